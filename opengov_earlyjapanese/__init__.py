@@ -1,15 +1,22 @@
 """OpenGov-EarlyJapanese - Comprehensive AI-powered Japanese language learning platform."""
 
+from importlib import import_module
+from typing import Any, List
+
 __version__ = "0.2.0"
 __author__ = "Nik Jois"
 __email__ = "nikjois@llamasearch.ai"
 
-from .config import settings
-from .core.hiragana import HiraganaTeacher
-from .core.katakana import KatakanaTeacher
-from .core.kanji import KanjiMaster
-from .core.grammar import GrammarTeacher
-from .core.srs import SpacedRepetitionSystem
+# Public names are imported on first access (PEP 562), so that importing the
+# package, e.g. for ``--version``, does not load settings or content.
+_LAZY = {
+    "settings": ".config",
+    "HiraganaTeacher": ".core.hiragana",
+    "KatakanaTeacher": ".core.katakana",
+    "KanjiMaster": ".core.kanji",
+    "GrammarTeacher": ".core.grammar",
+    "SpacedRepetitionSystem": ".core.srs",
+}
 
 __all__ = [
     "settings",
@@ -20,3 +27,16 @@ __all__ = [
     "SpacedRepetitionSystem",
     "__version__",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY))
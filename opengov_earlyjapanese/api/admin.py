@@ -0,0 +1,86 @@
+"""Admin-only endpoints, guarded by the ``X-Admin-Token`` header."""
+
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+
+from opengov_earlyjapanese.api import profiling
+from opengov_earlyjapanese.api.profiling import profile_store
+from opengov_earlyjapanese.api.security import require_admin
+from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.utils.profiling import (
+    STALE_AFTER_FLUSHES,
+    merge_collapsed_dir,
+    render_collapsed,
+)
+from opengov_earlyjapanese.utils.tracing import InMemoryExporter, summarize, tracer
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+async def list_profiles() -> List[Dict[str, Any]]:
+    return [p.summary() for p in profile_store.list()]
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    fmt: str = Query("pstats", alias="format", pattern="^(pstats|collapsed)$"),
+) -> Response:
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Unknown profile: {profile_id}")
+    if fmt == "collapsed":
+        return PlainTextResponse(profile.collapsed)
+    return Response(
+        profile.pstats,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.pstats"'},
+    )
+
+
+@router.get("/flamegraph", response_class=PlainTextResponse)
+async def flamegraph() -> PlainTextResponse:
+    """Collapsed stacks from the continuous sampler, merged across workers."""
+    sampler = profiling.sampler
+    if sampler is None and settings.sampler_dir is None:
+        raise HTTPException(status_code=404, detail="Continuous sampler is not enabled")
+    headers: Dict[str, str] = {}
+    if sampler is not None:
+        headers = {
+            "X-Sampler-Samples": str(sampler.samples),
+            "X-Sampler-Interval": f"{sampler.interval:g}",
+            "X-Sampler-Overhead": f"{sampler.overhead():.6f}",
+        }
+    if settings.sampler_dir is not None:
+        if sampler is not None:
+            sampler.flush()
+        stacks = merge_collapsed_dir(
+            settings.sampler_dir, max_age=STALE_AFTER_FLUSHES * settings.sampler_flush_interval
+        )
+    else:
+        assert sampler is not None
+        stacks = sampler.snapshot()
+    return PlainTextResponse(render_collapsed(stacks), headers=headers)
+
+
+@router.get("/traces")
+async def traces(
+    trace_id: Optional[str] = None,
+    summary: bool = False,
+    limit: int = Query(1000, ge=1, le=100_000),
+) -> Any:
+    """Finished spans held in memory (newest last), or a per-name time summary."""
+    exporter = tracer.exporter
+    if not isinstance(exporter, InMemoryExporter):
+        raise HTTPException(
+            status_code=404, detail="In-memory tracing is not enabled (see TRACING_FILE)"
+        )
+    spans = [s.to_dict() for s in exporter.get_finished_spans()]
+    if trace_id is not None:
+        spans = [s for s in spans if s["trace_id"] == trace_id]
+    if summary:
+        return summarize(spans)
+    return spans[-limit:]
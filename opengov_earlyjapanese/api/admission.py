@@ -0,0 +1,181 @@
+"""Token-bucket rate limiting and concurrency-based admission control."""
+
+import json
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Iterable
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+_server_workers = 1
+
+
+def set_server_workers(workers: int) -> None:
+    """Record how many server processes share this host; called in each prefork worker."""
+    global _server_workers
+    _server_workers = max(1, workers)
+
+
+class TokenBucket:
+    """Classic token bucket refilled lazily on each acquire."""
+
+    __slots__ = ("_clock", "capacity", "rate", "tokens", "updated")
+
+    def __init__(
+        self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self.updated = clock()
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take ``tokens`` if available; return 0.0, or seconds until they would be."""
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (tokens - self.tokens) / self.rate
+
+    def refund(self, tokens: float = 1.0) -> None:
+        """Give back tokens taken for work that was then rejected elsewhere."""
+        self.tokens = min(self.capacity, self.tokens + tokens)
+
+
+class ClientBuckets:
+    """Per-client buckets with LRU eviction so memory stays bounded."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        max_clients: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.max_clients = max_clients
+        self._clock = clock
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def try_acquire(self, client: str) -> float:
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.capacity, self._clock)
+            self._buckets[client] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        return bucket.try_acquire()
+
+    def refund(self, client: str) -> None:
+        bucket = self._buckets.get(client)
+        if bucket is not None:
+            bucket.refund()
+
+
+def _retry_after(wait: float) -> str:
+    return str(max(1, math.ceil(wait))) if math.isfinite(wait) else "60"
+
+
+class AdmissionControlMiddleware:
+    """Reject work early, before it queues on the event loop.
+
+    Checks run cheapest first: the in-flight request count (503), the
+    calling client's bucket (429) and the global token bucket (503). The
+    client goes first so that one client's rejected flood never drains
+    the global bucket shared by everyone else; a client whose request is
+    then shed for global load gets its token back. Rejections carry a
+    ``Retry-After`` header. Buckets are only touched
+    from the event loop thread, so no locking is needed.
+
+    The global rate, burst and concurrency are host-wide: each of
+    ``workers`` prefork processes (by default the count recorded by
+    :func:`set_server_workers`) enforces its share. Per-client limits apply
+    per process, since a client's connections may land on any worker.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        client_rate: float,
+        client_burst: float,
+        global_rate: float,
+        global_burst: float,
+        max_concurrency: int,
+        max_clients: int = 10000,
+        workers: Optional[int] = None,
+        exempt_paths: Iterable[str] = ("/health",),
+        trust_forwarded: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        share = max(1, workers or _server_workers)
+        self.app = app
+        self.clients = ClientBuckets(client_rate, client_burst, max_clients, clock)
+        self.global_bucket = TokenBucket(global_rate / share, global_burst / share, clock)
+        self.max_concurrency = max(1, math.ceil(max_concurrency / share))
+        self.exempt_paths: FrozenSet[str] = frozenset(exempt_paths)
+        self.trust_forwarded = trust_forwarded
+        self.in_flight = 0
+
+    def _client_key(self, scope: Scope) -> str:
+        if self.trust_forwarded:
+            headers: Iterable[Tuple[bytes, bytes]] = scope.get("headers", ())
+            for name, value in headers:
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client: Optional[Tuple[str, int]] = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def _reject(self, send: Send, status: int, detail: str, wait: float) -> None:
+        body = json.dumps({"detail": detail}).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                    (b"retry-after", _retry_after(wait).encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("path") in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+        if self.in_flight >= self.max_concurrency:
+            await self._reject(send, 503, "Server busy", 1.0)
+            return
+        client = self._client_key(scope)
+        wait = self.clients.try_acquire(client)
+        if wait:
+            await self._reject(send, 429, "Too many requests", wait)
+            return
+        wait = self.global_bucket.try_acquire()
+        if wait:
+            self.clients.refund(client)
+            await self._reject(send, 503, "Server busy", wait)
+            return
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
@@ -0,0 +1,23 @@
+"""Typeahead endpoint for the search box.
+
+Answered from the shared prefix trie (``core.autocomplete``) on the event
+loop: a lookup is a few microseconds, less than a hop to the thread pool.
+"""
+
+from typing import Any, Dict
+
+from fastapi import APIRouter, Query
+
+from opengov_earlyjapanese.core import registry
+from opengov_earlyjapanese.core.autocomplete import TOP_K
+
+router = APIRouter()
+
+
+@router.get("/autocomplete")
+async def autocomplete(
+    q: str = Query(..., max_length=64, description="Text typed so far; romaji is matched as kana"),
+    limit: int = Query(TOP_K, ge=1, le=TOP_K),
+) -> Dict[str, Any]:
+    """Completions for ``q``, most frequent first."""
+    return {"query": q, "items": registry.get_autocompleter().complete(q, limit)}
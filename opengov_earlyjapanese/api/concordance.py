@@ -0,0 +1,34 @@
+"""Keyword-in-context search for any substring of the example sentences.
+
+Answered from the memory-mapped suffix array (``core.concordance``) on the
+event loop: two binary searches of O(m log n) character comparisons find
+the occurrences, and only the ``limit`` returned ones are read. Level
+bounds add one integer bisection per level, not a pass over occurrences.
+"""
+
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from opengov_earlyjapanese.core import registry
+
+router = APIRouter()
+
+_LEVEL = "^([Nn][1-5]|unlisted)$"
+
+
+@router.get("/concordance")
+async def concordance(
+    q: str = Query(..., min_length=1, max_length=50, description="Substring to find"),
+    width: int = Query(12, ge=0, le=80, description="Characters of context either side"),
+    max_level: Optional[str] = Query(None, pattern=_LEVEL),
+    min_level: Optional[str] = Query(None, pattern=_LEVEL),
+    limit: int = Query(20, ge=1, le=200),
+) -> Dict[str, Any]:
+    """Occurrences of ``q`` in context, sorted by what follows; ``total`` within the levels."""
+    found = registry.get_concordance()
+    if found is None:
+        raise HTTPException(status_code=404, detail="No concordance is configured")
+    items = found.kwic(q, width, limit, max_level=max_level, min_level=min_level)
+    total = found.count(q, max_level=max_level, min_level=min_level)
+    return {"query": q, "total": total, "items": items}
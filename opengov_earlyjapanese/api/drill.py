@@ -0,0 +1,194 @@
+"""WebSocket review drill: one open connection per session, one frame per answer.
+
+Protocol (JSON text frames)::
+
+    server -> {"type": "session", "session_id": ..., "resumed": bool}
+    server -> {"type": "card", "card": {...}}            # or {"type": "done", ...}
+    client -> {"type": "answer", "card_id": ..., "answer": "ka"}
+              {"type": "answer", "card_id": ..., "rating": "hard"}
+    server -> {"type": "result", "result": {...}, "next": {...} | null}
+    client -> {"type": "end"}
+    server -> {"type": "done", "summary": {...}}
+    server -> {"type": "error", "detail": ...}           # bad frame; the session stays open
+
+Each result frame already carries the next card, so a round trip per answer
+is all the client waits for. Changed review states are written to the store
+in batches by a background task, and a session can be resumed by
+reconnecting with ``?session=<id>`` until it has been idle for
+``drill_session_ttl`` seconds.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.core import registry
+from opengov_earlyjapanese.core.drill import DrillSession, ReviewStore
+from opengov_earlyjapanese.core.models import Character
+
+router = APIRouter()
+
+review_store = ReviewStore()
+
+DECKS = ("hiragana", "katakana")
+
+
+class SessionManager:
+    """Live drill sessions kept for resumption, evicted by idle time and count."""
+
+    def __init__(self, ttl: float, max_sessions: int) -> None:
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, Tuple[DrillSession, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _purge(self, now: float) -> None:
+        while self._sessions:
+            sid, (_session, seen) = next(iter(self._sessions.items()))
+            if now - seen <= self.ttl and len(self._sessions) <= self.max_sessions:
+                break
+            del self._sessions[sid]
+
+    def get(self, session_id: str, student_id: str) -> Optional[DrillSession]:
+        now = time.monotonic()
+        self._purge(now)
+        entry = self._sessions.get(session_id)
+        if entry is None or entry[0].student_id != student_id:
+            return None
+        self.touch(session_id, entry[0])
+        return entry[0]
+
+    def add(self, session: DrillSession) -> str:
+        session_id = uuid.uuid4().hex
+        self.touch(session_id, session)
+        self._purge(time.monotonic())
+        return session_id
+
+    def touch(self, session_id: str, session: DrillSession) -> None:
+        self._sessions[session_id] = (session, time.monotonic())
+        self._sessions.move_to_end(session_id)
+
+    def drop(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+
+sessions = SessionManager(settings.drill_session_ttl, settings.drill_max_sessions)
+
+
+def build_pool(deck: str, row: Optional[str]) -> Dict[str, Character]:
+    teacher: Any = (
+        registry.get_hiragana_teacher() if deck == "hiragana" else registry.get_katakana_teacher()
+    )
+    if row is not None and row not in teacher.rows:
+        raise ValueError(f"Unknown row: {row}")
+    chars = teacher.rows[row] if row else list(teacher.characters)
+    return {teacher.characters[c].id: teacher.characters[c] for c in chars}
+
+
+async def flush(session: DrillSession) -> None:
+    dirty = session.take_dirty()
+    if dirty:
+        await asyncio.to_thread(review_store.save_many, session.student_id, dirty)
+
+
+async def _flush_periodically(session: DrillSession) -> None:
+    while True:
+        await asyncio.sleep(settings.drill_flush_interval)
+        await flush(session)
+
+
+async def _receive_message(websocket: WebSocket) -> Any:
+    """The next frame decoded as JSON; raises ValueError if it is not JSON."""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    return json.loads(message.get("text") or message.get("bytes") or "")
+
+
+def _card_message(session: DrillSession) -> Dict[str, Any]:
+    card = session.next_card()
+    if card is None:
+        return {"type": "done", "summary": session.summary()}
+    return {"type": "card", "card": card.model_dump()}
+
+
+@router.websocket("/ws/drill")
+async def drill(
+    websocket: WebSocket,
+    student: str = "anonymous",
+    deck: str = "hiragana",
+    row: Optional[str] = None,
+    session: Optional[str] = None,
+) -> None:
+    await websocket.accept()
+    drill_session = sessions.get(session, student) if session else None
+    resumed = drill_session is not None
+    if drill_session is None:
+        if deck not in DECKS:
+            await websocket.close(code=1008, reason=f"Unknown deck: {deck}")
+            return
+        try:
+            pool = build_pool(deck, row)
+        except ValueError as e:
+            await websocket.close(code=1008, reason=str(e))
+            return
+        states = await asyncio.to_thread(review_store.load, student)
+        drill_session = DrillSession(student, pool, states)
+        session = sessions.add(drill_session)
+    assert session is not None
+
+    await websocket.send_json({"type": "session", "session_id": session, "resumed": resumed})
+    await websocket.send_json(_card_message(drill_session))
+
+    flusher = asyncio.ensure_future(_flush_periodically(drill_session))
+    try:
+        while True:
+            try:
+                message = await _receive_message(websocket)
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "Invalid JSON"})
+                continue
+            if not isinstance(message, dict):
+                await websocket.send_json({"type": "error", "detail": "Expected a JSON object"})
+                continue
+            kind = message.get("type")
+            if kind == "end":
+                sessions.drop(session)
+                await flush(drill_session)
+                await websocket.send_json({"type": "done", "summary": drill_session.summary()})
+                await websocket.close()
+                return
+            if kind != "answer":
+                await websocket.send_json({"type": "error", "detail": f"Unknown type: {kind}"})
+                continue
+            try:
+                result = drill_session.answer(
+                    message.get("card_id", ""), message.get("answer"), message.get("rating")
+                )
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            sessions.touch(session, drill_session)
+            next_card = drill_session.next_card()
+            await websocket.send_json(
+                {
+                    "type": "result",
+                    "result": result.model_dump(mode="json"),
+                    "next": next_card.model_dump() if next_card else None,
+                }
+            )
+            if len(drill_session.dirty) >= settings.drill_flush_batch:
+                await flush(drill_session)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        flusher.cancel()
+        await flush(drill_session)
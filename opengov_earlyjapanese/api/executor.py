@@ -0,0 +1,96 @@
+"""Process pool for CPU-bound work, keeping the event loop free for cheap requests.
+
+The pool is started by the application lifespan and created on first use
+otherwise. Under the prefork server (``server.py``) every worker process
+starts its own pool, so the default size is the worker's share of the
+cores rather than all of them; see :func:`pool_size`. Workers are
+started with ``forkserver`` (``spawn`` where that is unavailable) so
+they never inherit the event loop or server threads.
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from opengov_earlyjapanese.config import settings
+
+T = TypeVar("T")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_server_workers = 1
+
+
+class CPUTaskTimeoutError(TimeoutError):
+    """A CPU-bound task did not finish within its deadline."""
+
+
+def _noop() -> None:
+    return None
+
+
+def _context() -> Any:
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def set_server_workers(workers: int) -> None:
+    """Record how many server processes share this host; called in each prefork worker."""
+    global _server_workers
+    _server_workers = max(1, workers)
+
+
+def pool_size() -> int:
+    """``CPU_POOL_WORKERS`` per server process, else the cores left for this one.
+
+    A single server process leaves one core for its event loop; ``N``
+    prefork workers each take ``cores // N``, so the host runs about as
+    many pool processes as cores instead of ``N * (cores - 1)``.
+    """
+    if settings.cpu_pool_workers:
+        return settings.cpu_pool_workers
+    cores = os.cpu_count() or 2
+    if _server_workers > 1:
+        return max(1, cores // _server_workers)
+    return max(1, cores - 1)
+
+
+def start_pool(workers: Optional[int] = None, warm: bool = True) -> ProcessPoolExecutor:
+    """Create the shared pool; with ``warm`` every worker is started immediately."""
+    global _pool
+    if _pool is None:
+        size = workers or pool_size()
+        _pool = ProcessPoolExecutor(max_workers=size, mp_context=_context())
+        if warm:
+            for f in [_pool.submit(_noop) for _ in range(size)]:
+                f.result()
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+async def run_cpu_bound(
+    func: Callable[..., T], *args: Any, timeout: Optional[float] = None, **kwargs: Any
+) -> T:
+    """Run ``func(*args, **kwargs)`` in the process pool and await its result.
+
+    ``func`` and its arguments must be picklable. On timeout or when the
+    awaiting request is cancelled, a task that has not started yet is
+    removed from the queue; one that is already running completes in its
+    worker and its result is discarded.
+    """
+    pool = _pool or start_pool(warm=False)
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+    limit = settings.cpu_task_timeout if timeout is None else timeout
+    try:
+        return await asyncio.wait_for(future, limit or None)
+    except asyncio.TimeoutError as e:
+        raise CPUTaskTimeoutError(f"{getattr(func, '__name__', func)} exceeded {limit}s") from e
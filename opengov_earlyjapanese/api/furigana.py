@@ -0,0 +1,88 @@
+"""Furigana for submitted text.
+
+Reader pages send the same articles over and over, so sentences are
+looked up in this process's annotator cache first; only the ones it has
+not seen are segmented, in the process pool (see ``api.executor``), and
+the results are stored here so the next request renders without a round
+trip. ``furigana`` left unset follows ``settings.furigana_default``.
+"""
+
+import unicodedata
+from collections.abc import Iterator
+from typing import Annotated, Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from opengov_earlyjapanese.api import executor
+from opengov_earlyjapanese.api.pagination import iter_ndjson
+from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.core import furigana, registry
+from opengov_earlyjapanese.utils.tracing import current_span, tracer
+
+router = APIRouter(prefix="/furigana")
+
+_FORMAT = Field("html", pattern="^(html|bracket|json)$")
+
+
+class FuriganaRequest(BaseModel):
+    text: str = Field(..., max_length=100_000)
+    format: str = _FORMAT
+    furigana: Optional[bool] = None
+
+
+class FuriganaBatchRequest(BaseModel):
+    texts: List[Annotated[str, Field(max_length=10_000)]] = Field(..., max_length=1000)
+    format: str = _FORMAT
+    furigana: Optional[bool] = None
+
+
+async def _prepare(texts: List[str], enabled: Optional[bool]) -> List[str]:
+    """NFC ``texts``, with every sentence they need segmented and cached."""
+    texts = [unicodedata.normalize("NFC", text) for text in texts]
+    if not (settings.furigana_default if enabled is None else enabled):
+        return texts
+    annotator = registry.get_furigana_annotator()
+    missing = annotator.missing(texts)
+    current_span().set_attribute("furigana.missing_sentences", len(missing))
+    if missing:
+        with tracer.start_span("executor.run_cpu_bound", {"code.function": "segment_sentences"}):
+            try:
+                found = await executor.run_cpu_bound(furigana.segment_sentences, missing)
+            except executor.CPUTaskTimeoutError as e:
+                raise HTTPException(status_code=504, detail=str(e)) from e
+        annotator.store(missing, found)
+    return texts
+
+
+@router.post("")
+async def annotate_text(body: FuriganaRequest) -> Dict[str, Any]:
+    """``text`` with furigana in ``format``: ``html``, ``bracket`` or ``json`` spans."""
+    (text,) = await _prepare([body.text], body.furigana)
+    annotator = registry.get_furigana_annotator()
+    return {"result": annotator.annotate(text, body.format, body.furigana)}
+
+
+@router.post("/batch")
+async def annotate_batch(body: FuriganaBatchRequest) -> Dict[str, Any]:
+    """Furigana for each of ``texts``, in order."""
+    texts = await _prepare(body.texts, body.furigana)
+    annotator = registry.get_furigana_annotator()
+    return {"results": annotator.annotate_many(texts, body.format, body.furigana)}
+
+
+@router.post("/stream")
+async def annotate_stream(body: FuriganaBatchRequest) -> StreamingResponse:
+    """As ``/batch``, but NDJSON, one ``{"index", "result"}`` line per text."""
+    texts = await _prepare(body.texts, body.furigana)
+    annotator = registry.get_furigana_annotator()
+    results = annotator.iter_annotate(texts, body.format, body.furigana)
+
+    def lines() -> Iterator[Dict[str, Any]]:
+        for i, result in enumerate(results):
+            yield {"index": i, "result": result}
+
+    return StreamingResponse(
+        iter_ndjson(lines(), settings.stream_chunk_size), media_type="application/x-ndjson"
+    )
@@ -0,0 +1,99 @@
+"""Cursor-paginated and NDJSON-streamed listing endpoints for content collections."""
+
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from opengov_earlyjapanese.api.pagination import KeysetCollection, decode_cursor, iter_ndjson
+from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.core import registry
+from opengov_earlyjapanese.core.sentences import with_examples
+
+router = APIRouter()
+
+
+def _hiragana() -> KeysetCollection:
+    return KeysetCollection(
+        registry.get_hiragana_teacher().characters,
+        lambda k: registry.get_hiragana_teacher().characters[k].model_dump(),
+    )
+
+
+def _katakana() -> KeysetCollection:
+    return KeysetCollection(
+        registry.get_katakana_teacher().characters,
+        lambda k: registry.get_katakana_teacher().characters[k].model_dump(),
+    )
+
+
+def _kanji() -> KeysetCollection:
+    return KeysetCollection(
+        registry.get_kanji_master().known_characters(),
+        lambda k: with_examples(registry.get_kanji_master().analyze(k)).model_dump(),
+    )
+
+
+def _grammar() -> KeysetCollection:
+    return KeysetCollection(
+        registry.get_grammar_teacher().patterns(),
+        lambda k: registry.get_grammar_teacher().explain(k).model_dump(),
+    )
+
+
+def _vocabulary() -> KeysetCollection:
+    return KeysetCollection(
+        registry.get_vocabulary_bank().ids(),
+        lambda k: registry.get_vocabulary_bank()[k].model_dump(mode="json"),
+    )
+
+
+COLLECTIONS: Dict[str, Callable[[], KeysetCollection]] = {
+    "hiragana": _hiragana,
+    "katakana": _katakana,
+    "kanji": _kanji,
+    "grammar": _grammar,
+    "vocabulary": _vocabulary,
+}
+
+
+# Only the sorted keys are cached. Items are fetched through the registry on
+# every call, so a reload that keeps the checksum (and so this cache entry)
+# never leaves a collection reading a closed pack.
+@lru_cache(maxsize=32)
+def _collection(name: str, content_hash: str) -> KeysetCollection:
+    return COLLECTIONS[name]()
+
+
+def get_collection(name: str) -> KeysetCollection:
+    """Collection ``name``; its keys are rebuilt when a reload changes the served content."""
+    return _collection(name, registry.content_hash())
+
+
+def _make_endpoint(name: str) -> Callable[..., Any]:
+    async def list_collection(
+        cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page"),
+        limit: Optional[int] = Query(None, ge=1, le=settings.page_size_max),
+        fmt: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+    ) -> Any:
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+        collection = get_collection(name)
+        if fmt == "ndjson":
+            return StreamingResponse(
+                iter_ndjson(collection.iter_from(after, limit), settings.stream_chunk_size),
+                media_type="application/x-ndjson",
+            )
+        items, next_cursor = collection.page(after, limit or settings.page_size_default)
+        return {"items": items, "next_cursor": next_cursor}
+
+    list_collection.__name__ = f"list_{name}"
+    list_collection.__doc__ = f"List {name} entries, one page or a full NDJSON stream."
+    return list_collection
+
+
+for _name in COLLECTIONS:
+    router.add_api_route(f"/{_name}", _make_endpoint(_name), methods=["GET"])
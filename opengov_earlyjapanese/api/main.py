@@ -1,12 +1,74 @@
 """FastAPI app exposing minimal endpoints."""
 
+import unicodedata
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any, List
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel, Field
 
+from opengov_earlyjapanese.api import executor, profiling
+from opengov_earlyjapanese.api.admin import router as admin_router
+from opengov_earlyjapanese.api.admission import AdmissionControlMiddleware
+from opengov_earlyjapanese.api.autocomplete import router as autocomplete_router
+from opengov_earlyjapanese.api.concordance import router as concordance_router
+from opengov_earlyjapanese.api.drill import router as drill_router
+from opengov_earlyjapanese.api.furigana import router as furigana_router
+from opengov_earlyjapanese.api.listing import router as listing_router
+from opengov_earlyjapanese.api.profiling import ProfilingMiddleware
+from opengov_earlyjapanese.api.sentences import router as sentences_router
+from opengov_earlyjapanese.api.tokenize import router as tokenize_router
+from opengov_earlyjapanese.api.tracing import TracingMiddleware
+from opengov_earlyjapanese.api.vocabulary import router as vocabulary_router
 from opengov_earlyjapanese.config import settings
-from opengov_earlyjapanese.core.hiragana import HiraganaTeacher
+from opengov_earlyjapanese.core.kanji import analyze_text
+from opengov_earlyjapanese.core.registry import get_hiragana_teacher
+from opengov_earlyjapanese.utils.cache import TTLCache
+from opengov_earlyjapanese.utils.logger import configure_logging
+from opengov_earlyjapanese.utils.singleflight import call_key
+from opengov_earlyjapanese.utils.tracing import current_span, setup_tracing, tracer
+
+
+configure_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    settings.ensure_directories()
+    executor.start_pool()
+    setup_tracing()
+    if settings.sampler_enabled:
+        profiling.start_sampler()
+    try:
+        yield
+    finally:
+        profiling.stop_sampler()
+        executor.shutdown_pool()
+
+
+app = FastAPI(title=settings.api_title, version=settings.api_version, lifespan=lifespan)
+
+if settings.profiling_enabled:
+    app.add_middleware(
+        ProfilingMiddleware,
+        sample_rate=settings.profiling_sample_rate,
+        sample_interval=settings.profiling_sample_interval,
+    )
 
-app = FastAPI(title=settings.api_title, version=settings.api_version)
+# Registered before CORS so that rejections still carry CORS headers
+if settings.rate_limit_enabled:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        client_rate=settings.rate_limit_per_client,
+        client_burst=settings.rate_limit_client_burst,
+        global_rate=settings.rate_limit_global,
+        global_burst=settings.rate_limit_global_burst,
+        max_concurrency=settings.max_concurrent_requests,
+        max_clients=settings.rate_limit_max_clients,
+        trust_forwarded=settings.rate_limit_trust_forwarded,
+    )
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,6 +78,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so the request span covers admission control and CORS too
+app.add_middleware(TracingMiddleware)
+
+app.include_router(listing_router)
+app.include_router(drill_router)
+app.include_router(admin_router)
+app.include_router(vocabulary_router)
+app.include_router(autocomplete_router)
+app.include_router(tokenize_router)
+app.include_router(furigana_router)
+app.include_router(sentences_router)
+app.include_router(concordance_router)
+
 
 @app.get("/")
 def root():
@@ -29,12 +104,37 @@ def health():
 
 @app.get("/hiragana/{row}")
 def get_hiragana_row(row: str):
-    teacher = HiraganaTeacher()
+    teacher = get_hiragana_teacher()
     try:
         lesson = teacher.get_lesson(row)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
-    return lesson.model_dump()
+    with tracer.start_span("serialize"):
+        return lesson.model_dump()
+
+
+class KanjiTextRequest(BaseModel):
+    text: str = Field(..., max_length=100_000)
 
 
+analysis_cache = TTLCache(settings.cache_ttl, maxsize=settings.cache_max_entries)
 
+
+@app.post("/kanji/analyze")
+async def analyze_kanji_text(body: KanjiTextRequest) -> List[Any]:
+    text = unicodedata.normalize("NFC", body.text)
+
+    async def compute() -> List[Any]:
+        current_span().set_attribute("cache.hit", False)
+        with tracer.start_span("executor.run_cpu_bound", {"code.function": "analyze_text"}):
+            return await executor.run_cpu_bound(analyze_text, text)
+
+    try:
+        if settings.enable_caching:
+            # Concurrent misses for the same text share one computation, which
+            # marks the leader's span as the miss
+            current_span().set_attribute("cache.hit", True)
+            return await analysis_cache.get_or_compute(call_key("analyze_text", text), compute)
+        return await compute()
+    except executor.CPUTaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
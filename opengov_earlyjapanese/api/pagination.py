@@ -0,0 +1,74 @@
+"""Keyset (cursor) pagination over in-memory content collections."""
+
+import base64
+import json
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def encode_cursor(key: str) -> str:
+    raw = json.dumps({"k": key}, ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        key = payload["k"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(key, str):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return key
+
+
+class KeysetCollection:
+    """A collection addressed by a sorted key list.
+
+    Items are fetched and serialised one key at a time, so a page costs
+    O(log n + limit) and a full iteration never holds more than one item.
+    Cursors carry the last key seen rather than an offset, which keeps
+    pages stable when items are added to or removed from the collection.
+    """
+
+    def __init__(self, keys: Iterable[str], fetch: Callable[[str], Dict[str, Any]]) -> None:
+        self._keys = sorted(keys)
+        self._fetch = fetch
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _start(self, after: Optional[str]) -> int:
+        return 0 if after is None else bisect_right(self._keys, after)
+
+    def page(self, after: Optional[str], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        start = self._start(after)
+        keys = self._keys[start : start + limit]
+        items = [self._fetch(k) for k in keys]
+        has_more = start + limit < len(self._keys)
+        next_cursor = encode_cursor(keys[-1]) if keys and has_more else None
+        return items, next_cursor
+
+    def iter_from(
+        self, after: Optional[str], limit: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        start = self._start(after)
+        stop = len(self._keys) if limit is None else min(len(self._keys), start + limit)
+        for i in range(start, stop):
+            yield self._fetch(self._keys[i])
+
+
+def iter_ndjson(items: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[bytes]:
+    """Encode items as NDJSON, grouping ``chunk_size`` lines per yielded chunk."""
+    buf: List[str] = []
+    for item in items:
+        buf.append(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+        if len(buf) >= chunk_size:
+            buf.append("")
+            yield "\n".join(buf).encode("utf-8")
+            buf = []
+    if buf:
+        buf.append("")
+        yield "\n".join(buf).encode("utf-8")
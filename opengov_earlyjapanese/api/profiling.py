@@ -0,0 +1,123 @@
+"""On-demand per-request profiling.
+
+Only installed when ``profiling_enabled`` is set, so it costs nothing
+otherwise. A request is profiled when it carries ``X-Profile: 1`` (or
+``?profile=1``) together with a valid ``X-Admin-Token``, or when it falls
+within ``profiling_sample_rate``. The request runs under cProfile and a
+stack sampler; the result is kept in memory and can be downloaded from
+``/admin/profiles/{id}`` as pstats or collapsed stacks. The profile id is
+returned in the ``X-Profile-Id`` response header.
+
+cProfile sees everything on the event loop thread while the request is in
+flight, and the sampler sees every busy thread, so concurrent requests can
+show up in a profile. Only one request is profiled at a time.
+"""
+
+import cProfile
+import marshal
+import random
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs
+
+from opengov_earlyjapanese.api.admission import ASGIApp, Receive, Scope, Send
+from opengov_earlyjapanese.api.security import is_admin_token
+from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.utils.profiling import (
+    ContinuousSampler,
+    ProfileStore,
+    StackSampler,
+    StoredProfile,
+    render_collapsed,
+)
+
+profile_store = ProfileStore(settings.profiling_max_profiles)
+
+# Continuous sampler for this process, started by the app lifespan
+sampler: Optional[ContinuousSampler] = None
+
+
+def start_sampler() -> ContinuousSampler:
+    global sampler
+    if sampler is None:
+        sampler = ContinuousSampler(
+            interval=settings.sampler_interval,
+            max_stacks=settings.sampler_max_stacks,
+            max_overhead=settings.sampler_max_overhead,
+            max_interval=settings.sampler_max_interval,
+            output_dir=settings.sampler_dir,
+            flush_interval=settings.sampler_flush_interval,
+        )
+    return sampler.start()
+
+
+def stop_sampler() -> None:
+    global sampler
+    if sampler is not None:
+        sampler.stop()
+        sampler = None
+
+
+def _requested(scope: Scope) -> bool:
+    headers = dict(scope.get("headers", ()))
+    flag = headers.get(b"x-profile", b"").decode("latin-1")
+    if flag not in ("1", "true"):
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        flag = query.get("profile", [""])[0]
+    if flag not in ("1", "true"):
+        return False
+    return is_admin_token(headers.get(b"x-admin-token", b"").decode("latin-1"))
+
+
+class ProfilingMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        sample_rate: float = 0.0,
+        sample_interval: float = 0.001,
+        store: ProfileStore = profile_store,
+    ) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.sample_interval = sample_interval
+        self.store = store
+        self._busy = False
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self._busy or scope["type"] != "http" or scope["path"].startswith("/admin"):
+            return False
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        return sampled or _requested(scope)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        profile = StoredProfile(scope.get("method", ""), scope["path"], 0.0, b"", "")
+
+        async def send_with_id(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile.id.encode("ascii")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler = cProfile.Profile()
+        sampler = StackSampler(self.sample_interval).start()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.disable()
+            duration = (time.perf_counter() - start) * 1000
+            stacks = sampler.stop()
+            profiler.create_stats()
+            profile.duration_ms = duration
+            profile.pstats = marshal.dumps(profiler.stats)
+            profile.collapsed = render_collapsed(stacks)
+            self.store.add(profile)
+            self._busy = False
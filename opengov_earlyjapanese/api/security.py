@@ -0,0 +1,20 @@
+"""Admin token checks shared by admin routes and middleware."""
+
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from opengov_earlyjapanese.config import settings
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    expected = settings.admin_token
+    if expected is None or not token:
+        return False
+    return secrets.compare_digest(token, expected.get_secret_value())
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
@@ -0,0 +1,31 @@
+"""Example sentences by kanji and word.
+
+Answered from the memory-mapped sentence index (``core.sentences``) on the
+event loop: a query intersects a few sorted posting lists and stops after
+``limit`` hits.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from opengov_earlyjapanese.core import registry
+
+router = APIRouter()
+
+_LEVEL = "^([Nn][1-5]|unlisted)$"
+
+
+@router.get("/sentences")
+async def find_sentences(
+    q: List[str] = Query([], max_length=8, description="Kanji or words every sentence contains"),
+    max_level: Optional[str] = Query(None, pattern=_LEVEL),
+    min_level: Optional[str] = Query(None, pattern=_LEVEL),
+    limit: int = Query(5, ge=1, le=100),
+) -> Dict[str, Any]:
+    """Sentences containing every ``q``, within the levels, easiest first."""
+    index = registry.get_sentence_index()
+    if index is None:
+        raise HTTPException(status_code=404, detail="No sentence index is configured")
+    items = index.find(q, max_level=max_level, min_level=min_level, limit=limit)
+    return {"query": q, "items": items}
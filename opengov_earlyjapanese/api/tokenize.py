@@ -0,0 +1,46 @@
+"""Morphological tokenization of submitted text.
+
+Segmentation is CPU-bound and grows with the text, so it runs in the
+process pool (see ``api.executor``); each worker keeps its own tokenizer
+and sentence cache.
+"""
+
+from typing import Annotated, Any, Dict, List
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from opengov_earlyjapanese.api import executor
+from opengov_earlyjapanese.core import tokenizer
+from opengov_earlyjapanese.utils.tracing import tracer
+
+router = APIRouter(prefix="/tokenize")
+
+
+class TokenizeRequest(BaseModel):
+    text: str = Field(..., max_length=100_000)
+
+
+class TokenizeBatchRequest(BaseModel):
+    texts: List[Annotated[str, Field(max_length=10_000)]] = Field(..., max_length=1000)
+
+
+async def _tokenize(texts: List[str]) -> List[List[Dict[str, Any]]]:
+    with tracer.start_span("executor.run_cpu_bound", {"code.function": "tokenize_many"}):
+        try:
+            found = await executor.run_cpu_bound(tokenizer.tokenize_many, texts)
+        except executor.CPUTaskTimeoutError as e:
+            raise HTTPException(status_code=504, detail=str(e)) from e
+    return [[t._asdict() for t in tokens] for tokens in found]
+
+
+@router.post("")
+async def tokenize_text(body: TokenizeRequest) -> Dict[str, Any]:
+    """Tokens of ``text``, with offsets into it."""
+    return {"tokens": (await _tokenize([body.text]))[0]}
+
+
+@router.post("/batch")
+async def tokenize_batch(body: TokenizeBatchRequest) -> Dict[str, Any]:
+    """Tokens for each of ``texts``, in order."""
+    return {"results": await _tokenize(body.texts)}
@@ -0,0 +1,47 @@
+"""Server spans for HTTP requests.
+
+Each request runs inside a ``SERVER`` span named ``"{method} {route}"``
+(the route template, e.g. ``/hiragana/{row}``, once routing has matched),
+so spans opened by handlers and core code nest under it. The middleware is
+always installed and passes requests straight through while the tracer is
+disabled.
+"""
+
+from typing import Any, Dict
+
+from opengov_earlyjapanese.api.admission import ASGIApp, Receive, Scope, Send
+from opengov_earlyjapanese.utils.tracing import tracer
+
+
+class TracingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not tracer.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "")
+        span = tracer.start_span(
+            f"{method} {scope['path']}",
+            {"http.request.method": method, "url.path": scope["path"]},
+            kind="SERVER",
+        )
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                span.set_attribute("http.response.status_code", status)
+                if status >= 500:
+                    span.set_status("ERROR")
+            await send(message)
+
+        with span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route is not None:
+                    span.name = f"{method} {route}"
+                    span.set_attribute("http.route", route)
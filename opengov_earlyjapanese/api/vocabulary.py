@@ -0,0 +1,38 @@
+"""Vocabulary lookups by written form or reading, and filtered listing."""
+
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.core import registry
+from opengov_earlyjapanese.core.sentences import with_examples
+
+router = APIRouter(prefix="/vocabulary")
+
+
+@router.get("/lookup/{query}")
+async def lookup_vocabulary(query: str) -> List[Dict[str, Any]]:
+    """Entries whose word or reading is ``query``; homographs return several.
+
+    Example sentences come from the sentence index when one is configured.
+    """
+    entries = registry.get_vocabulary_bank().lookup(query)
+    if not entries:
+        raise HTTPException(status_code=404, detail=f"No vocabulary entry for {query!r}")
+    return [with_examples(e).model_dump(mode="json") for e in entries]
+
+
+@router.get("/search")
+async def search_vocabulary(
+    jlpt: Optional[str] = Query(None, pattern="^[Nn][1-5]$"),
+    pos: Optional[str] = Query(None, description="Part of speech, e.g. noun"),
+    min_rank: Optional[int] = Query(None, ge=1),
+    max_rank: Optional[int] = Query(None, ge=1),
+    limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+) -> Dict[str, Any]:
+    """Entries matching every given filter; frequency order when a rank bound is set."""
+    entries = registry.get_vocabulary_bank().find(
+        limit, jlpt_level=jlpt, part_of_speech=pos, min_rank=min_rank, max_rank=max_rank
+    )
+    return {"items": [e.model_dump(mode="json") for e in entries]}
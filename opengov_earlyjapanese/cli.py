@@ -1,14 +1,20 @@
 """Typer CLI for common tasks."""
 
 import json
-from typing import Optional
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence
 
 import typer
 
 from opengov_earlyjapanese import __version__
-from opengov_earlyjapanese.core.hiragana import HiraganaTeacher
-from opengov_earlyjapanese.core.katakana import KatakanaTeacher
-from opengov_earlyjapanese.core.kanji import KanjiMaster
+from opengov_earlyjapanese.utils.table import TableRenderer, display_width, truncate
+
+if TYPE_CHECKING:
+    from opengov_earlyjapanese.daemon import DaemonClient
+
+# Content modules are imported inside each command so that startup (and
+# --version/--help) does not pay for settings or content construction.
 
 # Global settings
 COLOR_OUTPUT = True
@@ -16,6 +22,8 @@ COLOR_OUTPUT = True
 app = typer.Typer(add_completion=False, help="OpenGov-EarlyJapanese CLI")
 kanji_app = typer.Typer(help="Kanji utilities")
 katakana_app = typer.Typer(help="Katakana utilities")
+vocab_app = typer.Typer(help="Vocabulary lookups")
+sentences_app = typer.Typer(help="Example sentences")
 
 
 @app.callback(invoke_without_command=True)
@@ -25,6 +33,9 @@ def version_callback(
         None, "--version", help="Show version", is_eager=True
     ),
     color: bool = typer.Option(True, "--color/--no-color", help="Colorize table output"),
+    trace: Optional[Path] = typer.Option(
+        None, "--trace", help="Append tracing spans to this JSON-lines file (runs in-process)"
+    ),
 ):
     # Update color preference early
     # Typer doesn't pass boolean options here unless defined, so handle via env later if needed
@@ -35,42 +46,143 @@ def version_callback(
     if version:
         typer.echo(__version__)
         raise typer.Exit()
+    if trace is not None:
+        from opengov_earlyjapanese.utils.tracing import FileExporter, tracer
+
+        tracer.configure(FileExporter(trace))
+        ctx.call_on_close(tracer.disable)
     # If no subcommand and no version, show help
     if ctx.invoked_subcommand is None:
         typer.echo(ctx.get_help())
         raise typer.Exit(code=0)
 
 
-def _print_table(rows, headers):
-    # Basic table renderer without external deps
-    widths = [len(h) for h in headers]
-    for r in rows:
-        for i, cell in enumerate(r):
-            widths[i] = max(widths[i], len(str(cell)))
-    def fmt(r):
-        return " | ".join(str(c).ljust(widths[i]) for i, c in enumerate(r))
-    sep = "-+-".join("-" * w for w in widths)
-    header = fmt(headers)
-    # Colorize header and separator when supported
+def _print_table(rows: Iterable[Sequence[Any]], headers: List[str]) -> None:
+    # Streams: widths come from the first rows, so large outputs start at once
+    lines = TableRenderer(headers).render(rows)
+    header, rule = next(lines), next(lines)
     if COLOR_OUTPUT:
         typer.secho(header, bold=True)
-        typer.secho(sep, dim=True)
-        for r in rows:
-            typer.echo(fmt(r))
+        typer.secho(rule, dim=True)
     else:
-        lines = [header, sep]
-        for r in rows:
-            lines.append(fmt(r))
-        typer.echo("\n".join(lines))
+        typer.echo(header)
+        typer.echo(rule)
+    for line in lines:
+        typer.echo(line)
+
+
+def _stdin_option() -> Any:
+    return typer.Option(False, "--stdin", help="Read one query per line from stdin, write NDJSON")
+
+
+def _input_option() -> Any:
+    return typer.Option(
+        None, "--input", "-i", help="Read one query per line from a file, write NDJSON"
+    )
+
+
+def _daemon_client() -> Optional["DaemonClient"]:
+    from opengov_earlyjapanese import daemon
+    from opengov_earlyjapanese.utils.tracing import tracer
+
+    # Traced runs stay in-process so that the spans end up in the trace file
+    if tracer.enabled or not daemon.forwarding_enabled():
+        return None
+    client = daemon.DaemonClient.connect()
+    if client is None:
+        return None
+    try:
+        matches = client.matches()
+    except OSError:
+        matches = False
+    if matches:
+        return client
+    # A daemon started with other settings or content would answer differently
+    client.close()
+    return None
+
+
+def _from_daemon(name: str, query: str, **options: Any) -> Any:
+    """Lookup result from the daemon, or None when it is not running.
+
+    Lookup errors are reported like the in-process commands do.
+    """
+    client = _daemon_client()
+    if client is None:
+        return None
+    with client:
+        try:
+            return client.lookup(name, query, **options)
+        except ValueError as e:
+            typer.secho(str(e), err=True, fg=typer.colors.RED)
+            raise typer.Exit(code=1) from None
+        except OSError:
+            return None
+
+
+def _run_batch(name: str, stdin: bool, input_file: Optional[Path], **options: Any) -> bool:
+    """Stream NDJSON results for a batch of queries; False when not in batch mode.
+
+    Queries go to the daemon while it answers; if the connection fails
+    mid-batch, the rest run in-process. Exits with code 1 after the batch
+    if any query failed.
+    """
+    if not stdin and input_file is None:
+        return False
+    from opengov_earlyjapanese.lookups import lookup, stream_ndjson
+
+    client = _daemon_client()
+
+    def resolve(name: str, query: str, **options: Any) -> Any:
+        nonlocal client
+        if client is not None:
+            try:
+                return client.lookup(name, query, **options)
+            except OSError:  # includes ConnectionError and socket timeouts
+                client.close()
+                client = None
+        return lookup(name, query, **options)
+
+    source = sys.stdin if input_file is None else input_file.open(encoding="utf-8")
+    failed = 0
+    try:
+        for line, ok in stream_ndjson(name, source, resolve, **options):
+            typer.echo(line)
+            failed += not ok
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if client is not None:
+            client.close()
+    if failed:
+        raise typer.Exit(code=1)
+    return True
+
+
+def _require(value: Optional[str], name: str) -> str:
+    if value is None:
+        raise typer.BadParameter("Missing argument (or use --stdin/--input).", param_hint=name)
+    return value
 
 
 @app.command()
 def hiragana(
     row: str = typer.Argument("a_row"),
     fmt: str = typer.Option("json", "--format", "-f", "-F", help="json or table"),
+    stdin: bool = _stdin_option(),
+    input_file: Optional[Path] = _input_option(),
 ):
     """Show hiragana for a given row (e.g., a_row)."""
-    t = HiraganaTeacher()
+    if _run_batch("hiragana", stdin, input_file):
+        return
+    if fmt != "table":
+        lesson = _from_daemon("hiragana", row)
+        if lesson is not None:
+            typer.echo(json.dumps(lesson, ensure_ascii=False, indent=2))
+            return
+    from opengov_earlyjapanese.core import registry
+
+    t = registry.get_hiragana_teacher()
     try:
         lesson = t.get_lesson(row)
     except ValueError as e:
@@ -82,7 +194,7 @@ def hiragana(
                 c,
                 t.characters[c].romaji,
                 t.characters[c].unicode,
-                (t.characters[c].mnemonic or "")[:40],
+                truncate(t.characters[c].mnemonic or "", 40),
             ]
             for c in lesson.characters
         ]
@@ -94,7 +206,9 @@ def hiragana(
 @app.command()
 def rows(fmt: str = typer.Option("json", "--format", "-f", "-F", help="json or table")):
     """List available hiragana rows."""
-    t = HiraganaTeacher()
+    from opengov_earlyjapanese.core import registry
+
+    t = registry.get_hiragana_teacher()
     items = sorted(list(t.rows.keys()))
     if fmt == "table":
         _print_table([[r] for r in items], ["row"])
@@ -103,12 +217,25 @@ def rows(fmt: str = typer.Option("json", "--format", "-f", "-F", help="json or t
 
 
 @app.command()
-def mnemonic(character: str = typer.Argument(..., help="A single hiragana character")):
+def mnemonic(
+    character: Optional[str] = typer.Argument(None, help="A single hiragana character"),
+    stdin: bool = _stdin_option(),
+    input_file: Optional[Path] = _input_option(),
+) -> None:
     """Show mnemonic for a given hiragana character."""
+    if _run_batch("mnemonic", stdin, input_file):
+        return
+    character = _require(character, "CHARACTER")
     if len(character) != 1:
         typer.secho("Please provide a single hiragana character.", err=True, fg=typer.colors.RED)
         raise typer.Exit(code=1)
-    t = HiraganaTeacher()
+    forwarded = _from_daemon("mnemonic", character)
+    if forwarded is not None:
+        typer.echo(forwarded)
+        return
+    from opengov_earlyjapanese.core import registry
+
+    t = registry.get_hiragana_teacher()
     m = t.get_mnemonic(character)
     if m is None:
         typer.secho("Character not found.", err=True, fg=typer.colors.RED)
@@ -118,14 +245,26 @@ def mnemonic(character: str = typer.Argument(..., help="A single hiragana charac
 
 @kanji_app.command("analyze")
 def kanji_analyze(
-    character: str = typer.Argument(..., help="A single kanji character"),
+    character: Optional[str] = typer.Argument(None, help="A single kanji character"),
     fmt: str = typer.Option("json", "--format", "-f", "-F", help="json or table"),
+    stdin: bool = _stdin_option(),
+    input_file: Optional[Path] = _input_option(),
 ):
     """Analyze a kanji and print meanings and readings."""
+    if _run_batch("kanji.analyze", stdin, input_file):
+        return
+    character = _require(character, "CHARACTER")
     if len(character) != 1:
         typer.secho("Please provide a single kanji character.", err=True, fg=typer.colors.RED)
         raise typer.Exit(code=1)
-    km = KanjiMaster()
+    if fmt != "table":
+        forwarded = _from_daemon("kanji.analyze", character)
+        if forwarded is not None:
+            typer.echo(json.dumps(forwarded, ensure_ascii=False, indent=2))
+            return
+    from opengov_earlyjapanese.core import registry
+
+    km = registry.get_kanji_master()
     analysis = km.analyze(character)
     if fmt == "table":
         rows = [[
@@ -137,7 +276,9 @@ def kanji_analyze(
         ]]
         _print_table(rows, ["char", "meanings", "on", "kun", "radicals"])
     else:
-        typer.echo(json.dumps(analysis.model_dump(), ensure_ascii=False, indent=2))
+        from opengov_earlyjapanese.core.sentences import with_examples
+
+        typer.echo(json.dumps(with_examples(analysis).model_dump(), ensure_ascii=False, indent=2))
 
 
 @app.command()
@@ -146,7 +287,9 @@ def characters(
     fmt: str = typer.Option("json", "--format", "-f", "-F", help="json or table"),
 ):
     """List detailed character info for a row."""
-    t = HiraganaTeacher()
+    from opengov_earlyjapanese.core import registry
+
+    t = registry.get_hiragana_teacher()
     try:
         lesson = t.get_lesson(row)
     except ValueError as e:
@@ -158,7 +301,7 @@ def characters(
                 c,
                 t.characters[c].romaji,
                 t.characters[c].unicode,
-                (t.characters[c].mnemonic or "")[:40],
+                truncate(t.characters[c].mnemonic or "", 40),
             ]
             for c in lesson.characters
         ]
@@ -181,7 +324,9 @@ def kanji_sentences(
     if level not in {"N5", "N4", "N3", "N2", "N1"}:
         typer.secho("Level must be one of N5, N4, N3, N2, N1.", err=True, fg=typer.colors.RED)
         raise typer.Exit(code=1)
-    km = KanjiMaster()
+    from opengov_earlyjapanese.core import registry
+
+    km = registry.get_kanji_master()
     sentences = km.generate_sentences(character, level=level)
     if fmt == "table":
         _print_table([[i + 1, s] for i, s in enumerate(sentences)], ["#", "sentence"])
@@ -191,12 +336,16 @@ def kanji_sentences(
 
 app.add_typer(kanji_app, name="kanji")
 app.add_typer(katakana_app, name="katakana")
+app.add_typer(vocab_app, name="vocab")
+app.add_typer(sentences_app, name="sentences")
 
 
 @katakana_app.command("rows")
 def katakana_rows(fmt: str = typer.Option("json", "--format", "-f", "-F", help="json or table")):
     """List available katakana rows."""
-    t = KatakanaTeacher()
+    from opengov_earlyjapanese.core import registry
+
+    t = registry.get_katakana_teacher()
     items = sorted(list(t.rows.keys()))
     if fmt == "table":
         _print_table([[r] for r in items], ["row"])
@@ -208,9 +357,20 @@ def katakana_rows(fmt: str = typer.Option("json", "--format", "-f", "-F", help="
 def katakana_characters(
     row: str = typer.Argument("a_row"),
     fmt: str = typer.Option("json", "--format", "-f", "-F", help="json or table"),
+    stdin: bool = _stdin_option(),
+    input_file: Optional[Path] = _input_option(),
 ):
     """List katakana characters for a row."""
-    t = KatakanaTeacher()
+    if _run_batch("katakana.characters", stdin, input_file):
+        return
+    if fmt != "table":
+        forwarded = _from_daemon("katakana.characters", row)
+        if forwarded is not None:
+            typer.echo(json.dumps(forwarded, ensure_ascii=False, indent=2))
+            return
+    from opengov_earlyjapanese.core import registry
+
+    t = registry.get_katakana_teacher()
     if row not in t.rows:
         typer.secho(f"Unknown row: {row}", err=True, fg=typer.colors.RED)
         raise typer.Exit(code=1)
@@ -220,7 +380,7 @@ def katakana_characters(
                 c,
                 t.characters[c].romaji,
                 t.characters[c].unicode,
-                (t.characters[c].mnemonic or "")[:40],
+                truncate(t.characters[c].mnemonic or "", 40),
             ]
             for c in t.rows[row]
         ]
@@ -231,12 +391,25 @@ def katakana_characters(
 
 
 @katakana_app.command("mnemonic")
-def katakana_mnemonic(character: str = typer.Argument(..., help="A single katakana character")):
+def katakana_mnemonic(
+    character: Optional[str] = typer.Argument(None, help="A single katakana character"),
+    stdin: bool = _stdin_option(),
+    input_file: Optional[Path] = _input_option(),
+) -> None:
     """Show mnemonic for a given katakana character."""
+    if _run_batch("katakana.mnemonic", stdin, input_file):
+        return
+    character = _require(character, "CHARACTER")
     if len(character) != 1:
         typer.secho("Please provide a single katakana character.", err=True, fg=typer.colors.RED)
         raise typer.Exit(code=1)
-    t = KatakanaTeacher()
+    forwarded = _from_daemon("katakana.mnemonic", character)
+    if forwarded is not None:
+        typer.echo(forwarded)
+        return
+    from opengov_earlyjapanese.core import registry
+
+    t = registry.get_katakana_teacher()
     ch = t.characters.get(character)
     if not ch or not ch.mnemonic:
         typer.secho("Character not found.", err=True, fg=typer.colors.RED)
@@ -244,60 +417,597 @@ def katakana_mnemonic(character: str = typer.Argument(..., help="A single kataka
     typer.echo(ch.mnemonic)
 
 
+def _print_vocabulary(entries: Iterable[Dict[str, Any]], fmt: str) -> None:
+    if fmt == "table":
+        rows = (
+            [
+                e["word"],
+                e["reading"],
+                e["part_of_speech"],
+                e["jlpt_level"],
+                e.get("frequency_rank") or "",
+                truncate(", ".join(e["meanings"]), 40),
+            ]
+            for e in entries
+        )
+        _print_table(rows, ["word", "reading", "pos", "jlpt", "rank", "meanings"])
+    else:
+        typer.echo(json.dumps(list(entries), ensure_ascii=False, indent=2))
+
+
+@vocab_app.command("lookup")
+def vocab_lookup(
+    query: Optional[str] = typer.Argument(None, help="A word or its kana reading"),
+    fmt: str = typer.Option("json", "--format", "-f", "-F", help="json or table"),
+    stdin: bool = _stdin_option(),
+    input_file: Optional[Path] = _input_option(),
+) -> None:
+    """Look up vocabulary by written form or reading."""
+    if _run_batch("vocab", stdin, input_file):
+        return
+    query = _require(query, "QUERY")
+    if fmt != "table":
+        forwarded = _from_daemon("vocab", query)
+        if forwarded is not None:
+            typer.echo(json.dumps(forwarded, ensure_ascii=False, indent=2))
+            return
+    from opengov_earlyjapanese.lookups import vocabulary_lookup
+
+    try:
+        entries = vocabulary_lookup(query)
+    except ValueError as e:
+        typer.secho(str(e), err=True, fg=typer.colors.RED)
+        raise typer.Exit(code=1) from None
+    _print_vocabulary(entries, fmt)
+
+
+@vocab_app.command("list")
+def vocab_list(
+    jlpt: Optional[str] = typer.Option(None, "--jlpt", help="JLPT level N5..N1"),
+    pos: Optional[str] = typer.Option(None, "--pos", help="Part of speech, e.g. noun"),
+    min_rank: Optional[int] = typer.Option(None, "--min-rank", help="Most frequent rank"),
+    max_rank: Optional[int] = typer.Option(None, "--max-rank", help="Least frequent rank"),
+    limit: int = typer.Option(50, "--limit", "-n", min=1, help="Maximum entries"),
+    fmt: str = typer.Option("json", "--format", "-f", "-F", help="json or table"),
+) -> None:
+    """List vocabulary by JLPT level, part of speech and frequency rank."""
+    from opengov_earlyjapanese.core import registry
+
+    entries = registry.get_vocabulary_bank().find(
+        limit, jlpt_level=jlpt, part_of_speech=pos, min_rank=min_rank, max_rank=max_rank
+    )
+    _print_vocabulary((e.model_dump(mode="json") for e in entries), fmt)
+
+
+@app.command()
+def tokenize(
+    text: Optional[str] = typer.Argument(None, help="Japanese text to segment"),
+    fmt: str = typer.Option("json", "--format", "-f", "-F", help="json, table or words"),
+    stdin: bool = _stdin_option(),
+    input_file: Optional[Path] = _input_option(),
+) -> None:
+    """Split text into words with readings and parts of speech."""
+    if _run_batch("tokenize", stdin, input_file):
+        return
+    text = _require(text, "TEXT")
+    tokens = _from_daemon("tokenize", text) if fmt == "json" else None
+    if tokens is None:
+        from opengov_earlyjapanese.lookups import tokenize as tokenize_text
+
+        tokens = tokenize_text(text)
+    if fmt == "table":
+        rows = ([t["surface"], t["reading"], t["pos"], t["base"]] for t in tokens)
+        _print_table(rows, ["surface", "reading", "pos", "base"])
+    elif fmt == "words":
+        typer.echo(" ".join(t["surface"] for t in tokens))
+    else:
+        typer.echo(json.dumps(tokens, ensure_ascii=False, indent=2))
+
+
+@app.command()
+def furigana(
+    text: Optional[str] = typer.Argument(None, help="Japanese text to annotate"),
+    fmt: str = typer.Option("bracket", "--format", "-f", "-F", help="bracket, html or json"),
+    enabled: Optional[bool] = typer.Option(
+        None, "--furigana/--no-furigana", help="Annotate (default: FURIGANA_DEFAULT)"
+    ),
+    stdin: bool = _stdin_option(),
+    input_file: Optional[Path] = _input_option(),
+) -> None:
+    """Add furigana readings over the kanji of Japanese text."""
+    from opengov_earlyjapanese.core.furigana import FORMATS
+
+    if fmt not in FORMATS:
+        raise typer.BadParameter(f"expected one of {', '.join(FORMATS)}", param_hint="--format")
+    if _run_batch("furigana", stdin, input_file, fmt=fmt, furigana=enabled):
+        return
+    text = _require(text, "TEXT")
+    result = _from_daemon("furigana", text, fmt=fmt, furigana=enabled)
+    if result is None:
+        from opengov_earlyjapanese.lookups import furigana as annotate
+
+        result = annotate(text, fmt, enabled)
+    if fmt == "json":
+        typer.echo(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        typer.echo(result)
+
+
+@app.command("analyze-corpus")
+def analyze_corpus(
+    paths: List[Path] = typer.Argument(..., exists=True, dir_okay=False, help="UTF-8 text files"),
+    split: str = typer.Option(
+        "line", "--split", help="Documents are lines, blank-line separated blocks, or files"
+    ),
+    workers: int = typer.Option(0, "--workers", "-w", min=0, help="Processes (0 = one per core)"),
+    chunk_mb: int = typer.Option(16, "--chunk-mb", min=1, help="Megabytes per worker task"),
+    words: bool = typer.Option(
+        True,
+        "--words/--no-words",
+        help="Grade vocabulary too (tokenizes: ~0.2 MB/s per core on varied text)",
+    ),
+    documents: bool = typer.Option(
+        True, "--documents/--no-documents", help="Write a line per document"
+    ),
+    summary: bool = typer.Option(False, "--summary", help="End with a line for the whole corpus"),
+) -> None:
+    """Script composition and JLPT level distribution per document, as NDJSON."""
+    from opengov_earlyjapanese.core import difficulty
+    from opengov_earlyjapanese.lookups import dumps_compact
+
+    if split not in difficulty.SPLITS:
+        choices = ", ".join(difficulty.SPLITS)
+        raise typer.BadParameter(f"expected one of {choices}", param_hint="--split")
+    total = [0] * difficulty.WIDTH
+    count = 0
+    for (path, line), counts in difficulty.iter_corpus(
+        paths, split, workers, chunk_mb * 2**20, words
+    ):
+        count += 1
+        if summary:
+            difficulty.add(total, counts)
+        if documents:
+            where = {"path": path} if split == "file" else {"path": path, "line": line}
+            typer.echo(dumps_compact({**where, **difficulty.summarize(counts)}))
+    if summary:
+        typer.echo(dumps_compact({"documents": count, **difficulty.summarize(total)}))
+
+
+@sentences_app.command("import")
+def sentences_import(
+    paths: List[Path] = typer.Argument(..., exists=True, dir_okay=False, help="Sentence TSVs"),
+    output: Path = typer.Option(..., "--output", "-o", help="Index file to write"),
+    columns: str = typer.Option(
+        "0,1", "--columns", help="Japanese and English columns, 0-based (Tatoeba pairs: 1,3)"
+    ),
+    min_chars: int = typer.Option(4, "--min-chars", min=1, help="Shortest Japanese sentence"),
+    max_chars: int = typer.Option(80, "--max-chars", min=1, help="Longest Japanese sentence"),
+    max_level: str = typer.Option(
+        "unlisted", "--max-level", help="Hardest level kept: N5..N1, or unlisted for all"
+    ),
+    workers: int = typer.Option(0, "--workers", "-w", min=0, help="Processes (0 = one per core)"),
+    words: bool = typer.Option(
+        True, "--words/--no-words", help="Index vocabulary words too (tokenizes; slower)"
+    ),
+) -> None:
+    """Build the example-sentence index from bilingual sentence TSVs."""
+    from opengov_earlyjapanese.core import sentences
+
+    try:
+        japanese, english = (int(c) for c in columns.split(","))
+        options = sentences.ImportOptions(japanese, english, min_chars, max_chars, max_level)
+        sentences.level_index(max_level)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--columns/--max-level") from None
+    meta = sentences.import_corpus(paths, output, options, workers, words=words)
+    rejected = ", ".join(f"{n} {reason}" for reason, n in meta["rejected"].items())
+    typer.echo(f"Wrote {output}: {meta['sentences']} sentences (skipped {rejected})")
+
+
+@sentences_app.command("find")
+def sentences_find(
+    terms: List[str] = typer.Argument(..., help="Kanji or words every sentence must contain"),
+    max_level: Optional[str] = typer.Option(None, "--max-level", help="Hardest level, N5..N1"),
+    min_level: Optional[str] = typer.Option(None, "--min-level", help="Easiest level, N5..N1"),
+    limit: int = typer.Option(5, "--limit", "-n", min=1, help="Maximum sentences"),
+    index: Optional[Path] = typer.Option(
+        None, "--index", exists=True, dir_okay=False, help="Index file (default: SENTENCE_INDEX)"
+    ),
+    fmt: str = typer.Option("json", "--format", "-f", "-F", help="json or table"),
+) -> None:
+    """Example sentences containing every term, easiest first."""
+    from opengov_earlyjapanese.core import registry
+    from opengov_earlyjapanese.core.sentences import SentenceIndex
+
+    found = SentenceIndex.open(index) if index is not None else registry.get_sentence_index()
+    if found is None:
+        typer.secho(
+            "No sentence index; pass --index or set SENTENCE_INDEX.", err=True, fg=typer.colors.RED
+        )
+        raise typer.Exit(code=1)
+    try:
+        results = found.find(terms, max_level=max_level, min_level=min_level, limit=limit)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--max-level/--min-level") from None
+    if fmt == "table":
+        rows = ([s["level"], s["japanese"], s["english"]] for s in results)
+        _print_table(rows, ["level", "japanese", "english"])
+    else:
+        typer.echo(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+@sentences_app.command("concordance")
+def sentences_concordance(
+    index: Path = typer.Argument(..., exists=True, dir_okay=False, help="Sentence index file"),
+    output: Path = typer.Option(..., "--output", "-o", help="Concordance file to write"),
+) -> None:
+    """Build the suffix-array concordance of a sentence index."""
+    from opengov_earlyjapanese.core.concordance import build_file
+
+    meta = build_file(index, output)
+    typer.echo(f"Wrote {output}: {meta['sentences']} sentences, {meta['characters']} characters")
+
+
+@sentences_app.command("kwic")
+def sentences_kwic(
+    query: str = typer.Argument(..., help="Any substring: a word, part of one, or grammar"),
+    width: int = typer.Option(12, "--width", min=0, help="Characters of context either side"),
+    max_level: Optional[str] = typer.Option(None, "--max-level", help="Hardest level, N5..N1"),
+    min_level: Optional[str] = typer.Option(None, "--min-level", help="Easiest level, N5..N1"),
+    limit: int = typer.Option(20, "--limit", "-n", min=1, help="Maximum lines"),
+    index: Optional[Path] = typer.Option(
+        None,
+        "--index",
+        exists=True,
+        dir_okay=False,
+        help="Concordance file (default: CONCORDANCE_INDEX)",
+    ),
+    fmt: str = typer.Option("table", "--format", "-f", "-F", help="table or json"),
+) -> None:
+    """Occurrences of a substring in context, sorted by what follows it."""
+    from opengov_earlyjapanese.core import registry
+    from opengov_earlyjapanese.core.concordance import Concordance
+
+    found = Concordance.open(index) if index is not None else registry.get_concordance()
+    if found is None:
+        typer.secho(
+            "No concordance; pass --index or set CONCORDANCE_INDEX.", err=True, fg=typer.colors.RED
+        )
+        raise typer.Exit(code=1)
+    try:
+        lines = found.kwic(query, width, limit, max_level=max_level, min_level=min_level)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--max-level/--min-level") from None
+    if fmt == "json":
+        total = found.count(query, max_level=max_level, min_level=min_level)
+        result = {"query": query, "total": total, "items": lines}
+        typer.echo(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+    # Right-align the left context in terminal columns so the matches line up
+    left = max((display_width(line["left"]) for line in lines), default=0)
+    for line in lines:
+        indent = " " * (left - display_width(line["left"]))
+        typer.echo(f"{indent}{line['left']} [{line['match']}] {line['right']}")
+
+
 @app.command()
 def search(
-    query: str = typer.Argument(..., help="Search string for character, romaji, or mnemonic"),
+    query: Optional[str] = typer.Argument(
+        None, help="Search string for character, romaji, or mnemonic"
+    ),
     kind: str = typer.Option("all", "--kind", "-k", help="Content kind", case_sensitive=False),
     fmt: str = typer.Option("json", "--format", "-f", "-F", help="json or table"),
+    stdin: bool = _stdin_option(),
+    input_file: Optional[Path] = _input_option(),
 ):
     """Search hiragana/katakana by character, romaji, or mnemonic."""
     kind = kind.lower()
     if kind not in {"all", "hiragana", "katakana"}:
         typer.secho("--kind must be one of: all, hiragana, katakana", err=True, fg=typer.colors.RED)
         raise typer.Exit(code=1)
+    if _run_batch("search", stdin, input_file, kind=kind):
+        return
+    query = _require(query, "QUERY")
+    if fmt != "table":
+        forwarded = _from_daemon("search", query, kind=kind)
+        if forwarded is not None:
+            typer.echo(json.dumps(forwarded, ensure_ascii=False, indent=2))
+            return
 
-    query_lower = query.lower()
-    results = []
+    from opengov_earlyjapanese.core.search import iter_search, search_characters
 
-    def match_char(obj):
-        romaji = (obj.romaji or "").lower()
-        mnemonic = (obj.mnemonic or "").lower()
-        return (
-            query in obj.character
-            or query_lower in romaji
-            or (mnemonic and query_lower in mnemonic)
+    if fmt == "table":
+        table_rows = (
+            [r["type"], r["row"], r["character"], r["romaji"], truncate(r["mnemonic"] or "", 40)]
+            for r in iter_search(query, kind)
         )
+        _print_table(table_rows, ["type", "row", "char", "romaji", "mnemonic"])
+    else:
+        typer.echo(json.dumps(search_characters(query, kind), ensure_ascii=False, indent=2))
 
-    if kind in {"all", "hiragana"}:
-        ht = HiraganaTeacher()
-        for ch in ht.characters.values():
-            if match_char(ch):
-                results.append({
-                    "type": "hiragana",
-                    "row": ch.row,
-                    "character": ch.character,
-                    "romaji": ch.romaji,
-                    "mnemonic": ch.mnemonic,
-                })
-
-    if kind in {"all", "katakana"}:
-        kt = KatakanaTeacher()
-        for ch in kt.characters.values():
-            if match_char(ch):
-                results.append({
-                    "type": "katakana",
-                    "row": ch.row,
-                    "character": ch.character,
-                    "romaji": ch.romaji,
-                    "mnemonic": ch.mnemonic,
-                })
 
-    if fmt == "table":
-        table_rows = [[r["type"], r["row"], r["character"], r["romaji"], (r["mnemonic"] or "")[:40]] for r in results]
-        _print_table(table_rows, ["type", "row", "char", "romaji", "mnemonic"])
+@app.command()
+def serve(
+    host: Optional[str] = typer.Option(None, "--host", help="Bind address"),
+    port: Optional[int] = typer.Option(None, "--port", "-p", help="Bind port"),
+    workers: Optional[int] = typer.Option(
+        None, "--workers", "-w", help="Worker processes (0 = one per core)"
+    ),
+    max_requests: Optional[int] = typer.Option(
+        None, "--max-requests", help="Recycle a worker after this many requests (0 = never)"
+    ),
+    max_requests_jitter: Optional[int] = typer.Option(
+        None, "--max-requests-jitter", help="Random extra requests per worker before recycling"
+    ),
+) -> None:
+    """Run the API with content preloaded once and shared by forked workers."""
+    from opengov_earlyjapanese.config import settings
+    from opengov_earlyjapanese.server import PreforkServer
+
+    server = PreforkServer(
+        host=host if host is not None else settings.api_host,
+        port=port if port is not None else settings.api_port,
+        workers=workers if workers is not None else settings.server_workers,
+        max_requests=max_requests if max_requests is not None else settings.server_max_requests,
+        max_requests_jitter=(
+            max_requests_jitter
+            if max_requests_jitter is not None
+            else settings.server_max_requests_jitter
+        ),
+        graceful_timeout=settings.server_graceful_timeout,
+        log_level=settings.log_level.lower(),
+    )
+    server.run()
+
+
+@app.command()
+def flamegraph(
+    directory: Optional[Path] = typer.Option(
+        None, "--dir", "-d", help="Sampler output directory (default: SAMPLER_DIR)"
+    ),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Write to a file"),
+    max_age: Optional[float] = typer.Option(
+        None,
+        "--max-age",
+        min=0,
+        help="Skip files older than this many seconds (default: 3 flush intervals; 0 = keep all)",
+    ),
+) -> None:
+    """Merge continuous-sampler output into flamegraph-ready collapsed stacks."""
+    from opengov_earlyjapanese.config import settings
+    from opengov_earlyjapanese.utils.profiling import (
+        STALE_AFTER_FLUSHES,
+        merge_collapsed_dir,
+        render_collapsed,
+    )
+
+    directory = directory or settings.sampler_dir
+    if directory is None or not directory.is_dir():
+        typer.secho(
+            "No sampler directory; pass --dir or set SAMPLER_DIR.", err=True, fg=typer.colors.RED
+        )
+        raise typer.Exit(code=1)
+    if max_age is None:
+        max_age = STALE_AFTER_FLUSHES * settings.sampler_flush_interval
+    text = render_collapsed(merge_collapsed_dir(directory, max_age))
+    if output is not None:
+        output.write_text(text, encoding="utf-8")
     else:
-        typer.echo(json.dumps(results, ensure_ascii=False, indent=2))
+        typer.echo(text, nl=False)
+
+
+@app.command("build-content")
+def build_content(
+    source: Optional[Path] = typer.Argument(
+        None, file_okay=False, help="Source directory (default: the built-in content)"
+    ),
+    output: Path = typer.Option(Path("content.pack"), "--output", "-o", help="Pack file"),
+    content_version: str = typer.Option("dev", "--content-version", help="Version label"),
+    export: Optional[Path] = typer.Option(
+        None, "--export", help="Write the built-in content as source files here and exit"
+    ),
+) -> None:
+    """Compile content sources (JSON/TSV) into a versioned, checksummed pack."""
+    from opengov_earlyjapanese.core import pack
+
+    if export is not None:
+        pack.export_sources(export)
+        typer.echo(f"Exported built-in content to {export}")
+        return
+    try:
+        records = pack.load_sources(source) if source is not None else pack.builtin_records()
+        meta = pack.build_pack(records, output, content_version)
+    except (pack.ContentPackError, KeyError, json.JSONDecodeError) as e:
+        typer.secho(f"Cannot build content pack: {e}", err=True, fg=typer.colors.RED)
+        raise typer.Exit(code=1) from None
+    counts = ", ".join(f"{n} {kind}" for kind, n in sorted(meta["counts"].items()))
+    typer.echo(f"Wrote {output} ({meta['content_version']}, {counts}, sha256 {meta['checksum']})")
+
+
+@app.command("build-indexes")
+def build_indexes(
+    directory: Optional[Path] = typer.Option(
+        None, "--dir", "-d", help="Index cache directory (default: INDEX_CACHE_DIR)"
+    ),
+) -> None:
+    """Build the index cache for the current content, e.g. when baking an image."""
+    import time
+
+    from opengov_earlyjapanese.config import settings
+    from opengov_earlyjapanese.core import registry
+
+    if directory is not None:
+        settings.index_cache_dir = directory
+    if settings.index_cache_dir is None:
+        typer.secho(
+            "No cache directory; pass --dir or set INDEX_CACHE_DIR.", err=True, fg=typer.colors.RED
+        )
+        raise typer.Exit(code=1)
+    start = time.perf_counter()
+    registry.reload()
+    registry.preload()
+    cache = registry.get_index_cache()
+    typer.echo(
+        f"{cache.builds} built, {cache.hits} up to date in {settings.index_cache_dir} "
+        f"(content {registry.content_hash()[:12]}, {time.perf_counter() - start:.2f}s)"
+    )
+
+
+@app.command("content-info")
+def content_info(
+    path: Path = typer.Argument(..., exists=True, dir_okay=False, help="Pack file"),
+    verify: bool = typer.Option(False, "--verify", help="Recompute the checksum"),
+) -> None:
+    """Show a content pack's metadata, optionally verifying its checksum."""
+    from opengov_earlyjapanese.core.pack import ContentPack, ContentPackError
+
+    try:
+        with ContentPack(path) as pack:
+            if verify:
+                pack.verify()
+            meta = pack.meta
+    except ContentPackError as e:
+        typer.secho(str(e), err=True, fg=typer.colors.RED)
+        raise typer.Exit(code=1) from None
+    typer.echo(json.dumps(meta, ensure_ascii=False, indent=2))
+
 
+@app.command()
+def traces(
+    path: Path = typer.Argument(..., exists=True, dir_okay=False, help="Span file (--trace)"),
+    trace_id: Optional[str] = typer.Option(None, "--trace-id", help="Only this trace"),
+    fmt: str = typer.Option("table", "--format", "-f", "-F", help="table or json"),
+) -> None:
+    """Summarise a span file: calls, total and self time per span name."""
+    from opengov_earlyjapanese.utils.tracing import read_spans, summarize
+
+    spans = read_spans(path)
+    if trace_id is not None:
+        spans = [s for s in spans if s.get("trace_id") == trace_id]
+    rows = summarize(spans)
+    if fmt == "json":
+        typer.echo(json.dumps(rows, ensure_ascii=False, indent=2))
+        return
+    columns = ["name", "count", "total_ms", "self_ms", "mean_ms", "errors"]
+    _print_table(([row[c] for c in columns] for row in rows), columns)
+
+
+@app.command()
+def loadtest(
+    url: Optional[str] = typer.Option(
+        None, "--url", help="Server base URL (default: drive the app in-process)"
+    ),
+    concurrency: int = typer.Option(10, "--concurrency", "-c", min=1, help="Virtual users"),
+    requests: int = typer.Option(
+        1000, "--requests", "-n", min=0, help="Total requests (0 = until --duration)"
+    ),
+    duration: Optional[float] = typer.Option(
+        None, "--duration", "-t", help="Time limit in seconds"
+    ),
+    mix: Optional[Path] = typer.Option(None, "--mix", help="JSON file with the request mix"),
+    request: Optional[List[str]] = typer.Option(
+        None, "--request", "-r", help='Request spec "METHOD /path[=weight]" (repeatable)'
+    ),
+    seed: Optional[int] = typer.Option(None, "--seed", help="Random seed for the request mix"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Write the JSON report"),
+    max_error_rate: Optional[float] = typer.Option(
+        None, "--max-error-rate", help="Exit 1 if the error rate exceeds this fraction"
+    ),
+    max_p99: Optional[float] = typer.Option(
+        None, "--max-p99", help="Exit 1 if p99 latency exceeds this many milliseconds"
+    ),
+) -> None:
+    """Drive the API with a weighted request mix and report latency and errors as JSON."""
+    import asyncio
+
+    from opengov_earlyjapanese import loadtest as lt
+
+    try:
+        targets = [lt.parse_target(spec) for spec in request or []]
+        if mix is not None:
+            targets += lt.load_mix(mix)
+    except (OSError, ValueError, KeyError) as e:
+        typer.secho(f"Invalid request mix: {e}", err=True, fg=typer.colors.RED)
+        raise typer.Exit(code=2) from e
+    options = {"requests": requests, "duration": duration, "seed": seed}
+    targets = targets or lt.DEFAULT_MIX
+    if url is not None:
+        report = asyncio.run(lt.run_against_url(url, concurrency, targets, **options))
+    else:
+        from opengov_earlyjapanese.api.main import app as api
+
+        report = asyncio.run(lt.run_in_process(api, concurrency, targets, **options))
+    text = json.dumps(report, indent=2)
+    if output is not None:
+        output.write_text(text + "\n", encoding="utf-8")
+    typer.echo(text)
+    failed = (max_error_rate is not None and report["error_rate"] > max_error_rate) or (
+        max_p99 is not None and report["latency_ms"]["p99"] > max_p99
+    )
+    if failed:
+        typer.secho("Load test thresholds exceeded", err=True, fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+
+daemon_app = typer.Typer(help="Background lookup daemon on a Unix socket")
+app.add_typer(daemon_app, name="daemon")
+
+_socket_option = typer.Option(None, "--socket", help="Socket path (default: NIHONGO_DAEMON_SOCKET)")
+
+
+@daemon_app.command("start")
+def daemon_start(socket: Optional[Path] = _socket_option) -> None:
+    """Start the daemon in the background; lookups are forwarded to it."""
+    from opengov_earlyjapanese import daemon
+
+    client = daemon.DaemonClient.connect(socket)
+    if client is not None:
+        with client:
+            typer.echo(f"Daemon already running (pid {client.ping()['pid']})")
+        return
+    try:
+        pid = daemon.start(socket)
+    except RuntimeError as e:
+        typer.secho(str(e), err=True, fg=typer.colors.RED)
+        raise typer.Exit(code=1) from None
+    typer.echo(f"Daemon started (pid {pid}) on {socket or daemon.socket_path()}")
+
+
+@daemon_app.command("run")
+def daemon_run(socket: Optional[Path] = _socket_option) -> None:
+    """Run the daemon in the foreground."""
+    from opengov_earlyjapanese import daemon
+
+    try:
+        daemon.serve(socket)
+    except RuntimeError as e:
+        typer.secho(str(e), err=True, fg=typer.colors.RED)
+        raise typer.Exit(code=1) from None
+
+
+@daemon_app.command("stop")
+def daemon_stop(socket: Optional[Path] = _socket_option) -> None:
+    """Stop a running daemon."""
+    from opengov_earlyjapanese import daemon
+
+    if daemon.stop(socket):
+        typer.echo("Daemon stopped")
+    else:
+        typer.echo("Daemon is not running")
+
+
+@daemon_app.command("status")
+def daemon_status(socket: Optional[Path] = _socket_option) -> None:
+    """Show whether the daemon is running; exits 1 if it is not."""
+    from opengov_earlyjapanese import daemon
+
+    client = daemon.DaemonClient.connect(socket)
+    if client is None:
+        typer.echo("Daemon is not running")
+        raise typer.Exit(code=1)
+    with client:
+        info = client.ping()
+    typer.echo(f"Daemon running (pid {info['pid']}, {info['requests']} lookups served)")
 
 
 if __name__ == "__main__":
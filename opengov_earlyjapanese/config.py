@@ -25,12 +25,37 @@ class Settings(BaseSettings):
     api_prefix: str = Field(default="/api/v1")
     api_title: str = Field(default="OpenGov-EarlyJapanese API")
     api_version: str = Field(default="0.2.0")
+    page_size_default: int = Field(default=50)
+    page_size_max: int = Field(default=500)
+    stream_chunk_size: int = Field(default=64)  # NDJSON lines per chunk
 
     # Security
     secret_key: SecretStr = Field(default_factory=lambda: SecretStr(secrets.token_urlsafe(32)))
     jwt_secret: SecretStr = Field(default_factory=lambda: SecretStr(secrets.token_urlsafe(32)))
     jwt_algorithm: str = Field(default="HS256")
     jwt_expiration_hours: int = Field(default=24)
+    admin_token: Optional[SecretStr] = Field(default=None)  # unset = admin routes disabled
+
+    # Server
+    server_workers: int = Field(default=0)  # 0 = one per available core
+    server_max_requests: int = Field(default=0)  # 0 = never recycle workers
+    server_max_requests_jitter: int = Field(default=0)
+    server_graceful_timeout: float = Field(default=30.0)  # seconds
+
+    # CPU-bound work
+    cpu_pool_workers: int = Field(default=0)  # per server process; 0 = its share of the cores
+    cpu_task_timeout: float = Field(default=10.0)  # seconds, 0 = no limit
+
+    # Admission control. Global and concurrency limits are per host and split
+    # across prefork workers; per-client limits apply in each worker.
+    rate_limit_enabled: bool = Field(default=True)
+    rate_limit_per_client: float = Field(default=20.0)  # requests per second
+    rate_limit_client_burst: int = Field(default=40)
+    rate_limit_global: float = Field(default=500.0)  # requests per second
+    rate_limit_global_burst: int = Field(default=1000)
+    rate_limit_max_clients: int = Field(default=10000)
+    rate_limit_trust_forwarded: bool = Field(default=False)
+    max_concurrent_requests: int = Field(default=200)
 
     # Database
     database_url: Optional[str] = Field(default=None)
@@ -42,6 +67,8 @@ class Settings(BaseSettings):
     mecab_dict_path: Optional[Path] = Field(default=None)
     use_sudachi: bool = Field(default=True)
     sudachi_mode: str = Field(default="C")  # A, B, or C
+    tokenizer_backend: str = Field(default="auto")  # auto, builtin, sudachi or mecab
+    tokenizer_cache_size: int = Field(default=10000)  # sentences memoised per process
 
     # Learning Settings
     srs_initial_interval: int = Field(default=1)  # days
@@ -50,6 +77,11 @@ class Settings(BaseSettings):
     srs_hard_multiplier: float = Field(default=1.3)
     srs_fail_multiplier: float = Field(default=0.5)
 
+    drill_session_ttl: int = Field(default=900)  # seconds a drill can be resumed
+    drill_max_sessions: int = Field(default=10000)
+    drill_flush_interval: float = Field(default=2.0)  # seconds between review writes
+    drill_flush_batch: int = Field(default=20)
+
     max_daily_reviews: int = Field(default=100)
     max_daily_new_items: int = Field(default=20)
     session_time_limit: int = Field(default=60)  # minutes
@@ -62,8 +94,16 @@ class Settings(BaseSettings):
 
     # Content Settings
     furigana_default: bool = Field(default=True)
+    furigana_cache_size: int = Field(default=50000)  # sentences of annotated text per process
     romaji_default: bool = Field(default=False)
     english_translations: bool = Field(default=True)
+    content_pack: Optional[Path] = Field(default=None)  # compiled pack; unset = built-in content
+    sentence_index: Optional[Path] = Field(default=None)  # built by import-sentences; unset = none
+    example_sentences_limit: int = Field(default=3)  # per vocabulary entry or kanji
+    concordance_index: Optional[Path] = Field(default=None)  # suffix array; unset = none
+    index_cache_dir: Optional[Path] = Field(
+        default=None
+    )  # built indexes; unset = rebuild per process
 
     # Speech Settings
     speech_recognition_language: str = Field(default="ja-JP")
@@ -89,6 +129,7 @@ class Settings(BaseSettings):
     # Cache Settings
     cache_ttl: int = Field(default=3600)  # seconds
     enable_caching: bool = Field(default=True)
+    cache_max_entries: int = Field(default=10000)
 
     # Model Settings
     model_path: Path = Field(default=Path("models"))
@@ -96,18 +137,30 @@ class Settings(BaseSettings):
 
     # Logging
     log_level: str = Field(default="INFO")
-    log_format: str = Field(default="json")
+    log_format: str = Field(default="json")  # json or console
+    log_debug_sample_rate: float = Field(default=10.0)  # DEBUG records/s per logger; 0 = all
+    log_debug_sample_burst: int = Field(default=50)
     enable_metrics: bool = Field(default=True)
 
+    # Profiling
+    profiling_enabled: bool = Field(default=False)
+    profiling_sample_rate: float = Field(default=0.0)  # fraction of requests profiled
+    profiling_sample_interval: float = Field(default=0.001)  # seconds between stack samples
+    profiling_max_profiles: int = Field(default=50)
+    sampler_enabled: bool = Field(default=False)
+    sampler_interval: float = Field(default=0.01)  # seconds between samples
+    sampler_max_stacks: int = Field(default=5000)
+    sampler_max_overhead: float = Field(default=0.01)  # back off above this share of wall time
+    sampler_max_interval: float = Field(default=1.0)  # seconds; backing off stops here
+    sampler_dir: Optional[Path] = Field(default=None)  # shared by workers; unset = in-process only
+    sampler_flush_interval: float = Field(default=10.0)  # seconds
+    tracing_enabled: bool = Field(default=False)
+    tracing_file: Optional[Path] = Field(default=None)  # JSON lines; unset = in-memory only
+    tracing_max_spans: int = Field(default=10000)  # in-memory exporter capacity
+
     # CORS
     cors_origins: List[str] = Field(default=["http://localhost:3000", "http://localhost:8501"])
 
-    @field_validator("model_path", "media_storage_path")
-    @classmethod
-    def create_directories(cls, v: Path) -> Path:
-        v.mkdir(parents=True, exist_ok=True)
-        return v
-
     @field_validator("cors_origins", mode="before")
     @classmethod
     def parse_cors_origins(cls, v):
@@ -115,6 +168,11 @@ class Settings(BaseSettings):
             return [origin.strip() for origin in v.split(",")]
         return v
 
+    def ensure_directories(self) -> None:
+        """Create the model and media directories; called by code that writes to them."""
+        for path in (self.model_path, self.media_storage_path):
+            path.mkdir(parents=True, exist_ok=True)
+
 
 @lru_cache()
 def get_settings() -> Settings:
@@ -0,0 +1,350 @@
+"""Typeahead over vocabulary, kanji and kana, ranked by frequency.
+
+Completions are served from a compressed (radix) prefix trie. Every node
+covers a contiguous range of the sorted keys, and nodes with more than
+:data:`TOP_K` completions below them store their best ``TOP_K`` up front,
+so a keystroke costs one walk down the trie plus decoding the results;
+smaller subtrees are ranked on the fly from their few keys.
+
+Keys are written forms and readings (folded to hiragana) and the
+word-initial suffixes of English meanings, so ``"eat"`` finds "to eat".
+Romaji queries are also converted to kana as typed, with a trailing
+fragment (``"tab"`` -> ``"た"`` + ``"b"``) expanded to every kana it could
+become. Completions are ranked by ``frequency_rank``, unranked entries
+last. The trie is an index-cache section set (see ``utils.index_cache``).
+"""
+
+import heapq
+import json
+import re
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any, Dict, List, Optional, Tuple
+
+from opengov_earlyjapanese.core.kana import (
+    is_romaji,
+    pending_kana,
+    romaji_to_kana_partial,
+    to_hiragana,
+)
+from opengov_earlyjapanese.utils.index_cache import Sections
+from opengov_earlyjapanese.utils.tracing import traced
+
+INDEX_VERSION = 1
+TOP_K = 10
+UNRANKED = 2**32 - 1
+
+# A completion: what is shown, and where it comes from
+Term = Dict[str, Any]
+
+_READING_MARKS = re.compile(r"[().\-・]")
+_decode = json.JSONDecoder().decode
+
+
+def _norm(text: str) -> str:
+    return to_hiragana(text.strip().lower())
+
+
+def _meaning_keys(meaning: str) -> Iterator[str]:
+    words = meaning.lower().split()
+    for i in range(len(words)):
+        yield " ".join(words[i:])
+
+
+def vocabulary_terms(entries: Iterable[Any]) -> Iterator[Tuple[Term, List[str]]]:
+    """Terms and their keys for :class:`~opengov_earlyjapanese.core.models.Vocabulary`."""
+    for e in entries:
+        term = {
+            "kind": "vocabulary",
+            "id": e.id,
+            "text": e.word,
+            "reading": e.reading,
+            "meaning": e.meanings[0] if e.meanings else "",
+            "rank": e.frequency_rank,
+        }
+        keys = [e.word, e.reading]
+        for meaning in e.meanings:
+            keys.extend(_meaning_keys(meaning))
+        yield term, keys
+
+
+def kanji_terms(analyses: Iterable[Any]) -> Iterator[Tuple[Term, List[str]]]:
+    """Terms and their keys for :class:`~opengov_earlyjapanese.core.kanji.KanjiAnalysis`."""
+    for a in analyses:
+        readings = [_READING_MARKS.sub("", r) for r in [*a.on_reading, *a.kun_reading]]
+        term = {
+            "kind": "kanji",
+            "id": a.character,
+            "text": a.character,
+            "reading": readings[0] if readings else "",
+            "meaning": a.meanings[0] if a.meanings else "",
+            "rank": None,
+        }
+        keys = [a.character, *readings]
+        for meaning in a.meanings:
+            keys.extend(_meaning_keys(meaning))
+        yield term, keys
+
+
+def kana_terms(kind: str, characters: Mapping[str, Any]) -> Iterator[Tuple[Term, List[str]]]:
+    for ch, c in characters.items():
+        term = {
+            "kind": kind,
+            "id": ch,
+            "text": ch,
+            "reading": c.romaji,
+            "meaning": "",
+            "rank": None,
+        }
+        yield term, [ch]
+
+
+def build_sections(terms: Iterable[Tuple[Term, List[str]]], top_k: int = TOP_K) -> Sections:
+    """Lay out the trie for ``terms``: ``(term, keys)`` pairs, keys not yet normalised."""
+    data = bytearray()
+    offsets = array("Q", [0])
+    ranks = array("I")
+    postings: Dict[str, List[int]] = {}
+    for term_id, (term, keys) in enumerate(terms):
+        data += json.dumps(term, ensure_ascii=False, separators=(",", ":")).encode()
+        offsets.append(len(data))
+        ranks.append(UNRANKED if term["rank"] is None else term["rank"])
+        for key in {_norm(k) for k in keys} - {""}:
+            postings.setdefault(key, []).append(term_id)
+
+    keys = sorted(postings)
+    key_starts = array("I", [0])
+    key_terms = array("I")
+    for key in keys:
+        key_terms.extend(postings[key])
+        key_starts.append(len(key_terms))
+    del postings
+
+    # Breadth-first, so the children of a node are contiguous and sorted by label
+    labels: List[str] = [""]
+    label_starts = array("I", [0])
+    first_child = array("I", [0])
+    child_count = array("I", [0])
+    key_lo = array("I", [0])
+    key_hi = array("I", [len(keys)])
+    depths = [0]
+    parents = [0]
+    node = 0
+    while node < len(depths):
+        lo, hi, depth = key_lo[node], key_hi[node], depths[node]
+        if lo < hi and len(keys[lo]) == depth:
+            lo += 1  # the key ending exactly here
+        first_child[node] = len(depths)
+        while lo < hi:
+            ch = keys[lo][depth]
+            end = bisect_left(keys, keys[lo][:depth] + chr(ord(ch) + 1), lo, hi)
+            first, last = keys[lo], keys[end - 1]
+            common = depth + 1
+            while common < len(first) and common < len(last) and first[common] == last[common]:
+                common += 1
+            labels.append(first[depth:common])
+            label_starts.append(label_starts[-1] + len(labels[-2]))
+            first_child.append(0)
+            child_count.append(0)
+            key_lo.append(lo)
+            key_hi.append(end)
+            depths.append(common)
+            parents.append(node)
+            child_count[node] += 1
+            lo = end
+        node += 1
+    label_starts.append(label_starts[-1] + len(labels[-1]))
+
+    def large(node: int) -> bool:
+        return key_starts[key_hi[node]] - key_starts[key_lo[node]] > top_k
+
+    # Children have higher ids than their parent, so walk backwards merging upwards;
+    # only large nodes store a list, and only their children need one computed
+    stored: Dict[int, List[int]] = {}
+    pending: Dict[int, List[int]] = {}
+    for node in range(len(depths) - 1, -1, -1):
+        if large(node):
+            lists = [pending.pop(c) for c in _children(first_child, child_count, node)]
+            lo = key_lo[node]
+            if len(keys[lo]) == depths[node]:
+                here = key_terms[key_starts[lo] : key_starts[lo + 1]]
+                lists.append(sorted(here, key=lambda t: (ranks[t], t)))
+            best = stored[node] = _merge(lists, ranks, top_k)
+        elif node and large(parents[node]):
+            best = _rank_range(key_lo[node], key_hi[node], key_starts, key_terms, ranks, top_k)
+        else:
+            continue
+        if node:
+            pending[node] = best
+    top_starts = array("I", [0] * (len(depths) + 1))
+    top = array("I")
+    for node in range(len(depths)):
+        top.extend(stored.get(node, ()))
+        top_starts[node + 1] = len(top)
+
+    return {
+        "terms": array("B", data),
+        "term_offsets": offsets,
+        "ranks": ranks,
+        "labels": "".join(labels),
+        "label_starts": label_starts,
+        "first_child": first_child,
+        "child_count": child_count,
+        "key_lo": key_lo,
+        "key_hi": key_hi,
+        "key_starts": key_starts,
+        "key_terms": key_terms,
+        "top_starts": top_starts,
+        "top": top,
+        "top_k": top_k,
+    }
+
+
+def _children(first_child: Sequence[int], child_count: Sequence[int], node: int) -> range:
+    return range(first_child[node], first_child[node] + child_count[node])
+
+
+def _rank_range(
+    lo: int,
+    hi: int,
+    key_starts: Sequence[int],
+    key_terms: Sequence[int],
+    ranks: Sequence[int],
+    limit: int,
+) -> List[int]:
+    found = set(key_terms[key_starts[lo] : key_starts[hi]])
+    return heapq.nsmallest(limit, found, key=lambda t: (ranks[t], t))
+
+
+def _merge(lists: Iterable[List[int]], ranks: Sequence[int], limit: int) -> List[int]:
+    best: List[int] = []
+    seen = set()
+    for t in heapq.merge(*lists, key=lambda t: (ranks[t], t)):
+        if t not in seen:
+            seen.add(t)
+            best.append(t)
+            if len(best) == limit:
+                break
+    return best
+
+
+class Autocompleter:
+    """Prefix completions over a trie built by :func:`build_sections`."""
+
+    def __init__(self, sections: Sections) -> None:
+        self._terms = sections["terms"]
+        self._offsets = sections["term_offsets"]
+        self._ranks = sections["ranks"]
+        self._labels: str = sections["labels"]
+        self._label_starts: Sequence[int] = sections["label_starts"]
+        self._first_child: Sequence[int] = sections["first_child"]
+        self._child_count: Sequence[int] = sections["child_count"]
+        self._key_lo = sections["key_lo"]
+        self._key_hi = sections["key_hi"]
+        self._key_starts = sections["key_starts"]
+        self._key_terms = sections["key_terms"]
+        self._top_starts = sections["top_starts"]
+        self._top = sections["top"]
+        self.top_k: int = sections["top_k"]
+
+    @classmethod
+    def from_terms(cls, terms: Iterable[Tuple[Term, List[str]]]) -> "Autocompleter":
+        return cls(build_sections(terms))
+
+    def __len__(self) -> int:
+        return len(self._ranks)
+
+    def _label(self, node: int) -> str:
+        return self._labels[self._label_starts[node] : self._label_starts[node + 1]]
+
+    def _child(self, node: int, ch: str) -> Optional[int]:
+        # Children are sorted by label, and labels of siblings differ in their first character
+        lo = self._first_child[node]
+        end = hi = lo + self._child_count[node]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._labels[self._label_starts[mid]] < ch:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < end and self._labels[self._label_starts[lo]] == ch:
+            return lo
+        return None
+
+    def _find(self, prefix: str) -> Optional[int]:
+        """The node whose subtree holds exactly the keys starting with ``prefix``."""
+        node, pos = 0, 0
+        while pos < len(prefix):
+            child = self._child(node, prefix[pos])
+            if child is None:
+                return None
+            label = self._label(child)
+            rest = prefix[pos : pos + len(label)]
+            if not label.startswith(rest):
+                return None
+            node, pos = child, pos + len(label)
+        return node
+
+    def _top_ids(self, node: int, limit: int) -> List[int]:
+        start, end = self._top_starts[node], self._top_starts[node + 1]
+        if end > start:
+            return list(self._top[start : min(end, start + limit)])
+        return _rank_range(
+            self._key_lo[node],
+            self._key_hi[node],
+            self._key_starts,
+            self._key_terms,
+            self._ranks,
+            limit,
+        )
+
+    def _term(self, term_id: int) -> Term:
+        raw = self._terms[self._offsets[term_id] : self._offsets[term_id + 1]]
+        return _decode(bytes(raw).decode())  # type: ignore[no-any-return]
+
+    def prefixes(self, query: str) -> List[str]:
+        """Normalised prefixes searched for ``query``: as typed, and as kana if romaji."""
+        typed = _norm(query)
+        if not typed:
+            return []
+        found = [typed]
+        if is_romaji(typed):
+            kana, fragment = romaji_to_kana_partial(typed)
+            if fragment:
+                found += [kana + k for k in pending_kana(fragment)]
+            elif kana != typed:
+                found.append(kana)
+        return found
+
+    @traced("autocomplete.complete")
+    def complete(self, query: str, limit: int = TOP_K) -> List[Term]:
+        """Up to ``limit`` (at most ``top_k``) completions for ``query``, most frequent first."""
+        limit = min(limit, self.top_k)
+        lists = []
+        for prefix in self.prefixes(query):
+            node = self._find(prefix)
+            if node is not None:
+                lists.append(self._top_ids(node, limit))
+        if not lists:
+            return []
+        ids = lists[0] if len(lists) == 1 else _merge(lists, self._ranks, limit)
+        return [self._term(t) for t in ids]
+
+
+def content_terms() -> Iterator[Tuple[Term, List[str]]]:
+    """Terms for the content being served (see ``core.registry``)."""
+    from opengov_earlyjapanese.core import registry
+
+    yield from vocabulary_terms(registry.get_vocabulary_bank().iter_find())
+    kanji = registry.get_kanji_master()
+    yield from kanji_terms(kanji.analyze(ch) for ch in kanji.known_characters())
+    yield from kana_terms("hiragana", registry.get_hiragana_teacher().characters)
+    yield from kana_terms("katakana", registry.get_katakana_teacher().characters)
+
+
+def complete(query: str, limit: int = TOP_K) -> List[Term]:
+    """Completions for ``query`` from the shared autocompleter."""
+    from opengov_earlyjapanese.core import registry
+
+    return registry.get_autocompleter().complete(query, limit)
@@ -0,0 +1,258 @@
+"""Keyword-in-context concordance over the example-sentence corpus.
+
+Any substring, a grammar fragment such as ``ている`` or half a word, is
+found with a suffix array over the corpus text: the sentences of a
+sentence index (see ``core.sentences``) joined by newlines, stored as code
+points. The array lists every suffix start in sorted order, so the
+occurrences of a query of ``m`` characters are one contiguous range, found
+by two binary searches in O(m log n) without reading the corpus.
+
+The LCP array holds, for each suffix, the length of the prefix it shares
+with the previous one; runs of values of at least ``k`` are the repeated
+``k``-character substrings, which :meth:`Concordance.frequent` counts in
+one pass.
+
+Suffixes never need comparing past the end of their sentence (a query
+cannot span the newline), so sorting compares sentence tails, bucketed by
+first character. For level bounds the suffix ranks are also stored grouped
+by the level of their sentence, each group in rank order, so the
+occurrences at one level are found by bisecting its group and a bounded
+query never visits occurrences at other levels. Everything is an
+index-cache section set, memory-mapped when opened from a file.
+"""
+
+import heapq
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from collections.abc import Sequence
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from opengov_earlyjapanese.core.difficulty import BUCKETS
+from opengov_earlyjapanese.core.sentences import SentenceIndex, level_index
+from opengov_earlyjapanese.utils.index_cache import Sections, read_index, write_index
+from opengov_earlyjapanese.utils.tracing import traced
+
+WIDTH = 12  # characters of context either side
+LIMIT = 20
+KEY = "concordance:2"  # files without the level groups must be rebuilt
+
+_UTF32 = "utf-32-le" if sys.byteorder == "little" else "utf-32-be"
+
+
+def build_sections(sentences: Sequence[str], level_starts: Optional[List[int]] = None) -> Sections:
+    """Text, sentence starts, suffix and LCP arrays for ``sentences`` (without newlines)."""
+    text = "".join(s + "\n" for s in sentences)
+    starts = array("I", [0])
+    for s in sentences:
+        starts.append(starts[-1] + len(s) + 1)
+
+    buckets: Dict[str, List[int]] = {}
+    for i, ch in enumerate(text):
+        if ch != "\n":
+            buckets.setdefault(ch, []).append(i)
+    suffixes = array("I")
+    lcp = array("I")
+    find = text.find
+    for ch in sorted(buckets):
+        positions = buckets.pop(ch)
+        keys = [text[i : find("\n", i)] for i in positions]
+        order = sorted(range(len(positions)), key=keys.__getitem__)
+        previous = ""
+        for j in order:
+            key = keys[j]
+            n = 0
+            for a, b in zip(previous, key):
+                if a != b:
+                    break
+                n += 1
+            suffixes.append(positions[j])
+            lcp.append(n)
+            previous = key
+        del keys, order
+
+    codes = array("I")
+    codes.frombytes(text.encode(_UTF32))
+    level_starts = level_starts or [0] * len(BUCKETS) + [len(sentences)]
+    level_ranks, level_rank_starts = _group_by_level(suffixes, starts, level_starts)
+    return {
+        "meta": {
+            "sentences": len(sentences),
+            "characters": len(text),
+            "level_starts": level_starts,
+            "level_rank_starts": level_rank_starts,
+        },
+        "text": codes,
+        "sentence_starts": starts,
+        "suffixes": suffixes,
+        "lcp": lcp,
+        "level_ranks": level_ranks,
+    }
+
+
+def _group_by_level(
+    suffixes: Sequence[int], starts: Sequence[int], level_starts: List[int]
+) -> Tuple["array[int]", List[int]]:
+    """Suffix ranks grouped by the level of their sentence, and where each group starts."""
+    # Text position at which each level after the first begins
+    bounds = [starts[s] for s in level_starts[1:-1]]
+    groups = [array("I") for _ in BUCKETS]
+    for rank, p in enumerate(suffixes):
+        groups[bisect_right(bounds, p)].append(rank)
+    ranks = array("I")
+    offsets = [0]
+    for group in groups:
+        ranks.extend(group)
+        offsets.append(len(ranks))
+    return ranks, offsets
+
+
+def from_sentence_index(index: SentenceIndex) -> Sections:
+    """Sections over every sentence of ``index``, keeping its ids and level order."""
+    sentences = [index.sentence(i)["japanese"] for i in range(len(index))]
+    counts = index.level_counts()
+    starts = [0]
+    for name in BUCKETS:
+        starts.append(starts[-1] + counts[name])
+    return build_sections(sentences, starts)
+
+
+def build_file(sentence_index: Union[str, Path], output: Union[str, Path]) -> Dict[str, Any]:
+    """Write the concordance of a sentence index file to ``output``; returns its metadata."""
+    sections = from_sentence_index(SentenceIndex.open(sentence_index))
+    write_index(output, KEY, sections)
+    return sections["meta"]  # type: ignore[no-any-return]
+
+
+class Concordance:
+    """Substring search and KWIC windows over sections from :func:`build_sections`."""
+
+    def __init__(self, sections: Sections) -> None:
+        self.meta: Dict[str, Any] = sections["meta"]
+        self._text = sections["text"]
+        self._starts = sections["sentence_starts"]
+        self._suffixes = sections["suffixes"]
+        self._lcp = sections["lcp"]
+        self._level_starts: List[int] = self.meta["level_starts"]
+        self._level_ranks: Sequence[int] = sections["level_ranks"]
+        self._level_rank_starts: List[int] = self.meta["level_rank_starts"]
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "Concordance":
+        """Map a concordance file written by :func:`build_file`."""
+        return cls(read_index(path, KEY))
+
+    @classmethod
+    def from_sentences(cls, sentences: Sequence[str]) -> "Concordance":
+        return cls(build_sections(sentences))
+
+    def __len__(self) -> int:
+        return len(self._suffixes)
+
+    def _chars(self, start: int, end: int) -> str:
+        return "".join(map(chr, self._text[start:end]))
+
+    def _bound(self, query: Sequence[int], upper: bool) -> int:
+        """First suffix rank whose first ``m`` characters are >= (or > if ``upper``) ``query``."""
+        text, suffixes, m = self._text, self._suffixes, len(query)
+        lo, hi = 0, len(suffixes)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            p = suffixes[mid]
+            head = text[p : p + m].tolist()
+            if head < query or (upper and head == query):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def range(self, query: str) -> Tuple[int, int]:
+        """Suffix ranks ``[lo, hi)`` of the occurrences of ``query``."""
+        if not query or "\n" in query:
+            return 0, 0
+        codes = list(map(ord, query))
+        return self._bound(codes, False), self._bound(codes, True)
+
+    def count(
+        self, query: str, max_level: Optional[str] = None, min_level: Optional[str] = None
+    ) -> int:
+        """Occurrences of ``query`` in sentences within the level bounds."""
+        lo, hi = self.range(query)
+        if max_level is None and min_level is None:
+            return hi - lo
+        return sum(map(len, self._level_slices(lo, hi, max_level, min_level)))
+
+    def _level_slices(
+        self, lo: int, hi: int, max_level: Optional[str], min_level: Optional[str]
+    ) -> List[Sequence[int]]:
+        """The ranks in ``[lo, hi)`` of each level within the bounds, each in rank order."""
+        first = level_index(min_level) if min_level else 0
+        last = level_index(max_level) if max_level else len(BUCKETS) - 1
+        ranks, offsets = self._level_ranks, self._level_rank_starts
+        slices = []
+        for level in range(first, last + 1):
+            start, end = offsets[level], offsets[level + 1]
+            i = bisect_left(ranks, lo, start, end)
+            j = bisect_left(ranks, hi, i, end)
+            if i < j:
+                slices.append(ranks[i:j])
+        return slices
+
+    @traced("concordance.kwic")
+    def kwic(
+        self,
+        query: str,
+        width: int = WIDTH,
+        limit: int = LIMIT,
+        max_level: Optional[str] = None,
+        min_level: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Up to ``limit`` occurrences of ``query`` with ``width`` characters either side.
+
+        Occurrences come in suffix order, i.e. sorted by the text that
+        follows the match, as a printed concordance lists them; context
+        stops at sentence boundaries. With level bounds, the occurrences
+        are merged from the per-level rank groups, reading only ``limit``.
+        """
+        lo, hi = self.range(query)
+        ranks: Iterable[int] = range(lo, hi)
+        if max_level is not None or min_level is not None:
+            ranks = heapq.merge(*self._level_slices(lo, hi, max_level, min_level))
+        m = len(query)
+        lines = []
+        for rank in islice(ranks, limit):
+            p = self._suffixes[rank]
+            sentence = bisect_right(self._starts, p) - 1
+            start, stop = self._starts[sentence], self._starts[sentence + 1] - 1
+            lines.append(
+                {
+                    "sentence": sentence,
+                    "offset": p - start,
+                    "left": self._chars(max(start, p - width), p),
+                    "match": query,
+                    "right": self._chars(p + m, min(stop, p + m + width)),
+                    "level": BUCKETS[bisect_right(self._level_starts, sentence) - 1],
+                }
+            )
+        return lines
+
+    def frequent(self, length: int, limit: int = LIMIT) -> List[Tuple[str, int]]:
+        """The ``limit`` most repeated substrings of exactly ``length`` characters.
+
+        A substring occurring ``k`` times is a run of ``k - 1`` LCP values of
+        at least ``length``, so one pass over the LCP array counts them all.
+        """
+        counts: Counter[str] = Counter()
+        run = 0
+        for rank in range(1, len(self._lcp) + 1):
+            if rank < len(self._lcp) and self._lcp[rank] >= length:
+                run += 1
+                continue
+            if run:
+                p = self._suffixes[rank - 1]
+                counts[self._chars(p, p + length)] = run + 1
+            run = 0
+        return counts.most_common(limit)
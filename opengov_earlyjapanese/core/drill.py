@@ -0,0 +1,145 @@
+"""Review drill sessions driven by the spaced repetition scheduler."""
+
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.core.models import Character
+from opengov_earlyjapanese.core.srs import Rating, SpacedRepetitionSystem, SRSState
+
+# Cards answered "again" come back after this many other cards
+RELEARN_GAP = 3
+
+RATINGS = ("again", "hard", "good", "easy")
+
+
+class DrillCard(BaseModel):
+    card_id: str
+    prompt: str
+    content_type: str
+    row: str
+
+
+class DrillResult(BaseModel):
+    card_id: str
+    correct: bool
+    expected: str
+    rating: str
+    interval: int
+    next_review: datetime
+
+
+class ReviewStore:
+    """In-memory review state keyed by student and card; safe to call from threads."""
+
+    def __init__(self) -> None:
+        self._states: Dict[Tuple[str, str], SRSState] = {}
+        self._lock = threading.Lock()
+
+    def load(self, student_id: str) -> Dict[str, SRSState]:
+        with self._lock:
+            return {cid: s for (sid, cid), s in self._states.items() if sid == student_id}
+
+    def save_many(self, student_id: str, states: Dict[str, SRSState]) -> None:
+        with self._lock:
+            for cid, state in states.items():
+                self._states[(student_id, cid)] = state
+
+
+class DrillSession:
+    """Queue of due and new cards for one student, graded one answer at a time.
+
+    Due cards come first (oldest first, capped at ``max_daily_reviews``),
+    followed by unseen cards (capped at ``max_daily_new_items``). The next
+    card is always ready when an answer is graded, and changed states are
+    accumulated until the caller takes them for persistence.
+    """
+
+    def __init__(
+        self,
+        student_id: str,
+        pool: Dict[str, Character],
+        states: Dict[str, SRSState],
+        srs: Optional[SpacedRepetitionSystem] = None,
+        now: Optional[datetime] = None,
+    ) -> None:
+        now = now or datetime.utcnow()
+        self.student_id = student_id
+        self.pool = pool
+        self.states = states
+        self.srs = srs or SpacedRepetitionSystem()
+        due = sorted(
+            (cid for cid in pool if cid in states and states[cid].next_review <= now),
+            key=lambda cid: states[cid].next_review,
+        )[: settings.max_daily_reviews]
+        new = [cid for cid in pool if cid not in states][: settings.max_daily_new_items]
+        self.queue: Deque[str] = deque(due + new)
+        self.current: Optional[str] = None
+        self.dirty: Dict[str, SRSState] = {}
+        self.answered = 0
+        self.correct = 0
+
+    def _card(self, card_id: str) -> DrillCard:
+        ch = self.pool[card_id]
+        return DrillCard(card_id=card_id, prompt=ch.character, content_type=ch.type, row=ch.row)
+
+    def next_card(self) -> Optional[DrillCard]:
+        """Return the current card, advancing the queue if none is showing."""
+        if self.current is None:
+            if not self.queue:
+                return None
+            self.current = self.queue.popleft()
+        return self._card(self.current)
+
+    def answer(
+        self, card_id: str, answer: Optional[str] = None, rating: Optional[Rating] = None
+    ) -> DrillResult:
+        """Grade the current card by typed romaji or an explicit self-rating."""
+        if card_id != self.current:
+            raise ValueError(f"Not the current card: {card_id}")
+        if answer is None and rating is None:
+            raise ValueError("An answer or a rating is required")
+        if answer is not None and not isinstance(answer, str):
+            raise ValueError("The answer must be a string")
+        if rating is not None and rating not in RATINGS:
+            raise ValueError(f"Unknown rating: {rating}")
+        expected = self.pool[card_id].romaji
+        if answer is not None:
+            correct = answer.strip().lower() == expected
+            rating = rating or ("good" if correct else "again")
+        else:
+            correct = rating != "again"
+        assert rating is not None
+        state = self.states.get(card_id) or SRSState(
+            interval=settings.srs_initial_interval,
+            ease_factor=2.5,
+            repetitions=0,
+            next_review=datetime.utcnow(),
+        )
+        new_state = self.srs.schedule(state, rating)
+        self.states[card_id] = new_state
+        self.dirty[card_id] = new_state
+        if rating == "again":
+            self.queue.insert(min(len(self.queue), RELEARN_GAP), card_id)
+        self.current = None
+        self.answered += 1
+        self.correct += int(correct)
+        return DrillResult(
+            card_id=card_id,
+            correct=correct,
+            expected=expected,
+            rating=rating,
+            interval=new_state.interval,
+            next_review=new_state.next_review,
+        )
+
+    def take_dirty(self) -> Dict[str, SRSState]:
+        dirty, self.dirty = self.dirty, {}
+        return dirty
+
+    def summary(self) -> Dict[str, int]:
+        return {"answered": self.answered, "correct": self.correct, "remaining": len(self.queue)}
@@ -0,0 +1,226 @@
+"""Furigana: readings over the kanji of Japanese text.
+
+The tokenizer (see ``core.tokenizer``) supplies each word's dictionary
+reading, and :func:`align` pins it to the kanji runs of the word, so
+okurigana stay outside the ruby: 食べる is 食[た]べる, not 食べる[たべる].
+Words the lexicon does not know get no reading rather than a guess.
+
+:class:`FuriganaAnnotator` caches the segments of each sentence in an LRU
+keyed by a hash of the sentence's content (salted with the served
+content's checksum), so a page rendered for many readers is segmented
+once; it renders them as HTML ``<ruby>``, Anki-style brackets, or JSON
+spans. When a caller does not say whether to annotate,
+``settings.furigana_default`` decides; with furigana off the text is
+rendered with no readings.
+"""
+
+import hashlib
+import html
+import re
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import groupby
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from opengov_earlyjapanese.core.kana import to_hiragana
+from opengov_earlyjapanese.core.tokenizer import BaseTokenizer, char_class, split_sentences
+from opengov_earlyjapanese.utils.cache import LRUCache
+from opengov_earlyjapanese.utils.tracing import traced
+
+FORMATS = ("html", "bracket", "json")
+
+
+class Segment(NamedTuple):
+    """A piece of text and its hiragana reading (None when it needs none)."""
+
+    text: str
+    reading: Optional[str]
+    start: int
+    end: int
+
+
+def has_kanji(text: str) -> bool:
+    return any(char_class(ch) == "kanji" for ch in text)
+
+
+def align(surface: str, reading: str) -> List[Tuple[str, Optional[str]]]:
+    """Split ``surface`` into ``(text, reading)`` parts, readings on kanji runs only.
+
+    Kana in the surface must match the reading where they stand; if they
+    cannot (an irregular or missing reading), the whole word gets the
+    reading, or none if there is no reading at all.
+    """
+    if not reading or not has_kanji(surface):
+        return [(surface, None)]
+    parts = [
+        ("".join(run), kanji)
+        for kanji, run in groupby(surface, lambda ch: char_class(ch) == "kanji")
+    ]
+    if len(parts) == 1:
+        return [(surface, reading)]
+    pattern = "".join(
+        "(.+?)" if kanji else f"({re.escape(to_hiragana(text))})" for text, kanji in parts
+    )
+    m = re.fullmatch(pattern, to_hiragana(reading))
+    if m is None:
+        return [(surface, reading)]
+    return [(text, m.group(i + 1) if kanji else None) for i, (text, kanji) in enumerate(parts)]
+
+
+def sentence_segments(tokenizer: BaseTokenizer, sentence: str) -> List[Segment]:
+    """Segments covering all of ``sentence``, offsets into it; adjacent plain text is merged."""
+    segments: List[Segment] = []
+
+    def add(text: str, reading: Optional[str], start: int) -> None:
+        if segments and reading is None and segments[-1].reading is None:
+            last = segments.pop()
+            text, start = last.text + text, last.start
+        segments.append(Segment(text, reading, start, start + len(text)))
+
+    pos = 0
+    for token in tokenizer.tokenize(sentence):
+        if token.start > pos:
+            add(sentence[pos : token.start], None, pos)
+        start = token.start
+        for text, reading in align(token.surface, token.reading):
+            add(text, reading, start)
+            start += len(text)
+        pos = token.end
+    if pos < len(sentence):
+        add(sentence[pos:], None, pos)
+    return segments
+
+
+def render_html(segments: Iterable[Segment]) -> str:
+    """``<ruby>漢字<rt>かんじ</rt></ruby>`` markup, the text HTML-escaped."""
+    return "".join(
+        f"<ruby>{html.escape(s.text)}<rt>{html.escape(s.reading)}</rt></ruby>"
+        if s.reading
+        else html.escape(s.text)
+        for s in segments
+    )
+
+
+def render_bracket(segments: Iterable[Segment]) -> str:
+    """``漢字[かんじ]`` after each kanji run, Anki style.
+
+    A space goes before a run that follows other text, so a reader (or
+    Anki) can tell where the base starts.
+    """
+    out: List[str] = []
+    for s in segments:
+        if s.reading:
+            if out and not out[-1][-1:].isspace():
+                out.append(" ")
+            out.append(f"{s.text}[{s.reading}]")
+        else:
+            out.append(s.text)
+    return "".join(out)
+
+
+def render_json(segments: Iterable[Segment]) -> List[Dict[str, Any]]:
+    """Spans ``{text, reading, start, end}``, offsets into the annotated text."""
+    return [s._asdict() for s in segments]
+
+
+_RENDER = {"html": render_html, "bracket": render_bracket, "json": render_json}
+
+
+def _plain(text: str) -> List[Segment]:
+    return [Segment(text, None, 0, len(text))] if text else []
+
+
+class FuriganaAnnotator:
+    """Cached per-sentence furigana over a tokenizer.
+
+    ``salt`` goes into every cache key; pass the content checksum so a
+    cache outliving a content change can never serve stale readings.
+    """
+
+    def __init__(self, tokenizer: BaseTokenizer, cache_size: int = 50000, salt: str = "") -> None:
+        self.tokenizer = tokenizer
+        self.cache = LRUCache(cache_size)
+        self._salt = salt.encode()
+
+    def _key(self, sentence: str) -> bytes:
+        digest = hashlib.blake2b(self._salt, digest_size=16)
+        digest.update(sentence.encode())
+        return digest.digest()
+
+    def missing(self, texts: Iterable[str]) -> List[str]:
+        """Distinct sentences of ``texts`` not in the cache, in order of appearance."""
+        found: Dict[str, None] = {}
+        for text in texts:
+            for _, sentence in split_sentences(text):
+                if sentence not in found and self.cache.get(self._key(sentence)) is None:
+                    found[sentence] = None
+        return list(found)
+
+    def store(self, sentences: Sequence[str], segments: Sequence[List[Segment]]) -> None:
+        """Cache segments computed elsewhere, e.g. by :func:`segment_sentences` in a worker."""
+        for sentence, found in zip(sentences, segments):
+            self.cache.set(self._key(sentence), found)
+
+    def segments(self, text: str) -> List[Segment]:
+        """Segments covering all of ``text``, offsets into it."""
+        out: List[Segment] = []
+        for offset, sentence in split_sentences(text):
+            key = self._key(sentence)
+            found = self.cache.get(key)
+            if found is None:
+                found = sentence_segments(self.tokenizer, sentence)
+                self.cache.set(key, found)
+            if offset:
+                found = [s._replace(start=s.start + offset, end=s.end + offset) for s in found]
+            out.extend(found)
+        return out
+
+    @traced("furigana.annotate")
+    def annotate(self, text: str, fmt: str = "html", furigana: Optional[bool] = None) -> Any:
+        """``text`` rendered in ``fmt`` (see :data:`FORMATS`).
+
+        ``furigana=None`` follows ``settings.furigana_default``.
+        """
+        render = _RENDER.get(fmt)
+        if render is None:
+            raise ValueError(f"Unknown furigana format {fmt!r}; expected one of {FORMATS}")
+        if furigana is None:
+            from opengov_earlyjapanese.config import settings
+
+            furigana = settings.furigana_default
+        return render(self.segments(text) if furigana else _plain(text))
+
+    def iter_annotate(
+        self, texts: Iterable[str], fmt: str = "html", furigana: Optional[bool] = None
+    ) -> Iterator[Any]:
+        """:meth:`annotate` for each of ``texts``, lazily, e.g. over the lines of a file."""
+        for text in texts:
+            yield self.annotate(text, fmt, furigana)
+
+    def annotate_many(
+        self, texts: Iterable[str], fmt: str = "html", furigana: Optional[bool] = None
+    ) -> List[Any]:
+        return list(self.iter_annotate(texts, fmt, furigana))
+
+
+def segment_sentences(sentences: Sequence[str]) -> List[List[Segment]]:
+    """Uncached segments of each sentence from the shared tokenizer, for worker processes."""
+    from opengov_earlyjapanese.core import registry
+
+    tokenizer = registry.get_tokenizer()
+    return [sentence_segments(tokenizer, sentence) for sentence in sentences]
+
+
+def annotate(text: str, fmt: str = "html", furigana: Optional[bool] = None) -> Any:
+    """``text`` with furigana from the shared annotator."""
+    from opengov_earlyjapanese.core import registry
+
+    return registry.get_furigana_annotator().annotate(text, fmt, furigana)
+
+
+def annotate_many(
+    texts: Iterable[str], fmt: str = "html", furigana: Optional[bool] = None
+) -> List[Any]:
+    """:func:`annotate` for each of ``texts``."""
+    from opengov_earlyjapanese.core import registry
+
+    return registry.get_furigana_annotator().annotate_many(texts, fmt, furigana)
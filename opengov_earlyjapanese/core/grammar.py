@@ -1,9 +1,15 @@
 """Grammar teaching utilities (simplified)."""
 
-from typing import Dict, List
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, List
 
 from pydantic import BaseModel
 
+from opengov_earlyjapanese.utils.tracing import traced
+
+if TYPE_CHECKING:
+    from opengov_earlyjapanese.core.pack import ContentPack
+
 
 class GrammarExplanation(BaseModel):
     pattern: str
@@ -13,7 +19,7 @@ class GrammarExplanation(BaseModel):
 
 
 class GrammarTeacher:
-    _db: Dict[str, GrammarExplanation] = {
+    _db: Mapping[str, GrammarExplanation] = {
         "です": GrammarExplanation(
             pattern="です",
             meaning="to be (polite copula)",
@@ -22,6 +28,16 @@ class GrammarTeacher:
         )
     }
 
+    @classmethod
+    def from_pack(cls, pack: "ContentPack") -> "GrammarTeacher":
+        teacher = cls()
+        teacher._db = pack.table("grammar", GrammarExplanation.model_validate)
+        return teacher
+
+    def patterns(self) -> List[str]:
+        return list(self._db)
+
+    @traced("grammar.explain", record=("pattern",))
     def explain(self, pattern: str) -> GrammarExplanation:
         return self._db.get(
             pattern,
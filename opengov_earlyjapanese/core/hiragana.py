@@ -1,11 +1,16 @@
 """Hiragana teaching module."""
 
-from typing import Dict, List, Optional
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 from pydantic import BaseModel
 
 from opengov_earlyjapanese.core.models import Character
 from opengov_earlyjapanese.utils.logger import get_logger
+from opengov_earlyjapanese.utils.tracing import traced
+
+if TYPE_CHECKING:
+    from opengov_earlyjapanese.core.pack import ContentPack
 
 logger = get_logger(__name__)
 
@@ -20,9 +25,17 @@ class HiraganaTeacher:
     """Teaches hiragana characters."""
 
     def __init__(self) -> None:
-        self.characters = self._initialize_hiragana()
+        self.characters: Mapping[str, Character] = self._initialize_hiragana()
         self.rows = self._organize_by_rows()
 
+    @classmethod
+    def from_pack(cls, pack: "ContentPack") -> "HiraganaTeacher":
+        """Teacher over a compiled content pack; characters are decoded on first use."""
+        teacher = cls.__new__(cls)
+        teacher.characters = pack.table("hiragana", Character.model_validate)
+        teacher.rows = pack.groups("hiragana")
+        return teacher
+
     def _initialize_hiragana(self) -> Dict[str, Character]:
         hiragana_data = {
             "あ": ("a", "a_row", "Looks like an Apple with a leaf"),
@@ -113,6 +126,7 @@ class HiraganaTeacher:
         }
         return examples.get(character, [])
 
+    @traced("hiragana.get_lesson", record=("row",))
     def get_lesson(self, row: str) -> HiraganaLesson:
         if row not in self.rows:
             raise ValueError(f"Unknown row: {row}")
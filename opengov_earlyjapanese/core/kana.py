@@ -0,0 +1,183 @@
+"""Kana folding and romaji-to-kana conversion.
+
+:func:`to_hiragana` folds katakana onto hiragana so readings compare
+regardless of script. :func:`romaji_to_kana` converts Hepburn or
+Kunrei-shiki romaji as an IME would: doubled consonants become っ, ``n``
+before a consonant (or ``nn``/``n'``) becomes ん, and ``-`` is the long
+vowel mark. Characters that are not romaji pass through unchanged.
+:func:`romaji_to_kana_partial` instead returns a trailing fragment that
+could still become kana (``"tab"`` -> ``"た"``, ``"b"``) separately, which
+is what typeahead needs.
+"""
+
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Tuple
+
+_KATAKANA_START, _KATAKANA_END = 0x30A1, 0x30F6
+_KANA_OFFSET = 0x60
+
+_VOWELS = "aiueo"
+
+# Syllable tables: consonant prefix -> kana for a, i, u, e, o
+_ROWS = {
+    "": "あいうえお",
+    "k": "かきくけこ",
+    "g": "がぎぐげご",
+    "s": "さしすせそ",
+    "z": "ざじずぜぞ",
+    "t": "たちつてと",
+    "d": "だぢづでど",
+    "n": "なにぬねの",
+    "h": "はひふへほ",
+    "b": "ばびぶべぼ",
+    "p": "ぱぴぷぺぽ",
+    "m": "まみむめも",
+    "r": "らりるれろ",
+    "l": "ぁぃぅぇぉ",
+    "x": "ぁぃぅぇぉ",
+}
+# Yōon: consonant prefix -> i-column kana (combined with ゃ, ゅ, ょ)
+_YOON = {
+    "ky": "き",
+    "gy": "ぎ",
+    "sh": "し",
+    "sy": "し",
+    "j": "じ",
+    "jy": "じ",
+    "zy": "じ",
+    "ch": "ち",
+    "cy": "ち",
+    "ty": "ち",
+    "dy": "ぢ",
+    "ny": "に",
+    "hy": "ひ",
+    "by": "び",
+    "py": "ぴ",
+    "my": "み",
+    "ry": "り",
+}
+_EXTRA = {
+    "shi": "し",
+    "chi": "ち",
+    "tsu": "つ",
+    "fu": "ふ",
+    "ji": "じ",
+    "ya": "や",
+    "yu": "ゆ",
+    "yo": "よ",
+    "wa": "わ",
+    "wo": "を",
+    "wi": "うぃ",
+    "we": "うぇ",
+    "nn": "ん",
+    "n'": "ん",
+    "xn": "ん",
+    "vu": "ゔ",
+    "fa": "ふぁ",
+    "fi": "ふぃ",
+    "fe": "ふぇ",
+    "fo": "ふぉ",
+    "she": "しぇ",
+    "je": "じぇ",
+    "che": "ちぇ",
+    "ltu": "っ",
+    "xtu": "っ",
+    "ltsu": "っ",
+    "xtsu": "っ",
+    "lya": "ゃ",
+    "xya": "ゃ",
+    "lyu": "ゅ",
+    "xyu": "ゅ",
+    "lyo": "ょ",
+    "xyo": "ょ",
+    "-": "ー",
+}
+
+
+def _build_table() -> Dict[str, str]:
+    table: Dict[str, str] = {}
+    for prefix, kana in _ROWS.items():
+        for vowel, ch in zip(_VOWELS, kana):
+            table[prefix + vowel] = ch
+    for prefix, ch in _YOON.items():
+        for vowel, small in zip("auo", "ゃゅょ"):
+            table[prefix + vowel] = ch + small
+    table.update(_EXTRA)
+    return table
+
+
+ROMAJI: Dict[str, str] = _build_table()
+_MAX_KEY = max(map(len, ROMAJI))
+_PREFIXES: FrozenSet[str] = frozenset(k[:i] for k in ROMAJI for i in range(1, len(k) + 1))
+_SOKUON_CONSONANTS = frozenset("bcdfghjklmpqrstvwxyz")
+
+
+def to_hiragana(text: str) -> str:
+    """Fold katakana in ``text`` onto hiragana; other characters are unchanged."""
+    return "".join(
+        chr(ord(ch) - _KANA_OFFSET) if _KATAKANA_START <= ord(ch) <= _KATAKANA_END else ch
+        for ch in text
+    )
+
+
+def is_romaji(text: str) -> bool:
+    """True if ``text`` has ASCII letters, i.e. could be romaji input."""
+    return any("a" <= ch <= "z" for ch in text.lower())
+
+
+def _convert(text: str, partial: bool) -> Tuple[str, str]:
+    text = text.lower()
+    out: List[str] = []
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        nxt = text[i + 1] if i + 1 < n else ""
+        if ch == "n":
+            after = text[i + 2] if i + 2 < n else ""
+            if nxt and nxt not in _VOWELS and nxt not in "y'n":
+                out.append("ん")
+                i += 1
+                continue
+            if nxt == "n" and after and (after in _VOWELS or after == "y"):
+                out.append("ん")  # "konnichi": the second n starts the next syllable
+                i += 1
+                continue
+        elif (ch == nxt and ch in _SOKUON_CONSONANTS) or text.startswith("tch", i):
+            out.append("っ")
+            i += 1
+            continue
+        for size in range(min(_MAX_KEY, n - i), 0, -1):
+            kana = ROMAJI.get(text[i : i + size])
+            if kana is not None:
+                out.append(kana)
+                i += size
+                break
+        else:
+            if text[i:] in _PREFIXES:
+                if partial:
+                    return "".join(out), text[i:]
+                if text[i:] == "n":
+                    out.append("ん")
+                    break
+            out.append(ch)
+            i += 1
+    return "".join(out), ""
+
+
+def romaji_to_kana(text: str) -> str:
+    """Convert romaji in ``text`` to hiragana."""
+    return _convert(text, partial=False)[0]
+
+
+def romaji_to_kana_partial(text: str) -> Tuple[str, str]:
+    """Convert as typed so far: the kana, and a trailing romaji fragment still pending."""
+    return _convert(text, partial=True)
+
+
+@lru_cache(maxsize=256)
+def pending_kana(fragment: str) -> Tuple[str, ...]:
+    """First kana of every syllable ``fragment`` could still become, e.g. ``"b"`` -> ば..ぼ."""
+    firsts = {kana[0] for key, kana in ROMAJI.items() if key.startswith(fragment)}
+    if fragment == "n":
+        firsts.add("ん")
+    return tuple(sorted(firsts))
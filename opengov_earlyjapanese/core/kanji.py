@@ -1,10 +1,15 @@
 """Kanji learning utilities (offline sample data)."""
 
-from typing import Dict, List
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from pydantic import BaseModel
 
 from opengov_earlyjapanese.core.models import JLPTLevel
+from opengov_earlyjapanese.utils.tracing import traced
+
+if TYPE_CHECKING:
+    from opengov_earlyjapanese.core.pack import ContentPack
 
 
 class KanjiAnalysis(BaseModel):
@@ -14,21 +19,34 @@ class KanjiAnalysis(BaseModel):
     kun_reading: List[str]
     radicals: List[str]
     mnemonic: str
+    jlpt: Optional[str] = None
+    example_sentences: List[Dict[str, str]] = []
 
 
 class KanjiMaster:
-    def analyze(self, ch: str) -> KanjiAnalysis:
-        # Minimal demo data
-        data: Dict[str, Dict] = {
-            "愛": {
-                "meanings": ["love", "affection"],
-                "on": ["アイ"],
-                "kun": ["いと(しい)"],
-                "radicals": ["爫", "冖", "心"],
-                "mnemonic": "Claw hand over a cover with heart: love protects.",
-            }
+    # Minimal demo data
+    _db: Mapping[str, Dict[str, Any]] = {
+        "愛": {
+            "meanings": ["love", "affection"],
+            "on": ["アイ"],
+            "kun": ["いと(しい)"],
+            "radicals": ["爫", "冖", "心"],
+            "mnemonic": "Claw hand over a cover with heart: love protects.",
         }
-        d = data.get(ch, {
+    }
+
+    @classmethod
+    def from_pack(cls, pack: "ContentPack") -> "KanjiMaster":
+        master = cls()
+        master._db = pack.table("kanji", lambda record: record)
+        return master
+
+    def known_characters(self) -> List[str]:
+        return list(self._db)
+
+    @traced("kanji.analyze", record=("ch",))
+    def analyze(self, ch: str) -> KanjiAnalysis:
+        d = self._db.get(ch, {
             "meanings": ["unknown"],
             "on": [],
             "kun": [],
@@ -42,6 +60,7 @@ class KanjiMaster:
             kun_reading=d["kun"],
             radicals=d["radicals"],
             mnemonic=d["mnemonic"],
+            jlpt=d.get("jlpt"),
         )
 
     def generate_sentences(self, ch: str, level: str = "N5") -> List[str]:
@@ -54,3 +73,17 @@ class KanjiMaster:
             "N1": [f"{ch} に まつわる じじつ を ふまえて ろんじる。"],
         }
         return base[lvl]
+
+
+def is_kanji(ch: str) -> bool:
+    return "\u4e00" <= ch <= "\u9fff" or "\u3400" <= ch <= "\u4dbf"
+
+
+def analyze_text(text: str) -> List[Dict[str, Any]]:
+    """Analyse each distinct kanji in ``text``, in order of first appearance."""
+    from opengov_earlyjapanese.core.registry import get_kanji_master
+    from opengov_earlyjapanese.core.sentences import with_examples
+
+    km = get_kanji_master()
+    seen = dict.fromkeys(ch for ch in text if is_kanji(ch))
+    return [with_examples(km.analyze(ch)).model_dump() for ch in seen]
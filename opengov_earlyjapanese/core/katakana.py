@@ -1,10 +1,15 @@
 """Katakana teaching module (simplified)."""
 
-from typing import Dict, List, Optional
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 from pydantic import BaseModel
 
 from opengov_earlyjapanese.core.models import Character
+from opengov_earlyjapanese.utils.tracing import traced
+
+if TYPE_CHECKING:
+    from opengov_earlyjapanese.core.pack import ContentPack
 
 
 class KatakanaLesson(BaseModel):
@@ -15,9 +20,17 @@ class KatakanaLesson(BaseModel):
 
 class KatakanaTeacher:
     def __init__(self) -> None:
-        self.characters = self._initialize_katakana()
+        self.characters: Mapping[str, Character] = self._initialize_katakana()
         self.rows = self._organize_by_rows()
 
+    @classmethod
+    def from_pack(cls, pack: "ContentPack") -> "KatakanaTeacher":
+        """Teacher over a compiled content pack; characters are decoded on first use."""
+        teacher = cls.__new__(cls)
+        teacher.characters = pack.table("katakana", Character.model_validate)
+        teacher.rows = pack.groups("katakana")
+        return teacher
+
     def _initialize_katakana(self) -> Dict[str, Character]:
         data = {
             # a-row
@@ -104,6 +117,7 @@ class KatakanaTeacher:
             "wa_row": ["ワ", "ヲ", "ン"],
         }
 
+    @traced("katakana.get_lesson", record=("row",))
     def get_lesson(self, row: str) -> KatakanaLesson:
         if row not in self.rows:
             raise ValueError(f"Unknown row: {row}")
@@ -108,15 +108,17 @@ class Vocabulary(BaseModel):
     part_of_speech: str
     jlpt_level: JLPTLevel
 
-    kanji_breakdown: List[str] = []
+    # default_factory rather than [] defaults: VocabularyBank validates and
+    # decodes entries by the hundred thousand, and [] defaults are deep-copied
+    kanji_breakdown: List[str] = Field(default_factory=list)
     pitch_accent: Optional[str] = None
     audio_url: Optional[str] = None
 
-    example_sentences: List[Dict[str, str]] = []
-    synonyms: List[str] = []
-    antonyms: List[str] = []
+    example_sentences: List[Dict[str, str]] = Field(default_factory=list)
+    synonyms: List[str] = Field(default_factory=list)
+    antonyms: List[str] = Field(default_factory=list)
 
-    categories: List[str] = []
+    categories: List[str] = Field(default_factory=list)
     usage_notes: Optional[str] = None
     frequency_rank: Optional[int] = None
 
@@ -0,0 +1,412 @@
+"""Compiled content packs: versioned, checksummed SQLite bundles.
+
+``build-content`` compiles content source files into a single pack so that
+content can be updated without a code release. Sources live in one
+directory, one file per kind, as JSON (a list of objects) or TSV (a header
+row; list fields are ``;``-separated)::
+
+    hiragana.tsv    character, romaji, row, mnemonic
+    katakana.tsv    character, romaji, row, mnemonic
+    kanji.json      character, meanings, on, kun, radicals, mnemonic
+    vocabulary.tsv  word, reading, meanings, part_of_speech, jlpt_level
+    grammar.json    pattern, meaning, structure, examples
+
+Any further columns are kept. Without sources the built-in content is
+compiled instead, and ``export_sources`` writes it out as a starting point.
+
+Records are stored as compact JSON in ``(kind, key)`` order with their
+position and group (the kana row, for example) alongside. Opening a pack
+reads only its metadata; each kind's keys are read on first use and records
+are decoded one at a time when accessed. The checksum covers every record
+and is checked by :meth:`ContentPack.verify`, not on open.
+
+SQLite connections must not be used across ``fork()``, and the prefork
+server opens the pack before forking its workers, so each forked child
+reopens every open pack before it reads from it.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+FORMAT_VERSION = 1
+KINDS = ("hiragana", "katakana", "kanji", "vocabulary", "grammar")
+
+# Source fields holding lists, split on ";" when read from TSV
+LIST_FIELDS = {"meanings", "on", "kun", "radicals", "examples", "kanji_breakdown", "categories"}
+
+# Field that identifies a record, and the field records are grouped by
+KEY_FIELD = {
+    "hiragana": "character",
+    "katakana": "character",
+    "kanji": "character",
+    "vocabulary": "word",
+    "grammar": "pattern",
+}
+GROUP_FIELD = {"hiragana": "row", "katakana": "row", "kanji": "jlpt", "vocabulary": "jlpt_level"}
+
+T = TypeVar("T")
+
+# (kind, key, group, record)
+Record = Tuple[str, str, Optional[str], Dict[str, Any]]
+
+
+class ContentPackError(ValueError):
+    """A pack or its sources are malformed, or the pack fails verification."""
+
+
+def _normalise(kind: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in derived fields so that loading needs no further processing."""
+    if kind in ("hiragana", "katakana"):
+        ch = record["character"]
+        record = {
+            "id": f"{kind}_{ch}",
+            "unicode": f"U+{ord(ch):04X}",
+            "type": kind,
+            **record,
+        }
+    elif kind == "kanji":
+        record = {"meanings": [], "on": [], "kun": [], "radicals": [], "mnemonic": "", **record}
+    elif kind == "grammar":
+        record = {"structure": "", "examples": [], **record}
+    elif kind == "vocabulary":
+        from opengov_earlyjapanese.core import vocabulary
+
+        record = {**record, "id": vocabulary.entry_id(record)}
+    return record
+
+
+def _read_source(path: Path) -> List[Dict[str, Any]]:
+    if path.suffix == ".json":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(data, list):
+            raise ContentPackError(f"{path}: expected a JSON list of objects")
+        return data
+    with path.open(encoding="utf-8", newline="") as f:
+        rows = []
+        for row in csv.DictReader(f, delimiter="\t"):
+            rows.append(
+                {
+                    k: [v for v in (value or "").split(";") if v] if k in LIST_FIELDS else value
+                    for k, value in row.items()
+                    if k is not None and (value not in (None, "") or k in LIST_FIELDS)
+                }
+            )
+        return rows
+
+
+def load_sources(directory: Union[str, Path]) -> List[Record]:
+    """Read every recognised source file in ``directory``."""
+    directory = Path(directory)
+    records: List[Record] = []
+    found = False
+    for kind in KINDS:
+        for suffix in (".json", ".tsv"):
+            path = directory / f"{kind}{suffix}"
+            if not path.exists():
+                continue
+            found = True
+            for i, raw in enumerate(_read_source(path)):
+                key = raw.get(KEY_FIELD[kind])
+                if not key:
+                    raise ContentPackError(f"{path}: record {i} has no {KEY_FIELD[kind]!r}")
+                group = raw.get(GROUP_FIELD[kind]) if kind in GROUP_FIELD else None
+                record = _normalise(kind, dict(raw))
+                if kind == "vocabulary":
+                    key = record["id"]  # words are not unique; word and reading are
+                records.append((kind, str(key), group, record))
+    if not found:
+        raise ContentPackError(f"No content sources in {directory}")
+    return records
+
+
+def builtin_records() -> List[Record]:
+    """The content that ships in code, as pack records."""
+    from opengov_earlyjapanese.core import vocabulary
+    from opengov_earlyjapanese.core.grammar import GrammarTeacher
+    from opengov_earlyjapanese.core.hiragana import HiraganaTeacher
+    from opengov_earlyjapanese.core.kanji import KanjiMaster
+    from opengov_earlyjapanese.core.katakana import KatakanaTeacher
+
+    records: List[Record] = []
+    for kind, teacher in (("hiragana", HiraganaTeacher()), ("katakana", KatakanaTeacher())):
+        for ch, character in teacher.characters.items():
+            records.append((kind, ch, character.row, character.model_dump()))
+    for ch, entry in KanjiMaster._db.items():
+        records.append(("kanji", ch, None, _normalise("kanji", {"character": ch, **entry})))
+    for pattern, explanation in GrammarTeacher._db.items():
+        records.append(("grammar", pattern, None, explanation.model_dump()))
+    for entry in vocabulary.builtin_records():
+        records.append(("vocabulary", entry["id"], entry["jlpt_level"], entry))
+    return records
+
+
+def export_sources(directory: Union[str, Path], records: Optional[List[Record]] = None) -> None:
+    """Write ``records`` (default: the built-in content) as JSON source files."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    by_kind: Dict[str, List[Dict[str, Any]]] = {}
+    for kind, _, _, record in records if records is not None else builtin_records():
+        by_kind.setdefault(kind, []).append(record)
+    for kind, items in by_kind.items():
+        (directory / f"{kind}.json").write_text(
+            json.dumps(items, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+        )
+
+
+def _encode(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _checksum(rows: Iterable[Tuple[str, str, int, Optional[str], bytes]]) -> str:
+    digest = hashlib.sha256()
+    for kind, key, seq, group, data in rows:
+        if isinstance(data, str):
+            data = data.encode()
+        for part in (kind, key, str(seq), group or ""):
+            encoded = part.encode()
+            digest.update(len(encoded).to_bytes(4, "big"))
+            digest.update(encoded)
+        digest.update(len(data).to_bytes(4, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def _encoded_rows(records: Iterable[Record]) -> List[Tuple[str, str, int, Optional[str], bytes]]:
+    rows = []
+    seen = set()
+    for seq, (kind, key, group, record) in enumerate(records):
+        if kind not in KINDS:
+            raise ContentPackError(f"Unknown content kind: {kind}")
+        if (kind, key) in seen:
+            raise ContentPackError(f"Duplicate {kind} record: {key}")
+        seen.add((kind, key))
+        rows.append((kind, key, seq, group, _encode(record)))
+    rows.sort(key=lambda r: (r[0], r[1]))
+    return rows
+
+
+def records_checksum(records: Iterable[Record]) -> str:
+    """The checksum a pack built from ``records`` would carry."""
+    return _checksum(_encoded_rows(records))
+
+
+def build_pack(
+    records: Iterable[Record], output: Union[str, Path], content_version: str = "dev"
+) -> Dict[str, Any]:
+    """Compile ``records`` into a pack at ``output``, replacing it atomically.
+
+    Returns the pack metadata. Duplicate keys within a kind are an error.
+    """
+    output = Path(output)
+    rows = _encoded_rows(records)
+    counts: Dict[str, int] = {}
+    for kind, *_ in rows:
+        counts[kind] = counts.get(kind, 0) + 1
+    meta = {
+        "format": FORMAT_VERSION,
+        "content_version": content_version,
+        "checksum": _checksum(rows),
+        "built_at": int(time.time()),
+        "counts": counts,
+    }
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(output.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    db = sqlite3.connect(tmp)
+    try:
+        db.executescript(
+            """
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID;
+            CREATE TABLE records (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                grp TEXT,
+                data BLOB NOT NULL,
+                PRIMARY KEY (kind, key)
+            ) WITHOUT ROWID;
+            CREATE INDEX records_seq ON records (kind, seq, key, grp);
+            """
+        )
+        db.executemany("INSERT INTO records VALUES (?, ?, ?, ?, ?)", rows)
+        db.executemany(
+            "INSERT INTO meta VALUES (?, ?)", [(k, json.dumps(v)) for k, v in meta.items()]
+        )
+        db.commit()
+        db.execute("VACUUM")
+    finally:
+        db.close()
+    tmp.replace(output)
+    return meta
+
+
+class PackTable(Mapping[str, T], Generic[T]):
+    """Read-only mapping over one kind, decoding records on first access."""
+
+    def __init__(self, pack: "ContentPack", kind: str, decode: Callable[[Dict[str, Any]], T]):
+        self._pack = pack
+        self._kind = kind
+        self._decode = decode
+        self._keys = pack.keys(kind)
+        self._index = set(self._keys)
+        self._cache: Dict[str, T] = {}
+
+    def __getitem__(self, key: str) -> T:
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        if key not in self._index:
+            raise KeyError(key)
+        value = self._decode(self._pack.record(self._kind, key))
+        self._cache[key] = value
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class ContentPack:
+    """An open, read-only content pack."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        if not self.path.is_file():
+            raise ContentPackError(f"Content pack not found: {self.path}")
+        self._db = self._connect()
+        self._lock = threading.Lock()
+        self._inherited: List[sqlite3.Connection] = []
+        try:
+            with self._lock:
+                rows = self._db.execute("SELECT key, value FROM meta").fetchall()
+        except sqlite3.DatabaseError as e:
+            self._db.close()
+            raise ContentPackError(f"Not a content pack: {self.path} ({e})") from e
+        self.meta: Dict[str, Any] = {k: json.loads(v) for k, v in rows}
+        if self.meta.get("format") != FORMAT_VERSION:
+            self._db.close()
+            raise ContentPackError(
+                f"Unsupported content pack format {self.meta.get('format')!r} "
+                f"(expected {FORMAT_VERSION})"
+            )
+        _open_packs.add(self)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+
+    def _reopen_in_child(self) -> None:
+        # The parent's connection is kept, unused and unclosed: closing it
+        # would touch SQLite state that belongs to the parent.
+        self._inherited.append(self._db)
+        self._db = self._connect()
+        self._lock = threading.Lock()
+
+    @property
+    def checksum(self) -> str:
+        return str(self.meta["checksum"])
+
+    @property
+    def content_version(self) -> str:
+        return str(self.meta["content_version"])
+
+    def keys(self, kind: str) -> List[str]:
+        """Keys of ``kind`` in source order."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key FROM records WHERE kind = ? ORDER BY seq", (kind,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def groups(self, kind: str) -> Dict[str, List[str]]:
+        """Keys of ``kind`` per group (e.g. kana row), in source order."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT grp, key FROM records WHERE kind = ? AND grp IS NOT NULL ORDER BY seq",
+                (kind,),
+            ).fetchall()
+        groups: Dict[str, List[str]] = {}
+        for group, key in rows:
+            groups.setdefault(group, []).append(key)
+        return groups
+
+    def record(self, kind: str, key: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM records WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        record: Dict[str, Any] = json.loads(row[0])
+        return record
+
+    def records(self, kind: str) -> Iterator[Dict[str, Any]]:
+        """Decode every record of ``kind`` in source order."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT data FROM records WHERE kind = ? ORDER BY seq", (kind,)
+            ).fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def table(self, kind: str, decode: Callable[[Dict[str, Any]], T]) -> PackTable[T]:
+        return PackTable(self, kind, decode)
+
+    def verify(self) -> None:
+        """Recompute the checksum over every record; raise if it does not match."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT kind, key, seq, grp, data FROM records ORDER BY kind, key"
+            ).fetchall()
+        actual = _checksum(rows)
+        if actual != self.checksum:
+            raise ContentPackError(
+                f"Checksum mismatch for {self.path}: expected {self.checksum}, got {actual}"
+            )
+
+    def close(self) -> None:
+        _open_packs.discard(self)
+        self._db.close()
+
+    def __enter__(self) -> "ContentPack":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+_open_packs: "weakref.WeakSet[ContentPack]" = weakref.WeakSet()
+
+
+def _reopen_packs() -> None:
+    for pack in list(_open_packs):
+        pack._reopen_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reopen_packs)
@@ -0,0 +1,214 @@
+"""Process-wide shared content instances.
+
+Teachers are read-only once constructed, so the API and other long-lived
+entry points share one instance per process instead of rebuilding the
+content tables on every call. Construction is single-flighted: callers
+racing on a cold or just-reloaded registry wait for one build.
+
+With ``settings.content_pack`` set, teachers are built over that compiled
+pack (see ``core.pack``) instead of the built-in content. Derived indexes
+are loaded through :func:`load_index`, which reuses files in
+``settings.index_cache_dir`` built for the same content hash.
+"""
+
+from typing import Any, Callable, Dict, Optional, Type, TypeVar
+
+from opengov_earlyjapanese.core import autocomplete, tokenizer, vocabulary
+from opengov_earlyjapanese.core.autocomplete import Autocompleter
+from opengov_earlyjapanese.core.concordance import Concordance
+from opengov_earlyjapanese.core.furigana import FuriganaAnnotator
+from opengov_earlyjapanese.core.grammar import GrammarTeacher
+from opengov_earlyjapanese.core.hiragana import HiraganaTeacher
+from opengov_earlyjapanese.core.kanji import KanjiMaster
+from opengov_earlyjapanese.core.katakana import KatakanaTeacher
+from opengov_earlyjapanese.core.pack import ContentPack, builtin_records, records_checksum
+from opengov_earlyjapanese.core.sentences import SentenceIndex
+from opengov_earlyjapanese.core.tokenizer import BaseTokenizer
+from opengov_earlyjapanese.core.vocabulary import VocabularyBank
+from opengov_earlyjapanese.utils.index_cache import IndexCache, Sections
+from opengov_earlyjapanese.utils.singleflight import SingleFlight
+
+T = TypeVar("T")
+# Content classes that can be built from a pack
+C = TypeVar("C", HiraganaTeacher, KatakanaTeacher, KanjiMaster, GrammarTeacher)
+
+_instances: Dict[str, Any] = {}
+_flight = SingleFlight()
+
+
+def _shared(name: str, factory: Callable[[], T]) -> T:
+    instance = _instances.get(name)
+    if instance is None:
+
+        def build() -> Any:
+            if name not in _instances:
+                _instances[name] = factory()
+            return _instances[name]
+
+        instance = _flight.do(name, build)
+    return instance  # type: ignore[no-any-return]
+
+
+def _open_pack() -> Optional[ContentPack]:
+    from opengov_earlyjapanese.config import settings
+
+    if settings.content_pack is None:
+        return None
+    return ContentPack(settings.content_pack)
+
+
+def get_content_pack() -> Optional[ContentPack]:
+    """The configured content pack, opened once; None when using built-in content."""
+    if "pack" not in _instances:
+        _flight.do("pack", lambda: _instances.setdefault("pack", _open_pack()))
+    return _instances["pack"]  # type: ignore[no-any-return]
+
+
+def content_hash() -> str:
+    """Checksum of the content being served: the pack's, or the built-in content's."""
+
+    def compute() -> str:
+        pack = get_content_pack()
+        return pack.checksum if pack is not None else records_checksum(builtin_records())
+
+    return _shared("content_hash", compute)
+
+
+def get_index_cache() -> IndexCache:
+    from opengov_earlyjapanese.config import settings
+
+    return _shared("index_cache", lambda: IndexCache(settings.index_cache_dir))
+
+
+def load_index(name: str, build: Callable[[], Sections], version: int = 1) -> Sections:
+    """Shared index ``name``: loaded from the index cache, or built once and saved."""
+    return _shared(
+        f"index:{name}",
+        lambda: get_index_cache().load_or_build(name, content_hash(), build, version),
+    )
+
+
+def _from_pack(cls: Type[C]) -> Callable[[], C]:
+    def factory() -> C:
+        pack = get_content_pack()
+        return cls() if pack is None else cls.from_pack(pack)
+
+    return factory
+
+
+def get_hiragana_teacher() -> HiraganaTeacher:
+    return _shared("hiragana", _from_pack(HiraganaTeacher))
+
+
+def get_katakana_teacher() -> KatakanaTeacher:
+    return _shared("katakana", _from_pack(KatakanaTeacher))
+
+
+def get_kanji_master() -> KanjiMaster:
+    return _shared("kanji", _from_pack(KanjiMaster))
+
+
+def get_grammar_teacher() -> GrammarTeacher:
+    return _shared("grammar", _from_pack(GrammarTeacher))
+
+
+def get_vocabulary_bank() -> VocabularyBank:
+    """Vocabulary from the content pack (or the built-in sample), via the index cache."""
+
+    def build() -> Sections:
+        pack = get_content_pack()
+        if pack is None:
+            return vocabulary.build_sections(vocabulary.builtin_records())
+        return vocabulary.build_sections(pack.records("vocabulary"))
+
+    return _shared(
+        "vocabulary",
+        lambda: VocabularyBank(load_index("vocabulary", build, vocabulary.INDEX_VERSION)),
+    )
+
+
+def get_autocompleter() -> Autocompleter:
+    """Typeahead over the served content, via the index cache."""
+
+    def build() -> Sections:
+        return autocomplete.build_sections(autocomplete.content_terms())
+
+    return _shared(
+        "autocomplete",
+        lambda: Autocompleter(load_index("autocomplete", build, autocomplete.INDEX_VERSION)),
+    )
+
+
+def get_tokenizer() -> BaseTokenizer:
+    """The configured tokenizer; the built-in one's lexicon comes via the index cache."""
+
+    def build() -> Sections:
+        return tokenizer.build_sections(tokenizer.content_entries())
+
+    return _shared(
+        "tokenizer",
+        lambda: tokenizer.create_tokenizer(
+            lexicon=lambda: load_index("tokenizer", build, tokenizer.INDEX_VERSION)
+        ),
+    )
+
+
+def get_furigana_annotator() -> FuriganaAnnotator:
+    """Furigana over the shared tokenizer, its cache keyed to the served content."""
+    from opengov_earlyjapanese.config import settings
+
+    return _shared(
+        "furigana",
+        lambda: FuriganaAnnotator(
+            get_tokenizer(), settings.furigana_cache_size, salt=content_hash()
+        ),
+    )
+
+
+def get_sentence_index() -> Optional[SentenceIndex]:
+    """The configured example-sentence index, mapped once; None when there is none."""
+    from opengov_earlyjapanese.config import settings
+
+    def factory() -> Optional[SentenceIndex]:
+        path = settings.sentence_index
+        return SentenceIndex.open(path) if path is not None else None
+
+    return _shared("sentences", factory)
+
+
+def get_concordance() -> Optional[Concordance]:
+    """The configured suffix-array concordance, mapped once; None when there is none."""
+    from opengov_earlyjapanese.config import settings
+
+    def factory() -> Optional[Concordance]:
+        path = settings.concordance_index
+        return Concordance.open(path) if path is not None else None
+
+    return _shared("concordance", factory)
+
+
+def preload() -> None:
+    """Build every shared instance and load the indexes up front."""
+    from opengov_earlyjapanese.core import search
+
+    get_hiragana_teacher()
+    get_katakana_teacher()
+    get_kanji_master()
+    get_grammar_teacher()
+    get_vocabulary_bank()
+    get_autocompleter()
+    get_tokenizer()
+    get_sentence_index()
+    get_concordance()
+    search.get_index()
+
+
+def reload() -> None:
+    """Drop shared instances; the next caller for each rebuilds it once.
+
+    A configured content pack is reopened, so a rebuilt pack is picked up.
+    """
+    pack = _instances.get("pack")
+    _instances.clear()
+    if pack is not None:
+        pack.close()
@@ -0,0 +1,110 @@
+"""Substring search over kana characters, romaji and mnemonics.
+
+Queries of two or more characters are narrowed with a bigram index over
+each character's glyph, romaji and mnemonic before the exact check, so a
+query only touches characters containing all of its bigrams. The index is
+loaded through the registry's index cache.
+"""
+
+from collections.abc import Iterable, Iterator
+from typing import Any, Dict, List, Optional, Set
+
+from opengov_earlyjapanese.core import registry
+from opengov_earlyjapanese.core.models import Character
+from opengov_earlyjapanese.utils.index_cache import flatten_postings
+
+KINDS = ("all", "hiragana", "katakana")
+INDEX_VERSION = 1
+_SEPARATOR = "\0"
+
+
+def matches(ch: Character, query: str) -> bool:
+    query_lower = query.lower()
+    romaji = (ch.romaji or "").lower()
+    mnemonic = (ch.mnemonic or "").lower()
+    return (
+        query in ch.character or query_lower in romaji or bool(mnemonic and query_lower in mnemonic)
+    )
+
+
+def _haystack(ch: Character) -> str:
+    return _SEPARATOR.join((ch.character, (ch.romaji or "").lower(), (ch.mnemonic or "").lower()))
+
+
+def _bigrams(text: str) -> Iterator[str]:
+    for i in range(len(text) - 1):
+        gram = text[i : i + 2]
+        if _SEPARATOR not in gram:
+            yield gram
+
+
+def _teacher(kind: str) -> Any:
+    if kind == "hiragana":
+        return registry.get_hiragana_teacher()
+    return registry.get_katakana_teacher()
+
+
+def build_index() -> Dict[str, Any]:
+    """Bigram posting lists over every kana character, hiragana first."""
+    entries: List[List[str]] = []
+    postings: Dict[str, List[int]] = {}
+    for kind in ("hiragana", "katakana"):
+        for key, ch in _teacher(kind).characters.items():
+            for gram in set(_bigrams(_haystack(ch))):
+                postings.setdefault(gram, []).append(len(entries))
+            entries.append([kind, key])
+    grams, flat = flatten_postings(postings)
+    return {"entries": entries, "grams": grams, "postings": flat}
+
+
+def get_index() -> Dict[str, Any]:
+    return registry.load_index("search", build_index, INDEX_VERSION)
+
+
+def _candidates(kind: str, query: str) -> Optional[Iterable[Character]]:
+    """Characters of ``kind`` that contain every bigram of ``query``; None to scan all."""
+    grams = set(_bigrams(query.lower()))
+    if not grams:
+        return None
+    index = get_index()
+    ids: Optional[Set[int]] = None
+    for gram in grams:
+        span = index["grams"].get(gram)
+        if span is None:
+            return []
+        start, count = span
+        found = set(index["postings"][start : start + count])
+        ids = found if ids is None else ids & found
+    teacher = _teacher(kind)
+    entries = index["entries"]
+    return [teacher.characters[entries[i][1]] for i in sorted(ids or ()) if entries[i][0] == kind]
+
+
+def _results(
+    kind: str, chars: Iterable[Character], query: str
+) -> Iterator[Dict[str, Optional[str]]]:
+    candidates = _candidates(kind, query)
+    for ch in chars if candidates is None else candidates:
+        if matches(ch, query):
+            yield {
+                "type": kind,
+                "row": ch.row,
+                "character": ch.character,
+                "romaji": ch.romaji,
+                "mnemonic": ch.mnemonic,
+            }
+
+
+def iter_search(query: str, kind: str = "all") -> Iterator[Dict[str, Optional[str]]]:
+    """Lazily yield matches, hiragana first; see :func:`search_characters`."""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind: {kind}")
+    if kind in {"all", "hiragana"}:
+        yield from _results("hiragana", registry.get_hiragana_teacher().characters.values(), query)
+    if kind in {"all", "katakana"}:
+        yield from _results("katakana", registry.get_katakana_teacher().characters.values(), query)
+
+
+def search_characters(query: str, kind: str = "all") -> List[Dict[str, Optional[str]]]:
+    """Hiragana then katakana characters whose glyph, romaji or mnemonic contain ``query``."""
+    return list(iter_search(query, kind))
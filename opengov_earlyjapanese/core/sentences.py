@@ -0,0 +1,445 @@
+"""Example sentences from bilingual corpora, indexed by kanji and word.
+
+:func:`import_corpus` streams sentence-pair TSV files (Tatoeba exports and
+the like, millions of lines) through worker processes: each line's
+Japanese and English columns are normalised, filtered by length,
+deduplicated, and graded with the JLPT tables of ``core.difficulty``. A
+sentence's level is the hardest of its kanji (unlisted kanji make it
+``unlisted``) and of the vocabulary words it uses.
+
+The result is a single index file (see ``utils.index_cache``) holding the
+sentence texts and posting lists from every kanji and vocabulary word to
+the sentences containing it. Sentence ids are assigned easiest level
+first, so "at most N4" is a prefix of every posting list, and
+:meth:`SentenceIndex.find` answers "sentences at most N4 containing 愛
+and 心" by intersecting sorted lists from the shortest one, never by
+scanning sentences.
+"""
+
+import hashlib
+import mmap
+import os
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    overload,
+)
+
+from opengov_earlyjapanese.core.difficulty import (
+    BUCKETS,
+    LevelTables,
+    chunk_ranges,
+    level_tables,
+    ordered_results,
+    process_pool,
+)
+from opengov_earlyjapanese.core.tokenizer import BaseTokenizer, char_class
+from opengov_earlyjapanese.utils.index_cache import (
+    Sections,
+    flatten_postings,
+    read_index,
+    write_index,
+)
+from opengov_earlyjapanese.utils.tracing import traced
+
+if TYPE_CHECKING:
+    from opengov_earlyjapanese.core.kanji import KanjiAnalysis
+    from opengov_earlyjapanese.core.models import Vocabulary
+
+CHUNK_SIZE = 4 * 2**20  # bytes of TSV per worker task
+EXAMPLES = 5
+
+_UNLISTED = len(BUCKETS) - 1
+_LEVEL_BITS = 3  # build-time posting: local id << _LEVEL_BITS | level
+
+
+class ImportOptions(NamedTuple):
+    """Which columns hold the Japanese and English text, and what to keep."""
+
+    japanese: int = 0
+    english: int = 1
+    min_chars: int = 4
+    max_chars: int = 80
+    max_level: str = "unlisted"
+
+
+# A graded sentence: Japanese, English, level bucket, distinct kanji, distinct words
+Graded = Tuple[str, str, int, Tuple[str, ...], Tuple[str, ...]]
+
+
+def level_index(level: str) -> int:
+    """The :data:`~opengov_earlyjapanese.core.difficulty.BUCKETS` index of ``level``."""
+    name = level.upper() if level.lower() != "unlisted" else "unlisted"
+    if name not in BUCKETS:
+        raise ValueError(f"Unknown level: {level} (expected one of {', '.join(BUCKETS)})")
+    return BUCKETS.index(name)
+
+
+def normalize(text: str) -> str:
+    """NFC, with runs of whitespace collapsed to one space."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class SentenceGrader:
+    """Level, kanji and vocabulary words of a sentence."""
+
+    def __init__(self, tables: LevelTables, tokenizer: Optional[BaseTokenizer] = None) -> None:
+        self.tables = tables
+        self.tokenizer = tokenizer
+
+    def grade(self, sentence: str) -> Tuple[int, Tuple[str, ...], Tuple[str, ...]]:
+        kanji_levels = self.tables.kanji
+        kanji = tuple(dict.fromkeys(ch for ch in sentence if char_class(ch) == "kanji"))
+        level = max((kanji_levels.get(ch, _UNLISTED) for ch in kanji), default=0)
+        words: Dict[str, None] = {}
+        if self.tokenizer is not None:
+            levels = self.tables.words
+            for token in self.tokenizer.tokenize(sentence):
+                word = token.base if token.base in levels else token.surface
+                if word in levels:
+                    words[word] = None
+                    level = max(level, levels[word])
+        return level, kanji, tuple(words)
+
+    def parse(self, text: str, options: ImportOptions) -> Tuple[Dict[str, int], List[Graded]]:
+        """Counts of rejected lines by reason, and the kept sentences of TSV ``text``."""
+        rejected = {"malformed": 0, "length": 0, "level": 0, "duplicate": 0}
+        max_level = level_index(options.max_level)
+        width = max(options.japanese, options.english) + 1
+        seen = set()
+        kept: List[Graded] = []
+        for line in text.split("\n"):
+            if not line or line.isspace():
+                continue
+            fields = line.rstrip("\r").split("\t")
+            if len(fields) < width:
+                rejected["malformed"] += 1
+                continue
+            japanese = normalize(fields[options.japanese])
+            if not options.min_chars <= len(japanese) <= options.max_chars:
+                rejected["length"] += 1
+                continue
+            if japanese in seen:
+                rejected["duplicate"] += 1
+                continue
+            seen.add(japanese)
+            level, kanji, words = self.grade(japanese)
+            if level > max_level:
+                rejected["level"] += 1
+                continue
+            kept.append((japanese, normalize(fields[options.english]), level, kanji, words))
+        return rejected, kept
+
+
+class SentenceIndexBuilder:
+    """Accumulates graded sentences, deduplicated by content hash, into index sections."""
+
+    def __init__(self) -> None:
+        levels = len(BUCKETS)
+        self._japanese = [bytearray() for _ in range(levels)]
+        self._english = [bytearray() for _ in range(levels)]
+        self._japanese_ends: List[array[int]] = [array("Q") for _ in range(levels)]
+        self._english_ends: List[array[int]] = [array("Q") for _ in range(levels)]
+        self._kanji: Dict[str, array[int]] = {}
+        self._words: Dict[str, array[int]] = {}
+        self._seen: Set[bytes] = set()
+        self.duplicates = 0
+
+    def __len__(self) -> int:
+        return sum(len(ends) for ends in self._japanese_ends)
+
+    def add(self, sentence: Graded) -> bool:
+        """Add one sentence; False if the same Japanese text was added before."""
+        japanese, english, level, kanji, words = sentence
+        digest = hashlib.blake2b(japanese.encode(), digest_size=12).digest()
+        if digest in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen.add(digest)
+        local = len(self._japanese_ends[level])
+        self._japanese[level] += japanese.encode()
+        self._japanese_ends[level].append(len(self._japanese[level]))
+        self._english[level] += english.encode()
+        self._english_ends[level].append(len(self._english[level]))
+        posting = local << _LEVEL_BITS | level
+        for ch in kanji:
+            self._kanji.setdefault(ch, array("Q")).append(posting)
+        for word in words:
+            self._words.setdefault(word, array("Q")).append(posting)
+        return True
+
+    def sections(self, meta: Optional[Dict[str, Any]] = None) -> Sections:
+        """The index, sentences renumbered easiest level first; empties the posting lists."""
+        starts = [0]
+        for ends in self._japanese_ends:
+            starts.append(starts[-1] + len(ends))
+        mask = (1 << _LEVEL_BITS) - 1
+
+        def renumber(postings: Dict[str, "array[int]"]) -> Dict[str, Any]:
+            out = {}
+            for key in list(postings):
+                found = postings.pop(key)
+                out[key] = array("I", sorted(starts[p & mask] + (p >> _LEVEL_BITS) for p in found))
+            return out
+
+        kanji, kanji_postings = flatten_postings(renumber(self._kanji))
+        words, word_postings = flatten_postings(renumber(self._words))
+        levels = array("B")
+        for level, ends in enumerate(self._japanese_ends):
+            levels.extend([level] * len(ends))
+        return {
+            "meta": {**(meta or {}), "sentences": len(self)},
+            "level_starts": starts,
+            "levels": levels,
+            "japanese": array("B", b"".join(self._japanese)),
+            "japanese_offsets": _offsets(self._japanese_ends),
+            "english": array("B", b"".join(self._english)),
+            "english_offsets": _offsets(self._english_ends),
+            "kanji": kanji,
+            "kanji_postings": kanji_postings,
+            "words": words,
+            "word_postings": word_postings,
+        }
+
+
+def _offsets(ends_per_level: Sequence["array[int]"]) -> "array[int]":
+    offsets = array("Q", [0])
+    for ends in ends_per_level:
+        base = offsets[-1]
+        offsets.extend(base + end for end in ends)
+    return offsets
+
+
+def _intersect(lists: List[Sequence[int]], lo: int, hi: int, limit: int) -> List[int]:
+    """Up to ``limit`` ids in ``[lo, hi)`` present in every sorted list, ascending.
+
+    A leapfrog join: each list in turn jumps (by binary search) to the
+    current candidate, and any larger id it lands on becomes the next
+    candidate, so runs of ids missing from some list are skipped whole.
+    """
+    found: List[int] = []
+    cursors = [0] * len(lists)
+    candidate, agreed, i = lo, 0, 0
+    while candidate < hi:
+        ids = lists[i]
+        k = cursors[i] = bisect_left(ids, candidate, cursors[i])
+        if k == len(ids):
+            break
+        if ids[k] != candidate:
+            candidate, agreed = ids[k], 0
+            if candidate >= hi:
+                break
+        agreed += 1  # this list has the candidate, whether it matched or proposed it
+        if agreed == len(lists):
+            found.append(candidate)
+            if len(found) == limit:
+                break
+            candidate, agreed = candidate + 1, 0
+        i = (i + 1) % len(lists)
+    return found
+
+
+class SentenceIndex:
+    """Example sentences and their posting lists, over sections from the builder."""
+
+    def __init__(self, sections: Sections) -> None:
+        self.meta: Dict[str, Any] = sections["meta"]
+        self._level_starts: List[int] = sections["level_starts"]
+        self._levels = sections["levels"]
+        self._japanese = sections["japanese"]
+        self._japanese_offsets = sections["japanese_offsets"]
+        self._english = sections["english"]
+        self._english_offsets = sections["english_offsets"]
+        self._kanji: Dict[str, List[int]] = sections["kanji"]
+        self._kanji_postings = sections["kanji_postings"]
+        self._words: Dict[str, List[int]] = sections["words"]
+        self._word_postings = sections["word_postings"]
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "SentenceIndex":
+        """Map an index file written by :func:`import_corpus`."""
+        return cls(read_index(path))
+
+    def __len__(self) -> int:
+        return len(self._levels)
+
+    def level_counts(self) -> Dict[str, int]:
+        starts = self._level_starts
+        return {name: starts[i + 1] - starts[i] for i, name in enumerate(BUCKETS)}
+
+    def sentence(self, sentence_id: int) -> Dict[str, str]:
+        """``{japanese, english, level}``, the shape of ``example_sentences`` entries."""
+        ja, en = self._japanese_offsets, self._english_offsets
+        return {
+            "japanese": bytes(self._japanese[ja[sentence_id] : ja[sentence_id + 1]]).decode(),
+            "english": bytes(self._english[en[sentence_id] : en[sentence_id + 1]]).decode(),
+            "level": BUCKETS[self._levels[sentence_id]],
+        }
+
+    def postings(self, term: str) -> Sequence[int]:
+        """Ids of sentences containing ``term``: a kanji, or else a vocabulary word."""
+        if len(term) == 1 and char_class(term) == "kanji":
+            spans, flat = self._kanji, self._kanji_postings
+        else:
+            spans, flat = self._words, self._word_postings
+        span = spans.get(term)
+        if span is None:
+            return ()
+        start, count = span
+        ids: Sequence[int] = flat[start : start + count]
+        return ids
+
+    @traced("sentences.find")
+    def find(
+        self,
+        terms: Iterable[str],
+        max_level: Optional[str] = None,
+        min_level: Optional[str] = None,
+        limit: int = EXAMPLES,
+    ) -> List[Dict[str, str]]:
+        """Up to ``limit`` sentences containing every term, within the levels, easiest first."""
+        lo = self._level_starts[level_index(min_level)] if min_level else 0
+        hi = self._level_starts[level_index(max_level) + 1] if max_level else len(self)
+        lists = [self.postings(term) for term in dict.fromkeys(terms)]
+        if not lists:
+            ids: Iterable[int] = range(lo, min(hi, lo + limit))
+        else:
+            ids = _intersect(lists, lo, hi, limit)
+        return [self.sentence(i) for i in ids]
+
+
+# The grader of this worker process, set up by _init_worker
+_grader: Optional[SentenceGrader] = None
+
+
+def _make_grader(tables: LevelTables, backend: Optional[str], words: bool) -> SentenceGrader:
+    tokenizer = None
+    if words:
+        from opengov_earlyjapanese.config import settings
+        from opengov_earlyjapanese.core import registry
+
+        if backend is not None:
+            settings.tokenizer_backend = backend
+        tokenizer = registry.get_tokenizer()
+    return SentenceGrader(tables, tokenizer)
+
+
+def _init_worker(tables: LevelTables, backend: Optional[str], words: bool) -> None:
+    global _grader
+    _grader = _make_grader(tables, backend, words)
+
+
+def _parse_range(
+    path: str, start: int, end: int, options: ImportOptions
+) -> Tuple[Dict[str, int], List[Graded]]:
+    assert _grader is not None
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[start:end].decode("utf-8", errors="replace")
+    return _grader.parse(text, options)
+
+
+def import_corpus(
+    paths: Iterable[Union[str, Path]],
+    output: Union[str, Path],
+    options: ImportOptions = ImportOptions(),
+    workers: int = 0,
+    chunk_size: int = CHUNK_SIZE,
+    words: bool = True,
+    tables: Optional[LevelTables] = None,
+) -> Dict[str, Any]:
+    """Build the sentence index of ``paths`` into ``output``; returns its metadata.
+
+    Files are read in chunks by ``workers`` processes (0: one per core;
+    with one, everything runs here), and only graded, kept sentences
+    come back to be deduplicated across chunks. ``words=False`` indexes
+    kanji only and skips tokenization, which is most of the cost.
+    """
+    global _grader
+    from opengov_earlyjapanese.config import settings
+
+    level_index(options.max_level)
+    sources = [str(p) for p in paths]
+    if tables is None:
+        tables = level_tables()
+    tasks = [
+        (path, start, end, options)
+        for path in sources
+        for start, end in chunk_ranges(path, "line", chunk_size)
+    ]
+    workers = min(workers or os.cpu_count() or 1, max(1, len(tasks)))
+    builder = SentenceIndexBuilder()
+    rejected = {"malformed": 0, "length": 0, "level": 0, "duplicate": 0}
+
+    def consume(results: Iterator[Tuple[Dict[str, int], List[Graded]]]) -> None:
+        for counts, kept in results:
+            for reason, n in counts.items():
+                rejected[reason] += n
+            for sentence in kept:
+                builder.add(sentence)
+
+    if workers == 1:
+        _grader = _make_grader(tables, None, words)
+        consume(_parse_range(*task) for task in tasks)
+    else:
+        initargs = (tables, settings.tokenizer_backend, words)
+        with process_pool(workers, _init_worker, initargs) as pool:
+            consume(ordered_results(pool, _parse_range, tasks, 2 * workers))
+    rejected["duplicate"] += builder.duplicates
+    meta = {"sources": sources, "options": options._asdict(), "rejected": rejected}
+    sections = builder.sections(meta)
+    write_index(output, "sentences", sections)
+    return sections["meta"]  # type: ignore[no-any-return]
+
+
+def examples(
+    term: str, max_level: Optional[str] = None, limit: Optional[int] = None
+) -> List[Dict[str, str]]:
+    """Sentences containing ``term`` from the configured index; none when there is none."""
+    from opengov_earlyjapanese.config import settings
+    from opengov_earlyjapanese.core import registry
+
+    index = registry.get_sentence_index()
+    if index is None:
+        return []
+    limit = settings.example_sentences_limit if limit is None else limit
+    return index.find([term], max_level=max_level, limit=limit)
+
+
+@overload
+def with_examples(entry: "Vocabulary") -> "Vocabulary":
+    ...
+
+
+@overload
+def with_examples(entry: "KanjiAnalysis") -> "KanjiAnalysis":
+    ...
+
+
+def with_examples(entry: Any) -> Any:
+    """A vocabulary entry or kanji analysis with example sentences attached.
+
+    ``entry`` is a :class:`~opengov_earlyjapanese.core.models.Vocabulary`
+    or a :class:`~opengov_earlyjapanese.core.kanji.KanjiAnalysis`. Entries
+    that already have examples, or have none in the index, are returned as
+    they are; examples are no harder than the entry's level, when it has one.
+    """
+    if entry.example_sentences:
+        return entry
+    if hasattr(entry, "word"):
+        found = examples(entry.word, max_level=entry.jlpt_level.value)
+    else:
+        level = entry.jlpt.upper() if entry.jlpt and entry.jlpt.upper() in BUCKETS else None
+        found = examples(entry.character, max_level=level)
+    return entry.model_copy(update={"example_sentences": found}) if found else entry
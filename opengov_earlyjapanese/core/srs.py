@@ -1,10 +1,12 @@
 """Simple spaced repetition system implementation."""
 
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Literal
+from typing import List, Literal, Optional
 
 from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.utils.tracing import traced
 
 
 Rating = Literal["again", "hard", "good", "easy"]
@@ -19,7 +21,8 @@ class SRSState:
 
 
 class SpacedRepetitionSystem:
-    def schedule(self, state: SRSState, rating: Rating) -> SRSState:
+    @traced("srs.schedule", record=("rating",))
+    def schedule(self, state: SRSState, rating: Rating, now: Optional[datetime] = None) -> SRSState:
         ef = state.ease_factor
         reps = state.repetitions
         interval = state.interval
@@ -40,6 +43,15 @@ class SpacedRepetitionSystem:
             interval = max(1, int(interval * settings.srs_easy_multiplier))
             reps += 1
 
-        next_review = datetime.utcnow() + timedelta(days=interval)
+        next_review = (now or datetime.utcnow()) + timedelta(days=interval)
         return SRSState(interval=interval, ease_factor=ef, repetitions=reps, next_review=next_review)
 
+    @traced("srs.schedule_many")
+    def schedule_many(
+        self, states: Sequence[SRSState], ratings: Sequence[Rating]
+    ) -> List[SRSState]:
+        """Schedule a batch of reviews, all relative to the same moment."""
+        if len(states) != len(ratings):
+            raise ValueError("states and ratings must have the same length")
+        now = datetime.utcnow()
+        return [self.schedule(s, r, now) for s, r in zip(states, ratings)]
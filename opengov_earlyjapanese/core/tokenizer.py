@@ -0,0 +1,722 @@
+"""Morphological tokenizer: dictionary lookup plus Viterbi over a word lattice.
+
+:class:`DictionaryTokenizer` needs nothing outside this package. Its
+lexicon is the served vocabulary (written forms, kana spellings and the
+inflection stems of verbs and i-adjectives), one entry per kanji, and a
+built-in table of particles, auxiliaries and endings. All surfaces live in
+a double-array trie (see ``utils.datrie``), so building the lattice is one
+trie walk per character; unknown words are proposed per character class as
+MeCab does. The cheapest path through the lattice, with word costs from
+frequency rank and connection costs that make a stem expect its ending,
+is the segmentation.
+
+:class:`SudachiTokenizer` and :class:`MecabTokenizer` wrap SudachiPy and
+MeCab (through fugashi) when they are installed, and
+:func:`create_tokenizer` picks one per ``settings.tokenizer_backend``.
+Every backend splits text into sentences and memoises each sentence's
+tokens, so repeated lines are segmented once.
+"""
+
+import re
+import unicodedata
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from opengov_earlyjapanese.core.kana import to_hiragana
+from opengov_earlyjapanese.utils.cache import LRUCache
+from opengov_earlyjapanese.utils.datrie import DoubleArrayTrie
+from opengov_earlyjapanese.utils.datrie import build as build_trie
+from opengov_earlyjapanese.utils.index_cache import Sections
+from opengov_earlyjapanese.utils.logger import get_logger
+from opengov_earlyjapanese.utils.tracing import traced
+
+logger = get_logger(__name__)
+
+INDEX_VERSION = 1
+BACKENDS = ("auto", "builtin", "sudachi", "mecab")
+
+
+class Token(NamedTuple):
+    """One morpheme; ``start``/``end`` index the tokenized text, ``reading`` is hiragana."""
+
+    surface: str
+    reading: str
+    pos: str
+    base: str
+    start: int
+    end: int
+    known: bool = True
+
+
+POS = (
+    "bos",
+    "noun",
+    "pronoun",
+    "verb",
+    "verb-stem",
+    "i-adjective",
+    "adjective-stem",
+    "na-adjective",
+    "adnominal",
+    "adverb",
+    "particle",
+    "auxiliary",
+    "inflection",
+    "conjunction",
+    "interjection",
+    "prefix",
+    "suffix",
+    "number",
+    "symbol",
+)
+_POS_ID = {name: i for i, name in enumerate(POS)}
+_BOS = _POS_ID["bos"]
+_STEMS = frozenset(_POS_ID[p] for p in ("verb-stem", "adjective-stem"))
+_INFLECTION = _POS_ID["inflection"]
+
+# Costs are in arbitrary units; only their differences matter
+_STEM_PENALTY = 3000  # a stem without its ending, or an ending without a stem
+_BOS_PENALTY = 1500  # a sentence starting with a particle or auxiliary
+_READING_PENALTY = 1500  # a word written in kana rather than its usual spelling
+_KANJI_COST = 6500  # a single kanji read with its first reading
+_UNKNOWN_KANJI_COST = (7000, 1500)  # base, per extra character
+_UNKNOWN_HIRAGANA_COST = 9000
+_UNKNOWN_RUN_COST = {"katakana": 5000, "latin": 3000, "digit": 2000, "symbol": 1000}
+_MAX_UNKNOWN_KANJI = 3
+
+# Word, reading, part of speech, cost. Verbs here also get their stems.
+FUNCTION_WORDS: List[Tuple[str, str, str, int]] = [
+    *[
+        (p, p, "particle", 800)
+        for p in (
+            "が",
+            "を",
+            "に",
+            "で",
+            "と",
+            "も",
+            "の",
+            "や",
+            "か",
+            "ね",
+            "よ",
+            "な",
+            "から",
+            "まで",
+            "より",
+            "だけ",
+            "しか",
+            "ばかり",
+            "など",
+            "って",
+            "けど",
+            "でも",
+            "ので",
+            "のに",
+            "ながら",
+            "には",
+            "では",
+            "とは",
+        )
+    ],
+    ("は", "わ", "particle", 800),
+    ("へ", "え", "particle", 800),
+    *[
+        (a, a, "auxiliary", 1000)
+        for a in (
+            "です",
+            "でした",
+            "でしょう",
+            "だ",
+            "だった",
+            "だろう",
+            "じゃ",
+            "ない",
+            "ではない",
+            "じゃない",
+            "ではありません",
+            "じゃありません",
+        )
+    ],
+    *[
+        (e, e, "inflection", 400)
+        for e in (
+            # verb endings, after a stem
+            "ます",
+            "ました",
+            "ません",
+            "ませんでした",
+            "ましょう",
+            "ない",
+            "なかった",
+            "なくて",
+            "なければ",
+            "た",
+            "て",
+            "だ",
+            "で",
+            "たい",
+            "たかった",
+            "たくない",
+            "ば",
+            "られる",
+            "れる",
+            "させる",
+            "せる",
+            "ろ",
+            # i-adjective endings, after a stem
+            "い",
+            "かった",
+            "くない",
+            "くなかった",
+            "く",
+            "くて",
+            "ければ",
+            "さ",
+        )
+    ],
+    *[
+        (w, r, "pronoun", 1500)
+        for w, r in (
+            ("私", "わたし"),
+            ("僕", "ぼく"),
+            ("彼", "かれ"),
+            ("彼女", "かのじょ"),
+            ("あなた", "あなた"),
+            ("これ", "これ"),
+            ("それ", "それ"),
+            ("あれ", "あれ"),
+            ("どれ", "どれ"),
+            ("ここ", "ここ"),
+            ("そこ", "そこ"),
+            ("あそこ", "あそこ"),
+            ("どこ", "どこ"),
+            ("誰", "だれ"),
+            ("何", "なに"),
+        )
+    ],
+    *[(w, w, "adnominal", 1200) for w in ("この", "その", "あの", "どの")],
+    *[(w, w, "conjunction", 1500) for w in ("そして", "でも", "しかし", "だから")],
+    *[
+        (w, r, "verb", 1500)
+        for w, r in (
+            ("する", "する"),
+            ("くる", "くる"),
+            ("来る", "くる"),
+            ("いる", "いる"),
+            ("ある", "ある"),
+            ("なる", "なる"),
+            ("行く", "いく"),
+        )
+    ],
+    *[(s, s, "symbol", 500) for s in "。、！？!?,.「」『』（）()・…ー～"],
+]
+
+# Irregular stems: surface, reading, base
+_IRREGULAR_STEMS: List[Tuple[str, str, str]] = [
+    ("し", "し", "する"),
+    ("さ", "さ", "する"),
+    ("せ", "せ", "する"),
+    ("き", "き", "くる"),
+    ("こ", "こ", "くる"),
+    ("来", "き", "来る"),
+    ("来", "こ", "来る"),
+]
+
+_E_ROW = frozenset("えけげせぜてでねへべぺめれ")
+_I_ROW = frozenset("いきぎしじちぢにひびぴみり")
+# Godan dictionary ending -> (a-row, i-row, e-row, te/ta stem ending)
+_GODAN = {
+    "う": ("わ", "い", "え", "っ"),
+    "く": ("か", "き", "け", "い"),
+    "ぐ": ("が", "ぎ", "げ", "い"),
+    "す": ("さ", "し", "せ", "し"),
+    "つ": ("た", "ち", "て", "っ"),
+    "ぬ": ("な", "に", "ね", "ん"),
+    "ぶ": ("ば", "び", "べ", "ん"),
+    "む": ("ま", "み", "め", "ん"),
+    "る": ("ら", "り", "れ", "っ"),
+}
+
+# Entry: surface, reading, part of speech, dictionary form, cost
+Entry = Tuple[str, str, str, str, int]
+
+
+def pos_class(part_of_speech: str) -> str:
+    """The :data:`POS` class for a content part of speech such as ``"godan verb"``."""
+    name = part_of_speech.strip().lower()
+    if name in _POS_ID:
+        return name
+    if "adverb" in name:
+        return "adverb"
+    if "verb" in name:
+        return "verb"
+    if "adjective" in name:
+        return "na-adjective" if "na" in re.split(r"[\s\-()]+", name) else "i-adjective"
+    return "noun"
+
+
+def _rank_cost(rank: Optional[int]) -> int:
+    return 2000 + (1500 if rank is None else min(rank, 30000) // 20)
+
+
+def _is_ichidan(word: str, reading: str, part_of_speech: str) -> bool:
+    if "ichidan" in part_of_speech:
+        return True
+    if "godan" in part_of_speech:
+        return False
+    return (
+        word.endswith("る") and len(reading) > 1 and (reading[-2] in _E_ROW or reading[-2] in _I_ROW)
+    )
+
+
+def _stems(word: str, reading: str, part_of_speech: str) -> Iterator[Tuple[str, str, str]]:
+    """``(surface, reading, pos)`` stems that inflection endings attach to."""
+    if not word or word[-1] != reading[-1:]:
+        return  # the last character must be kana okurigana shared by both spellings
+    pos = pos_class(part_of_speech)
+    if pos == "i-adjective" and word.endswith("い") and len(word) > 1:
+        yield word[:-1], reading[:-1], "adjective-stem"
+    elif pos == "verb":
+        if word in ("する", "くる", "来る"):
+            return  # irregular, see _IRREGULAR_STEMS
+        if _is_ichidan(word, reading, part_of_speech.lower()):
+            if len(word) > 1:
+                yield word[:-1], reading[:-1], "verb-stem"
+            return
+        forms = _GODAN.get(word[-1])
+        if forms is None:
+            return
+        te = "っ" if word.endswith("行く") or word == "いく" else forms[3]
+        for ending in dict.fromkeys((forms[0], forms[1], forms[2], te)):
+            yield word[:-1] + ending, reading[:-1] + ending, "verb-stem"
+
+
+def _word_entries(word: str, reading: str, part_of_speech: str, cost: int) -> Iterator[Entry]:
+    pos = pos_class(part_of_speech)
+    spellings = [(word, cost)]
+    if reading and reading != word:
+        spellings.append((reading, cost + _READING_PENALTY))
+    for surface, c in spellings:
+        yield surface, reading, pos, word, c
+        for stem, stem_reading, stem_pos in _stems(surface, reading, part_of_speech):
+            yield stem, stem_reading, stem_pos, word, c
+
+
+def function_entries() -> Iterator[Entry]:
+    """The built-in particles, auxiliaries, endings and common words."""
+    for word, reading, pos, cost in FUNCTION_WORDS:
+        yield from _word_entries(word, reading, pos, cost)
+    for surface, reading, base in _IRREGULAR_STEMS:
+        yield surface, reading, "verb-stem", base, 1500
+
+
+def vocabulary_entries(entries: Iterable[Any]) -> Iterator[Entry]:
+    """Entries for :class:`~opengov_earlyjapanese.core.models.Vocabulary`."""
+    for e in entries:
+        reading = to_hiragana(e.reading)
+        yield from _word_entries(e.word, reading, e.part_of_speech, _rank_cost(e.frequency_rank))
+
+
+def kanji_entries(analyses: Iterable[Any]) -> Iterator[Entry]:
+    """A single-kanji entry, read with its first reading, per analysed kanji."""
+    for a in analyses:
+        readings = [r for r in [*a.on_reading, *a.kun_reading] if r]
+        if readings:
+            reading = to_hiragana(re.sub(r"\..*|[()\-・]", "", readings[0]))
+            yield a.character, reading, "noun", a.character, _KANJI_COST
+
+
+def build_sections(entries: Iterable[Entry]) -> Sections:
+    """Lexicon sections: the surface trie, then each surface's entries in a row.
+
+    Of the entries sharing a surface and part of speech only the cheapest
+    is kept: the lattice would never choose another, and homographs
+    otherwise multiply the candidates at every position.
+    """
+    best: Dict[Tuple[str, str], Tuple[int, str, str]] = {}
+    for surface, reading, pos, base, cost in entries:
+        surface = unicodedata.normalize("NFC", surface)
+        key = (surface, pos)
+        if surface and (key not in best or (cost, reading, base) < best[key]):
+            best[key] = (cost, reading, base)
+    rows = sorted(
+        (surface, cost, pos, reading, base)
+        for (surface, pos), (cost, reading, base) in best.items()
+    )
+
+    surfaces: List[str] = []
+    entry_starts = array("I")
+    entry_pos = array("B")
+    entry_cost = array("i")
+    readings: List[str] = []
+    bases: List[str] = []
+    for surface, cost, pos, reading, base in rows:
+        if not surfaces or surfaces[-1] != surface:
+            surfaces.append(surface)
+            entry_starts.append(len(readings))
+        entry_pos.append(_POS_ID[pos])
+        entry_cost.append(cost)
+        readings.append(reading)
+        bases.append(base)
+    entry_starts.append(len(readings))
+    return {
+        **build_trie(surfaces),
+        "entry_starts": entry_starts,
+        "entry_pos": entry_pos,
+        "entry_cost": entry_cost,
+        "entry_reading": readings,
+        "entry_base": bases,
+    }
+
+
+def content_entries() -> Iterator[Entry]:
+    """Entries for the content being served (see ``core.registry``)."""
+    from opengov_earlyjapanese.core import registry
+
+    yield from function_entries()
+    yield from vocabulary_entries(registry.get_vocabulary_bank().iter_find())
+    kanji = registry.get_kanji_master()
+    yield from kanji_entries(kanji.analyze(ch) for ch in kanji.known_characters())
+
+
+def _connection_costs() -> List[List[int]]:
+    """``costs[left][right]`` for adjacent parts of speech; the extra last column is EOS."""
+    n = len(POS)
+    costs = [[0] * (n + 1) for _ in range(n)]
+    for left in range(n):
+        for right in range(n + 1):
+            if left in _STEMS and right != _INFLECTION:
+                costs[left][right] += _STEM_PENALTY
+            if right == _INFLECTION and left not in _STEMS:
+                costs[left][right] += _STEM_PENALTY
+    for name in ("particle", "auxiliary"):
+        costs[_BOS][_POS_ID[name]] += _BOS_PENALTY
+    return costs
+
+
+_CONNECT = _connection_costs()
+_EOS = len(POS)
+
+
+def char_class(ch: str) -> str:
+    """``kanji``, ``hiragana``, ``katakana``, ``latin``, ``digit``, ``space`` or ``symbol``."""
+    code = ord(ch)
+    if 0x4E00 <= code <= 0x9FFF or 0x3400 <= code <= 0x4DBF or ch in "々〆ヶ":
+        return "kanji"
+    if 0xF900 <= code <= 0xFAFF or 0x20000 <= code <= 0x3FFFF:
+        return "kanji"  # compatibility ideographs, extensions B and later
+    if 0x3041 <= code <= 0x309F:
+        return "hiragana"
+    if 0x30A0 <= code <= 0x30FF or 0xFF66 <= code <= 0xFF9F:
+        return "katakana"
+    if ch.isspace():
+        return "space"
+    if ch.isdigit():
+        return "digit"
+    if ch.isalpha():
+        return "latin"
+    return "symbol"
+
+
+_UNKNOWN_POS = {"katakana": "noun", "latin": "noun", "digit": "number", "symbol": "symbol"}
+_SENTENCE = re.compile(r"[^。！？!?\n]+[。！？!?\n]*|[。！？!?\n]+")
+
+
+def split_sentences(text: str) -> Iterator[Tuple[int, str]]:
+    """``(offset, sentence)`` pieces that together are exactly ``text``."""
+    for m in _SENTENCE.finditer(text):
+        yield m.start(), m.group()
+
+
+class BaseTokenizer:
+    """Sentence splitting, memoisation and batching shared by every backend.
+
+    Subclasses implement :meth:`_segment` for one sentence; tokens are
+    cached per sentence text, so offsets there are sentence-relative.
+    """
+
+    name = "base"
+
+    def __init__(self, cache_size: int = 10000) -> None:
+        self.cache = LRUCache(cache_size)
+
+    def _segment(self, sentence: str) -> List[Token]:
+        raise NotImplementedError
+
+    @traced("tokenizer.tokenize")
+    def tokenize(self, text: str) -> List[Token]:
+        """Tokens of ``text`` in order, whitespace dropped, offsets into ``text``."""
+        tokens: List[Token] = []
+        for offset, sentence in split_sentences(text):
+            found = self.cache.get(sentence)
+            if found is None:
+                found = self._segment(sentence)
+                self.cache.set(sentence, found)
+            if offset:
+                found = [t._replace(start=t.start + offset, end=t.end + offset) for t in found]
+            tokens.extend(found)
+        return tokens
+
+    def iter_tokenize(self, texts: Iterable[str]) -> Iterator[List[Token]]:
+        """Tokens for each of ``texts``, lazily."""
+        for text in texts:
+            yield self.tokenize(text)
+
+    def tokenize_many(self, texts: Iterable[str]) -> List[List[Token]]:
+        return list(self.iter_tokenize(texts))
+
+    def words(self, text: str) -> List[str]:
+        """Just the surfaces of :meth:`tokenize`."""
+        return [t.surface for t in self.tokenize(text)]
+
+
+class DictionaryTokenizer(BaseTokenizer):
+    """The built-in tokenizer over lexicon sections from :func:`build_sections`."""
+
+    name = "builtin"
+
+    def __init__(self, sections: Sections, cache_size: int = 10000) -> None:
+        super().__init__(cache_size)
+        self._trie = DoubleArrayTrie(sections)
+        self._starts = sections["entry_starts"]
+        self._pos = sections["entry_pos"]
+        self._cost = sections["entry_cost"]
+        self._readings: List[str] = sections["entry_reading"]
+        self._bases: List[str] = sections["entry_base"]
+
+    @classmethod
+    def from_entries(
+        cls, entries: Iterable[Entry], cache_size: int = 10000
+    ) -> "DictionaryTokenizer":
+        return cls(build_sections(entries), cache_size)
+
+    def __len__(self) -> int:
+        return len(self._readings)
+
+    def _segment(self, sentence: str) -> List[Token]:
+        tokens: List[Token] = []
+        for m in re.finditer(r"\S+", sentence):
+            tokens.extend(self._viterbi(m.group(), m.start()))
+        return tokens
+
+    def _candidates(
+        self, text: str, start: int, classes: Sequence[str], run_ends: Sequence[int]
+    ) -> Iterator[Tuple[int, int, int, int]]:
+        """``(end, entry, pos, cost)`` for every word starting at ``start``; entry -1 is unknown."""
+        starts, pos, cost = self._starts, self._pos, self._cost
+        matched = False
+        for end, surface in self._trie.prefixes(text, start):
+            matched = True
+            for e in range(starts[surface], starts[surface + 1]):
+                yield end, e, pos[e], cost[e]
+        cls = classes[start]
+        if cls == "kanji":
+            base, extra = _UNKNOWN_KANJI_COST
+            for n in range(1, min(_MAX_UNKNOWN_KANJI, run_ends[start] - start) + 1):
+                yield start + n, -1, _POS_ID["noun"], base + extra * (n - 1)
+        elif cls == "hiragana":
+            if not matched:
+                yield start + 1, -1, _POS_ID["noun"], _UNKNOWN_HIRAGANA_COST
+        elif not (matched and cls == "symbol"):
+            yield run_ends[start], -1, _POS_ID[_UNKNOWN_POS[cls]], _UNKNOWN_RUN_COST[cls]
+
+    def _viterbi(self, text: str, offset: int) -> List[Token]:
+        n = len(text)
+        classes = [char_class(ch) for ch in text]
+        run_ends = [n] * n
+        for i in range(n - 2, -1, -1):
+            if classes[i] == classes[i + 1] and classes[i] != "symbol":
+                run_ends[i] = run_ends[i + 1]
+            else:
+                run_ends[i] = i + 1
+        if n:
+            run_ends[n - 1] = n
+
+        # For each position, the cheapest path ending there per part of speech of its
+        # last word (the connection cost only depends on that): pos -> (cost, node)
+        ends: List[Dict[int, Tuple[int, int]]] = [{} for _ in range(n + 1)]
+        ends[0][_BOS] = (0, -1)
+        nodes: List[Tuple[int, int, int, int, int]] = []  # start, end, entry, pos, prev
+        for start in range(n):
+            left = ends[start]
+            if not left:
+                continue
+            for end, entry, pos, cost in self._candidates(text, start, classes, run_ends):
+                best, prev = min((c + _CONNECT[lp][pos], node) for lp, (c, node) in left.items())
+                total = best + cost
+                slot = ends[end]
+                current = slot.get(pos)
+                if current is None or total < current[0]:
+                    nodes.append((start, end, entry, pos, prev))
+                    slot[pos] = (total, len(nodes) - 1)
+
+        _, node = min((c + _CONNECT[p][_EOS], node) for p, (c, node) in ends[n].items())
+        path = []
+        while node >= 0:
+            start, end, entry, pos, prev = nodes[node]
+            path.append(self._token(text[start:end], entry, pos, start + offset, end + offset))
+            node = prev
+        path.reverse()
+        return path
+
+    def _token(self, surface: str, entry: int, pos: int, start: int, end: int) -> Token:
+        if entry >= 0:
+            return Token(surface, self._readings[entry], POS[pos], self._bases[entry], start, end)
+        reading = "" if char_class(surface[0]) == "kanji" else to_hiragana(surface)
+        return Token(surface, reading, POS[pos], surface, start, end, False)
+
+
+# Leading part of speech from Sudachi / MeCab (UniDic, IPAdic) -> POS class
+_JAPANESE_POS = {
+    "名詞": "noun",
+    "代名詞": "pronoun",
+    "動詞": "verb",
+    "形容詞": "i-adjective",
+    "形状詞": "na-adjective",
+    "形容動詞": "na-adjective",
+    "連体詞": "adnominal",
+    "副詞": "adverb",
+    "助詞": "particle",
+    "助動詞": "auxiliary",
+    "接続詞": "conjunction",
+    "感動詞": "interjection",
+    "接頭辞": "prefix",
+    "接頭詞": "prefix",
+    "接尾辞": "suffix",
+    "数詞": "number",
+    "記号": "symbol",
+    "補助記号": "symbol",
+}
+_WHITESPACE_POS = ("空白",)
+
+
+class SudachiTokenizer(BaseTokenizer):
+    """SudachiPy with ``mode`` A, B or C (shortest to longest units)."""
+
+    name = "sudachi"
+
+    def __init__(self, mode: str = "C", cache_size: int = 10000) -> None:
+        from sudachipy import Dictionary, SplitMode
+
+        super().__init__(cache_size)
+        self._tokenizer = Dictionary().create()
+        self._mode = getattr(SplitMode, mode.upper())
+
+    def _segment(self, sentence: str) -> List[Token]:
+        tokens = []
+        for m in self._tokenizer.tokenize(sentence, self._mode):
+            tag = m.part_of_speech()[0]
+            if tag in _WHITESPACE_POS or not m.surface().strip():
+                continue
+            tokens.append(
+                Token(
+                    m.surface(),
+                    to_hiragana(m.reading_form()),
+                    _JAPANESE_POS.get(tag, "noun"),
+                    m.dictionary_form(),
+                    m.begin(),
+                    m.end(),
+                    not m.is_oov(),
+                )
+            )
+        return tokens
+
+
+class MecabTokenizer(BaseTokenizer):
+    """MeCab through fugashi, with an IPAdic-layout dictionary at ``dict_path``."""
+
+    name = "mecab"
+
+    def __init__(self, dict_path: Optional[Any] = None, cache_size: int = 10000) -> None:
+        from fugashi import GenericTagger
+
+        super().__init__(cache_size)
+        self._tagger = GenericTagger(f'-d "{dict_path}"' if dict_path else "")
+
+    def _segment(self, sentence: str) -> List[Token]:
+        tokens = []
+        cursor = 0
+        for node in self._tagger(sentence):
+            surface = node.surface
+            features = node.feature
+            start = sentence.find(surface, cursor)
+            cursor = start + len(surface)
+            tag = features[0] if features else ""
+            if tag in _WHITESPACE_POS:
+                continue
+            base = features[6] if len(features) > 6 and features[6] != "*" else surface
+            reading = features[7] if len(features) > 7 and features[7] != "*" else surface
+            tokens.append(
+                Token(
+                    surface,
+                    to_hiragana(reading),
+                    _JAPANESE_POS.get(tag, "noun"),
+                    base,
+                    start,
+                    cursor,
+                    not getattr(node, "is_unk", False),
+                )
+            )
+        return tokens
+
+
+def create_tokenizer(
+    backend: Optional[str] = None, lexicon: Optional[Callable[[], Sections]] = None
+) -> BaseTokenizer:
+    """A tokenizer for ``backend`` (default ``settings.tokenizer_backend``).
+
+    ``auto`` prefers SudachiPy when ``settings.use_sudachi`` is set, then
+    MeCab when ``settings.mecab_dict_path`` is, and falls back to the
+    built-in tokenizer when neither loads. Naming ``sudachi`` or ``mecab``
+    explicitly raises ``ImportError`` if it is not installed. ``lexicon``
+    supplies the built-in tokenizer's sections, and is only called if that
+    is the one chosen.
+    """
+    from opengov_earlyjapanese.config import settings
+
+    backend = (backend or settings.tokenizer_backend).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown tokenizer backend: {backend}")
+    size = settings.tokenizer_cache_size
+    if backend == "sudachi":
+        return SudachiTokenizer(settings.sudachi_mode, size)
+    if backend == "mecab":
+        return MecabTokenizer(settings.mecab_dict_path, size)
+    if backend == "auto":
+        candidates: List[Callable[[], BaseTokenizer]] = []
+        if settings.use_sudachi:
+            candidates.append(lambda: SudachiTokenizer(settings.sudachi_mode, size))
+        if settings.mecab_dict_path is not None:
+            candidates.append(lambda: MecabTokenizer(settings.mecab_dict_path, size))
+        for candidate in candidates:
+            try:
+                return candidate()
+            except Exception as e:  # not installed, or installed without a dictionary
+                logger.debug("tokenizer backend unavailable, trying the next: %s", e)
+    if lexicon is None:
+        return DictionaryTokenizer(build_sections(function_entries()), size)
+    return DictionaryTokenizer(lexicon(), size)
+
+
+def tokenize(text: str) -> List[Token]:
+    """Tokens of ``text`` from the shared tokenizer."""
+    from opengov_earlyjapanese.core import registry
+
+    return registry.get_tokenizer().tokenize(text)
+
+
+def tokenize_many(texts: Iterable[str]) -> List[List[Token]]:
+    """Tokens for each of ``texts`` from the shared tokenizer."""
+    from opengov_earlyjapanese.core import registry
+
+    return registry.get_tokenizer().tokenize_many(texts)
@@ -0,0 +1,296 @@
+"""Vocabulary storage with indexes by word, reading, level, part of speech and frequency.
+
+:class:`VocabularyBank` keeps entries as one buffer of compact JSON records
+(sorted by id) plus an offset array, and decodes a :class:`Vocabulary`
+only when it is returned, so 200k JMdict-sized entries cost tens of
+megabytes rather than a model object each. Word and reading lookups are
+dict hits; level and part-of-speech filters are posting lists; frequency
+queries bisect an array of ids ordered by rank. All parts are index-cache
+sections (see ``utils.index_cache``), so a bank can be mapped from disk
+instead of rebuilt.
+"""
+
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any, Dict, List, Optional, Union
+
+from opengov_earlyjapanese.core.models import Vocabulary
+from opengov_earlyjapanese.utils.index_cache import Sections, flatten_postings
+
+INDEX_VERSION = 1
+
+# Minimal demo data, used when no content pack provides vocabulary
+BUILTIN: List[Dict[str, Any]] = [
+    {
+        "word": "水",
+        "reading": "みず",
+        "meanings": ["water"],
+        "part_of_speech": "noun",
+        "jlpt_level": "N5",
+        "frequency_rank": 420,
+    },
+    {
+        "word": "食べる",
+        "reading": "たべる",
+        "meanings": ["to eat"],
+        "part_of_speech": "verb",
+        "jlpt_level": "N5",
+        "frequency_rank": 610,
+    },
+    {
+        "word": "学生",
+        "reading": "がくせい",
+        "meanings": ["student"],
+        "part_of_speech": "noun",
+        "jlpt_level": "N5",
+        "frequency_rank": 380,
+    },
+    {
+        "word": "日本語",
+        "reading": "にほんご",
+        "meanings": ["Japanese (language)"],
+        "part_of_speech": "noun",
+        "jlpt_level": "N5",
+        "frequency_rank": 900,
+    },
+    {
+        "word": "大きい",
+        "reading": "おおきい",
+        "meanings": ["big", "large"],
+        "part_of_speech": "i-adjective",
+        "jlpt_level": "N5",
+        "frequency_rank": 350,
+    },
+    {
+        "word": "上手",
+        "reading": "じょうず",
+        "meanings": ["skilful", "good at"],
+        "part_of_speech": "na-adjective",
+        "jlpt_level": "N5",
+        "frequency_rank": 2100,
+    },
+    {
+        "word": "今日",
+        "reading": "きょう",
+        "meanings": ["today"],
+        "part_of_speech": "noun",
+        "jlpt_level": "N5",
+        "frequency_rank": 150,
+    },
+    {
+        "word": "今日",
+        "reading": "こんにち",
+        "meanings": ["nowadays", "these days"],
+        "part_of_speech": "noun",
+        "jlpt_level": "N3",
+        "frequency_rank": 4200,
+    },
+]
+
+
+def entry_id(record: Dict[str, Any]) -> str:
+    """Stable id for a record without one; word and reading together are unique."""
+    return str(record.get("id") or f"vocab_{record['word']}_{record['reading']}")
+
+
+def _norm(text: str) -> str:
+    return unicodedata.normalize("NFC", text.strip())
+
+
+def _contains(posting: Sequence[int], i: int) -> bool:
+    j = bisect_left(posting, i)
+    return j < len(posting) and posting[j] == i
+
+
+def _add(index: Dict[str, Any], key: str, i: int) -> None:
+    # A single id is stored bare; only keys with several entries pay for a list
+    existing = index.get(key)
+    if existing is None:
+        index[key] = i
+    elif isinstance(existing, list):
+        existing.append(i)
+    else:
+        index[key] = [existing, i]
+
+
+def build_sections(records: Iterable[Dict[str, Any]]) -> Sections:
+    """Validate ``records`` and lay them out as bank sections."""
+    entries = []
+    for record in records:
+        entry = Vocabulary.model_validate({**record, "id": entry_id(record)})
+        entries.append(entry)
+    entries.sort(key=lambda e: e.id)
+
+    data = bytearray()
+    offsets = array("Q", [0])
+    ids: List[str] = []
+    words: Dict[str, Any] = {}
+    readings: Dict[str, Any] = {}
+    levels: Dict[str, List[int]] = {}
+    parts: Dict[str, List[int]] = {}
+    ranked: List[Any] = []
+    for i, entry in enumerate(entries):
+        if ids and ids[-1] == entry.id:
+            raise ValueError(f"Duplicate vocabulary id: {entry.id}")
+        ids.append(entry.id)
+        data += entry.model_dump_json(exclude_defaults=True).encode()
+        offsets.append(len(data))
+        _add(words, _norm(entry.word), i)
+        _add(readings, _norm(entry.reading), i)
+        levels.setdefault(entry.jlpt_level.value, []).append(i)
+        parts.setdefault(entry.part_of_speech.lower(), []).append(i)
+        if entry.frequency_rank is not None:
+            ranked.append((entry.frequency_rank, i))
+    ranked.sort()
+    level_spans, by_level = flatten_postings(levels)
+    pos_spans, by_pos = flatten_postings(parts)
+    return {
+        "data": array("B", data),
+        "offsets": offsets,
+        "ids": ids,
+        "words": words,
+        "readings": readings,
+        "levels": level_spans,
+        "by_level": by_level,
+        "parts": pos_spans,
+        "by_pos": by_pos,
+        "ranks": array("I", [r for r, _ in ranked]),
+        "ranked": array("I", [i for _, i in ranked]),
+    }
+
+
+class VocabularyBank:
+    """Read-only, indexed vocabulary; construct with :meth:`from_records`."""
+
+    def __init__(self, sections: Sections) -> None:
+        self._data = sections["data"]
+        self._offsets = sections["offsets"]
+        self._ids: List[str] = sections["ids"]
+        self._words: Dict[str, Any] = sections["words"]
+        self._readings: Dict[str, Any] = sections["readings"]
+        self._levels: Dict[str, List[int]] = sections["levels"]
+        self._by_level = sections["by_level"]
+        self._parts: Dict[str, List[int]] = sections["parts"]
+        self._by_pos = sections["by_pos"]
+        self._ranks: Sequence[int] = sections["ranks"]
+        self._ranked: Sequence[int] = sections["ranked"]
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "VocabularyBank":
+        return cls(build_sections(records))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def ids(self) -> List[str]:
+        """Entry ids in sorted order."""
+        return self._ids
+
+    def _entry(self, i: int) -> Vocabulary:
+        raw = self._data[self._offsets[i] : self._offsets[i + 1]]
+        return Vocabulary.model_validate_json(bytes(raw))
+
+    def _entries(self, ids: Iterable[int]) -> List[Vocabulary]:
+        return [self._entry(i) for i in ids]
+
+    @staticmethod
+    def _hits(index: Dict[str, Any], key: str) -> List[int]:
+        hit = index.get(_norm(key))
+        if hit is None:
+            return []
+        return hit if isinstance(hit, list) else [hit]
+
+    def get(self, vocab_id: str) -> Optional[Vocabulary]:
+        i = bisect_left(self._ids, vocab_id)
+        if i < len(self._ids) and self._ids[i] == vocab_id:
+            return self._entry(i)
+        return None
+
+    def __getitem__(self, vocab_id: str) -> Vocabulary:
+        entry = self.get(vocab_id)
+        if entry is None:
+            raise KeyError(vocab_id)
+        return entry
+
+    def by_word(self, word: str) -> List[Vocabulary]:
+        return self._entries(self._hits(self._words, word))
+
+    def by_reading(self, reading: str) -> List[Vocabulary]:
+        return self._entries(self._hits(self._readings, reading))
+
+    def lookup(self, query: str) -> List[Vocabulary]:
+        """Entries whose word or reading is ``query``, words first."""
+        hits = list(self._hits(self._words, query))
+        seen = set(hits)
+        hits += [i for i in self._hits(self._readings, query) if i not in seen]
+        return self._entries(hits)
+
+    def levels(self) -> List[str]:
+        return sorted(self._levels)
+
+    def parts_of_speech(self) -> List[str]:
+        return sorted(self._parts)
+
+    @staticmethod
+    def _posting(spans: Dict[str, List[int]], flat: Sequence[int], key: str) -> Sequence[int]:
+        span = spans.get(key)
+        if span is None:
+            return ()
+        start, count = span
+        return flat[start : start + count]
+
+    def _ranked_ids(self, min_rank: Optional[int], max_rank: Optional[int]) -> Sequence[int]:
+        lo = 0 if min_rank is None else bisect_left(self._ranks, min_rank)
+        hi = len(self._ranks) if max_rank is None else bisect_right(self._ranks, max_rank)
+        return self._ranked[lo:hi]
+
+    def iter_find(
+        self,
+        jlpt_level: Optional[str] = None,
+        part_of_speech: Optional[str] = None,
+        min_rank: Optional[int] = None,
+        max_rank: Optional[int] = None,
+    ) -> Iterator[Vocabulary]:
+        """Entries matching every given filter.
+
+        With a rank bound, results come in frequency order; otherwise in id
+        order. Only the smallest candidate list is walked; the others are
+        sorted, so membership is a bisection rather than a set build.
+        """
+        filters: List[Sequence[int]] = []
+        if jlpt_level is not None:
+            filters.append(self._posting(self._levels, self._by_level, jlpt_level.upper()))
+        if part_of_speech is not None:
+            filters.append(self._posting(self._parts, self._by_pos, part_of_speech.lower()))
+        if min_rank is not None or max_rank is not None:
+            walk: Sequence[int] = self._ranked_ids(min_rank, max_rank)
+        elif filters:
+            filters.sort(key=len)
+            walk = filters.pop(0)
+        else:
+            walk = range(len(self))
+        for i in walk:
+            if all(_contains(f, i) for f in filters):
+                yield self._entry(i)
+
+    def find(self, limit: int = 100, **filters: Any) -> List[Vocabulary]:
+        """Up to ``limit`` entries from :meth:`iter_find`."""
+        found: List[Vocabulary] = []
+        for entry in self.iter_find(**filters):
+            if len(found) >= limit:
+                break
+            found.append(entry)
+        return found
+
+    def stats(self) -> Dict[str, Union[int, Dict[str, int]]]:
+        return {
+            "entries": len(self),
+            "bytes": len(self._data),
+            "levels": {k: v[1] for k, v in sorted(self._levels.items())},
+        }
+
+
+def builtin_records() -> List[Dict[str, Any]]:
+    return [{**r, "id": entry_id(r)} for r in BUILTIN]
@@ -0,0 +1,302 @@
+"""Local lookup daemon: warm content served over a Unix socket.
+
+The daemon preloads every teacher once and answers lookups (see
+``opengov_earlyjapanese.lookups``) on a Unix socket, so CLI commands and
+editor integrations skip content construction. The CLI forwards to it
+when it is running and runs in-process otherwise.
+
+Protocol: one JSON object per line in each direction, any number of
+requests per connection::
+
+    -> {"op": "lookup", "name": "mnemonic", "query": "あ", "options": {}}
+    <- {"result": "..."}        or  {"error": "Character not found."}
+    -> {"op": "ping"}           <- {"ok": true, "pid": 1234, "settings": "...", ...}
+    -> {"op": "stop"}           <- {"ok": true}
+
+The CLI only forwards to a daemon that serves what it would serve itself:
+``ping`` reports a fingerprint of the daemon's settings inputs and the
+checksum of its content, and :meth:`DaemonClient.matches` compares them
+with the calling process's environment, ``.env`` and content pack.
+
+Environment:
+
+- ``NIHONGO_DAEMON_SOCKET``: socket path (default: a per-user path in
+  ``$XDG_RUNTIME_DIR`` or the temp directory).
+- ``NIHONGO_DAEMON=0``: never forward CLI commands to the daemon.
+
+This module is imported on every CLI call, so it only uses the standard
+library at import time.
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+SOCKET_ENV = "NIHONGO_DAEMON_SOCKET"
+ENABLE_ENV = "NIHONGO_DAEMON"
+
+# Not utils.logger.get_logger: that configures logging from settings on first
+# call, and this module must stay standard-library-only at import time. The
+# logger only emits inside the daemon process, after content is loaded.
+logger = logging.getLogger(__name__)
+
+
+def socket_path() -> Path:
+    configured = os.environ.get(SOCKET_ENV)
+    if configured:
+        return Path(configured)
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return Path(base) / f"opengov-earlyjapanese-{uid}.sock"
+
+
+def forwarding_enabled() -> bool:
+    return os.environ.get(ENABLE_ENV, "1").lower() not in {"0", "false", "no", "off"}
+
+
+def settings_fingerprint(fields: Iterable[str]) -> str:
+    """Hash of what settings named ``fields`` are read from in this process.
+
+    Covers the installed package, the environment variables named after a
+    field and ``.env`` in the working directory, so it is cheap to compute
+    without loading the settings themselves.
+    """
+    import opengov_earlyjapanese as package
+
+    names = {field.lower() for field in fields}
+    digest = hashlib.sha256()
+    digest.update(f"{package.__version__}\0{Path(package.__file__).parent}\0".encode())
+    for key, value in sorted((k.lower(), v) for k, v in os.environ.items() if k.lower() in names):
+        digest.update(f"{key}={value}\0".encode("utf-8", "surrogateescape"))
+    env_file = Path(".env")
+    if env_file.is_file():
+        digest.update(env_file.read_bytes())
+    return digest.hexdigest()
+
+
+def identity() -> Dict[str, Any]:
+    """What this process's lookups depend on, as reported by a daemon's ``ping``."""
+    from opengov_earlyjapanese.config import Settings, settings
+    from opengov_earlyjapanese.core import registry
+
+    fields = sorted(Settings.model_fields)
+    pack = settings.content_pack
+    return {
+        "fields": fields,
+        "settings": settings_fingerprint(fields),
+        "content": registry.content_hash(),
+        "content_pack": str(pack) if pack is not None else None,
+    }
+
+
+class DaemonClient:
+    """One connection to a running daemon."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self._reader = sock.makefile("r", encoding="utf-8")
+
+    @classmethod
+    def connect(cls, path: Optional[Path] = None, timeout: float = 5.0) -> Optional["DaemonClient"]:
+        """Connect to the daemon, or return None if it is not running."""
+        if not hasattr(socket, "AF_UNIX"):  # pragma: no cover - Windows
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(str(path or socket_path()))
+        except OSError:
+            sock.close()
+            return None
+        return cls(sock)
+
+    def call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.sock.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Daemon closed the connection")
+        response: Dict[str, Any] = json.loads(line)
+        return response
+
+    def lookup(self, name: str, query: str, **options: Any) -> Any:
+        """Run a lookup in the daemon; lookup errors are raised as ValueError."""
+        response = self.call({"op": "lookup", "name": name, "query": query, "options": options})
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response["result"]
+
+    def ping(self) -> Dict[str, Any]:
+        return self.call({"op": "ping"})
+
+    def matches(self) -> bool:
+        """Whether the daemon serves the settings and content this process would.
+
+        A configured content pack is compared by checksum, so a pack rebuilt
+        after the daemon started is not answered from the old one.
+        """
+        info = self.ping()
+        fields = info.get("fields")
+        if not isinstance(fields, list) or info.get("settings") != settings_fingerprint(fields):
+            return False
+        pack = info.get("content_pack")
+        if pack is None:
+            return True
+        from opengov_earlyjapanese.core.pack import ContentPack, ContentPackError
+
+        try:
+            with ContentPack(pack) as current:
+                return current.checksum == info.get("content")
+        except ContentPackError:
+            return False
+
+    def stop(self) -> None:
+        self.call({"op": "stop"})
+
+    def close(self) -> None:
+        self._reader.close()
+        self.sock.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "DaemonServer"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            request: Dict[str, Any] = {}
+            try:
+                decoded = json.loads(line)
+                if not isinstance(decoded, dict):
+                    raise ValueError("Expected a JSON object")
+                request = decoded
+                response = self.server.dispatch(request)
+                body = json.dumps(response, ensure_ascii=False)
+            except (ValueError, TypeError) as e:
+                body = json.dumps({"error": str(e)}, ensure_ascii=False)
+            except Exception as e:  # one failing request must not end the connection
+                logger.exception("daemon request failed: %r", request)
+                body = json.dumps({"error": f"Internal error: {type(e).__name__}: {e}"})
+            self.wfile.write(body.encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if request.get("op") == "stop":
+                return
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.requests_served = 0
+        self.identity = identity()
+        self._lock = threading.Lock()
+        if self.path.exists():
+            client = DaemonClient.connect(self.path, timeout=1.0)
+            if client is not None:
+                client.close()
+                raise RuntimeError(f"Daemon already running on {self.path}")
+            self.path.unlink()  # stale socket from a crashed daemon
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(str(self.path), _Handler)
+        os.chmod(self.path, 0o600)
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        from opengov_earlyjapanese.lookups import lookup
+
+        op = request.get("op", "lookup")
+        if op == "ping":
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "requests": self.requests_served,
+                **self.identity,
+            }
+        if op == "stop":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True}
+        if op != "lookup":
+            raise ValueError(f"Unknown op: {op}")
+        with self._lock:
+            self.requests_served += 1
+        return {
+            "result": lookup(
+                request.get("name", ""), request.get("query", ""), **request.get("options", {})
+            )
+        }
+
+    def server_close(self) -> None:
+        super().server_close()
+        with contextlib.suppress(FileNotFoundError):
+            self.path.unlink()
+
+
+def serve(path: Optional[Path] = None) -> None:
+    """Preload content and serve until stopped by a ``stop`` request or SIGTERM."""
+    from opengov_earlyjapanese.core import registry
+
+    registry.preload()
+    server = DaemonServer(path or socket_path())
+
+    def _terminate(signum: int, frame: Any) -> None:
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _terminate)
+    try:
+        server.serve_forever(poll_interval=0.1)
+    finally:
+        server.server_close()
+
+
+def start(path: Optional[Path] = None, timeout: float = 10.0) -> int:
+    """Start the daemon in a new session and wait until it answers; returns its pid."""
+    path = path or socket_path()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "opengov_earlyjapanese", "daemon", "run", "--socket", str(path)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        client = DaemonClient.connect(path, timeout=1.0)
+        if client is not None:
+            with client:
+                return int(client.ping()["pid"])
+        if proc.poll() is not None:
+            raise RuntimeError(f"Daemon exited with code {proc.returncode}")
+        time.sleep(0.05)
+    proc.terminate()
+    raise RuntimeError(f"Daemon did not start within {timeout}s")
+
+
+def stop(path: Optional[Path] = None, timeout: float = 5.0) -> bool:
+    """Ask the daemon to exit and wait for its socket to go away; False if not running."""
+    path = path or socket_path()
+    client = DaemonClient.connect(path)
+    if client is None:
+        return False
+    with client:
+        client.stop()
+    deadline = time.monotonic() + timeout
+    while path.exists() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return True
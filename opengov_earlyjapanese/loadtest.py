@@ -0,0 +1,223 @@
+"""Async load generator for the API, in-process or against a running server.
+
+A run drives ``concurrency`` virtual users, each picking requests from a
+weighted mix until the request budget or the time limit is exhausted, and
+reports throughput, latency percentiles and error rates as a JSON-ready
+dict. In-process runs go through httpx's ASGI transport with the app's
+lifespan running, and give every virtual user its own client address so
+that per-client rate limits apply as they would to real users.
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# Status code recorded for requests that failed without a response
+TRANSPORT_ERROR = 0
+
+
+@dataclass
+class Target:
+    method: str
+    path: str
+    weight: float = 1.0
+    body: Optional[Dict[str, Any]] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+DEFAULT_MIX = [
+    Target("GET", "/health", 4),
+    Target("GET", "/hiragana/a_row", 3),
+    Target("GET", "/katakana", 2),
+    Target("POST", "/kanji/analyze", 1, {"text": "日本語を勉強しています。"}),
+]
+
+
+def parse_target(spec: str) -> Target:
+    """Parse ``"METHOD /path[=weight]"``, e.g. ``"GET /health=3"``."""
+    method, _, rest = spec.strip().partition(" ")
+    path, _, weight = rest.strip().partition("=")
+    if not method or not path.startswith("/"):
+        raise ValueError(f"Invalid request spec: {spec!r}")
+    try:
+        return Target(method.upper(), path, float(weight) if weight else 1.0)
+    except ValueError as e:
+        raise ValueError(f"Invalid weight in request spec: {spec!r}") from e
+
+
+def load_mix(path: Path) -> List[Target]:
+    """Read a JSON list of ``{"method", "path", "weight", "body"}`` objects."""
+    entries = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"Request mix must be a non-empty JSON list: {path}")
+    return [
+        Target(
+            e.get("method", "GET").upper(),
+            e["path"],
+            float(e.get("weight", 1.0)),
+            e.get("body"),
+        )
+        for e in entries
+    ]
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (0.0 for an empty sequence)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+
+def _latency_summary(latencies: Sequence[float]) -> Dict[str, float]:
+    return {
+        "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99": round(percentile(latencies, 0.99) * 1000, 3),
+        "max": round(max(latencies) * 1000, 3) if latencies else 0.0,
+    }
+
+
+def is_error(status: int) -> bool:
+    return status == TRANSPORT_ERROR or status >= 400
+
+
+class Recorder:
+    """Per-request latencies and status codes, grouped by target."""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter[int]] = defaultdict(Counter)
+
+    def record(self, target: Target, seconds: float, status: int) -> None:
+        self.latencies[target.name].append(seconds)
+        self.statuses[target.name][status] += 1
+
+    def report(self, elapsed: float, concurrency: int) -> Dict[str, Any]:
+        all_latencies = [s for values in self.latencies.values() for s in values]
+        statuses: Counter[int] = Counter()
+        endpoints: Dict[str, Any] = {}
+        for name, counts in self.statuses.items():
+            statuses.update(counts)
+            total = sum(counts.values())
+            errors = sum(n for code, n in counts.items() if is_error(code))
+            endpoints[name] = {
+                "requests": total,
+                "errors": errors,
+                "error_rate": round(errors / total, 4),
+                "latency_ms": _latency_summary(self.latencies[name]),
+            }
+        total = len(all_latencies)
+        errors = sum(n for code, n in statuses.items() if is_error(code))
+        return {
+            "concurrency": concurrency,
+            "requests": total,
+            "duration_s": round(elapsed, 3),
+            "throughput_rps": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "latency_ms": _latency_summary(all_latencies),
+            "status": {str(code): n for code, n in sorted(statuses.items())},
+            "endpoints": endpoints,
+        }
+
+
+async def _user(
+    client: httpx.AsyncClient,
+    mix: Sequence[Target],
+    rng: random.Random,
+    recorder: Recorder,
+    budget: List[int],
+    deadline: Optional[float],
+) -> None:
+    weights = [t.weight for t in mix]
+    while True:
+        if deadline is not None and time.perf_counter() >= deadline:
+            return
+        if budget[0] == 0:
+            return
+        budget[0] -= 1
+        target = rng.choices(mix, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = await client.request(target.method, target.path, json=target.body)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = TRANSPORT_ERROR
+        recorder.record(target, time.perf_counter() - start, status)
+
+
+async def run_load(
+    clients: Sequence[httpx.AsyncClient],
+    mix: Sequence[Target],
+    requests: int = 1000,
+    duration: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Run one virtual user per client until ``requests`` are sent or ``duration`` passes.
+
+    ``requests=0`` removes the request budget, in which case ``duration``
+    is required.
+    """
+    if not mix:
+        raise ValueError("Request mix is empty")
+    if requests <= 0 and duration is None:
+        raise ValueError("Either a request count or a duration is required")
+    recorder = Recorder()
+    budget = [requests if requests > 0 else -1]
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    deadline = start + duration if duration is not None else None
+    await asyncio.gather(
+        *(
+            _user(client, mix, random.Random(rng.random()), recorder, budget, deadline)
+            for client in clients
+        )
+    )
+    return recorder.report(time.perf_counter() - start, len(clients))
+
+
+async def run_in_process(
+    app: Any, concurrency: int, mix: Sequence[Target], **kwargs: Any
+) -> Dict[str, Any]:
+    """Load-test an ASGI app in this process, with its lifespan running."""
+    clients = [
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(
+                app=app, raise_app_exceptions=False, client=(f"10.0.{i // 250}.{i % 250 + 1}", 0)
+            ),
+            base_url="http://loadtest",
+        )
+        for i in range(concurrency)
+    ]
+    try:
+        async with app.router.lifespan_context(app):
+            report = await run_load(clients, mix, **kwargs)
+    finally:
+        for client in clients:
+            await client.aclose()
+    report["target"] = "asgi"
+    return report
+
+
+async def run_against_url(
+    url: str, concurrency: int, mix: Sequence[Target], **kwargs: Any
+) -> Dict[str, Any]:
+    """Load-test a running server over HTTP, sharing one connection pool."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        report = await run_load([client] * concurrency, mix, **kwargs)
+    report["target"] = url
+    return report
@@ -0,0 +1,121 @@
+"""Single-query lookups behind the CLI commands, and NDJSON batch streaming.
+
+Each lookup takes one query string and returns a JSON-ready value, or
+raises ``ValueError`` with a user-facing message. Lookups use the shared
+teacher instances from the registry, so a batch of queries (or a
+long-running process) builds each teacher once.
+"""
+
+import json
+from collections.abc import Iterable, Iterator
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from opengov_earlyjapanese.core import registry
+from opengov_earlyjapanese.core.search import search_characters
+from opengov_earlyjapanese.core.sentences import with_examples
+from opengov_earlyjapanese.utils.tracing import tracer
+
+
+def _single(ch: str, script: str) -> str:
+    if len(ch) != 1:
+        raise ValueError(f"Please provide a single {script} character.")
+    return ch
+
+
+def hiragana_lesson(row: str) -> Dict[str, Any]:
+    return registry.get_hiragana_teacher().get_lesson(row).model_dump()
+
+
+def hiragana_mnemonic(character: str) -> str:
+    mnemonic = registry.get_hiragana_teacher().get_mnemonic(_single(character, "hiragana"))
+    if mnemonic is None:
+        raise ValueError("Character not found.")
+    return mnemonic
+
+
+def kanji_analysis(character: str) -> Dict[str, Any]:
+    analysis = registry.get_kanji_master().analyze(_single(character, "kanji"))
+    return with_examples(analysis).model_dump()
+
+
+def kana_search(query: str, kind: str = "all") -> List[Dict[str, Any]]:
+    return search_characters(query, kind)
+
+
+def katakana_characters(row: str) -> List[Dict[str, Any]]:
+    teacher = registry.get_katakana_teacher()
+    if row not in teacher.rows:
+        raise ValueError(f"Unknown row: {row}")
+    return [teacher.characters[c].model_dump() for c in teacher.rows[row]]
+
+
+def katakana_mnemonic(character: str) -> str:
+    ch = registry.get_katakana_teacher().characters.get(_single(character, "katakana"))
+    if not ch or not ch.mnemonic:
+        raise ValueError("Character not found.")
+    return ch.mnemonic
+
+
+def vocabulary_lookup(query: str) -> List[Dict[str, Any]]:
+    entries = registry.get_vocabulary_bank().lookup(query)
+    if not entries:
+        raise ValueError(f"No vocabulary entry for {query!r}.")
+    return [with_examples(e).model_dump(mode="json") for e in entries]
+
+
+def tokenize(text: str) -> List[Dict[str, Any]]:
+    return [t._asdict() for t in registry.get_tokenizer().tokenize(text)]
+
+
+def furigana(text: str, fmt: str = "bracket", furigana: Optional[bool] = None) -> Any:
+    return registry.get_furigana_annotator().annotate(text, fmt, furigana)
+
+
+LOOKUPS: Dict[str, Callable[..., Any]] = {
+    "hiragana": hiragana_lesson,
+    "mnemonic": hiragana_mnemonic,
+    "kanji.analyze": kanji_analysis,
+    "search": kana_search,
+    "katakana.characters": katakana_characters,
+    "katakana.mnemonic": katakana_mnemonic,
+    "vocab": vocabulary_lookup,
+    "tokenize": tokenize,
+    "furigana": furigana,
+}
+
+
+def lookup(name: str, query: str, **options: Any) -> Any:
+    try:
+        func = LOOKUPS[name]
+    except KeyError:
+        raise ValueError(f"Unknown lookup: {name}") from None
+    with tracer.start_span(f"lookup {name}", {"lookup.query": query}):
+        return func(query, **options)
+
+
+def dumps_compact(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def stream_ndjson(
+    name: str,
+    lines: Iterable[str],
+    resolve: Callable[..., Any] = lookup,
+    **options: Any,
+) -> Iterator[Tuple[str, bool]]:
+    """Run ``name`` for each non-blank line, yielding ``(ndjson_line, ok)``.
+
+    Results are ``{"query": ..., "result": ...}``; failed lookups are
+    reported in-line as ``{"query": ..., "error": ...}`` and do not stop
+    the batch. ``resolve`` defaults to an in-process :func:`lookup`.
+    """
+    for line in lines:
+        query = line.strip()
+        if not query:
+            continue
+        try:
+            result = resolve(name, query, **options)
+        except ValueError as e:
+            yield dumps_compact({"query": query, "error": str(e)}), False
+        else:
+            yield dumps_compact({"query": query, "result": result}), True
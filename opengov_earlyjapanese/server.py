@@ -0,0 +1,265 @@
+"""Pre-fork API server: preload content once, then fork workers that share it.
+
+The parent imports the ASGI app and builds every teacher and index before
+forking, then freezes the garbage collector so the children's collections
+do not write to (and therefore copy) the shared pages. Workers serve from a
+socket bound by the parent and are restarted when they exit, including
+after ``max_requests`` recycling. Each worker's CPU process pool (see
+``api.executor``) defaults to its share of the cores, not all of them, and
+its admission control (see ``api.admission``) enforces its share of the
+global rate and concurrency limits.
+
+Signals handled by the parent:
+
+- ``SIGTERM``/``SIGINT``: graceful shutdown of all workers.
+- ``SIGHUP``: reload content (a rebuilt content pack or index) in the
+  parent, then a rolling restart replacing workers one at a time. If the
+  reload fails the old workers keep serving.
+"""
+
+import contextlib
+import gc
+import os
+import random
+import signal
+import socket
+import time
+from typing import Any, Dict, List, Optional
+
+from opengov_earlyjapanese.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_APP = "opengov_earlyjapanese.api.main:app"
+
+
+def default_workers() -> int:
+    """One worker per available core; handlers are short and CPU-bound."""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:  # pragma: no cover - not available on macOS/Windows
+        return max(1, os.cpu_count() or 1)
+
+
+def worker_request_limit(max_requests: int, jitter: int) -> int:
+    """Per-worker request budget, jittered so workers do not recycle together."""
+    if max_requests <= 0:
+        return 0
+    return max_requests + (random.randint(0, jitter) if jitter > 0 else 0)
+
+
+def preload_content() -> None:
+    """Build shared content so forked workers inherit it copy-on-write."""
+    from opengov_earlyjapanese.core import registry
+
+    registry.preload()
+
+
+class PreforkServer:
+    def __init__(
+        self,
+        app: str = DEFAULT_APP,
+        host: str = "0.0.0.0",
+        port: int = 8000,
+        workers: int = 0,
+        max_requests: int = 0,
+        max_requests_jitter: int = 0,
+        graceful_timeout: float = 30.0,
+        log_level: str = "info",
+    ) -> None:
+        self.app_path = app
+        self.host = host
+        self.port = port
+        self.workers = workers or default_workers()
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        self.children: Dict[int, float] = {}
+        self.sock: Optional[socket.socket] = None
+        self._app: Any = None
+        self._stopping = False
+        self._reload_requested = False
+
+    # Parent ------------------------------------------------------------
+
+    def bind(self) -> socket.socket:
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        self.sock = sock
+        self.port = sock.getsockname()[1]
+        return sock
+
+    def preload(self) -> None:
+        from uvicorn.importer import import_from_string
+
+        self._app = import_from_string(self.app_path)
+        self._preload_content()
+
+    def _preload_content(self) -> None:
+        preload_content()
+        gc.collect()
+        if hasattr(gc, "freeze"):
+            gc.freeze()
+
+    def reload_content(self) -> bool:
+        """Rebuild shared content in the parent; False (logged) if that fails."""
+        from opengov_earlyjapanese.core import registry
+
+        try:
+            registry.reload()
+            self._preload_content()
+        except Exception:
+            logger.exception("content reload failed; keeping the current workers")
+            return False
+        return True
+
+    def run(self) -> None:
+        if not hasattr(os, "fork") or self.workers == 1:
+            self._run_single()
+            return
+        if self.sock is None:
+            self.bind()
+        self.preload()
+        logger.info(
+            "prefork server listening on %s:%d with %d workers",
+            self.host,
+            self.port,
+            self.workers,
+        )
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+        for _ in range(self.workers):
+            self.spawn()
+        try:
+            self._supervise()
+        finally:
+            self._shutdown()
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - runs in the child process
+            code = 0
+            try:
+                self._run_worker()
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        return pid
+
+    def _on_stop(self, signum: int, frame: Any) -> None:
+        self._stopping = True
+
+    def _on_reload(self, signum: int, frame: Any) -> None:
+        self._reload_requested = True
+
+    def _reap(self) -> List[int]:
+        exited = []
+        while self.children:
+            try:
+                pid, _status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            if self.children.pop(pid, None) is not None:
+                exited.append(pid)
+        return exited
+
+    def _supervise(self) -> None:
+        while not self._stopping:
+            for pid in self._reap():
+                if not self._stopping:
+                    logger.info("worker %d exited, respawning", pid)
+                    self.spawn()
+            if self._reload_requested:
+                self._reload_requested = False
+                self._rolling_restart()
+            time.sleep(0.2)
+
+    def _rolling_restart(self) -> None:
+        if not self.reload_content():
+            return
+        logger.info("rolling restart of %d workers", len(self.children))
+        for old in list(self.children):
+            self.spawn()
+            self._stop_worker(old)
+
+    def _stop_worker(self, pid: int) -> None:
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        try:
+            while time.monotonic() < deadline:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+                if done:
+                    break
+                time.sleep(0.05)
+            else:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+        self.children.pop(pid, None)
+
+    def _shutdown(self) -> None:
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.children.pop(pid, None)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+        for pid in list(self.children):
+            with contextlib.suppress(ProcessLookupError, ChildProcessError):
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            self.children.pop(pid, None)
+        if self.sock is not None:
+            self.sock.close()
+        logger.info("prefork server stopped")
+
+    # Workers -----------------------------------------------------------
+
+    def _config(self, app: Any) -> Any:
+        import uvicorn
+
+        return uvicorn.Config(
+            app,
+            host=self.host,
+            port=self.port,
+            log_level=self.log_level,
+            limit_max_requests=worker_request_limit(self.max_requests, self.max_requests_jitter)
+            or None,
+            timeout_graceful_shutdown=int(self.graceful_timeout),
+        )
+
+    def _run_worker(self) -> None:  # pragma: no cover - runs in the child process
+        import uvicorn
+
+        from opengov_earlyjapanese.api import admission, executor
+
+        admission.set_server_workers(self.workers)
+        executor.set_server_workers(self.workers)
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, signal.SIG_DFL)
+        random.seed()
+        assert self.sock is not None, "run() binds the socket before forking"
+        uvicorn.Server(self._config(self._app)).run(sockets=[self.sock])
+
+    def _run_single(self) -> None:
+        import uvicorn
+
+        preload_content()
+        uvicorn.Server(self._config(self.app_path)).run(
+            sockets=[self.sock] if self.sock is not None else None
+        )
@@ -0,0 +1,120 @@
+"""Bounded caches: a TTL cache whose misses are computed once per key, and a plain LRU."""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Hashable
+from typing import Any, Callable, Optional, Tuple, TypeVar
+
+from opengov_earlyjapanese.utils.singleflight import AsyncSingleFlight
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class TTLCache:
+    """LRU cache with a per-entry time to live.
+
+    ``get_or_compute`` routes misses through an :class:`AsyncSingleFlight`,
+    so an expired hot key is recomputed by one caller while the rest wait
+    for that result instead of stampeding.
+    """
+
+    def __init__(
+        self, ttl: float, maxsize: int = 1024, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = AsyncSingleFlight()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires <= self._clock():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    async def get_or_compute(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value  # type: ignore[no-any-return]
+
+        async def compute() -> T:
+            result = await fn()
+            self.set(key, result)
+            return result
+
+        return await self._flight.do(key, compute)
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache for pure functions of their key.
+
+    No expiry and no single-flight: for values that never go stale and are
+    cheap enough that two threads occasionally computing the same one is
+    fine. ``hits`` and ``misses`` count :meth:`get` outcomes.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def get_or_compute(self, key: Hashable, fn: Callable[[], T]) -> T:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = fn()
+            self.set(key, value)
+        return value  # type: ignore[no-any-return]
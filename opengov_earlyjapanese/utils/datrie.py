@@ -0,0 +1,175 @@
+"""Double-array trie for dictionary prefix matching.
+
+A static trie stored in two integer arrays, ``base`` and ``check``: the
+child of state ``s`` on character code ``c`` is ``t = base[s] + c``, valid
+when ``check[t] == s``. Walking one character is two array reads, and
+:meth:`DoubleArrayTrie.prefixes` finds every key that starts at a given
+position of a text in one walk, which is what a tokenizer's lattice needs.
+
+Characters are mapped to dense codes (most frequent first, so the arrays
+pack tightly); code 0 marks the end of a key, and the end state stores the
+key's value as ``-(value + 1)`` in ``base``. The arrays are index-cache
+sections (see ``utils.index_cache``), so a built trie can be mapped from
+disk.
+"""
+
+from array import array
+from collections import Counter, deque
+from collections.abc import Iterator, Sequence
+from typing import Dict, List, Optional, Tuple
+
+from opengov_earlyjapanese.utils.index_cache import Sections
+
+_FREE = -1
+_ROOT_CHECK = -2
+
+
+def build(keys: Sequence[str], values: Optional[Sequence[int]] = None) -> Sections:
+    """Sections for ``keys`` (sorted, unique, non-empty); values default to key positions."""
+    if values is None:
+        values = range(len(keys))
+    counts = Counter(ch for key in keys for ch in key)
+    codes = {ch: i + 1 for i, (ch, _) in enumerate(counts.most_common())}
+    seqs = [[codes[ch] for ch in key] for key in keys]
+
+    base: List[int] = [0]
+    check: List[int] = [_ROOT_CHECK]
+    # Free cells form a linked list (index 0, the root, is its head sentinel),
+    # so placing a node only ever visits free cells
+    next_free: List[int] = [0]
+    prev_free: List[int] = [0]
+
+    def grow(size: int) -> None:
+        old = len(check)
+        if size <= old:
+            return
+        new = max(size, old + old // 2 + 16)
+        base.extend([0] * (new - old))
+        check.extend([_FREE] * (new - old))
+        last = prev_free[0]
+        next_free.extend(range(old + 1, new + 1))
+        prev_free.extend(range(old - 1, new - 1))
+        next_free[last] = old
+        prev_free[old] = last
+        next_free[new - 1] = 0
+        prev_free[0] = new - 1
+
+    def occupy(t: int) -> None:
+        after, before = next_free[t], prev_free[t]
+        next_free[before] = after
+        prev_free[after] = before
+
+    # Nodes with several children rarely fit the scattered holes near the front,
+    # so once one needs a retry, later ones start where it fit (as Darts does);
+    # single-child nodes still fill the holes from the head of the list
+    skip_to = 0
+
+    def find_base(labels: List[int]) -> int:
+        nonlocal skip_to
+        low, high = labels[0], labels[-1]
+        pos = next_free[0]
+        if len(labels) > 1 and skip_to > pos:
+            pos = skip_to
+            while pos < len(check) and check[pos] != _FREE:
+                pos += 1
+            if pos == len(check):
+                pos = 0
+        tries = 0
+        while True:
+            if pos == 0:  # no free cell left: append one past the end
+                pos = len(check)
+                grow(pos + high - low + 1)
+            b = pos - low
+            if b >= 1:
+                grow(b + high + 1)
+                for c in labels:
+                    if check[b + c] != _FREE:
+                        break
+                else:
+                    if tries > 1:
+                        skip_to = pos
+                    return b
+            tries += 1
+            pos = next_free[pos]
+
+    queue = deque([(0, 0, len(keys), 0)] if keys else [])
+    while queue:
+        state, lo, hi, depth = queue.popleft()
+        children: List[Tuple[int, int, int]] = []
+        i = lo
+        while i < hi:
+            seq = seqs[i]
+            c = seq[depth] if depth < len(seq) else 0
+            j = i + 1
+            while j < hi and (seqs[j][depth] if depth < len(seqs[j]) else 0) == c:
+                j += 1
+            children.append((c, i, j))
+            i = j
+        labels = sorted(c for c, _, _ in children)
+        b = find_base(labels)
+        base[state] = b
+        for c, _, _ in children:
+            check[b + c] = state
+            occupy(b + c)
+        for c, i, j in children:
+            if c == 0:
+                base[b] = -(values[i] + 1)
+            else:
+                queue.append((b + c, i, j, depth + 1))
+
+    while check and check[-1] == _FREE:
+        check.pop()
+        base.pop()
+    return {"base": array("i", base), "check": array("i", check), "codes": codes}
+
+
+class DoubleArrayTrie:
+    """Read-only lookups over sections from :func:`build`."""
+
+    def __init__(self, sections: Sections) -> None:
+        self._base: Sequence[int] = sections["base"]
+        self._check: Sequence[int] = sections["check"]
+        self._codes: Dict[str, int] = sections["codes"]
+        self._size = len(self._check)
+
+    @classmethod
+    def from_keys(cls, keys: Sequence[str]) -> "DoubleArrayTrie":
+        return cls(build(keys))
+
+    def _value(self, state: int) -> Optional[int]:
+        end = self._base[state]
+        if 0 <= end < self._size and self._check[end] == state and self._base[end] < 0:
+            return -self._base[end] - 1
+        return None
+
+    def get(self, key: str) -> Optional[int]:
+        """The value stored for ``key``, or None."""
+        state = 0
+        for ch in key:
+            c = self._codes.get(ch)
+            if c is None:
+                return None
+            t = self._base[state] + c
+            if t >= self._size or self._check[t] != state:
+                return None
+            state = t
+        return self._value(state)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def prefixes(self, text: str, start: int = 0) -> Iterator[Tuple[int, int]]:
+        """``(end, value)`` for every key equal to ``text[start:end]``, shortest first."""
+        base, check, codes, size = self._base, self._check, self._codes, self._size
+        state = 0
+        for i in range(start, len(text)):
+            c = codes.get(text[i])
+            if c is None:
+                return
+            t = base[state] + c
+            if t >= size or check[t] != state:
+                return
+            state = t
+            end = base[state]
+            if 0 <= end < size and check[end] == state and base[end] < 0:
+                yield i + 1, -base[end] - 1
@@ -0,0 +1,176 @@
+"""On-disk cache of built index structures, keyed by content hash and code version.
+
+An index is a dict of named sections: JSON-serialisable values, or
+``array.array`` instances for the large numeric parts (offsets, posting
+lists, suffix arrays). Files are written once, atomically, and loaded with
+``mmap``: JSON sections are decoded on load, array sections come back as
+zero-copy ``memoryview`` objects over the mapping, so opening a large
+index costs page faults rather than a rebuild.
+
+A file is only reused when the content hash, the package version, the
+index's own ``version`` (bump it when the builder changes), the format and
+the platform byte order all match; anything else, including a truncated or
+corrupt file, triggers a rebuild. Files for older keys of the same index
+are removed after a rebuild.
+
+Layout: ``MAGIC``, an 8-byte little-endian manifest length, the JSON
+manifest, then the sections, each 8-byte aligned; manifest offsets are
+relative to the first section.
+"""
+
+import array
+import hashlib
+import json
+import mmap
+import os
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from opengov_earlyjapanese import __version__
+
+MAGIC = b"OGJIDX1\n"
+FORMAT_VERSION = 1
+_ALIGN = 8
+
+Sections = Dict[str, Any]
+
+
+class IndexCacheError(ValueError):
+    """A cache file is truncated, corrupt or was written for another key."""
+
+
+def cache_key(name: str, content_hash: str, version: int = 1) -> str:
+    parts = [name, content_hash, __version__, str(version), str(FORMAT_VERSION), sys.byteorder]
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()[:24]
+
+
+def flatten_postings(
+    postings: Dict[str, List[int]], typecode: str = "I"
+) -> Tuple[Dict[str, List[int]], "array.array[int]"]:
+    """Concatenate posting lists into one array; returns ``{key: [start, count]}`` and it."""
+    flat = array.array(typecode)
+    spans: Dict[str, List[int]] = {}
+    for key in sorted(postings):
+        spans[key] = [len(flat), len(postings[key])]
+        flat.extend(postings[key])
+    return spans, flat
+
+
+def _pad(offset: int) -> int:
+    return -offset % _ALIGN
+
+
+def write_index(path: Union[str, Path], key: str, sections: Sections) -> None:
+    """Serialise ``sections`` to ``path`` atomically."""
+    path = Path(path)
+    blobs = []
+    manifest: Dict[str, Any] = {"key": key, "sections": {}}
+    for name, value in sections.items():
+        if isinstance(value, array.array):
+            entry: Dict[str, Any] = {"type": "array", "typecode": value.typecode}
+            blob = value.tobytes()
+        else:
+            entry = {"type": "json"}
+            blob = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+        entry["length"] = len(blob)
+        manifest["sections"][name] = entry
+        blobs.append((name, blob))
+
+    offset = 0
+    for name, blob in blobs:
+        manifest["sections"][name]["offset"] = offset
+        offset += len(blob) + _pad(len(blob))
+    header = json.dumps(manifest, separators=(",", ":")).encode()
+    data_start = len(MAGIC) + 8 + len(header)
+    data_start += _pad(data_start)
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tmp.open("wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for name, blob in blobs:
+            f.write(b"\0" * (data_start + manifest["sections"][name]["offset"] - f.tell()))
+            f.write(blob)
+        f.write(b"\0" * _pad(f.tell()))
+    os.replace(tmp, path)
+
+
+def read_index(path: Union[str, Path], key: Optional[str] = None) -> Sections:
+    """Map ``path`` and decode its sections; raise :class:`IndexCacheError` if unusable."""
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # empty file
+            raise IndexCacheError(f"{path}: {e}") from e
+    try:
+        if mm[: len(MAGIC)] != MAGIC:
+            raise IndexCacheError(f"{path}: not an index file")
+        start = len(MAGIC) + 8
+        length = int.from_bytes(mm[len(MAGIC) : start], "little")
+        manifest = json.loads(bytes(mm[start : start + length]))
+        if key is not None and manifest.get("key") != key:
+            raise IndexCacheError(f"{path}: written for another key")
+        data_start = start + length + _pad(start + length)
+        view = memoryview(mm)
+        sections: Sections = {}
+        for name, entry in manifest["sections"].items():
+            offset, size = data_start + entry["offset"], entry["length"]
+            if offset + size > len(mm):
+                raise IndexCacheError(f"{path}: truncated section {name!r}")
+            if entry["type"] == "array":
+                sections[name] = view[offset : offset + size].cast(entry["typecode"])
+            else:
+                sections[name] = json.loads(bytes(view[offset : offset + size]))
+        return sections
+    except IndexCacheError:
+        raise
+    except (ValueError, KeyError, TypeError) as e:
+        raise IndexCacheError(f"{path}: {e}") from e
+
+
+class IndexCache:
+    """Index files in ``directory``; with no directory every index is built in memory."""
+
+    def __init__(self, directory: Optional[Union[str, Path]]) -> None:
+        self.directory = Path(directory) if directory is not None else None
+        self.hits = 0
+        self.builds = 0
+
+    def path(self, name: str, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{name}-{key}.idx"
+
+    def load_or_build(
+        self,
+        name: str,
+        content_hash: str,
+        build: Callable[[], Sections],
+        version: int = 1,
+    ) -> Sections:
+        """Sections of index ``name`` for ``content_hash``, building and saving on a miss."""
+        if self.directory is None:
+            self.builds += 1
+            return build()
+        key = cache_key(name, content_hash, version)
+        path = self.path(name, key)
+        if path.exists():
+            try:
+                sections = read_index(path, key)
+            except (IndexCacheError, OSError):
+                pass
+            else:
+                self.hits += 1
+                return sections
+        sections = build()
+        self.builds += 1
+        try:
+            write_index(path, key, sections)
+        except OSError:
+            return sections  # read-only or full disk: serve from memory
+        for stale in self.directory.glob(f"{name}-*.idx"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        return sections
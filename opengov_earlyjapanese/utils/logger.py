@@ -1,35 +1,206 @@
-"""Logging utilities using structlog if available, fallback to stdlib."""
+"""Logging utilities using structlog if available, fallback to stdlib.
+
+Logging is configured once per process, on the first :func:`get_logger`
+call or explicitly with :func:`configure_logging` at startup, from
+``settings.log_level`` and ``settings.log_format``. Callers only enqueue
+records: a ``QueueListener`` thread renders them and writes to the
+stream, so request handlers never block on log I/O. DEBUG records are
+rate-limited per logger.
+"""
 
 from __future__ import annotations
 
+import atexit
 import logging
-from typing import Any
+import os
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, TextIO
 
+HANDLER_NAME = "opengov-queue"
 
-def get_logger(name: str) -> Any:
-    try:
+# Libraries that log every request or event at INFO/DEBUG; kept at WARNING so
+# clients such as ``loadtest`` do not put one record per request on the queue
+QUIET_LOGGERS = ("httpx", "httpcore", "asyncio")
+
+_lock = threading.Lock()
+_configured = False
+_use_structlog = False
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Enqueue records as they are; rendering happens on the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class DebugSampler(logging.Filter):
+    """Token bucket per logger for records at or below ``level``.
+
+    Each logger may emit ``burst`` such records at once and ``rate`` per
+    second after that; the rest are dropped and counted in ``dropped``.
+    A ``rate`` of 0 disables sampling.
+    """
+
+    def __init__(
+        self, rate: float, burst: int, level: int = logging.DEBUG, clock: Any = time.monotonic
+    ) -> None:
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.level = level
+        self.clock = clock
+        self.dropped = 0
+        self._buckets: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate <= 0 or record.levelno > self.level:
+            return True
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.setdefault(record.name, [float(self.burst), now])
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True
+            self.dropped += 1
+            return False
+
+
+def _output_handler(fmt: str, stream: TextIO, use_structlog: bool) -> logging.Handler:
+    handler = logging.StreamHandler(stream)
+    if use_structlog:
         import structlog
 
-        structlog.configure(
-            processors=[
-                structlog.processors.add_log_level,
-                structlog.processors.TimeStamper(fmt="iso"),
-                structlog.processors.JSONRenderer(),
-            ],
-            wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
-            cache_logger_on_first_use=True,
+        renderer: Any = (
+            structlog.processors.JSONRenderer()
+            if fmt == "json"
+            else structlog.dev.ConsoleRenderer(colors=False)
         )
-        return structlog.get_logger(name)
-    except Exception:
-        logger = logging.getLogger(name)
-        if not logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter(
+        handler.setFormatter(
+            structlog.stdlib.ProcessorFormatter(
+                processor=renderer,
+                foreign_pre_chain=[
+                    structlog.stdlib.add_log_level,
+                    structlog.processors.TimeStamper(fmt="iso"),
+                ],
+            )
+        )
+    else:
+        handler.setFormatter(
+            logging.Formatter(
                 fmt="%(asctime)s %(levelname)s %(name)s - %(message)s",
                 datefmt="%Y-%m-%dT%H:%M:%S",
             )
-            handler.setFormatter(formatter)
-            logger.addHandler(handler)
-            logger.setLevel(logging.INFO)
-        return logger
+        )
+    return handler
+
+
+def _remove_queue_handlers(root: logging.Logger) -> None:
+    for handler in [h for h in root.handlers if h.get_name() == HANDLER_NAME]:
+        listener = getattr(handler, "listener", None)
+        if listener is not None:
+            listener.stop()
+        root.removeHandler(handler)
+
+
+def configure_logging(
+    level: str | None = None,
+    fmt: str | None = None,
+    stream: TextIO | None = None,
+    force: bool = False,
+) -> None:
+    """Install the queue handler and background writer; later calls are no-ops.
+
+    ``level`` and ``fmt`` default to ``settings.log_level`` and
+    ``settings.log_format`` (``json`` or ``console``). ``force``
+    replaces an existing configuration.
+    """
+    global _configured, _use_structlog
+    with _lock:
+        if _configured and not force:
+            return
+        from opengov_earlyjapanese.config import settings
+
+        numeric = logging.getLevelName((level or settings.log_level).upper())
+        if not isinstance(numeric, int):
+            numeric = logging.INFO
+        try:
+            import structlog
+        except ImportError:
+            structlog = None  # type: ignore[assignment]
+        use_structlog = structlog is not None
+
+        root = logging.getLogger()
+        _remove_queue_handlers(root)
+        records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        handler = _DeferredQueueHandler(records)
+        handler.set_name(HANDLER_NAME)
+        handler.addFilter(
+            DebugSampler(settings.log_debug_sample_rate, settings.log_debug_sample_burst)
+        )
+        output = _output_handler(fmt or settings.log_format, stream or sys.stderr, use_structlog)
+        listener = QueueListener(records, output)
+        handler.listener = listener  # type: ignore[attr-defined]
+        root.addHandler(handler)
+        root.setLevel(numeric)
+        for name in QUIET_LOGGERS:
+            logging.getLogger(name).setLevel(max(numeric, logging.WARNING))
+        listener.start()
+
+        if use_structlog:
+            structlog.configure(
+                processors=[
+                    structlog.stdlib.add_log_level,
+                    structlog.processors.TimeStamper(fmt="iso"),
+                    structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+                ],
+                logger_factory=structlog.stdlib.LoggerFactory(),
+                wrapper_class=structlog.make_filtering_bound_logger(numeric),
+                cache_logger_on_first_use=True,
+            )
+        _use_structlog = use_structlog
+        _configured = True
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and remove the handler; the next call reconfigures."""
+    global _configured
+    with _lock:
+        _remove_queue_handlers(logging.getLogger())
+        _configured = False
 
+
+def _restart_in_child() -> None:
+    # The listener thread does not survive fork; give the child its own
+    for handler in logging.getLogger().handlers:
+        listener = getattr(handler, "listener", None)
+        if handler.get_name() == HANDLER_NAME and listener is not None:
+            records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+            handler.queue = records  # type: ignore[attr-defined]
+            listener.queue = records
+            listener._thread = None
+            listener.start()
+
+
+# Guarded so that reloading this module does not register the hooks twice
+if "_hooks_registered" not in globals():
+    atexit.register(shutdown_logging)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_restart_in_child)
+    _hooks_registered = True
+
+
+def get_logger(name: str) -> Any:
+    configure_logging()
+    if _use_structlog:
+        import structlog
+
+        return structlog.get_logger(name)
+    return logging.getLogger(name)
@@ -0,0 +1,296 @@
+"""Profiling helpers: a stack sampler and a bounded store of captured profiles."""
+
+import contextlib
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import FrameType
+from typing import Dict, List, Optional
+
+# A worker's file not rewritten for this many flush intervals is from a worker
+# that has exited
+STALE_AFTER_FLUSHES = 3
+
+# Leaf frames in these files mean the thread is parked, not doing work
+_IDLE_FILES = frozenset({"threading.py", "selectors.py", "queue.py"})
+
+
+def frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    parts = code.co_filename.replace("\\", "/").rsplit("/", 2)
+    where = "/".join(parts[-2:])
+    return f"{code.co_name} ({where}:{code.co_firstlineno})"
+
+
+def collapse(frame: FrameType) -> str:
+    """Root-first ``a;b;c`` stack for a frame, as used by flamegraph tools."""
+    labels: List[str] = []
+    f: Optional[FrameType] = frame
+    while f is not None:
+        labels.append(frame_label(f))
+        f = f.f_back
+    return ";".join(reversed(labels))
+
+
+def is_idle(frame: FrameType) -> bool:
+    return os.path.basename(frame.f_code.co_filename) in _IDLE_FILES
+
+
+def render_collapsed(stacks: "Counter[str]") -> str:
+    """Collapsed-stack text: one ``stack count`` line per distinct stack."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def parse_collapsed(text: str) -> "Counter[str]":
+    stacks: Counter[str] = Counter()
+    for line in text.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if stack and count.isdigit():
+            stacks[stack] += int(count)
+    return stacks
+
+
+def merge_collapsed_dir(directory: Path, max_age: Optional[float] = None) -> "Counter[str]":
+    """Sum the ``*.collapsed`` files written by each worker's sampler.
+
+    With ``max_age`` set, files not rewritten within that many seconds are
+    skipped: running samplers flush periodically, so those belong to
+    workers that have exited.
+    """
+    cutoff = time.time() - max_age if max_age else None
+    merged: Counter[str] = Counter()
+    for path in sorted(Path(directory).glob("*.collapsed")):
+        try:
+            if cutoff is not None and path.stat().st_mtime < cutoff:
+                continue
+            text = path.read_text(encoding="utf-8")
+        except FileNotFoundError:  # removed by a worker that just stopped
+            continue
+        merged.update(parse_collapsed(text))
+    return merged
+
+
+class StackSampler:
+    """Sample the stacks of busy threads at a fixed interval on a daemon thread."""
+
+    def __init__(self, interval: float = 0.001, thread_ids: Optional[Iterable[int]] = None) -> None:
+        self.interval = interval
+        self.thread_ids = frozenset(thread_ids) if thread_ids is not None else None
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample_once(self) -> None:
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own or (self.thread_ids is not None and ident not in self.thread_ids):
+                continue
+            if is_idle(frame):
+                continue
+            self.stacks[collapse(frame)] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample_once()
+
+    def start(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "Counter[str]":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+
+@dataclass
+class StoredProfile:
+    method: str
+    path: str
+    duration_ms: float
+    pstats: bytes
+    collapsed: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    created: float = field(default_factory=time.time)
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "duration_ms": round(self.duration_ms, 3),
+            "created": self.created,
+        }
+
+
+class ProfileStore:
+    """Most recent profiles, oldest evicted first."""
+
+    def __init__(self, max_profiles: int) -> None:
+        self.max_profiles = max_profiles
+        self._profiles: OrderedDict[str, StoredProfile] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: StoredProfile) -> None:
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[StoredProfile]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[StoredProfile]:
+        with self._lock:
+            return list(reversed(self._profiles.values()))
+
+
+class ContinuousSampler:
+    """Always-on background sampler with a bounded stack buffer.
+
+    Every ``interval`` seconds the stacks of all busy threads are added to
+    a counter holding at most ``max_stacks`` distinct stacks; once full,
+    unseen stacks are counted under ``[other]``. The sampler times its own
+    work over windows of ``window`` seconds: when its share of wall time in
+    a window exceeds ``max_overhead`` the interval doubles, up to
+    ``max_interval``, and when it falls well below the budget the interval
+    halves back toward the configured one. With ``output_dir`` set, the
+    counts are written to ``<output_dir>/<pid>.collapsed`` every
+    ``flush_interval`` seconds so that samples from all worker processes
+    can be merged; the file is removed when the sampler stops.
+    """
+
+    OTHER = "[other]"
+
+    def __init__(
+        self,
+        interval: float = 0.01,
+        max_stacks: int = 5000,
+        max_overhead: float = 0.01,
+        output_dir: Optional[Path] = None,
+        flush_interval: float = 10.0,
+        max_interval: float = 1.0,
+        window: float = 1.0,
+    ) -> None:
+        self.base_interval = interval
+        self.interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.window = window
+        self.max_stacks = max_stacks
+        self.max_overhead = max_overhead
+        self.output_dir = Path(output_dir) if output_dir is not None else None
+        self.flush_interval = flush_interval
+        self.samples = 0
+        self.busy_seconds = 0.0
+        self.recent_overhead = 0.0
+        self._window_start = 0.0
+        self._window_busy = 0.0
+        self._stacks: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def overhead(self) -> float:
+        """Fraction of wall time spent sampling since start."""
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        return self.busy_seconds / elapsed if elapsed > 0 else 0.0
+
+    def sample_once(self) -> None:
+        begin = time.perf_counter()
+        own = threading.get_ident()
+        batch = [
+            collapse(frame)
+            for ident, frame in sys._current_frames().items()
+            if ident != own and not is_idle(frame)
+        ]
+        with self._lock:
+            for stack in batch:
+                if stack in self._stacks or len(self._stacks) < self.max_stacks:
+                    self._stacks[stack] += 1
+                else:
+                    self._stacks[self.OTHER] += 1
+        self.samples += 1
+        busy = time.perf_counter() - begin
+        self.busy_seconds += busy
+        self._window_busy += busy
+
+    def adapt(self, now: float) -> None:
+        """Retune the interval from the overhead of the window ending at ``now``."""
+        elapsed = now - self._window_start
+        if elapsed < self.window:
+            return
+        self.recent_overhead = self._window_busy / elapsed
+        if self.recent_overhead > self.max_overhead:
+            self.interval = min(self.interval * 2, self.max_interval)
+        elif self.recent_overhead < self.max_overhead / 4:
+            self.interval = max(self.interval / 2, self.base_interval)
+        self._window_start = now
+        self._window_busy = 0.0
+
+    def _run(self) -> None:
+        next_flush = time.monotonic() + self.flush_interval
+        while not self._stop.wait(self.interval):
+            self.sample_once()
+            self.adapt(time.perf_counter())
+            if self.output_dir is not None and time.monotonic() >= next_flush:
+                self.flush()
+                next_flush = time.monotonic() + self.flush_interval
+
+    def start(self) -> "ContinuousSampler":
+        if not self.running:
+            self._stop.clear()
+            self._started = self._window_start = time.perf_counter()
+            self._window_busy = 0.0
+            self._thread = threading.Thread(
+                target=self._run, name="continuous-sampler", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.output_dir is not None:
+            with contextlib.suppress(FileNotFoundError):
+                self._output_path().unlink()
+
+    def snapshot(self) -> "Counter[str]":
+        with self._lock:
+            return Counter(self._stacks)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stacks.clear()
+
+    def _output_path(self) -> Path:
+        assert self.output_dir is not None
+        return self.output_dir / f"{os.getpid()}.collapsed"
+
+    def flush(self) -> Optional[Path]:
+        """Atomically write this process's counts to ``output_dir``."""
+        if self.output_dir is None:
+            return None
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self._output_path()
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(render_collapsed(self.snapshot()), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
@@ -0,0 +1,94 @@
+"""Single-flight execution: concurrent identical calls share one computation.
+
+The first caller for a key (the leader) runs the function; callers that
+arrive while it is in flight wait for and receive the leader's result or
+exception. Nothing is remembered once the call completes, so this pairs
+with a cache rather than replacing one.
+"""
+
+import asyncio
+import json
+import threading
+from collections.abc import Awaitable, Hashable
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def call_key(*args: Any, **kwargs: Any) -> str:
+    """Normalised key for a call signature; keyword order does not matter."""
+    return json.dumps([args, kwargs], sort_keys=True, ensure_ascii=False, default=repr)
+
+
+class _Call(Generic[T]):
+    __slots__ = ("done", "error", "result", "waiters")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Thread-based single flight."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call[Any]] = {}
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result  # type: ignore[return-value]
+
+
+class AsyncSingleFlight:
+    """Event-loop single flight.
+
+    The shared work runs as its own task and waiters are shielded from it,
+    so a caller that disconnects does not cancel the computation for the
+    others still waiting.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, asyncio.Future[Any]] = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda f: self._finish(key, f))
+        return await asyncio.shield(future)
+
+    def _finish(self, key: Hashable, future: "asyncio.Future[Any]") -> None:
+        self._calls.pop(key, None)
+        # Mark the exception retrieved even if every waiter was cancelled
+        if not future.cancelled():
+            future.exception()
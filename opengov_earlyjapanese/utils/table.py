@@ -0,0 +1,107 @@
+"""Plain-text tables measured in terminal columns rather than code points.
+
+Full-width kana and kanji occupy two columns and combining marks none, so
+padding and truncation use :func:`display_width`. :class:`TableRenderer`
+streams rows: column widths come from the first ``sample`` rows (or are
+fixed up front) and later rows that do not fit are truncated, so output
+starts immediately and memory stays bounded by the sample.
+"""
+
+import unicodedata
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import islice
+from typing import Any, List, Optional
+
+ELLIPSIS = "…"
+SEPARATOR = " | "
+RULE_JOINT = "-+-"
+
+
+def char_width(ch: str) -> int:
+    if unicodedata.combining(ch) or unicodedata.category(ch) in ("Mn", "Me", "Cf"):
+        return 0
+    return 2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1
+
+
+def display_width(text: str) -> int:
+    """Number of terminal columns ``text`` occupies."""
+    if text.isascii():
+        return len(text)
+    return sum(char_width(ch) for ch in text)
+
+
+def truncate(text: str, width: int, ellipsis: str = ELLIPSIS) -> str:
+    """Cut ``text`` to at most ``width`` columns, marking the cut with ``ellipsis``."""
+    if display_width(text) <= width:
+        return text
+    budget = width - display_width(ellipsis)
+    if budget < 0:
+        return ""
+    used = 0
+    out: List[str] = []
+    for ch in text:
+        w = char_width(ch)
+        if used + w > budget:
+            break
+        out.append(ch)
+        used += w
+    return "".join(out) + ellipsis
+
+
+def pad(text: str, width: int) -> str:
+    """Left-align ``text`` in ``width`` columns."""
+    return text + " " * max(0, width - display_width(text))
+
+
+class TableRenderer:
+    """Render rows as `` | ``-separated lines, one line at a time.
+
+    With ``widths`` given, nothing is buffered. Otherwise widths are the
+    widest cell (or header) within the first ``sample`` rows, capped at
+    ``max_width`` columns.
+    """
+
+    def __init__(
+        self,
+        headers: Sequence[str],
+        sample: int = 100,
+        widths: Optional[Sequence[int]] = None,
+        max_width: Optional[int] = None,
+    ) -> None:
+        self.headers = [str(h) for h in headers]
+        self.sample = sample
+        self.widths = list(widths) if widths is not None else None
+        self.max_width = max_width
+
+    def _measure(self, rows: List[List[str]]) -> List[int]:
+        widths = [display_width(h) for h in self.headers]
+        for row in rows:
+            for i, cell in enumerate(row):
+                widths[i] = max(widths[i], display_width(cell))
+        if self.max_width is not None:
+            widths = [min(w, self.max_width) for w in widths]
+        return widths
+
+    def format_row(self, cells: Sequence[Any], widths: Sequence[int]) -> str:
+        return SEPARATOR.join(
+            pad(truncate(str(c), widths[i]), widths[i]) for i, c in enumerate(cells)
+        )
+
+    def rule(self, widths: Sequence[int]) -> str:
+        return RULE_JOINT.join("-" * w for w in widths)
+
+    def render(self, rows: Iterable[Sequence[Any]]) -> Iterator[str]:
+        """Yield the header, the rule, then one line per row."""
+        it = iter(rows)
+        head: List[List[str]] = []
+        if self.widths is None:
+            head = [[str(c) for c in row] for row in islice(it, self.sample)]
+            widths = self._measure(head)
+        else:
+            widths = self.widths
+        yield self.format_row(self.headers, widths)
+        yield self.rule(widths)
+        for row in head:
+            yield self.format_row(row, widths)
+        for cells in it:
+            yield self.format_row(cells, widths)
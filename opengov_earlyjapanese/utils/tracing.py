@@ -0,0 +1,334 @@
+"""Lightweight tracing spans with OpenTelemetry-style semantics.
+
+Spans carry a 128-bit trace id and 64-bit span id, nest through a context
+variable (so they follow ``await`` and threads started with a copied
+context), and finish with a status, attributes and events such as
+``exception``, using the OpenTelemetry names. Finished spans go to an
+exporter: :class:`InMemoryExporter` for tests and the admin endpoint, or
+:class:`FileExporter`, which appends one JSON object per line for offline
+inspection with :func:`read_spans` and :func:`summarize`.
+
+With no exporter configured, :meth:`Tracer.start_span` returns a shared
+no-op span and :func:`traced` calls straight through, so instrumented code
+pays one attribute check per call.
+"""
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Iterable, Sequence
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    TypeVar,
+    Union,
+)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_current: "ContextVar[Optional[Span]]" = ContextVar("opengov_current_span", default=None)
+
+
+class Span:
+    """One timed operation; use as a context manager to make it current."""
+
+    __slots__ = (
+        "_token",
+        "_tracer",
+        "attributes",
+        "end_time_unix_nano",
+        "events",
+        "kind",
+        "name",
+        "parent_span_id",
+        "span_id",
+        "start_time_unix_nano",
+        "status_code",
+        "status_description",
+        "trace_id",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        parent: Optional["Span"] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: str = "INTERNAL",
+    ) -> None:
+        self.name = name
+        self.kind = kind
+        self.trace_id: str = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent.span_id if parent is not None else None
+        self.start_time_unix_nano = time.time_ns()
+        self.end_time_unix_nano: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Dict[str, Any]] = []
+        self.status_code = "UNSET"
+        self.status_description = ""
+        self._tracer = tracer
+        self._token: Optional[Token[Optional[Span]]] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_time_unix_nano or time.time_ns()
+        return (end - self.start_time_unix_nano) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        self.events.append(
+            {"name": name, "time_unix_nano": time.time_ns(), "attributes": dict(attributes or {})}
+        )
+
+    def set_status(self, code: str, description: str = "") -> None:
+        self.status_code = code
+        self.status_description = description
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.add_event(
+            "exception",
+            {"exception.type": type(exc).__qualname__, "exception.message": str(exc)},
+        )
+        self.set_status("ERROR", f"{type(exc).__qualname__}: {exc}")
+
+    def end(self) -> None:
+        if self.end_time_unix_nano is None:
+            self.end_time_unix_nano = time.time_ns()
+            self._tracer._export(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Optional[BaseException], tb: Any) -> None:
+        if exc is not None:
+            self.record_exception(exc)
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+        self.end()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "start_time_unix_nano": self.start_time_unix_nano,
+            "end_time_unix_nano": self.end_time_unix_nano,
+            "attributes": self.attributes,
+            "events": self.events,
+            "status": {"code": self.status_code, "description": self.status_description},
+        }
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled; every method does nothing."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+    def set_status(self, code: str, description: str = "") -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class InMemoryExporter:
+    """Keep the most recent ``maxlen`` finished spans."""
+
+    def __init__(self, maxlen: int = 10_000) -> None:
+        self._spans: Deque[Span] = deque(maxlen=maxlen)
+
+    def export(self, span: Span) -> None:
+        self._spans.append(span)
+
+    def get_finished_spans(self) -> List[Span]:
+        return list(self._spans)
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileExporter:
+    """Append finished spans to ``path`` as JSON lines."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the configured exporter."""
+
+    def __init__(self) -> None:
+        self.exporter: Optional[Any] = None
+        self.enabled = False
+
+    def configure(self, exporter: Any) -> None:
+        """Start exporting to ``exporter``, shutting down the previous one."""
+        previous = self.exporter
+        self.exporter = exporter
+        self.enabled = True
+        if previous is not None and previous is not exporter:
+            previous.shutdown()
+
+    def disable(self) -> None:
+        self.enabled = False
+        exporter, self.exporter = self.exporter, None
+        if exporter is not None:
+            exporter.shutdown()
+
+    def start_span(
+        self, name: str, attributes: Optional[Dict[str, Any]] = None, kind: str = "INTERNAL"
+    ) -> Any:
+        """Span for ``with`` blocks, child of the current span if there is one."""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, _current.get(), attributes, kind)
+
+    def _export(self, span: Span) -> None:
+        exporter = self.exporter
+        if exporter is not None:
+            exporter.export(span)
+
+
+tracer = Tracer()
+
+
+def current_span() -> Any:
+    """The active span, or the no-op span outside of any."""
+    span = _current.get()
+    return span if span is not None else NOOP_SPAN
+
+
+def traced(name: Optional[str] = None, record: Sequence[str] = ()) -> Callable[[F], F]:
+    """Run the decorated function in a span named ``name`` (default: its qualname).
+
+    Arguments named in ``record`` are added as span attributes.
+    """
+
+    def decorate(func: F) -> F:
+        span_name = name or func.__qualname__
+        signature = inspect.signature(func) if record else None
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            attributes: Dict[str, Any] = {"code.function": func.__qualname__}
+            if signature is not None:
+                bound = signature.bind_partial(*args, **kwargs).arguments
+                attributes.update((k, bound[k]) for k in record if k in bound)
+            with tracer.start_span(span_name, attributes):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def setup_tracing() -> None:
+    """Configure the global tracer from settings; a no-op unless tracing is enabled."""
+    from opengov_earlyjapanese.config import settings
+
+    if not settings.tracing_enabled:
+        return
+    if settings.tracing_file is not None:
+        tracer.configure(FileExporter(settings.tracing_file))
+    else:
+        tracer.configure(InMemoryExporter(settings.tracing_max_spans))
+
+
+def read_spans(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """Load spans written by :class:`FileExporter`, skipping truncated lines."""
+    spans = []
+    with Path(path).open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                spans.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return spans
+
+
+def _duration_ms(span: Dict[str, Any]) -> float:
+    end = span.get("end_time_unix_nano") or span["start_time_unix_nano"]
+    return float(end - span["start_time_unix_nano"]) / 1e6
+
+
+def summarize(spans: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per span name: count, total and self time (total minus direct children), errors.
+
+    Sorted by self time, so the top rows are where the time actually went.
+    """
+    spans = list(spans)
+    children_ms: Dict[str, float] = defaultdict(float)
+    for span in spans:
+        if span.get("parent_span_id"):
+            children_ms[span["parent_span_id"]] += _duration_ms(span)
+    stats: Dict[str, Dict[str, Any]] = {}
+    for span in spans:
+        name = span["name"]
+        if name not in stats:
+            stats[name] = {"name": name, "count": 0, "total_ms": 0.0, "self_ms": 0.0, "errors": 0}
+        entry = stats[name]
+        duration = _duration_ms(span)
+        entry["count"] += 1
+        entry["total_ms"] += duration
+        entry["self_ms"] += max(0.0, duration - children_ms.get(span["span_id"], 0.0))
+        if span.get("status", {}).get("code") == "ERROR":
+            entry["errors"] += 1
+    rows = sorted(stats.values(), key=lambda e: e["self_ms"], reverse=True)
+    for entry in rows:
+        entry["mean_ms"] = round(entry["total_ms"] / entry["count"], 3)
+        entry["total_ms"] = round(entry["total_ms"], 3)
+        entry["self_ms"] = round(entry["self_ms"], 3)
+    return rows
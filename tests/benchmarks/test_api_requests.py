@@ -0,0 +1,31 @@
+"""End-to-end request handling through the ASGI app."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from opengov_earlyjapanese.api.main import app
+
+pytestmark = pytest.mark.benchmark(group="api")
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def test_health(benchmark, client):
+    assert benchmark(client.get, "/health").status_code == 200
+
+
+def test_hiragana_row(benchmark, client):
+    assert benchmark(client.get, "/hiragana/ka_row").status_code == 200
+
+
+def test_listing_page(benchmark, client):
+    assert benchmark(client.get, "/katakana", params={"limit": 50}).status_code == 200
+
+
+def test_kanji_analyze_cached(benchmark, client):
+    body = {"text": "日本語を勉強しています。"}
+    assert benchmark(client.post, "/kanji/analyze", json=body).status_code == 200
@@ -0,0 +1,53 @@
+"""Per-keystroke autocomplete latency over a large vocabulary.
+
+The trie is built once from 100k synthetic entries with Japanese words,
+readings and English meanings; queries cover kana, kanji, English and
+romaji, including an unfinished syllable that fans out to several kana.
+"""
+
+import random
+
+import pytest
+
+from opengov_earlyjapanese.core.autocomplete import Autocompleter, build_sections, vocabulary_terms
+from opengov_earlyjapanese.core.models import Vocabulary
+
+pytestmark = pytest.mark.benchmark(group="autocomplete")
+
+ENTRIES = 100_000
+KANA = "あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわん"
+KANJI = "日本語学生水大小山川人口手目耳木金土火月年時間先今行来食飲見聞読書話"
+WORDS = ["water", "eat", "drink", "see", "hear", "read", "write", "big", "small", "time"]
+
+
+def synthetic(n):
+    rng = random.Random(0)
+    for i in range(n):
+        yield Vocabulary(
+            id=f"v{i}",
+            word="".join(rng.choice(KANJI) for _ in range(rng.randint(1, 3))) + str(i % 7),
+            reading="".join(rng.choice(KANA) for _ in range(rng.randint(2, 6))),
+            meanings=[f"to {rng.choice(WORDS)} {rng.choice(WORDS)}"],
+            part_of_speech="noun",
+            jlpt_level="N5",
+            frequency_rank=i + 1,
+        )
+
+
+@pytest.fixture(scope="module")
+def sections():
+    return build_sections(vocabulary_terms(synthetic(ENTRIES)))
+
+
+def test_build(benchmark):
+    entries = list(synthetic(ENTRIES // 10))
+    trie = benchmark.pedantic(
+        lambda: Autocompleter(build_sections(vocabulary_terms(entries))), rounds=3
+    )
+    assert len(trie) == ENTRIES // 10
+
+
+@pytest.mark.parametrize("query", ["に", "にほ", "日本", "to ea", "k", "kan", "tam"])
+def test_keystroke(benchmark, sections, query):
+    trie = Autocompleter(sections)
+    assert benchmark(trie.complete, query)
@@ -0,0 +1,52 @@
+"""Substring counts over a 200k-sentence concordance.
+
+A grammar fragment counted by binary search of the mapped suffix array,
+against counting it by scanning the corpus text, which is what grepping
+the sentences costs per query.
+"""
+
+import random
+
+import pytest
+
+from opengov_earlyjapanese.core.concordance import KEY, Concordance, build_sections
+from opengov_earlyjapanese.utils.index_cache import write_index
+
+pytestmark = pytest.mark.benchmark(group="concordance")
+
+SENTENCES = 200_000
+KANJI = "日本語学生水大小山川人口手目耳木金土火月年時間先今行来食飲見聞読書話愛心"
+ENDINGS = ["ている。", "ました。", "です。", "でしょう。", "たい。", "なければならない。"]
+
+
+@pytest.fixture(scope="module")
+def sentences():
+    rng = random.Random(0)
+    return [
+        "".join(rng.choices(KANJI, k=3)) + rng.choice("をがにで") + rng.choice(ENDINGS)
+        for _ in range(SENTENCES)
+    ]
+
+
+@pytest.fixture(scope="module")
+def concordance(tmp_path_factory, sentences):
+    path = tmp_path_factory.mktemp("concordance") / "concordance.idx"
+    write_index(path, KEY, build_sections(sentences))
+    return Concordance.open(path)
+
+
+def test_count_by_suffix_array(benchmark, concordance, sentences):
+    """Two binary searches over the suffix array."""
+    expected = sum(s.count("ればなら") for s in sentences)
+    assert benchmark(concordance.count, "ればなら") == expected
+
+
+def test_kwic_by_suffix_array(benchmark, concordance):
+    """Twenty context windows, as the API returns them."""
+    assert len(benchmark(concordance.kwic, "ればなら")) == 20
+
+
+def test_count_by_scan(benchmark, sentences):
+    """The same count by scanning every sentence, for comparison."""
+    text = "\n".join(sentences)
+    assert benchmark(text.count, "ればなら") > 0
@@ -0,0 +1,43 @@
+"""Teacher construction, lesson lookup and search."""
+
+import pytest
+
+from opengov_earlyjapanese.core.grammar import GrammarTeacher
+from opengov_earlyjapanese.core.hiragana import HiraganaTeacher
+from opengov_earlyjapanese.core.kanji import KanjiMaster
+from opengov_earlyjapanese.core.katakana import KatakanaTeacher
+from opengov_earlyjapanese.core.registry import get_hiragana_teacher, get_katakana_teacher
+from opengov_earlyjapanese.core.search import search_characters
+
+pytestmark = pytest.mark.benchmark(group="content")
+
+
+@pytest.mark.parametrize(
+    "teacher",
+    [HiraganaTeacher, KatakanaTeacher, KanjiMaster, GrammarTeacher],
+    ids=lambda t: t.__name__,
+)
+def test_teacher_construction(benchmark, teacher):
+    assert benchmark(teacher) is not None
+
+
+def test_hiragana_lesson_lookup(benchmark):
+    teacher = get_hiragana_teacher()
+    lesson = benchmark(teacher.get_lesson, "ka_row")
+    assert lesson.characters
+
+
+def test_katakana_lesson_lookup(benchmark):
+    teacher = get_katakana_teacher()
+    lesson = benchmark(teacher.get_lesson, "ka_row")
+    assert lesson.characters
+
+
+def test_mnemonic_lookup(benchmark):
+    teacher = get_hiragana_teacher()
+    assert benchmark(teacher.get_mnemonic, "あ")
+
+
+@pytest.mark.parametrize("query", ["a", "ka", "あ", "zzz"])
+def test_search(benchmark, query):
+    benchmark(search_characters, query)
@@ -0,0 +1,54 @@
+"""Corpus analysis throughput, in one process.
+
+A synthetic corpus of short sentences (about 2 MB) is analysed line by
+line, with and without vocabulary grading; workers scale this by the
+number of cores, as chunks are independent.
+"""
+
+import random
+
+import pytest
+
+from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.core.difficulty import iter_corpus, level_tables
+
+pytestmark = pytest.mark.benchmark(group="corpus")
+
+SENTENCES = [
+    "私は学生です。",
+    "今日は水を食べました。",
+    "日本語を勉強しています。",
+    "カタカナのテストは難しい",
+    "大きい家に住んでいる。",
+    "ABC 123 と書いてあります",
+]
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    rng = random.Random(0)
+    path = tmp_path_factory.mktemp("corpus") / "corpus.txt"
+    with path.open("w", encoding="utf-8") as f:
+        for _ in range(80_000):
+            f.write(rng.choice(SENTENCES) + "\n")
+    return path
+
+
+@pytest.fixture(scope="module")
+def tables():
+    return level_tables()
+
+
+def _run(corpus, tables, words):
+    return sum(1 for _ in iter_corpus([corpus], "line", 1, words=words, tables=tables))
+
+
+def test_scripts_and_kanji(benchmark, corpus, tables):
+    """Character classes and kanji levels only."""
+    assert benchmark(_run, corpus, tables, False) == 80_000
+
+
+def test_with_vocabulary(benchmark, corpus, tables, monkeypatch):
+    """Also tokenizing runs to grade vocabulary."""
+    monkeypatch.setattr(settings, "tokenizer_backend", "builtin")
+    assert benchmark(_run, corpus, tables, True) == 80_000
@@ -0,0 +1,94 @@
+"""Tail latency of a cheap endpoint while CPU-heavy requests are in flight.
+
+Runs the same heavy workload inline on the event loop and through the
+process pool, and records the /health latency percentiles of both in the
+benchmark's ``extra_info``.
+"""
+
+import asyncio
+import os
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from opengov_earlyjapanese.api import executor
+
+pytestmark = pytest.mark.benchmark
+
+CHEAP_REQUESTS = 50
+HEAVY_EVERY = 10  # one heavy request is started every N cheap ones
+
+
+def _cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not available on macOS/Windows
+        return os.cpu_count() or 1
+
+
+def burn(seconds: float) -> int:
+    end = time.perf_counter() + seconds
+    n = 0
+    while time.perf_counter() < end:
+        n += 1
+    return n
+
+
+def _make_app(offload: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/heavy")
+    async def heavy():
+        if offload:
+            return {"n": await executor.run_cpu_bound(burn, 0.05)}
+        return {"n": burn(0.05)}
+
+    return app
+
+
+def _p(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def _cheap_latencies(app: FastAPI):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        heavy = []
+        latencies = []
+        for i in range(CHEAP_REQUESTS):
+            if i % HEAVY_EVERY == 0:
+                heavy.append(asyncio.ensure_future(client.get("/heavy")))
+            start = time.perf_counter()
+            # In-process transport never suspends on I/O; yield once as a socket read would
+            await asyncio.sleep(0)
+            await client.get("/health")
+            latencies.append(time.perf_counter() - start)
+        await asyncio.gather(*heavy)
+    return latencies
+
+
+def test_cheap_latency_flat_under_offloaded_load(benchmark):
+    executor.start_pool(workers=2)
+    try:
+        inline = asyncio.run(_cheap_latencies(_make_app(offload=False)))
+        offloaded = benchmark.pedantic(
+            lambda: asyncio.run(_cheap_latencies(_make_app(offload=True))), rounds=3
+        )
+    finally:
+        executor.shutdown_pool()
+    benchmark.extra_info.update(
+        inline_p50_ms=_p(inline, 0.5) * 1000,
+        inline_p99_ms=_p(inline, 0.99) * 1000,
+        offloaded_p50_ms=_p(offloaded, 0.5) * 1000,
+        offloaded_p99_ms=_p(offloaded, 0.99) * 1000,
+    )
+    # With a single core the pool workers compete with the event loop for the CPU
+    if _cores() > 1:
+        assert _p(offloaded, 0.99) < _p(inline, 0.99)
@@ -0,0 +1,74 @@
+"""Furigana for a reader page, cold and from the sentence cache.
+
+The article is 200 distinct sentences over a 20k-word synthetic lexicon;
+a reader page re-renders it for every learner, which is the cached case.
+"""
+
+import random
+
+import pytest
+
+from opengov_earlyjapanese.core.furigana import FuriganaAnnotator
+from opengov_earlyjapanese.core.models import Vocabulary
+from opengov_earlyjapanese.core.tokenizer import (
+    DictionaryTokenizer,
+    build_sections,
+    function_entries,
+    vocabulary_entries,
+)
+
+pytestmark = pytest.mark.benchmark(group="furigana")
+
+ENTRIES = 20_000
+KANA = "あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわ"
+KANJI = "日本語学生水大小山川人口手目耳木金土火月年時間先今行来食飲見聞読書話"
+PARTICLES = ["は", "が", "を", "に", "で", "と", "も"]
+
+
+@pytest.fixture(scope="module")
+def vocabulary():
+    rng = random.Random(0)
+    return [
+        Vocabulary(
+            id=f"v{i}",
+            word="".join(rng.choice(KANJI) for _ in range(rng.randint(1, 3))),
+            reading="".join(rng.choice(KANA) for _ in range(rng.randint(2, 5))),
+            meanings=["x"],
+            part_of_speech="noun",
+            jlpt_level="N5",
+            frequency_rank=i + 1,
+        )
+        for i in range(ENTRIES)
+    ]
+
+
+@pytest.fixture(scope="module")
+def tokenizer(vocabulary):
+    sections = build_sections([*function_entries(), *vocabulary_entries(vocabulary)])
+    return DictionaryTokenizer(sections, cache_size=0)
+
+
+@pytest.fixture(scope="module")
+def article(vocabulary):
+    rng = random.Random(1)
+    sentences = []
+    for _ in range(200):
+        words = [rng.choice(vocabulary).word + rng.choice(PARTICLES) for _ in range(5)]
+        sentences.append("".join(words) + "です。")
+    return "".join(sentences)
+
+
+def test_annotate_cold(benchmark, tokenizer, article):
+    """Every sentence segmented: what the first reader of an article pays."""
+    annotator = FuriganaAnnotator(tokenizer, cache_size=0)
+    html = benchmark(annotator.annotate, article, "html", True)
+    assert "<ruby>" in html
+
+
+def test_annotate_cached(benchmark, tokenizer, article):
+    """Sentences from the cache: only hashing and rendering remain."""
+    annotator = FuriganaAnnotator(tokenizer, cache_size=1000)
+    annotator.annotate(article, "html", True)
+    html = benchmark(annotator.annotate, article, "html", True)
+    assert "<ruby>" in html
+    assert annotator.cache.misses == 200
@@ -0,0 +1,46 @@
+"""CLI startup cost, checked against a budget.
+
+``CLI_IMPORT_BUDGET_MS`` (default 150) caps the cumulative import time of
+``opengov_earlyjapanese.cli`` as reported by ``python -X importtime``; the
+wall time of ``python -m opengov_earlyjapanese --version`` is recorded in
+the benchmark's ``extra_info``.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.benchmark(group="startup")
+
+BUDGET_MS = float(os.environ.get("CLI_IMPORT_BUDGET_MS", "150"))
+
+
+def _import_time_ms(module: str) -> float:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+def _version() -> None:
+    subprocess.run(
+        [sys.executable, "-m", "opengov_earlyjapanese", "--version"],
+        capture_output=True,
+        check=True,
+    )
+
+
+def test_cli_import_budget(benchmark):
+    benchmark.pedantic(_version, rounds=5)
+    import_ms = min(_import_time_ms("opengov_earlyjapanese.cli") for _ in range(3))
+    benchmark.extra_info.update(cli_import_ms=import_ms, budget_ms=BUDGET_MS)
+    assert import_ms < BUDGET_MS
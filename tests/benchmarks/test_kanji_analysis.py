@@ -0,0 +1,22 @@
+"""Kanji lookup and text analysis."""
+
+import pytest
+
+from opengov_earlyjapanese.core.kanji import analyze_text
+from opengov_earlyjapanese.core.registry import get_kanji_master
+
+pytestmark = pytest.mark.benchmark(group="kanji")
+
+SHORT = "日本語を勉強しています。"
+LONG = "日本語の勉強は楽しいです。漢字を毎日練習しましょう。" * 100
+
+
+def test_analyze_single(benchmark):
+    master = get_kanji_master()
+    ch = master.known_characters()[0]
+    assert benchmark(master.analyze, ch).character == ch
+
+
+@pytest.mark.parametrize("text", [SHORT, LONG], ids=["short", "long"])
+def test_analyze_text(benchmark, text):
+    benchmark(analyze_text, text)
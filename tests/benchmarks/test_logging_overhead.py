@@ -0,0 +1,69 @@
+"""Per-call cost of logging from a request handler.
+
+Compares the queued logger (records are handed to a background writer)
+with the same JSON rendering done synchronously on the caller's thread,
+writing to an in-memory stream and to a slow one (a congested pipe or
+terminal), plus a DEBUG call filtered out by level. Rendering still needs
+the GIL, so with a fast stream the queue mostly moves work rather than
+removing it; with a slow stream only the synchronous path waits.
+"""
+
+import io
+import logging
+import time
+
+import pytest
+
+from opengov_earlyjapanese.utils.logger import (
+    _output_handler,
+    configure_logging,
+    get_logger,
+    shutdown_logging,
+)
+
+pytestmark = pytest.mark.benchmark
+
+
+class SlowStream(io.StringIO):
+    def write(self, s: str) -> int:
+        time.sleep(0.0005)
+        return super().write(s)
+
+
+STREAMS = {"memory": io.StringIO, "slow": SlowStream}
+
+
+def _info(logger) -> None:
+    logger.info("lesson served", row="a_row", items=5)
+
+
+@pytest.fixture(params=sorted(STREAMS))
+def stream(request):
+    return STREAMS[request.param]()
+
+
+@pytest.fixture
+def queued(stream):
+    configure_logging(level="INFO", fmt="json", stream=stream, force=True)
+    yield get_logger("bench.queued")
+    shutdown_logging()
+
+
+def test_queued_info(benchmark, queued):
+    benchmark.pedantic(_info, args=(queued,), rounds=500)
+
+
+def test_synchronous_info(benchmark, queued, stream):
+    sync = logging.getLogger("bench.sync")
+    sync.propagate = False
+    handler = _output_handler("json", stream, use_structlog=True)
+    sync.addHandler(handler)
+    try:
+        benchmark.pedantic(_info, args=(get_logger("bench.sync"),), rounds=500)
+    finally:
+        sync.removeHandler(handler)
+        sync.propagate = True
+
+
+def test_filtered_debug(benchmark, queued):
+    benchmark(queued.debug, "cache miss", key="a_row")
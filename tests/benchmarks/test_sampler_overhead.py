@@ -0,0 +1,47 @@
+"""Overhead of the always-on stack sampler on a CPU-bound workload.
+
+Times the same workload with and without a ``ContinuousSampler`` running at
+its default interval and records the relative slowdown and the sampler's
+self-measured overhead in the benchmark's ``extra_info``.
+"""
+
+import time
+
+import pytest
+
+from opengov_earlyjapanese.core.kanji import analyze_text
+from opengov_earlyjapanese.utils.profiling import ContinuousSampler
+
+pytestmark = pytest.mark.benchmark
+
+TEXT = "日本語の勉強は楽しいです。漢字を毎日練習しましょう。" * 200
+
+
+def workload() -> None:
+    for _ in range(20):
+        analyze_text(TEXT)
+
+
+def _timed() -> float:
+    start = time.perf_counter()
+    workload()
+    return time.perf_counter() - start
+
+
+def test_sampler_overhead(benchmark):
+    baseline = min(_timed() for _ in range(3))
+    sampler = ContinuousSampler().start()
+    try:
+        benchmark.pedantic(workload, rounds=3)
+        sampled = min(_timed() for _ in range(3))
+    finally:
+        sampler.stop()
+    benchmark.extra_info.update(
+        baseline_ms=baseline * 1000,
+        sampled_ms=sampled * 1000,
+        slowdown=sampled / baseline - 1,
+        self_overhead=sampler.overhead(),
+        samples=sampler.samples,
+    )
+    # The sampler backs off to stay within its budget; allow for timing noise
+    assert sampler.overhead() <= sampler.max_overhead * 2
@@ -0,0 +1,54 @@
+"""Example-sentence queries over a million-sentence index.
+
+"Five N4-or-easier sentences containing two kanji" as a posting-list
+intersection, against a scan of the sentence texts for the same answer.
+The index is read back from its file, as served.
+"""
+
+import random
+
+import pytest
+
+from opengov_earlyjapanese.core.sentences import SentenceIndex, SentenceIndexBuilder
+from opengov_earlyjapanese.utils.index_cache import write_index
+
+pytestmark = pytest.mark.benchmark(group="sentences")
+
+SENTENCES = 1_000_000
+KANJI = "日本語学生水大小山川人口手目耳木金土火月年時間先今行来食飲見聞読書話愛心"
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    rng = random.Random(0)
+    builder = SentenceIndexBuilder()
+    for i in range(SENTENCES):
+        kanji = tuple(dict.fromkeys(rng.choices(KANJI, k=4)))
+        text = "".join(kanji) + f"の{i}です"
+        builder.add((text, "x", rng.randrange(6), kanji, ()))
+    path = tmp_path_factory.mktemp("sentences") / "sentences.idx"
+    write_index(path, "sentences", builder.sections())
+    return SentenceIndex.open(path)
+
+
+def test_find_intersection(benchmark, index):
+    """Posting lists intersected from the shortest, stopping after five."""
+    found = benchmark(index.find, ["愛", "心", "水"], "N4", None, 5)
+    assert len(found) == 5
+
+
+def test_find_by_scan(benchmark, index):
+    """The same question answered by scanning sentences, for comparison."""
+
+    def scan():
+        found = []
+        for i in range(len(index)):
+            s = index.sentence(i)
+            text = s["japanese"]
+            if "愛" in text and "心" in text and "水" in text and s["level"] in ("N5", "N4"):
+                found.append(s)
+                if len(found) == 5:
+                    break
+        return found
+
+    assert len(benchmark.pedantic(scan, rounds=3, iterations=1)) == 5
@@ -0,0 +1,31 @@
+"""JSON serialisation of lessons and search results."""
+
+import json
+
+import pytest
+
+from opengov_earlyjapanese.api.pagination import iter_ndjson
+from opengov_earlyjapanese.core.registry import get_hiragana_teacher
+from opengov_earlyjapanese.core.search import search_characters
+
+pytestmark = pytest.mark.benchmark(group="serialization")
+
+
+def test_lesson_model_dump_json(benchmark):
+    lesson = get_hiragana_teacher().get_lesson("ka_row")
+    benchmark(lesson.model_dump_json)
+
+
+def test_lesson_model_dump(benchmark):
+    lesson = get_hiragana_teacher().get_lesson("ka_row")
+    benchmark(lesson.model_dump)
+
+
+def test_search_results_json(benchmark):
+    results = search_characters("a")
+    benchmark(json.dumps, results, ensure_ascii=False)
+
+
+def test_ndjson_stream(benchmark):
+    items = search_characters("a") * 20
+    benchmark(lambda: b"".join(iter_ndjson(items, 64)))
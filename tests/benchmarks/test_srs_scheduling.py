@@ -0,0 +1,38 @@
+"""Spaced repetition scheduling, one review at a time and in batches."""
+
+from datetime import datetime
+
+import pytest
+
+from opengov_earlyjapanese.core.srs import SpacedRepetitionSystem, SRSState
+
+pytestmark = pytest.mark.benchmark(group="srs")
+
+BATCH = 1000
+RATINGS = ["again", "hard", "good", "easy"]
+
+
+@pytest.fixture
+def states():
+    now = datetime.utcnow()
+    return [
+        SRSState(interval=i % 30 + 1, ease_factor=2.5, repetitions=i % 5, next_review=now)
+        for i in range(BATCH)
+    ]
+
+
+def test_schedule_scalar(benchmark, states):
+    srs = SpacedRepetitionSystem()
+    benchmark(srs.schedule, states[0], "good")
+
+
+def test_schedule_loop(benchmark, states):
+    srs = SpacedRepetitionSystem()
+    ratings = [RATINGS[i % 4] for i in range(BATCH)]
+    benchmark(lambda: [srs.schedule(s, r) for s, r in zip(states, ratings)])
+
+
+def test_schedule_many(benchmark, states):
+    srs = SpacedRepetitionSystem()
+    ratings = [RATINGS[i % 4] for i in range(BATCH)]
+    assert len(benchmark(srs.schedule_many, states, ratings)) == BATCH
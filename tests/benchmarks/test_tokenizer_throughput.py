@@ -0,0 +1,90 @@
+"""Tokenizer throughput with a JMdict-sized lexicon.
+
+The lexicon is built once from 100k synthetic words (with their kana
+spellings and inflection stems); sentences mix known words, particles,
+inflected verbs and unknown katakana. The cold run bypasses the sentence
+cache, the warm one measures repeated sentences.
+"""
+
+import random
+
+import pytest
+
+from opengov_earlyjapanese.core.models import Vocabulary
+from opengov_earlyjapanese.core.tokenizer import (
+    DictionaryTokenizer,
+    build_sections,
+    function_entries,
+    vocabulary_entries,
+)
+
+pytestmark = pytest.mark.benchmark(group="tokenizer")
+
+ENTRIES = 100_000
+KANA = "あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわ"
+KANJI = "日本語学生水大小山川人口手目耳木金土火月年時間先今行来食飲見聞読書話"
+PARTICLES = ["は", "が", "を", "に", "で", "と", "も"]
+
+
+def synthetic(n):
+    rng = random.Random(0)
+    for i in range(n):
+        verb = i % 5 == 0
+        reading = "".join(rng.choice(KANA) for _ in range(rng.randint(2, 5)))
+        word = "".join(rng.choice(KANJI) for _ in range(rng.randint(1, 3)))
+        if verb:
+            word, reading = word + "む", reading + "む"
+        yield Vocabulary(
+            id=f"v{i}",
+            word=word,
+            reading=reading,
+            meanings=["x"],
+            part_of_speech="verb" if verb else "noun",
+            jlpt_level=rng.choice(["N5", "N4", "N3", "N2", "N1"]),
+            frequency_rank=i + 1,
+        )
+
+
+@pytest.fixture(scope="module")
+def vocabulary():
+    return list(synthetic(ENTRIES))
+
+
+@pytest.fixture(scope="module")
+def tokenizer(vocabulary):
+    sections = build_sections([*function_entries(), *vocabulary_entries(vocabulary)])
+    return DictionaryTokenizer(sections, cache_size=0)
+
+
+@pytest.fixture(scope="module")
+def sentences(vocabulary):
+    rng = random.Random(1)
+    out = []
+    for _ in range(200):
+        parts = []
+        for _ in range(4):
+            parts.append(rng.choice(vocabulary).word + rng.choice(PARTICLES))
+        parts.append(rng.choice(["テスト", "コーヒー", ""]) + "を飲みました。")
+        out.append("".join(parts))
+    return out
+
+
+def test_tokenize_cold(benchmark, tokenizer, sentences):
+    """Segmenting distinct sentences, no cache."""
+    result = benchmark(tokenizer.tokenize_many, sentences)
+    assert len(result) == len(sentences)
+
+
+def test_tokenize_cached(benchmark, sentences):
+    """Repeated sentences are answered from the sentence cache."""
+    cached = DictionaryTokenizer.from_entries(function_entries())
+    cached.tokenize_many(sentences)
+    benchmark(cached.tokenize_many, sentences)
+    assert cached.cache.hits >= len(sentences)
+
+
+def test_lexicon_build(benchmark, vocabulary):
+    """Building the lexicon (trie and entry tables) for the whole vocabulary."""
+    entries = [*function_entries(), *vocabulary_entries(vocabulary)]
+    sections = benchmark.pedantic(build_sections, args=(entries,), rounds=1, iterations=1)
+    assert len(sections["entry_reading"]) > ENTRIES
@@ -0,0 +1,33 @@
+"""Cost of span instrumentation on a core entry point.
+
+``HiraganaTeacher.get_lesson`` is timed undecorated, instrumented with
+tracing disabled (the no-op fast path every production call takes by
+default) and instrumented with an in-memory exporter.
+"""
+
+import pytest
+
+from opengov_earlyjapanese.core.hiragana import HiraganaTeacher
+from opengov_earlyjapanese.utils.tracing import InMemoryExporter, tracer
+
+pytestmark = pytest.mark.benchmark
+
+teacher = HiraganaTeacher()
+undecorated = HiraganaTeacher.get_lesson.__wrapped__  # type: ignore[attr-defined]
+
+
+def test_undecorated(benchmark):
+    benchmark(undecorated, teacher, "a_row")
+
+
+def test_traced_disabled(benchmark):
+    assert not tracer.enabled
+    benchmark(teacher.get_lesson, "a_row")
+
+
+def test_traced_enabled(benchmark):
+    tracer.configure(InMemoryExporter(maxlen=1000))
+    try:
+        benchmark(teacher.get_lesson, "a_row")
+    finally:
+        tracer.disable()
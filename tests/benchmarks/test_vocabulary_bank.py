@@ -0,0 +1,93 @@
+"""VocabularyBank at JMdict scale: build, cached load, lookups and memory.
+
+The bank is built once from 200k synthetic entries and saved through the
+index cache; the build benchmark uses a tenth of that, since per-entry
+cost (model validation) is linear. Memory is what a process holds after
+loading the bank from the cache, where entry data stays in the mapping.
+"""
+
+import gc
+import tracemalloc
+
+import pytest
+
+from opengov_earlyjapanese.core.vocabulary import INDEX_VERSION, VocabularyBank, build_sections
+from opengov_earlyjapanese.utils.index_cache import IndexCache
+
+pytestmark = pytest.mark.benchmark(group="vocabulary")
+
+ENTRIES = 200_000
+PARTS = ["noun", "verb", "i-adjective", "na-adjective", "adverb", "expression"]
+
+
+def synthetic(n):
+    return [
+        {
+            "word": f"語{i}",
+            "reading": f"ご{i % (n // 4)}",  # four homophones per reading
+            "meanings": [f"meaning {i}", f"sense {i}"],
+            "part_of_speech": PARTS[i % len(PARTS)],
+            "jlpt_level": f"N{i % 5 + 1}",
+            "frequency_rank": i + 1,
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture(scope="module")
+def cache(tmp_path_factory):
+    cache = IndexCache(tmp_path_factory.mktemp("vocabulary-index"))
+    records = synthetic(ENTRIES)
+    cache.load_or_build("vocabulary", "bench", lambda: build_sections(records), INDEX_VERSION)
+    return cache
+
+
+def _load(cache):
+    return VocabularyBank(cache.load_or_build("vocabulary", "bench", None, INDEX_VERSION))
+
+
+@pytest.fixture(scope="module")
+def bank(cache):
+    return _load(cache)
+
+
+def test_build(benchmark):
+    records = synthetic(ENTRIES // 10)
+    bank = benchmark.pedantic(VocabularyBank.from_records, (records,), rounds=3)
+    assert len(bank) == ENTRIES // 10
+
+
+def test_load_from_cache(benchmark, cache):
+    bank = benchmark.pedantic(_load, (cache,), rounds=3)
+    assert len(bank) == ENTRIES
+
+
+def test_memory_after_load(cache):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        bank = _load(cache)
+        held, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    print(f"\n{len(bank)} entries hold {held / 1e6:.1f} MB")
+    assert held < 150e6
+
+
+@pytest.mark.parametrize("method,query", [("by_word", "語123456"), ("by_reading", "ご1234")])
+def test_point_lookup(benchmark, bank, method, query):
+    entries = benchmark(getattr(bank, method), query)
+    assert entries
+
+
+def test_get_by_id(benchmark, bank):
+    assert benchmark(bank.get, "vocab_語99999_ご49999") is not None
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [{"jlpt_level": "N3"}, {"jlpt_level": "N3", "part_of_speech": "verb"}, {"max_rank": 5000}],
+    ids=["level", "level+pos", "rank"],
+)
+def test_filtered_page(benchmark, bank, filters):
+    assert len(benchmark(bank.find, 50, **filters)) == 50
@@ -0,0 +1,10 @@
+"""Shared pytest configuration."""
+
+import os
+
+# The shared API app is exercised by many test modules from one client
+# address; keep admission control out of the way unless a test opts in.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+# Never forward CLI commands to a developer's running lookup daemon.
+os.environ.setdefault("NIHONGO_DAEMON", "0")
@@ -0,0 +1,212 @@
+"""Tests for token-bucket admission control."""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from opengov_earlyjapanese.api import admission
+from opengov_earlyjapanese.api.admission import (
+    AdmissionControlMiddleware,
+    ClientBuckets,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    """Test suite for TokenBucket."""
+
+    def test_burst_then_refill(self):
+        """Test that a bucket allows its burst and refills at its rate."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, capacity=3, clock=clock)
+        assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert bucket.try_acquire() == pytest.approx(0.5)
+        clock.now = 0.5
+        assert bucket.try_acquire() == 0.0
+
+    def test_refill_capped_at_capacity(self):
+        """Test that idle time never accumulates more than capacity."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, capacity=2, clock=clock)
+        clock.now = 100.0
+        assert bucket.try_acquire(2) == 0.0
+        assert bucket.try_acquire() > 0
+
+    def test_zero_rate_never_refills(self):
+        """Test that a zero-rate bucket reports an infinite wait."""
+        bucket = TokenBucket(rate=0.0, capacity=0)
+        assert bucket.try_acquire() == float("inf")
+
+
+class TestClientBuckets:
+    """Test suite for ClientBuckets."""
+
+    def test_clients_are_isolated(self):
+        """Test that one client exhausting its bucket does not affect another."""
+        buckets = ClientBuckets(rate=1.0, capacity=1, max_clients=10, clock=FakeClock())
+        assert buckets.try_acquire("a") == 0.0
+        assert buckets.try_acquire("a") > 0
+        assert buckets.try_acquire("b") == 0.0
+
+    def test_lru_eviction(self):
+        """Test that the least recently seen client is evicted."""
+        buckets = ClientBuckets(rate=1.0, capacity=1, max_clients=2, clock=FakeClock())
+        for client in ("a", "b", "a", "c"):
+            buckets.try_acquire(client)
+        assert len(buckets) == 2
+        # "b" was evicted, so it starts with a full bucket again
+        assert buckets.try_acquire("b") == 0.0
+
+
+def _make_app(**limits):
+    inner = FastAPI()
+
+    @inner.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @inner.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    options = {
+        "client_rate": 0.001,
+        "client_burst": 2,
+        "global_rate": 1000.0,
+        "global_burst": 1000,
+        "max_concurrency": 10,
+    }
+    options.update(limits)
+    inner.add_middleware(AdmissionControlMiddleware, **options)
+    return inner
+
+
+class TestAdmissionControlMiddleware:
+    """Test suite for the admission middleware."""
+
+    def test_client_limit_returns_429(self):
+        """Test that a client over its rate gets 429 with Retry-After."""
+        client = TestClient(_make_app())
+        assert client.get("/ping").status_code == 200
+        assert client.get("/ping").status_code == 200
+        response = client.get("/ping")
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) >= 1
+
+    def test_global_limit_returns_503(self):
+        """Test that exhausting the global bucket sheds load with 503."""
+        client = TestClient(_make_app(client_burst=100, global_rate=0.001, global_burst=1))
+        assert client.get("/ping").status_code == 200
+        response = client.get("/ping")
+        assert response.status_code == 503
+        assert "retry-after" in response.headers
+
+    def test_flooding_client_does_not_starve_others(self):
+        """Test that a client's rejected requests leave the global bucket to everyone else."""
+        app = _make_app(client_burst=1, global_rate=0.001, global_burst=3, trust_forwarded=True)
+        client = TestClient(app)
+        flooder = {"X-Forwarded-For": "1.1.1.1"}
+        statuses = [client.get("/ping", headers=flooder).status_code for _ in range(20)]
+        assert statuses == [200] + [429] * 19
+        response = client.get("/ping", headers={"X-Forwarded-For": "2.2.2.2"})
+        assert response.status_code == 200
+
+    def test_global_rejection_refunds_client_token(self):
+        """Test that a request shed for global load does not count against its client."""
+        clock = FakeClock()
+        app = _make_app(
+            client_burst=1, global_rate=1.0, global_burst=1, trust_forwarded=True, clock=clock
+        )
+        client = TestClient(app)
+        other = {"X-Forwarded-For": "2.2.2.2"}
+        assert client.get("/ping", headers={"X-Forwarded-For": "1.1.1.1"}).status_code == 200
+        assert client.get("/ping", headers=other).status_code == 503
+        clock.now = 1.0
+        assert client.get("/ping", headers=other).status_code == 200
+
+    def test_global_limits_split_across_workers(self, monkeypatch):
+        """Test that each prefork worker enforces its share of the host-wide limits."""
+        monkeypatch.setattr(admission, "_server_workers", 1)
+        kwargs = {
+            "client_rate": 20.0,
+            "client_burst": 40,
+            "global_rate": 500.0,
+            "global_burst": 1000,
+            "max_concurrency": 200,
+        }
+        single = AdmissionControlMiddleware(None, **kwargs)
+        assert (single.global_bucket.rate, single.max_concurrency) == (500.0, 200)
+        admission.set_server_workers(4)
+        shared = AdmissionControlMiddleware(None, **kwargs)
+        assert shared.global_bucket.rate == 125.0
+        assert shared.global_bucket.capacity == 250.0
+        assert shared.max_concurrency == 50
+        assert shared.clients.rate == 20.0
+        assert AdmissionControlMiddleware(None, workers=3, **kwargs).max_concurrency == 67
+
+    def test_exempt_path(self):
+        """Test that health checks bypass admission control."""
+        client = TestClient(_make_app(client_burst=0))
+        assert client.get("/health").status_code == 200
+
+    def test_forwarded_header_identifies_client(self):
+        """Test that X-Forwarded-For is used when trusted."""
+        client = TestClient(_make_app(client_burst=1, trust_forwarded=True))
+        assert client.get("/ping", headers={"X-Forwarded-For": "1.1.1.1"}).status_code == 200
+        assert (
+            client.get("/ping", headers={"X-Forwarded-For": "2.2.2.2, 10.0.0.1"}).status_code == 200
+        )
+        assert client.get("/ping", headers={"X-Forwarded-For": "1.1.1.1"}).status_code == 429
+
+    def test_concurrency_limit_returns_503(self):
+        """Test that requests beyond the in-flight limit are rejected."""
+        release = asyncio.Event()
+        statuses = []
+
+        async def slow_app(scope, receive, send):
+            await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        middleware = AdmissionControlMiddleware(
+            slow_app,
+            client_rate=100.0,
+            client_burst=100,
+            global_rate=100.0,
+            global_burst=100,
+            max_concurrency=1,
+        )
+
+        async def call():
+            async def receive():
+                return {"type": "http.request"}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    statuses.append(message["status"])
+
+            scope = {"type": "http", "path": "/x", "headers": [], "client": ("h", 1)}
+            await middleware(scope, receive, send)
+
+        async def scenario():
+            first = asyncio.ensure_future(call())
+            await asyncio.sleep(0)
+            await call()
+            release.set()
+            await first
+
+        asyncio.run(scenario())
+        assert statuses == [503, 200]
+        assert middleware.in_flight == 0
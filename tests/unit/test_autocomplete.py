@@ -0,0 +1,129 @@
+"""Tests for the prefix-trie autocompleter and its endpoint."""
+
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from opengov_earlyjapanese.api.main import app
+from opengov_earlyjapanese.core import registry
+from opengov_earlyjapanese.core.autocomplete import (
+    UNRANKED,
+    Autocompleter,
+    _norm,
+    build_sections,
+    complete,
+)
+
+
+def _term(i, rank):
+    return {"kind": "test", "id": str(i), "text": "", "reading": "", "meaning": "", "rank": rank}
+
+
+@pytest.fixture
+def small():
+    """A handful of terms sharing prefixes."""
+    terms = [
+        (_term(0, 30), ["たべる", "to eat"]),
+        (_term(1, 10), ["たべもの", "food"]),
+        (_term(2, None), ["たいへん", "serious"]),
+        (_term(3, 20), ["タクシー", "taxi"]),
+        (_term(4, 5), ["た"]),
+    ]
+    return Autocompleter.from_terms(terms)
+
+
+def _ids(results):
+    return [r["id"] for r in results]
+
+
+class TestTrie:
+    """Prefix walks and ranking."""
+
+    def test_ranked_by_frequency(self, small):
+        """Test that completions come most frequent first, unranked last."""
+        assert _ids(small.complete("た")) == ["4", "1", "3", "0", "2"]
+        assert _ids(small.complete("たべ")) == ["1", "0"]
+        assert _ids(small.complete("たべる")) == ["0"]
+
+    def test_prefix_inside_an_edge(self, small):
+        """Test a prefix that ends partway along a compressed edge."""
+        assert _ids(small.complete("たいへ")) == ["2"]
+        assert small.complete("たいほ") == []
+        assert small.complete("x") == []
+        assert small.complete("") == []
+
+    def test_keys_are_normalised(self, small):
+        """Test that katakana folds to hiragana and case and outer space are ignored."""
+        assert _ids(small.complete("タク")) == ["3"]
+        assert _ids(small.complete(" To E")) == ["0"]
+
+    def test_romaji_as_typed(self, small):
+        """Test that romaji is converted, including an unfinished syllable."""
+        assert _ids(small.complete("tabe")) == ["1", "0"]
+        assert _ids(small.complete("tab")) == ["1", "0"]
+        assert _ids(small.complete("taku")) == ["3"]
+        assert _ids(small.complete("ta")) == ["4", "1", "3", "0", "2"]
+
+    def test_limit(self, small):
+        """Test that limit caps the results and cannot exceed top_k."""
+        assert len(small.complete("た", limit=2)) == 2
+        assert len(small.complete("た", limit=1000)) == 5
+
+    def test_matches_brute_force(self):
+        """Test stored and on-the-fly top-k against a scan of every key."""
+        rng = random.Random(7)
+        alphabet = "あいかきさ"
+        terms = []
+        for i in range(400):
+            keys = [
+                "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 5)))
+                for _ in range(rng.randint(1, 3))
+            ]
+            terms.append((_term(i, rng.choice([None, rng.randint(1, 50)])), keys))
+        trie = Autocompleter(build_sections(terms, top_k=4))
+        rank = {t["id"]: UNRANKED if t["rank"] is None else t["rank"] for t, _ in terms}
+        prefixes = {k[:n] for _, keys in terms for k in keys for n in range(1, len(k) + 1)}
+        for prefix in [*sorted(prefixes), "かかかかかか"]:
+            matching = {
+                t["id"] for t, keys in terms if any(_norm(k).startswith(prefix) for k in keys)
+            }
+            expected = sorted(matching, key=lambda i: (rank[i], int(i)))[:4]
+            assert _ids(trie.complete(prefix)) == expected, prefix
+
+    def test_cached_sections_round_trip(self, tmp_path, small):
+        """Test that a trie read back from the index cache answers the same."""
+        from opengov_earlyjapanese.utils.index_cache import read_index, write_index
+
+        sections = build_sections([(_term(0, 1), ["たべる"]), (_term(1, 2), ["たいへん"])])
+        write_index(tmp_path / "ac.idx", "k", sections)
+        loaded = Autocompleter(read_index(tmp_path / "ac.idx", "k"))
+        assert _ids(loaded.complete("tab")) == ["0"]
+        assert _ids(loaded.complete("た")) == ["0", "1"]
+
+
+class TestServedContent:
+    """Completions over the registry's content."""
+
+    def test_vocabulary_kanji_and_kana(self):
+        """Test completions from each content kind."""
+        assert complete("kyo")[0]["text"] == "今日"
+        assert complete("eat")[0]["id"] == "vocab_食べる_たべる"
+        assert "愛" in [r["text"] for r in complete("love")]
+        kinds = {r["kind"] for r in complete("ka")}
+        assert {"hiragana", "katakana"} <= kinds
+
+    def test_endpoint(self):
+        """Test the autocomplete route and its validation."""
+        client = TestClient(app)
+        response = client.get("/autocomplete", params={"q": "tabe", "limit": 3})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["query"] == "tabe"
+        assert body["items"][0]["text"] == "食べる"
+        assert client.get("/autocomplete", params={"q": "a", "limit": 0}).status_code == 422
+        assert client.get("/autocomplete").status_code == 422
+
+    def test_shared_instance(self):
+        """Test that the registry builds the trie once."""
+        assert registry.get_autocompleter() is registry.get_autocompleter()
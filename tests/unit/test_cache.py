@@ -0,0 +1,105 @@
+"""Tests for the TTL and LRU caches."""
+
+import asyncio
+
+from opengov_earlyjapanese.utils.cache import LRUCache, TTLCache
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    """Test suite for TTLCache."""
+
+    def test_expiry(self):
+        """Test that entries expire after their TTL."""
+        clock = FakeClock()
+        cache = TTLCache(ttl=10, clock=clock)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        clock.now = 10
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_lru_bound(self):
+        """Test that the least recently used entry is evicted."""
+        cache = TTLCache(ttl=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+
+    def test_get_or_compute_caches(self):
+        """Test that a computed value is reused until it expires."""
+        cache = TTLCache(ttl=60)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return "v"
+
+        assert asyncio.run(cache.get_or_compute("k", compute)) == "v"
+        assert asyncio.run(cache.get_or_compute("k", compute)) == "v"
+        assert len(calls) == 1
+        cache.clear()
+        asyncio.run(cache.get_or_compute("k", compute))
+        assert len(calls) == 2
+
+    def test_stampede_computes_once(self):
+        """Test that concurrent misses for one key compute it once."""
+        cache = TTLCache(ttl=60)
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "v"
+
+        async def stampede():
+            return await asyncio.gather(*(cache.get_or_compute("k", slow) for _ in range(8)))
+
+        assert asyncio.run(stampede()) == ["v"] * 8
+        assert len(calls) == 1
+        assert cache.get("k") == "v"
+
+
+class TestLRUCache:
+    """Test suite for LRUCache."""
+
+    def test_evicts_least_recently_used(self):
+        """A read refreshes a key, so the untouched one is evicted."""
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_counts_hits_and_misses(self):
+        """get_or_compute computes a missing key once and counts both outcomes."""
+        cache = LRUCache()
+        calls = []
+        for _ in range(3):
+            assert cache.get_or_compute("k", lambda: calls.append(1) or "v") == "v"
+        assert len(calls) == 1
+        assert (cache.hits, cache.misses) == (2, 1)
+        cache.clear()
+        assert (len(cache), cache.hits, cache.misses) == (0, 0, 0)
+
+    def test_zero_size_stores_nothing(self):
+        """maxsize 0 disables caching."""
+        cache = LRUCache(maxsize=0)
+        cache.set("a", 1)
+        assert cache.get("a") is None
@@ -0,0 +1,185 @@
+"""Tests for the suffix-array concordance and its front ends."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from typer.testing import CliRunner
+
+from opengov_earlyjapanese.api.main import app as api_app
+from opengov_earlyjapanese.cli import app
+from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.core import registry
+from opengov_earlyjapanese.core.concordance import Concordance, build_file, build_sections
+from opengov_earlyjapanese.core.difficulty import BUCKETS, LevelTables
+from opengov_earlyjapanese.core.sentences import ImportOptions, import_corpus
+from opengov_earlyjapanese.utils.index_cache import IndexCacheError, write_index
+
+SENTENCES = ["本を読んでいる。", "水を飲んでいます。", "雨が降っている", "いるか"]
+LINES = [
+    "1\t私は学生です。\t2\tI am a student.",
+    "3\t愛は心ではない。\t4\tLove is not the heart.",
+    "5\t水を飲んでいる。\t6\tI am drinking water.",
+    "7\t心を水で洗っている。\t8\tWashing the heart with water.",
+]
+
+
+@pytest.fixture
+def concordance():
+    return Concordance.from_sentences(SENTENCES)
+
+
+@pytest.fixture(autouse=True)
+def builtin_tokenizer(monkeypatch):
+    """Use the built-in tokenizer and drop shared instances around each test."""
+    monkeypatch.setattr(settings, "tokenizer_backend", "builtin")
+    registry.reload()
+    yield
+    registry.reload()
+
+
+@pytest.fixture
+def paths(tmp_path):
+    """A sentence index over ``LINES`` (N5, N3, N5, N4) and its concordance."""
+    corpus = tmp_path / "pairs.tsv"
+    corpus.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+    tables = LevelTables({"私": 0, "学": 0, "生": 0, "水": 0, "飲": 0, "心": 1, "洗": 1, "愛": 2}, {})
+    index = tmp_path / "sentences.idx"
+    import_corpus([corpus], index, ImportOptions(1, 3), workers=1, words=False, tables=tables)
+    output = tmp_path / "concordance.idx"
+    build_file(index, output)
+    return index, output
+
+
+def _brute_force(sentences, query):
+    return sorted(
+        (s[i:], n, i)
+        for n, s in enumerate(sentences)
+        for i in range(len(s))
+        if s.startswith(query, i)
+    )
+
+
+class TestSuffixArray:
+    """Test suite for building and searching the suffix array."""
+
+    def test_suffixes_sorted_with_lcp(self):
+        """Suffixes are in order within their sentence, each LCP against the previous one."""
+        sections = build_sections(SENTENCES)
+        text = "".join(s + "\n" for s in SENTENCES)
+        tails = [text[p : text.index("\n", p)] for p in sections["suffixes"]]
+        assert len(tails) == sum(map(len, SENTENCES))
+        assert tails == sorted(tails)
+        for rank in range(1, len(tails)):
+            a, b = tails[rank - 1], tails[rank]
+            n = next((i for i, (x, y) in enumerate(zip(a, b)) if x != y), min(len(a), len(b)))
+            assert sections["lcp"][rank] == n
+        assert list(sections["sentence_starts"]) == [0, 9, 19, 27, 31]
+
+    def test_count_matches_brute_force(self, concordance):
+        """Every occurrence is found, whether a word, part of one, or absent."""
+        for query in ["いる", "い", "んで", "を", "。", "いるか", "降って", "猫", "るかな"]:
+            assert concordance.count(query) == len(_brute_force(SENTENCES, query)), query
+        assert concordance.count("") == 0
+        assert concordance.count("る\nい") == 0  # never across sentences
+
+    def test_kwic(self, concordance):
+        """Windows are clipped to the sentence and sorted by what follows the match."""
+        lines = concordance.kwic("いる", width=3)
+        assert [(x["left"], x["match"], x["right"]) for x in lines] == [
+            ("降って", "いる", ""),
+            ("読んで", "いる", "。"),
+            ("", "いる", "か"),
+        ]
+        assert [(x["sentence"], x["offset"]) for x in lines] == [(2, 5), (0, 5), (3, 0)]
+        assert len(concordance.kwic("い", limit=2)) == 2
+        assert concordance.kwic("猫") == []
+
+    def test_frequent(self, concordance):
+        """Repeated substrings of a length are counted from runs in the LCP array."""
+        assert concordance.frequent(2)[0] == ("いる", 3)
+        assert ("んで", 2) in concordance.frequent(2)
+        assert concordance.frequent(3) == [("んでい", 2)]
+        assert concordance.frequent(9) == []
+
+
+class TestIndexFile:
+    """Test suite for concordances of a sentence index file."""
+
+    def test_mapped_file_keeps_ids_and_levels(self, paths):
+        """Sentence ids are the index's, and levels bound the occurrences."""
+        found = Concordance.open(paths[1])
+        assert found.meta["sentences"] == 4
+        assert [(x["sentence"], x["level"]) for x in found.kwic("を")] == [(2, "N4"), (1, "N5")]
+        assert [x["left"] for x in found.kwic("を", max_level="N5")] == ["水"]
+        assert [x["left"] for x in found.kwic("は", min_level="N4")] == ["愛は心で", "愛"]
+        assert found.kwic("は", min_level="N2") == []
+        with pytest.raises(ValueError):
+            found.kwic("は", max_level="N7")
+
+    def test_level_bounds_match_a_scan(self, paths):
+        """Bounded counts and windows equal filtering every occurrence by level."""
+        found = Concordance.open(paths[1])
+        bounds = [
+            (None, None),
+            ("N5", None),
+            (None, "N4"),
+            ("N4", "N3"),
+            ("N3", "N5"),
+            ("N1", None),
+        ]
+        for query in ["を", "は", "で", "心", "っている", "。", "猫"]:
+            every = found.kwic(query, limit=100)
+            assert found.count(query) == len(every)
+            for max_level, min_level in bounds:
+                allowed = BUCKETS[
+                    BUCKETS.index(min_level or "N5") : BUCKETS.index(max_level or "unlisted") + 1
+                ]
+                expected = [x for x in every if x["level"] in allowed]
+                bounded = found.kwic(query, limit=2, max_level=max_level, min_level=min_level)
+                assert bounded == expected[:2]
+                assert found.count(query, max_level=max_level, min_level=min_level) == len(expected)
+
+    def test_rejects_files_without_level_groups(self, tmp_path):
+        """Concordance files of the earlier layout must be rebuilt."""
+        stale = tmp_path / "stale.idx"
+        sections = build_sections(SENTENCES)
+        del sections["level_ranks"]
+        write_index(stale, "concordance", sections)
+        with pytest.raises(IndexCacheError):
+            Concordance.open(stale)
+
+    def test_cli(self, paths, tmp_path):
+        """sentences concordance builds the file and sentences kwic queries it."""
+        runner = CliRunner()
+        output = tmp_path / "cli.idx"
+        result = runner.invoke(app, ["sentences", "concordance", str(paths[0]), "-o", str(output)])
+        assert result.exit_code == 0, result.output
+        assert "4 sentences" in result.output
+        result = runner.invoke(app, ["sentences", "kwic", "いる", "--index", str(output)])
+        assert result.output.splitlines() == ["    水を飲んで [いる] 。", "心を水で洗って [いる] 。"]
+        args = ["sentences", "kwic", "水", "--index", str(output), "-F", "json", "-n", "1"]
+        result = json.loads(runner.invoke(app, args).output)
+        assert result["total"] == 2 and len(result["items"]) == 1
+
+    def test_cli_without_concordance(self, monkeypatch):
+        """kwic needs a concordance."""
+        monkeypatch.setattr(settings, "concordance_index", None)
+        assert CliRunner().invoke(app, ["sentences", "kwic", "水"]).exit_code == 1
+
+    def test_api(self, monkeypatch, paths):
+        """GET /concordance returns the windows and the total; 404 when unconfigured."""
+        monkeypatch.setattr(settings, "concordance_index", None)
+        with TestClient(api_app) as client:
+            assert client.get("/concordance", params={"q": "水"}).status_code == 404
+        monkeypatch.setattr(settings, "concordance_index", paths[1])
+        registry.reload()
+        with TestClient(api_app) as client:
+            response = client.get("/concordance", params={"q": "心", "width": 2})
+            assert response.status_code == 200
+            body = response.json()
+            assert body["total"] == 2
+            assert [(x["left"], x["right"]) for x in body["items"]] == [("愛は", "では"), ("", "を水")]
+            response = client.get("/concordance", params={"q": "心", "max_level": "N4"})
+            assert response.json()["total"] == 1 and len(response.json()["items"]) == 1
+            assert client.get("/concordance", params={"q": ""}).status_code == 422
@@ -32,9 +32,11 @@ class TestConfig:
         settings = Settings(cors_origins=origins)
         assert settings.cors_origins == origins
 
-    def test_directories_creation(self):
-        """Test that directories are created on initialization."""
-        settings = Settings()
+    def test_directories_creation(self, tmp_path):
+        """Test that directories are created on demand, not on initialization."""
+        settings = Settings(model_path=tmp_path / "models", media_storage_path=tmp_path / "media")
+        assert not settings.model_path.exists()
+        settings.ensure_directories()
         assert settings.model_path.exists()
         assert settings.media_storage_path.exists()
 
@@ -0,0 +1,221 @@
+"""Tests for the lookup daemon and CLI forwarding."""
+
+import json
+import socket
+import threading
+
+import pytest
+from typer.testing import CliRunner
+
+from opengov_earlyjapanese import daemon
+from opengov_earlyjapanese.cli import app
+from opengov_earlyjapanese.daemon import DaemonClient, DaemonServer
+
+
+@pytest.fixture
+def sock_path(tmp_path, monkeypatch):
+    """Point the daemon socket into a temporary directory and enable forwarding."""
+    path = tmp_path / "d.sock"
+    monkeypatch.setenv(daemon.SOCKET_ENV, str(path))
+    monkeypatch.setenv(daemon.ENABLE_ENV, "1")
+    return path
+
+
+@pytest.fixture
+def server(sock_path):
+    """Run a daemon server on a background thread."""
+    server = DaemonServer(sock_path)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05})
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+class TestDaemonProtocol:
+    """Test suite for the daemon request protocol."""
+
+    def test_lookup(self, server):
+        """Test a lookup round trip and request accounting."""
+        with DaemonClient.connect() as client:
+            assert client.matches()
+            assert client.lookup("hiragana", "a_row")["row"] == "a_row"
+            assert client.lookup("search", "ka", kind="katakana")[0]["type"] == "katakana"
+            assert client.ping()["requests"] == 2
+
+    def test_lookup_error(self, server):
+        """Test that lookup errors come back as ValueError."""
+        with DaemonClient.connect() as client:
+            with pytest.raises(ValueError, match="Unknown row"):
+                client.lookup("hiragana", "nope")
+            with pytest.raises(ValueError):
+                client.lookup("search", "a", bogus=1)
+
+    def test_bad_requests(self, server, sock_path):
+        """Test that malformed lines and unknown ops get error responses."""
+        with socket.socket(socket.AF_UNIX) as s:
+            s.connect(str(sock_path))
+            reader = s.makefile("r", encoding="utf-8")
+            s.sendall(b"not json\n" + b'{"op": "dance"}\n')
+            assert "error" in json.loads(reader.readline())
+            assert json.loads(reader.readline()) == {"error": "Unknown op: dance"}
+
+    def test_unexpected_errors_keep_connection(self, server, monkeypatch):
+        """Test that a lookup raising any exception gets an error record, not a dropped line."""
+        from opengov_earlyjapanese import lookups
+
+        def boom(query):
+            raise RuntimeError("broken " + query)
+
+        monkeypatch.setitem(lookups.LOOKUPS, "boom", boom)
+        with DaemonClient.connect() as client:
+            with pytest.raises(ValueError, match="Internal error: RuntimeError: broken x"):
+                client.lookup("boom", "x")
+            assert client.call(["not", "an", "object"]) == {"error": "Expected a JSON object"}
+            assert client.lookup("mnemonic", "あ")
+
+    def test_socket_permissions(self, server, sock_path):
+        """Test that only the owner can connect."""
+        assert sock_path.stat().st_mode & 0o777 == 0o600
+
+    def test_already_running(self, server, sock_path):
+        """Test that a second server on the same socket is refused."""
+        with pytest.raises(RuntimeError):
+            DaemonServer(sock_path)
+
+    def test_stale_socket_replaced(self, sock_path):
+        """Test that a socket file left by a dead daemon is removed."""
+        with socket.socket(socket.AF_UNIX) as s:
+            s.bind(str(sock_path))
+        server = DaemonServer(sock_path)
+        server.server_close()
+        assert not sock_path.exists()
+
+    def test_not_running(self, sock_path):
+        """Test that connecting without a daemon returns None."""
+        assert DaemonClient.connect() is None
+        assert daemon.stop() is False
+
+
+class TestForwarding:
+    """Test suite for CLI forwarding to the daemon."""
+
+    @pytest.fixture
+    def runner(self):
+        """Create a CLI test runner."""
+        return CliRunner()
+
+    @pytest.mark.parametrize(
+        "args",
+        [
+            ["hiragana", "ka_row"],
+            ["mnemonic", "あ"],
+            ["kanji", "analyze", "愛"],
+            ["search", "ka"],
+            ["katakana", "characters", "ka_row"],
+            ["katakana", "mnemonic", "カ"],
+        ],
+    )
+    def test_same_output(self, runner, server, monkeypatch, args):
+        """Test that forwarded commands print exactly what in-process ones do."""
+        forwarded = runner.invoke(app, args)
+        assert server.requests_served == 1
+        monkeypatch.setenv(daemon.ENABLE_ENV, "0")
+        local = runner.invoke(app, args)
+        assert forwarded.exit_code == local.exit_code == 0
+        assert forwarded.stdout == local.stdout
+
+    def test_error_forwarded(self, runner, server):
+        """Test that lookup errors exit 1 with the usual message."""
+        result = runner.invoke(app, ["hiragana", "nope"])
+        assert result.exit_code == 1
+        assert server.requests_served == 1
+
+    def test_table_runs_in_process(self, runner, server):
+        """Test that table output does not use the daemon."""
+        result = runner.invoke(app, ["hiragana", "ka_row", "--format", "table"])
+        assert result.exit_code == 0
+        assert server.requests_served == 0
+
+    def test_batch_forwarded(self, runner, server):
+        """Test that batch mode sends every query to the daemon."""
+        result = runner.invoke(app, ["mnemonic", "--stdin"], input="あ\nい\n")
+        assert result.exit_code == 0
+        assert server.requests_served == 2
+
+    def test_batch_falls_back_when_daemon_goes_away(self, runner, server, monkeypatch):
+        """Test that a connection lost mid-batch finishes the batch in-process."""
+        forwarded = DaemonClient.lookup
+
+        def lookup_once(client, name, query, **options):
+            if server.requests_served:
+                raise ConnectionError("Daemon closed the connection")
+            return forwarded(client, name, query, **options)
+
+        monkeypatch.setattr(DaemonClient, "lookup", lookup_once)
+        result = runner.invoke(app, ["mnemonic", "--stdin"], input="あ\nい\nう\n")
+        assert result.exit_code == 0, result.output
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        assert [r["query"] for r in records] == ["あ", "い", "う"]
+        assert all("result" in r for r in records)
+        assert server.requests_served == 1
+
+    def test_other_settings_run_in_process(self, runner, server, monkeypatch):
+        """Test that a shell with different settings does not use the daemon."""
+        monkeypatch.setenv("CONTENT_PACK", "/elsewhere/content.pack")
+        result = runner.invoke(app, ["mnemonic", "あ"])
+        assert result.exit_code == 0
+        assert server.requests_served == 0
+
+    def test_rebuilt_pack_runs_in_process(self, runner, sock_path, tmp_path, monkeypatch):
+        """Test that a pack rebuilt after the daemon started is not served stale."""
+        from opengov_earlyjapanese.config import settings
+        from opengov_earlyjapanese.core import registry
+        from opengov_earlyjapanese.core.pack import build_pack, builtin_records
+
+        path = tmp_path / "content.pack"
+        records = builtin_records()
+        build_pack(records, path)
+        monkeypatch.setattr(settings, "content_pack", path)
+        registry.reload()
+        server = DaemonServer(sock_path)
+        thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05})
+        thread.start()
+        try:
+            with DaemonClient.connect() as client:
+                assert client.matches()
+            build_pack(records[1:], path)
+            with DaemonClient.connect() as client:
+                assert not client.matches()
+            assert runner.invoke(app, ["mnemonic", "あ"]).exit_code == 0
+            assert server.requests_served == 0
+        finally:
+            server.shutdown()
+            thread.join()
+            server.server_close()
+            monkeypatch.setattr(settings, "content_pack", None)
+            registry.reload()
+
+    def test_fallback_without_daemon(self, runner, sock_path):
+        """Test that commands run in-process when no daemon is running."""
+        result = runner.invoke(app, ["mnemonic", "あ"])
+        assert result.exit_code == 0
+        assert result.stdout.strip()
+
+
+class TestLifecycle:
+    """Test suite for starting and stopping a background daemon."""
+
+    def test_start_status_stop(self, sock_path):
+        """Test the daemon start, status and stop commands."""
+        runner = CliRunner()
+        try:
+            assert runner.invoke(app, ["daemon", "start"]).exit_code == 0
+            status = runner.invoke(app, ["daemon", "status"])
+            assert status.exit_code == 0 and "running" in status.stdout
+        finally:
+            stopped = runner.invoke(app, ["daemon", "stop"])
+        assert "stopped" in stopped.stdout
+        assert not sock_path.exists()
+        assert runner.invoke(app, ["daemon", "status"]).exit_code == 1
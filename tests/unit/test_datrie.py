@@ -0,0 +1,60 @@
+"""Tests for the double-array trie."""
+
+import random
+
+import pytest
+
+from opengov_earlyjapanese.utils.datrie import DoubleArrayTrie, build
+
+
+@pytest.fixture
+def keys():
+    """Sorted keys sharing prefixes, including one that prefixes all the others."""
+    return sorted(["日", "日本", "日本語", "日本人", "本", "本当", "にほん", "に"])
+
+
+class TestDoubleArrayTrie:
+    """Test suite for build and lookups."""
+
+    def test_get(self, keys):
+        """Every key maps to its position; other strings are absent."""
+        trie = DoubleArrayTrie.from_keys(keys)
+        for i, key in enumerate(keys):
+            assert trie.get(key) == i
+            assert key in trie
+        for missing in ["", "日本語学", "語", "ほん", "x"]:
+            assert trie.get(missing) is None
+            assert missing not in trie
+
+    def test_prefixes(self, keys):
+        """Every key starting at a position is found, shortest first."""
+        trie = DoubleArrayTrie.from_keys(keys)
+        found = [("日本語人"[:end], keys[v]) for end, v in trie.prefixes("日本語人")]
+        assert found == [("日", "日"), ("日本", "日本"), ("日本語", "日本語")]
+        assert [end for end, _ in trie.prefixes("私の日本", 2)] == [3, 4]
+        assert list(trie.prefixes("語")) == []
+
+    def test_custom_values(self):
+        """Values other than positions are stored as given."""
+        trie = DoubleArrayTrie(build(["a", "ab"], [7, 0]))
+        assert trie.get("a") == 7
+        assert trie.get("ab") == 0
+
+    def test_matches_brute_force(self):
+        """Random keys over a small alphabet agree with a set."""
+        rng = random.Random(1)
+        keys = sorted(
+            {"".join(rng.choice("あいうえお日本") for _ in range(rng.randint(1, 6))) for _ in range(3000)}
+        )
+        trie = DoubleArrayTrie.from_keys(keys)
+        index = {k: i for i, k in enumerate(keys)}
+        for _ in range(500):
+            text = "".join(rng.choice("あいうえお日本") for _ in range(8))
+            expected = [(e, index[text[:e]]) for e in range(1, 9) if text[:e] in index]
+            assert list(trie.prefixes(text)) == expected
+
+    def test_empty(self):
+        """A trie without keys finds nothing."""
+        trie = DoubleArrayTrie.from_keys([])
+        assert trie.get("a") is None
+        assert list(trie.prefixes("abc")) == []
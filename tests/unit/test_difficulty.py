@@ -0,0 +1,219 @@
+"""Tests for the corpus difficulty and script composition analyser."""
+
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from opengov_earlyjapanese.cli import app
+from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.core import difficulty
+from opengov_earlyjapanese.core.difficulty import (
+    WIDTH,
+    CorpusAnalyzer,
+    LevelTables,
+    add,
+    chunk_ranges,
+    estimate_level,
+    iter_corpus,
+    level_tables,
+    summarize,
+)
+from opengov_earlyjapanese.core.tokenizer import DictionaryTokenizer, function_entries
+
+LINES = ["私は学生です。", "水を飲む", "カタカナ ABC 123", "", "   ", "今日は大きい日本語"]
+
+
+@pytest.fixture
+def tables():
+    """水, 学 and 生 at N5, 語 at N4; words to match."""
+    kanji = {"水": 0, "学": 0, "生": 0, "語": 1}
+    return LevelTables(kanji, {"学生": 0, "水": 0, "飲む": 0, "日本語": 1})
+
+
+@pytest.fixture
+def analyzer(tables):
+    """An analyzer with the function-word tokenizer and no numpy."""
+    entries = [
+        *function_entries(),
+        ("学生", "がくせい", "noun", "学生", 2000),
+        ("日本語", "にほんご", "noun", "日本語", 2000),
+        ("飲み", "のみ", "verb-stem", "飲む", 2000),
+    ]
+    return CorpusAnalyzer(tables, DictionaryTokenizer.from_entries(entries), vectorised=False)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """A file with documents on lines and in blank-line separated blocks."""
+    path = tmp_path / "corpus.txt"
+    path.write_text("\n".join(LINES * 50) + "\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture(autouse=True)
+def builtin_tokenizer(monkeypatch):
+    """Use the built-in tokenizer in this process and in workers."""
+    monkeypatch.setattr(settings, "tokenizer_backend", "builtin")
+
+
+class TestCounting:
+    """Test suite for per-document counts."""
+
+    def test_scripts_and_kanji_levels(self, analyzer):
+        """Characters are counted per script, kanji per level; spaces are ignored."""
+        result = summarize(analyzer.count("私は学生です。 カナ A1"))
+        assert result["characters"] == 11
+        assert result["scripts"] == {
+            "hiragana": round(3 / 11, 4),
+            "katakana": round(2 / 11, 4),
+            "kanji": round(3 / 11, 4),
+            "latin": round(1 / 11, 4),
+            "digit": round(1 / 11, 4),
+            "symbol": round(1 / 11, 4),
+        }
+        assert result["kanji"] == {"N5": 2, "N4": 0, "N3": 0, "N2": 0, "N1": 0, "unlisted": 1}
+
+    def test_words(self, analyzer):
+        """Content words are graded; particles and endings are not."""
+        result = summarize(analyzer.count("学生は日本語の水を飲みます。学生とカナ"))
+        assert result["vocabulary"] == {
+            "N5": 4,
+            "N4": 1,
+            "N3": 0,
+            "N2": 0,
+            "N1": 0,
+            "unlisted": 1,
+        }
+
+    def test_without_tokenizer(self, tables):
+        """Words are skipped when no tokenizer is given."""
+        counts = CorpusAnalyzer(tables, vectorised=False).count("学生は水")
+        assert summarize(counts)["vocabulary"]["N5"] == 0
+        assert summarize(counts)["kanji"]["N5"] == 3
+
+    def test_count_many_matches_count(self, analyzer):
+        """Counting documents together matches counting them one by one."""
+        assert analyzer.count_many(LINES) == [analyzer.count(line) for line in LINES]
+
+    def test_vectorised_matches_fallback(self, tables):
+        """numpy counting agrees with the str.translate fallback."""
+        pytest.importorskip("numpy")
+        fast = CorpusAnalyzer(tables, vectorised=True)
+        slow = CorpusAnalyzer(tables, vectorised=False)
+        docs = [*LINES, "𠀋𠀋 ext-B", "ｱｲｳ ５"]
+        assert fast.count_many(docs) == slow.count_many(docs)
+
+
+class TestLevels:
+    """Test suite for level estimates and summaries."""
+
+    def _counts(self, kanji, words=(0,) * 6):
+        return [0] * 6 + list(kanji) + list(words)
+
+    def test_estimate(self):
+        """The easiest level covering 95% of kanji and words is chosen."""
+        assert estimate_level(self._counts((96, 4, 0, 0, 0, 0))) == "N5"
+        assert estimate_level(self._counts((50, 0, 50, 0, 0, 0))) == "N3"
+        assert estimate_level(self._counts((50, 0, 0, 0, 0, 50))) == "N1+"
+        assert estimate_level([0] * WIDTH) is None
+
+    def test_add(self):
+        """Counts merge by addition."""
+        assert add([1] * WIDTH, [2] * WIDTH) == [3] * WIDTH
+
+    def test_tables_from_content(self):
+        """Built-in vocabulary gives word levels and, through it, kanji levels."""
+        tables = level_tables()
+        assert tables.words["今日"] == 0  # N5 beats the N3 homograph
+        assert tables.kanji["水"] == 0
+
+
+class TestCorpus:
+    """Test suite for chunked and parallel corpus runs."""
+
+    def test_chunks_end_at_boundaries(self, corpus):
+        """Chunks cover the file and end after a newline (a blank line for blocks)."""
+        data = corpus.read_bytes()
+        for split, boundary in (("line", b"\n"), ("blank", b"\n\n")):
+            ranges = chunk_ranges(corpus, split, 100)
+            assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+            assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+            assert all(data[:end].endswith(boundary) for _, end in ranges[:-1])
+
+    def test_line_numbers_across_chunks(self, corpus, tables):
+        """Each line document reports its line in the file, whatever the chunking."""
+        whole = list(iter_corpus([corpus], "line", 1, 2**20, tables=tables))
+        chunked = list(iter_corpus([corpus], "line", 1, 64, tables=tables))
+        assert whole == chunked
+        lines = corpus.read_text(encoding="utf-8").split("\n")
+        found = [lines[line - 1] for (_, line), _ in whole[:4]]
+        assert found == [LINES[0], LINES[1], LINES[2], LINES[5]]
+        assert len(whole) == 4 * 50
+
+    def test_blocks_and_files(self, corpus, tables):
+        """Blank-line blocks and whole files add up to the same totals as lines."""
+
+        def total(split):
+            found = list(iter_corpus([corpus], split, 1, 64, tables=tables))
+            result = [0] * WIDTH
+            for _, counts in found:
+                add(result, counts)
+            return len(found), result
+
+        _, by_line = total("line")
+        blocks, by_block = total("blank")
+        files, by_file = total("file")
+        assert (blocks, files) == (51, 1)
+        assert by_line == by_block == by_file
+
+    def test_process_pool_matches_single_process(self, corpus, tables):
+        """Worker processes return the same documents in the same order."""
+        single = list(iter_corpus([corpus, corpus], "line", 1, 256, tables=tables))
+        pooled = list(iter_corpus([corpus, corpus], "line", 2, 256, tables=tables))
+        assert pooled == single
+
+    def test_empty_file_and_bad_split(self, tmp_path, tables):
+        """An empty file has no line documents but is still one file document."""
+        empty = tmp_path / "empty.txt"
+        empty.write_bytes(b"")
+        assert list(iter_corpus([empty], "line", 1, tables=tables)) == []
+        whole = list(iter_corpus([empty], "file", 1, tables=tables))
+        assert whole == [((str(empty), 0), [0] * WIDTH)]
+        with pytest.raises(ValueError):
+            list(iter_corpus([empty], "page", 1, tables=tables))
+
+
+class TestCli:
+    """Test suite for the analyze-corpus command."""
+
+    def test_documents_and_summary(self, corpus):
+        """One NDJSON line per document, then the corpus summary."""
+        result = CliRunner().invoke(
+            app, ["analyze-corpus", str(corpus), "--workers", "1", "--split", "blank", "--summary"]
+        )
+        assert result.exit_code == 0
+        lines = [json.loads(line) for line in result.output.splitlines()]
+        assert len(lines) == 52
+        assert lines[0]["path"] == str(corpus) and lines[0]["line"] == 1
+        assert lines[-1]["documents"] == 51
+        assert lines[-1]["vocabulary"]["N5"] > 0
+
+    def test_summary_only(self, corpus):
+        """--no-documents with --summary prints a single line."""
+        result = CliRunner().invoke(
+            app,
+            ["analyze-corpus", str(corpus), "-w", "1", "--no-documents", "--no-words", "--summary"],
+        )
+        (line,) = result.output.splitlines()
+        assert json.loads(line)["vocabulary"]["N5"] == 0
+
+    def test_bad_split(self, corpus):
+        """An unknown split is a usage error."""
+        result = CliRunner().invoke(app, ["analyze-corpus", str(corpus), "--split", "page"])
+        assert result.exit_code == 2
+
+
+def test_module_constants():
+    """Counts vectors have a slot per class and two per bucket."""
+    assert len(difficulty.CLASSES) + 2 * len(difficulty.BUCKETS) == WIDTH
@@ -0,0 +1,93 @@
+"""Tests for review drill sessions."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from opengov_earlyjapanese.core.drill import RELEARN_GAP, DrillSession, ReviewStore
+from opengov_earlyjapanese.core.hiragana import HiraganaTeacher
+from opengov_earlyjapanese.core.srs import SRSState
+
+
+@pytest.fixture
+def pool():
+    """Card pool for the hiragana a-row."""
+    t = HiraganaTeacher()
+    return {t.characters[c].id: t.characters[c] for c in t.rows["a_row"]}
+
+
+class TestDrillSession:
+    """Test suite for DrillSession."""
+
+    def test_new_cards_in_order(self, pool):
+        """Test that unseen cards are drilled in pool order."""
+        session = DrillSession("s1", pool, {})
+        assert session.next_card().prompt == "あ"
+        # Asking again without answering returns the same card
+        assert session.next_card().prompt == "あ"
+
+    def test_correct_answer(self, pool):
+        """Test grading a correct romaji answer."""
+        session = DrillSession("s1", pool, {})
+        card = session.next_card()
+        result = session.answer(card.card_id, answer=" A ")
+        assert result.correct
+        assert result.rating == "good"
+        assert session.next_card().prompt == "い"
+        assert card.card_id in session.take_dirty()
+        assert session.take_dirty() == {}
+
+    def test_wrong_answer_is_relearned(self, pool):
+        """Test that a failed card comes back after a short gap."""
+        session = DrillSession("s1", pool, {})
+        card = session.next_card()
+        result = session.answer(card.card_id, answer="o")
+        assert not result.correct
+        assert result.expected == "a"
+        assert list(session.queue).index(card.card_id) == RELEARN_GAP
+
+    def test_explicit_rating(self, pool):
+        """Test grading by self-rating only."""
+        session = DrillSession("s1", pool, {})
+        card = session.next_card()
+        assert session.answer(card.card_id, rating="easy").correct
+
+    def test_invalid_answers(self, pool):
+        """Test rejected answer messages."""
+        session = DrillSession("s1", pool, {})
+        card = session.next_card()
+        with pytest.raises(ValueError):
+            session.answer("hiragana_い", answer="i")
+        with pytest.raises(ValueError):
+            session.answer(card.card_id)
+        with pytest.raises(ValueError):
+            session.answer(card.card_id, rating="perfect")
+
+    def test_due_cards_before_new(self, pool):
+        """Test that due reviews are queued ahead of new cards, oldest first."""
+        now = datetime.utcnow()
+        states = {
+            "hiragana_お": SRSState(1, 2.5, 1, now - timedelta(days=2)),
+            "hiragana_え": SRSState(1, 2.5, 1, now - timedelta(days=1)),
+            "hiragana_う": SRSState(1, 2.5, 1, now + timedelta(days=3)),
+        }
+        session = DrillSession("s1", pool, states, now=now)
+        assert list(session.queue) == ["hiragana_お", "hiragana_え", "hiragana_あ", "hiragana_い"]
+
+    def test_exhausted_session(self, pool):
+        """Test that an empty queue yields no card."""
+        session = DrillSession("s1", {}, {})
+        assert session.next_card() is None
+        assert session.summary() == {"answered": 0, "correct": 0, "remaining": 0}
+
+
+class TestReviewStore:
+    """Test suite for ReviewStore."""
+
+    def test_states_are_per_student(self):
+        """Test that saved states load back for the same student only."""
+        store = ReviewStore()
+        state = SRSState(2, 2.5, 1, datetime.utcnow())
+        store.save_many("s1", {"c1": state})
+        assert store.load("s1") == {"c1": state}
+        assert store.load("s2") == {}
@@ -0,0 +1,108 @@
+"""Tests for the WebSocket drill endpoint."""
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from opengov_earlyjapanese.api import drill
+from opengov_earlyjapanese.api.main import app
+
+
+class TestDrillWebSocket:
+    """Test suite for /ws/drill."""
+
+    @pytest.fixture
+    def client(self):
+        """Create a test client."""
+        return TestClient(app)
+
+    def test_answer_returns_result_and_next_card(self, client):
+        """Test that each result frame carries the next card."""
+        with client.websocket_connect("/ws/drill?student=ws1&row=a_row") as ws:
+            session = ws.receive_json()
+            assert session["type"] == "session"
+            assert not session["resumed"]
+            card = ws.receive_json()["card"]
+            assert card["prompt"] == "あ"
+            ws.send_json({"type": "answer", "card_id": card["card_id"], "answer": "a"})
+            frame = ws.receive_json()
+            assert frame["type"] == "result"
+            assert frame["result"]["correct"]
+            assert frame["next"]["prompt"] == "い"
+            ws.send_json({"type": "end"})
+            done = ws.receive_json()
+            assert done["summary"]["answered"] == 1
+        assert "hiragana_あ" in drill.review_store.load("ws1")
+
+    def test_resume_after_disconnect(self, client):
+        """Test that reconnecting with a session id resumes at the same card."""
+        with client.websocket_connect("/ws/drill?student=ws2&deck=katakana&row=ka_row") as ws:
+            session_id = ws.receive_json()["session_id"]
+            card = ws.receive_json()["card"]
+            ws.send_json({"type": "answer", "card_id": card["card_id"], "rating": "good"})
+            pending = ws.receive_json()["next"]
+        # The disconnect flushed the answered card
+        assert card["card_id"] in drill.review_store.load("ws2")
+        with client.websocket_connect(f"/ws/drill?student=ws2&session={session_id}") as ws:
+            assert ws.receive_json()["resumed"]
+            assert ws.receive_json()["card"] == pending
+
+    def test_session_belongs_to_student(self, client):
+        """Test that another student cannot resume someone else's session."""
+        with client.websocket_connect("/ws/drill?student=ws3") as ws:
+            session_id = ws.receive_json()["session_id"]
+        with client.websocket_connect(f"/ws/drill?student=ws4&session={session_id}") as ws:
+            assert not ws.receive_json()["resumed"]
+
+    def test_errors_keep_connection_open(self, client):
+        """Test that bad messages produce error frames."""
+        with client.websocket_connect("/ws/drill?student=ws5") as ws:
+            ws.receive_json()
+            card = ws.receive_json()["card"]
+            ws.send_json({"type": "bogus"})
+            assert ws.receive_json()["type"] == "error"
+            ws.send_json({"type": "answer", "card_id": "nope", "answer": "a"})
+            assert ws.receive_json()["type"] == "error"
+            ws.send_json({"type": "answer", "card_id": card["card_id"], "answer": "a"})
+            assert ws.receive_json()["type"] == "result"
+
+    def test_malformed_frames_keep_connection_open(self, client):
+        """Test that invalid JSON, non-object and binary frames produce error frames."""
+        with client.websocket_connect("/ws/drill?student=ws6") as ws:
+            ws.receive_json()
+            card = ws.receive_json()["card"]
+            ws.send_text("{not json")
+            assert ws.receive_json() == {"type": "error", "detail": "Invalid JSON"}
+            for frame in ([1, 2], "answer", None):
+                ws.send_json(frame)
+                assert ws.receive_json() == {"type": "error", "detail": "Expected a JSON object"}
+            ws.send_bytes(b"\xff")
+            assert ws.receive_json()["type"] == "error"
+            ws.send_json({"type": "answer", "card_id": card["card_id"], "answer": 5})
+            assert ws.receive_json()["type"] == "error"
+            ws.send_json({"type": "answer", "card_id": card["card_id"], "answer": "a"})
+            assert ws.receive_json()["type"] == "result"
+
+    def test_unknown_deck_or_row(self, client):
+        """Test that invalid decks and rows close the socket."""
+        for query in ("deck=kanji", "row=zz_row"):
+            url = f"/ws/drill?{query}"
+            with client.websocket_connect(url) as ws, pytest.raises(WebSocketDisconnect):
+                ws.receive_json()
+
+
+class TestSessionManager:
+    """Test suite for SessionManager."""
+
+    def test_expiry_and_capacity(self):
+        """Test that idle and excess sessions are evicted."""
+        from opengov_earlyjapanese.core.drill import DrillSession
+
+        manager = drill.SessionManager(ttl=0.0, max_sessions=1)
+        sid = manager.add(DrillSession("a", {}, {}))
+        assert manager.get(sid, "a") is None
+        manager = drill.SessionManager(ttl=60.0, max_sessions=1)
+        first = manager.add(DrillSession("a", {}, {}))
+        manager.add(DrillSession("b", {}, {}))
+        assert len(manager) == 1
+        assert manager.get(first, "a") is None
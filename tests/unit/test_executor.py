@@ -0,0 +1,104 @@
+"""Tests for the CPU-bound process pool."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from opengov_earlyjapanese.api import executor
+from opengov_earlyjapanese.api.main import app
+from opengov_earlyjapanese.core.kanji import analyze_text
+
+
+class TestRunCPUBound:
+    """Test suite for run_cpu_bound."""
+
+    @pytest.fixture(autouse=True)
+    def pool(self):
+        """Start a small pool for each test and shut it down afterwards."""
+        executor.shutdown_pool()
+        executor.start_pool(workers=1)
+        yield
+        executor.shutdown_pool()
+
+    def test_runs_in_pool(self):
+        """Test that a function runs in a worker and returns its result."""
+        result = asyncio.run(executor.run_cpu_bound(analyze_text, "愛は愛"))
+        assert [r["character"] for r in result] == ["愛"]
+
+    def test_timeout(self):
+        """Test that a task exceeding its deadline raises CPUTaskTimeoutError."""
+        with pytest.raises(executor.CPUTaskTimeoutError):
+            asyncio.run(executor.run_cpu_bound(time.sleep, 0.5, timeout=0.05))
+
+    def test_start_is_idempotent(self):
+        """Test that starting twice returns the same pool."""
+        assert executor.start_pool() is executor.start_pool()
+
+    def test_pool_size_default(self):
+        """Test that the default size is positive."""
+        assert executor.pool_size() >= 1
+
+    def test_pool_size_shared_by_prefork_workers(self, monkeypatch):
+        """Test that prefork workers split the cores instead of each taking all of them."""
+        monkeypatch.setattr(executor.os, "cpu_count", lambda: 8)
+        monkeypatch.setattr(executor.settings, "cpu_pool_workers", 0)
+        monkeypatch.setattr(executor, "_server_workers", 1)
+        assert executor.pool_size() == 7
+        executor.set_server_workers(4)
+        assert executor.pool_size() == 2
+        executor.set_server_workers(16)
+        assert executor.pool_size() == 1
+        monkeypatch.setattr(executor.settings, "cpu_pool_workers", 3)
+        assert executor.pool_size() == 3
+
+
+class TestAnalyzeEndpoint:
+    """Test suite for the offloaded kanji analysis endpoint."""
+
+    def test_analyze_text(self):
+        """Test batch analysis through the app lifespan."""
+        with TestClient(app) as client:
+            response = client.post("/kanji/analyze", json={"text": "愛してる、愛!"})
+        assert response.status_code == 200
+        assert [r["character"] for r in response.json()] == ["愛"]
+
+    def test_timeout_maps_to_504(self, monkeypatch):
+        """Test that a timed-out analysis returns 504."""
+
+        async def slow(*args, **kwargs):
+            raise executor.CPUTaskTimeoutError("too slow")
+
+        monkeypatch.setattr(executor, "run_cpu_bound", slow)
+        response = TestClient(app).post("/kanji/analyze", json={"text": "愛"})
+        assert response.status_code == 504
+
+    def test_identical_requests_coalesce(self, monkeypatch):
+        """Test that concurrent identical analyses run once and are then cached."""
+        from opengov_earlyjapanese.api import main
+
+        calls = []
+
+        async def fake(func, text):
+            calls.append(text)
+            await asyncio.sleep(0.02)
+            return func(text)
+
+        monkeypatch.setattr(executor, "run_cpu_bound", fake)
+        main.analysis_cache.clear()
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+                body = {"text": "愛と愛情"}
+                responses = await asyncio.gather(
+                    *(client.post("/kanji/analyze", json=body) for _ in range(10))
+                )
+                again = await client.post("/kanji/analyze", json=body)
+            return [*responses, again]
+
+        responses = asyncio.run(scenario())
+        assert all(r.status_code == 200 for r in responses)
+        assert len(calls) == 1
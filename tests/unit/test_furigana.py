@@ -0,0 +1,226 @@
+"""Tests for furigana alignment, rendering, caching and front ends."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from typer.testing import CliRunner
+
+from opengov_earlyjapanese.api.main import app as api_app
+from opengov_earlyjapanese.cli import app
+from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.core import registry
+from opengov_earlyjapanese.core.furigana import (
+    FuriganaAnnotator,
+    Segment,
+    align,
+    render_bracket,
+    render_html,
+    segment_sentences,
+)
+from opengov_earlyjapanese.core.models import Vocabulary
+from opengov_earlyjapanese.core.tokenizer import (
+    DictionaryTokenizer,
+    function_entries,
+    vocabulary_entries,
+)
+
+WORDS = [
+    ("学生", "がくせい", "noun"),
+    ("日本語", "にほんご", "noun"),
+    ("食べる", "たべる", "verb"),
+    ("取り扱い", "とりあつかい", "noun"),
+    ("お茶", "おちゃ", "noun"),
+]
+
+
+@pytest.fixture
+def annotator():
+    """An annotator over a small vocabulary plus the built-in function words."""
+    entries = [
+        Vocabulary(
+            id=f"v{i}",
+            word=w,
+            reading=r,
+            meanings=["x"],
+            part_of_speech=p,
+            jlpt_level="N5",
+            frequency_rank=i + 1,
+        )
+        for i, (w, r, p) in enumerate(WORDS)
+    ]
+    tokenizer = DictionaryTokenizer.from_entries(
+        [*function_entries(), *vocabulary_entries(entries)]
+    )
+    return FuriganaAnnotator(tokenizer, cache_size=100)
+
+
+class TestAlign:
+    """Test suite for pinning readings to kanji runs."""
+
+    @pytest.mark.parametrize(
+        "surface,reading,parts",
+        [
+            ("学生", "がくせい", [("学生", "がくせい")]),
+            ("食べる", "たべる", [("食", "た"), ("べる", None)]),
+            ("取り扱い", "とりあつかい", [("取", "と"), ("り", None), ("扱", "あつか"), ("い", None)]),
+            ("お茶", "おちゃ", [("お", None), ("茶", "ちゃ")]),
+            ("コーヒー", "こーひー", [("コーヒー", None)]),
+            ("は", "わ", [("は", None)]),
+            ("学生", "", [("学生", None)]),
+        ],
+    )
+    def test_align(self, surface, reading, parts):
+        """Okurigana and prefixes stay outside the reading."""
+        assert align(surface, reading) == parts
+
+    def test_mismatched_kana_reads_whole_word(self):
+        """Kana that the reading does not contain give the whole word the reading."""
+        assert align("食べる", "くう") == [("食べる", "くう")]
+
+
+class TestRendering:
+    """Test suite for the output formats."""
+
+    def test_formats(self, annotator):
+        """HTML ruby, brackets and JSON spans for the same text."""
+        text = "学生は食べる"
+        assert annotator.annotate(text, "html", True) == (
+            "<ruby>学生<rt>がくせい</rt></ruby>は<ruby>食<rt>た</rt></ruby>べる"
+        )
+        assert annotator.annotate(text, "bracket", True) == "学生[がくせい]は 食[た]べる"
+        spans = annotator.annotate(text, "json", True)
+        assert spans[0] == {"text": "学生", "reading": "がくせい", "start": 0, "end": 2}
+        assert "".join(s["text"] for s in spans) == text
+
+    def test_html_is_escaped(self):
+        """Text around the ruby is escaped."""
+        segments = [Segment("<b>", None, 0, 3), Segment("茶", "ちゃ", 3, 4)]
+        assert render_html(segments) == "&lt;b&gt;<ruby>茶<rt>ちゃ</rt></ruby>"
+
+    def test_bracket_spacing(self):
+        """No space is added at the start or after whitespace."""
+        segments = [Segment("茶", "ちゃ", 0, 1), Segment(" ", None, 1, 2), Segment("茶", "ちゃ", 2, 3)]
+        assert render_bracket(segments) == "茶[ちゃ] 茶[ちゃ]"
+
+    def test_segments_cover_text(self, annotator):
+        """Spans tile the text across sentences, whitespace and unknown words."""
+        text = "学生です。\n  未知の日本語！ABC"
+        spans = annotator.annotate(text, "json", True)
+        assert "".join(s["text"] for s in spans) == text
+        for s in spans:
+            assert text[s["start"] : s["end"]] == s["text"]
+        assert {"text": "日本語", "reading": "にほんご", "start": 11, "end": 14} in spans
+
+    def test_unknown_words_have_no_reading(self, annotator):
+        """Kanji the lexicon does not know are left bare."""
+        assert annotator.annotate("未知", "bracket", True) == "未知"
+
+    def test_unknown_format(self, annotator):
+        """An unknown format is an error."""
+        with pytest.raises(ValueError, match="format"):
+            annotator.annotate("学生", "xml", True)
+
+    def test_default_follows_setting(self, annotator, monkeypatch):
+        """Unset ``furigana`` follows ``settings.furigana_default``."""
+        monkeypatch.setattr(settings, "furigana_default", False)
+        assert annotator.annotate("学生<", "html") == "学生&lt;"
+        assert annotator.annotate("学生", "json") == [
+            {"text": "学生", "reading": None, "start": 0, "end": 2}
+        ]
+        monkeypatch.setattr(settings, "furigana_default", True)
+        assert annotator.annotate("学生", "bracket") == "学生[がくせい]"
+
+
+class TestCaching:
+    """Test suite for the sentence cache and batch interfaces."""
+
+    def test_sentences_are_cached(self, annotator):
+        """A repeated sentence is segmented once, whatever the format or position."""
+        annotator.annotate("学生です。", "html", True)
+        annotator.annotate("学生です。", "bracket", True)
+        annotator.annotate("日本語。学生です。", "json", True)
+        assert len(annotator.cache) == 2
+        assert annotator.cache.hits >= 2
+
+    def test_salt_changes_keys(self, annotator):
+        """Annotators for different content never share keys."""
+        other = FuriganaAnnotator(annotator.tokenizer, salt="other")
+        assert annotator._key("学生") != other._key("学生")
+
+    def test_missing_and_store(self, annotator):
+        """Sentences segmented elsewhere are served from the cache."""
+        texts = ["学生です。日本語。", "学生です。"]
+        missing = annotator.missing(texts)
+        assert missing == ["学生です。", "日本語。"]
+        annotator.store(["日本語。"], [[Segment("日本語。", "x", 0, 4)]])
+        assert annotator.missing(texts) == ["学生です。"]
+        assert annotator.annotate("日本語。", "bracket", True) == "日本語。[x]"
+
+    def test_batch_and_stream(self, annotator):
+        """annotate_many and iter_annotate keep input order."""
+        texts = ["学生", "食べる", ""]
+        expected = ["学生[がくせい]", "食[た]べる", ""]
+        assert annotator.annotate_many(texts, "bracket", True) == expected
+        stream = annotator.iter_annotate(iter(texts), "bracket", True)
+        assert next(stream) == expected[0]
+        assert list(stream) == expected[1:]
+
+
+class TestInterfaces:
+    """Test suite for the registry, CLI and API."""
+
+    @pytest.fixture(autouse=True)
+    def builtin(self, monkeypatch):
+        """Use the built-in tokenizer over the served content, furigana on."""
+        monkeypatch.setattr(settings, "tokenizer_backend", "builtin")
+        monkeypatch.setattr(settings, "furigana_default", True)
+        registry.reload()
+        yield
+        registry.reload()
+
+    def test_registry(self):
+        """The shared annotator uses the shared tokenizer and is salted with the content."""
+        annotator = registry.get_furigana_annotator()
+        assert annotator is registry.get_furigana_annotator()
+        assert annotator.tokenizer is registry.get_tokenizer()
+        assert segment_sentences(["学生"]) == [[Segment("学生", "がくせい", 0, 2)]]
+
+    def test_cli(self):
+        """furigana prints brackets, HTML or JSON, and streams batches."""
+        runner = CliRunner()
+        result = runner.invoke(app, ["furigana", "学生です"])
+        assert result.exit_code == 0
+        assert result.output.strip() == "学生[がくせい]です"
+        result = runner.invoke(app, ["furigana", "学生", "--format", "html"])
+        assert result.output.strip() == "<ruby>学生<rt>がくせい</rt></ruby>"
+        result = runner.invoke(app, ["furigana", "学生", "--format", "json"])
+        assert json.loads(result.output)[0]["reading"] == "がくせい"
+        result = runner.invoke(app, ["furigana", "学生", "--no-furigana"])
+        assert result.output.strip() == "学生"
+        result = runner.invoke(app, ["furigana", "--stdin"], input="学生\n水\n")
+        lines = [json.loads(line) for line in result.output.splitlines()]
+        assert [line["query"] for line in lines] == ["学生", "水"]
+        assert lines[0]["result"] == "学生[がくせい]"
+        assert runner.invoke(app, ["furigana", "学生", "--format", "xml"]).exit_code != 0
+
+    def test_api(self):
+        """POST /furigana, /furigana/batch and /furigana/stream."""
+        with TestClient(api_app) as client:
+            response = client.post("/furigana", json={"text": "学生です"})
+            assert response.status_code == 200
+            assert response.json()["result"] == "<ruby>学生<rt>がくせい</rt></ruby>です"
+            body = {"texts": ["学生", "学生です"], "format": "bracket"}
+            response = client.post("/furigana/batch", json=body)
+            assert response.json()["results"] == ["学生[がくせい]", "学生[がくせい]です"]
+            response = client.post("/furigana/stream", json=body)
+            assert response.headers["content-type"] == "application/x-ndjson"
+            lines = [json.loads(line) for line in response.text.splitlines()]
+            assert lines == [
+                {"index": 0, "result": "学生[がくせい]"},
+                {"index": 1, "result": "学生[がくせい]です"},
+            ]
+            response = client.post("/furigana", json={"text": "学生", "furigana": False})
+            assert response.json()["result"] == "学生"
+            assert client.post("/furigana", json={"text": "x", "format": "xml"}).status_code == 422
+        assert len(registry.get_furigana_annotator().cache) >= 2
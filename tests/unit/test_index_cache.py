@@ -0,0 +1,130 @@
+"""Tests for the persisted index cache."""
+
+from array import array
+
+import pytest
+
+from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.core import registry
+from opengov_earlyjapanese.utils.index_cache import (
+    IndexCache,
+    IndexCacheError,
+    cache_key,
+    read_index,
+    write_index,
+)
+
+
+def _sections():
+    return {"postings": array("I", [3, 1, 4, 1, 5]), "grams": {"あい": [0, 2]}, "n": 7}
+
+
+class TestFormat:
+    """Writing and mapping index files."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that JSON and array sections read back unchanged."""
+        path = tmp_path / "x.idx"
+        write_index(path, "k", _sections())
+        loaded = read_index(path, "k")
+        assert list(loaded["postings"]) == [3, 1, 4, 1, 5]
+        assert isinstance(loaded["postings"], memoryview)
+        assert loaded["grams"] == {"あい": [0, 2]}
+        assert loaded["n"] == 7
+        assert path.stat().st_size % 8 == 0
+
+    def test_rejects_other_key(self, tmp_path):
+        """Test that a file written for another key is refused."""
+        path = tmp_path / "x.idx"
+        write_index(path, "k", _sections())
+        with pytest.raises(IndexCacheError, match="another key"):
+            read_index(path, "other")
+
+    def test_rejects_truncated_file(self, tmp_path):
+        """Test that a truncated file is detected."""
+        path = tmp_path / "x.idx"
+        write_index(path, "k", _sections())
+        path.write_bytes(path.read_bytes()[:-16])
+        with pytest.raises(IndexCacheError):
+            read_index(path, "k")
+
+    def test_key_covers_content_and_version(self):
+        """Test that the key changes with the content hash and builder version."""
+        assert cache_key("search", "abc") != cache_key("search", "abd")
+        assert cache_key("search", "abc", 1) != cache_key("search", "abc", 2)
+        assert cache_key("search", "abc") == cache_key("search", "abc")
+
+
+class TestIndexCache:
+    """load_or_build behaviour."""
+
+    def test_builds_once_then_loads(self, tmp_path):
+        """Test that a second cache over the same directory loads the file."""
+        calls = []
+
+        def build():
+            calls.append(1)
+            return _sections()
+
+        first = IndexCache(tmp_path).load_or_build("demo", "h1", build)
+        cache = IndexCache(tmp_path)
+        second = cache.load_or_build("demo", "h1", build)
+        assert len(calls) == 1
+        assert cache.hits == 1 and cache.builds == 0
+        assert list(second["postings"]) == list(first["postings"])
+
+    def test_content_change_rebuilds_and_prunes(self, tmp_path):
+        """Test that a new content hash rebuilds and removes the old file."""
+        cache = IndexCache(tmp_path)
+        cache.load_or_build("demo", "h1", _sections)
+        cache.load_or_build("demo", "h2", _sections)
+        assert cache.builds == 2
+        (only,) = tmp_path.glob("demo-*.idx")
+        assert only == cache.path("demo", cache_key("demo", "h2"))
+
+    def test_corrupt_file_is_rebuilt(self, tmp_path):
+        """Test that an unreadable cache file is replaced."""
+        cache = IndexCache(tmp_path)
+        path = cache.path("demo", cache_key("demo", "h1"))
+        path.write_bytes(b"garbage")
+        sections = cache.load_or_build("demo", "h1", _sections)
+        assert sections["n"] == 7 and cache.builds == 1
+        assert read_index(path)["n"] == 7
+
+    def test_without_directory(self):
+        """Test that no directory means building in memory every time."""
+        cache = IndexCache(None)
+        cache.load_or_build("demo", "h1", _sections)
+        cache.load_or_build("demo", "h1", _sections)
+        assert cache.builds == 2
+
+
+class TestRegistryIndexes:
+    """Indexes shared through the registry."""
+
+    @pytest.fixture
+    def cache_dir(self, tmp_path, monkeypatch):
+        """Use a temporary index cache directory with a fresh registry."""
+        monkeypatch.setattr(settings, "index_cache_dir", tmp_path)
+        monkeypatch.setattr(settings, "tokenizer_backend", "builtin")
+        registry.reload()
+        yield tmp_path
+        monkeypatch.setattr(settings, "index_cache_dir", None)
+        registry.reload()
+
+    def test_preload_writes_and_reuses_indexes(self, cache_dir):
+        """Test that a restarted process loads every index from disk."""
+        names = ["autocomplete", "search", "tokenizer", "vocabulary"]
+        registry.preload()
+        assert registry.get_index_cache().builds == len(names)
+        assert sorted(p.name.split("-")[0] for p in cache_dir.glob("*.idx")) == names
+        registry.reload()
+        registry.preload()
+        assert registry.get_index_cache().hits == len(names)
+        assert registry.get_index_cache().builds == 0
+
+    def test_content_hash_is_stable(self, cache_dir):
+        """Test that the built-in content hash does not change between loads."""
+        first = registry.content_hash()
+        registry.reload()
+        assert registry.content_hash() == first
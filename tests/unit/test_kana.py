@@ -0,0 +1,69 @@
+"""Tests for kana folding and romaji conversion."""
+
+import pytest
+
+from opengov_earlyjapanese.core.kana import (
+    is_romaji,
+    pending_kana,
+    romaji_to_kana,
+    romaji_to_kana_partial,
+    to_hiragana,
+)
+
+
+class TestRomajiToKana:
+    """Test suite for romaji conversion."""
+
+    @pytest.mark.parametrize(
+        "romaji,kana",
+        [
+            ("gakusei", "がくせい"),
+            ("kyou", "きょう"),
+            ("shinbun", "しんぶん"),
+            ("sinbun", "しんぶん"),
+            ("konnichiha", "こんにちは"),
+            ("onna", "おんな"),
+            ("kan'i", "かんい"),
+            ("kitte", "きって"),
+            ("matcha", "まっちゃ"),
+            ("tsukue", "つくえ"),
+            ("tukue", "つくえ"),
+            ("ko-hi-", "こーひー"),
+            ("hon", "ほん"),
+            ("Tabemasu", "たべます"),
+        ],
+    )
+    def test_words(self, romaji, kana):
+        """Test Hepburn and Kunrei spellings, sokuon, ん and long vowels."""
+        assert romaji_to_kana(romaji) == kana
+
+    def test_non_romaji_passes_through(self):
+        """Test that kana, digits and stray consonants are left alone."""
+        assert romaji_to_kana("たbe 2") == "たべ 2"
+        assert romaji_to_kana("q") == "q"
+
+    def test_partial(self):
+        """Test that an unfinished syllable is held back while typing."""
+        assert romaji_to_kana_partial("tab") == ("た", "b")
+        assert romaji_to_kana_partial("kan") == ("か", "n")
+        assert romaji_to_kana_partial("kitt") == ("きっ", "t")
+        assert romaji_to_kana_partial("kyo") == ("きょ", "")
+
+    def test_pending_kana(self):
+        """Test the kana a fragment can still turn into."""
+        assert pending_kana("b") == ("ば", "び", "ぶ", "べ", "ぼ")
+        assert "ん" in pending_kana("n")
+        assert pending_kana("ts") == ("つ",)
+
+
+class TestKanaHelpers:
+    """Test suite for script helpers."""
+
+    def test_to_hiragana(self):
+        """Test that katakana folds onto hiragana and nothing else changes."""
+        assert to_hiragana("コーヒーと水") == "こーひーと水"
+
+    def test_is_romaji(self):
+        """Test ASCII letter detection."""
+        assert is_romaji("Ka")
+        assert not is_romaji("かな 123")
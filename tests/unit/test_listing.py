@@ -0,0 +1,75 @@
+"""Tests for the content listing endpoints."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from opengov_earlyjapanese.api.main import app
+
+
+class TestListingEndpoints:
+    """Test suite for cursor-paginated listings."""
+
+    @pytest.fixture
+    def client(self):
+        """Create a test client."""
+        return TestClient(app)
+
+    def test_first_page(self, client):
+        """Test fetching the first page of hiragana."""
+        response = client.get("/hiragana", params={"limit": 10})
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) == 10
+        assert data["next_cursor"]
+
+    def test_follow_cursor_to_end(self, client):
+        """Test that cursors walk the full katakana collection."""
+        seen = []
+        params = {"limit": 20}
+        while True:
+            data = client.get("/katakana", params=params).json()
+            seen.extend(item["character"] for item in data["items"])
+            if not data["next_cursor"]:
+                break
+            params["cursor"] = data["next_cursor"]
+        assert len(seen) == 46
+        assert len(set(seen)) == 46
+
+    def test_kanji_and_grammar(self, client):
+        """Test the kanji and grammar collections."""
+        kanji = client.get("/kanji").json()
+        assert kanji["items"][0]["character"] == "愛"
+        grammar = client.get("/grammar").json()
+        assert grammar["items"][0]["pattern"] == "です"
+
+    def test_invalid_cursor(self, client):
+        """Test that a bad cursor is rejected with 400."""
+        response = client.get("/hiragana", params={"cursor": "!!!"})
+        assert response.status_code == 400
+
+    def test_limit_bounds(self, client):
+        """Test that out-of-range limits are rejected."""
+        assert client.get("/hiragana", params={"limit": 0}).status_code == 422
+
+    def test_ndjson_stream(self, client):
+        """Test streaming a collection as NDJSON."""
+        response = client.get("/hiragana", params={"format": "ndjson"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = response.text.splitlines()
+        assert len(lines) == 46
+        assert json.loads(lines[0])["type"] == "hiragana"
+
+    def test_ndjson_stream_from_cursor(self, client):
+        """Test that NDJSON streaming resumes after a cursor."""
+        first = client.get("/hiragana", params={"limit": 40}).json()
+        response = client.get(
+            "/hiragana", params={"format": "ndjson", "cursor": first["next_cursor"]}
+        )
+        assert len(response.text.splitlines()) == 6
+
+    def test_row_route_still_works(self, client):
+        """Test that the row lesson route is unaffected by the listing route."""
+        assert client.get("/hiragana/a_row").json()["row"] == "a_row"
@@ -0,0 +1,141 @@
+"""Tests for the load-test harness."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from typer.testing import CliRunner
+
+from opengov_earlyjapanese import loadtest
+from opengov_earlyjapanese.cli import app as cli_app
+from opengov_earlyjapanese.loadtest import Target, load_mix, parse_target, percentile
+
+
+def _make_app():
+    app = FastAPI()
+
+    @app.get("/ok")
+    async def ok():
+        return {"ok": True}
+
+    @app.get("/fail")
+    async def fail():
+        raise HTTPException(status_code=500)
+
+    @app.post("/echo")
+    async def echo(body: dict):
+        return body
+
+    return app
+
+
+class TestParsing:
+    """Test suite for request mix parsing."""
+
+    def test_parse_target(self):
+        """Test parsing method, path and weight."""
+        target = parse_target("get /health=3")
+        assert (target.method, target.path, target.weight) == ("GET", "/health", 3.0)
+        assert parse_target("POST /x").weight == 1.0
+
+    @pytest.mark.parametrize("spec", ["/health", "GET health", "GET /x=abc"])
+    def test_parse_target_invalid(self, spec):
+        """Test that malformed specs are rejected."""
+        with pytest.raises(ValueError):
+            parse_target(spec)
+
+    def test_load_mix(self, tmp_path):
+        """Test loading a JSON mix with bodies."""
+        path = tmp_path / "mix.json"
+        path.write_text(json.dumps([{"path": "/a"}, {"method": "post", "path": "/b", "body": {}}]))
+        mix = load_mix(path)
+        assert [t.name for t in mix] == ["GET /a", "POST /b"]
+        assert mix[1].body == {}
+
+    def test_load_mix_empty(self, tmp_path):
+        """Test that an empty mix is rejected."""
+        path = tmp_path / "mix.json"
+        path.write_text("[]")
+        with pytest.raises(ValueError):
+            load_mix(path)
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 0.5) == 50.0
+        assert percentile(values, 0.99) == 99.0
+        assert percentile([], 0.5) == 0.0
+
+
+class TestRunLoad:
+    """Test suite for running load in process."""
+
+    def test_report(self):
+        """Test request counts, error rates and per-endpoint breakdown."""
+        mix = [Target("GET", "/ok", 3), Target("GET", "/fail", 1)]
+        report = asyncio.run(
+            loadtest.run_in_process(_make_app(), concurrency=4, mix=mix, requests=200, seed=7)
+        )
+        assert report["target"] == "asgi"
+        assert report["requests"] == 200
+        assert report["errors"] == report["endpoints"]["GET /fail"]["requests"] > 0
+        assert report["endpoints"]["GET /ok"]["errors"] == 0
+        assert set(report["status"]) == {"200", "500"}
+        latency = report["latency_ms"]
+        assert latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+
+    def test_body_sent(self):
+        """Test that JSON bodies from the mix are posted."""
+        mix = [Target("POST", "/echo", body={"text": "あ"})]
+        report = asyncio.run(loadtest.run_in_process(_make_app(), 2, mix, requests=10))
+        assert report["status"] == {"200": 10}
+
+    def test_duration_limit(self):
+        """Test an open-ended run bounded by duration."""
+        mix = [Target("GET", "/ok")]
+        report = asyncio.run(loadtest.run_in_process(_make_app(), 2, mix, requests=0, duration=0.1))
+        assert report["requests"] > 0
+        assert report["duration_s"] < 1.0
+
+    def test_requires_budget(self):
+        """Test that a run needs a request count or a duration."""
+        client = httpx.AsyncClient()
+        with pytest.raises(ValueError):
+            asyncio.run(loadtest.run_load([client], [Target("GET", "/")], requests=0))
+
+    def test_transport_errors_counted(self):
+        """Test that connection failures are recorded as errors."""
+        report = asyncio.run(
+            loadtest.run_against_url("http://127.0.0.1:9", 1, [Target("GET", "/")], requests=3)
+        )
+        assert report["status"] == {"0": 3}
+        assert report["error_rate"] == 1.0
+
+
+class TestLoadtestCommand:
+    """Test suite for the loadtest CLI command."""
+
+    def test_in_process(self, tmp_path):
+        """Test a small in-process run against the API with a JSON report."""
+        out = tmp_path / "report.json"
+        result = CliRunner().invoke(
+            cli_app, ["loadtest", "-n", "20", "-c", "2", "-r", "GET /health", "-o", str(out)]
+        )
+        assert result.exit_code == 0
+        report = json.loads(out.read_text())
+        assert report["requests"] == 20
+        assert report["status"] == {"200": 20}
+
+    def test_threshold_fails(self):
+        """Test that exceeding the error-rate gate exits with 1."""
+        result = CliRunner().invoke(
+            cli_app, ["loadtest", "-n", "5", "-r", "GET /missing", "--max-error-rate", "0"]
+        )
+        assert result.exit_code == 1
+
+    def test_invalid_spec(self):
+        """Test that a malformed request spec is a usage error."""
+        result = CliRunner().invoke(cli_app, ["loadtest", "-r", "nonsense"])
+        assert result.exit_code == 2
@@ -66,3 +66,120 @@ class TestLogger:
         except Exception as e:
             pytest.fail(f"Logging raised an exception: {e}")
 
+
+
+@pytest.fixture
+def captured():
+    """Route logging to a buffer for one test, then restore the default setup."""
+    import io
+
+    from opengov_earlyjapanese.utils.logger import configure_logging, shutdown_logging
+
+    stream = io.StringIO()
+    configure_logging(level="INFO", fmt="json", stream=stream, force=True)
+    yield stream
+    shutdown_logging()
+
+
+class TestQueuedLogging:
+    """Configure-once setup, background writer and DEBUG sampling."""
+
+    def test_configure_is_idempotent(self, captured):
+        """Test that repeated configuration installs a single queue handler."""
+        from opengov_earlyjapanese.utils.logger import HANDLER_NAME, configure_logging
+
+        configure_logging()
+        configure_logging()
+        get_logger("idempotent")
+        names = [h.get_name() for h in logging.getLogger().handlers]
+        assert names.count(HANDLER_NAME) == 1
+
+    def test_records_written_by_listener(self, captured):
+        """Test that records reach the stream once the queue is flushed."""
+        import json
+
+        from opengov_earlyjapanese.utils.logger import shutdown_logging
+
+        get_logger("queued").info("hello %s", "queue", user=1)
+        shutdown_logging()
+        entry = json.loads(captured.getvalue().strip().splitlines()[-1])
+        assert entry["event"] == "hello queue"
+        assert entry["level"] == "info"
+        assert entry["user"] == 1
+
+    def test_level_is_respected(self, captured):
+        """Test that records below the configured level are not written."""
+        from opengov_earlyjapanese.utils.logger import shutdown_logging
+
+        get_logger("levels").debug("hidden")
+        get_logger("levels").warning("shown")
+        shutdown_logging()
+        output = captured.getvalue()
+        assert "hidden" not in output
+        assert "shown" in output
+
+    def test_stdlib_records_share_the_queue(self, captured):
+        """Test that plain logging calls are rendered by the same writer."""
+        from opengov_earlyjapanese.utils.logger import shutdown_logging
+
+        logging.getLogger("third.party").warning("from %s", "stdlib")
+        shutdown_logging()
+        assert "from stdlib" in captured.getvalue()
+
+    def test_noisy_libraries_stay_at_warning(self, captured):
+        """Test that per-request INFO records from HTTP clients are not queued."""
+        from opengov_earlyjapanese.utils.logger import shutdown_logging
+
+        logging.getLogger("httpx").info("HTTP Request: GET /health")
+        logging.getLogger("httpcore.connection").debug("connect_tcp.started")
+        logging.getLogger("httpx").warning("kept")
+        shutdown_logging()
+        output = captured.getvalue()
+        assert "HTTP Request" not in output
+        assert "connect_tcp" not in output
+        assert "kept" in output
+
+
+class TestDebugSampler:
+    """Token-bucket sampling of DEBUG records."""
+
+    @staticmethod
+    def _record(name: str, level: int = logging.DEBUG) -> logging.LogRecord:
+        return logging.LogRecord(name, level, __file__, 1, "msg", None, None)
+
+    def test_drops_beyond_burst(self):
+        """Test that a burst is allowed and the excess is dropped."""
+        from opengov_earlyjapanese.utils.logger import DebugSampler
+
+        sampler = DebugSampler(rate=1.0, burst=3, clock=lambda: 0.0)
+        kept = [sampler.filter(self._record("hot")) for _ in range(5)]
+        assert kept == [True, True, True, False, False]
+        assert sampler.dropped == 2
+
+    def test_refills_over_time(self):
+        """Test that tokens refill at the configured rate."""
+        from opengov_earlyjapanese.utils.logger import DebugSampler
+
+        now = [0.0]
+        sampler = DebugSampler(rate=2.0, burst=1, clock=lambda: now[0])
+        assert sampler.filter(self._record("hot"))
+        assert not sampler.filter(self._record("hot"))
+        now[0] = 0.5
+        assert sampler.filter(self._record("hot"))
+
+    def test_buckets_are_per_logger_and_level(self):
+        """Test that other loggers and higher levels are not affected."""
+        from opengov_earlyjapanese.utils.logger import DebugSampler
+
+        sampler = DebugSampler(rate=1.0, burst=1, clock=lambda: 0.0)
+        assert sampler.filter(self._record("a"))
+        assert not sampler.filter(self._record("a"))
+        assert sampler.filter(self._record("b"))
+        assert sampler.filter(self._record("a", logging.INFO))
+
+    def test_zero_rate_disables_sampling(self):
+        """Test that a rate of 0 keeps every record."""
+        from opengov_earlyjapanese.utils.logger import DebugSampler
+
+        sampler = DebugSampler(rate=0, burst=0)
+        assert all(sampler.filter(self._record("hot")) for _ in range(100))
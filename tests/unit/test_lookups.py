@@ -0,0 +1,126 @@
+"""Tests for shared lookups and the CLI's NDJSON batch mode."""
+
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from opengov_earlyjapanese.cli import app
+from opengov_earlyjapanese.lookups import LOOKUPS, lookup, stream_ndjson
+
+
+class TestLookups:
+    """Test suite for single-query lookups."""
+
+    def test_hiragana_lesson(self):
+        """Test a row lookup."""
+        assert lookup("hiragana", "a_row")["characters"][0] == "あ"
+
+    def test_mnemonics(self):
+        """Test hiragana and katakana mnemonic lookups."""
+        assert lookup("mnemonic", "あ")
+        assert lookup("katakana.mnemonic", "カ")
+
+    @pytest.mark.parametrize(
+        "name,query",
+        [
+            ("hiragana", "nope"),
+            ("mnemonic", "ab"),
+            ("kanji.analyze", "愛愛"),
+            ("katakana.characters", "x"),
+            ("vocab", "ない言葉"),
+        ],
+    )
+    def test_invalid_queries(self, name, query):
+        """Test that bad queries raise ValueError."""
+        with pytest.raises(ValueError):
+            lookup(name, query)
+
+    def test_unknown_lookup(self):
+        """Test that an unknown lookup name is rejected."""
+        with pytest.raises(ValueError):
+            lookup("nope", "x")
+
+    def test_search_options(self):
+        """Test that options are passed through to the lookup."""
+        results = lookup("search", "ka", kind="hiragana")
+        assert {r["type"] for r in results} == {"hiragana"}
+
+    def test_all_lookups_registered(self):
+        """Test the set of batch-capable lookups."""
+        assert set(LOOKUPS) == {
+            "hiragana",
+            "mnemonic",
+            "kanji.analyze",
+            "search",
+            "katakana.characters",
+            "katakana.mnemonic",
+            "vocab",
+            "tokenize",
+            "furigana",
+        }
+
+
+class TestStreamNdjson:
+    """Test suite for NDJSON batch streaming."""
+
+    def test_results_and_errors(self):
+        """Test that errors are reported in-line and blank lines skipped."""
+        out = list(stream_ndjson("hiragana", ["a_row\n", "\n", "  \n", "bad\n"]))
+        assert [ok for _, ok in out] == [True, False]
+        first, second = (json.loads(line) for line, _ in out)
+        assert first["query"] == "a_row" and first["result"]["row"] == "a_row"
+        assert second == {"query": "bad", "error": "Unknown row: bad"}
+
+    def test_compact_unicode(self):
+        """Test that output is single-line and not ASCII-escaped."""
+        line, _ = next(stream_ndjson("mnemonic", ["あ"]))
+        assert "\n" not in line and ", " not in line
+        assert '"あ"' in line
+
+
+class TestBatchCommands:
+    """Test suite for --stdin and --input on CLI commands."""
+
+    @pytest.fixture
+    def runner(self):
+        """Create a CLI test runner."""
+        return CliRunner()
+
+    @pytest.mark.parametrize(
+        "args,stdin",
+        [
+            (["hiragana"], "a_row\nka_row\n"),
+            (["mnemonic"], "あ\nい\n"),
+            (["kanji", "analyze"], "愛\n日\n"),
+            (["search", "--kind", "katakana"], "ka\nsa\n"),
+            (["katakana", "characters"], "a_row\nka_row\n"),
+            (["katakana", "mnemonic"], "ア\nカ\n"),
+        ],
+    )
+    def test_stdin(self, runner, args, stdin):
+        """Test that each batch-capable command streams one line per query."""
+        result = runner.invoke(app, [*args, "--stdin"], input=stdin)
+        assert result.exit_code == 0, result.output
+        lines = [json.loads(line) for line in result.stdout.splitlines()]
+        assert [r["query"] for r in lines] == stdin.split()
+        assert all("result" in r for r in lines)
+
+    def test_input_file(self, runner, tmp_path):
+        """Test reading queries from a file."""
+        path = tmp_path / "rows.txt"
+        path.write_text("a_row\n", encoding="utf-8")
+        result = runner.invoke(app, ["katakana", "characters", "--input", str(path)])
+        assert result.exit_code == 0
+        assert json.loads(result.stdout)["result"][0]["character"] == "ア"
+
+    def test_failures_exit_nonzero(self, runner):
+        """Test that a failed query keeps the batch going but exits 1."""
+        result = runner.invoke(app, ["mnemonic", "--stdin"], input="x\nあ\n")
+        assert result.exit_code == 1
+        assert len(result.stdout.splitlines()) == 2
+
+    def test_missing_argument(self, runner):
+        """Test that a query argument is still required outside batch mode."""
+        result = runner.invoke(app, ["search"])
+        assert result.exit_code == 2
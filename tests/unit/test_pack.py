@@ -0,0 +1,232 @@
+"""Tests for compiled content packs."""
+
+import json
+import os
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+from typer.testing import CliRunner
+
+from opengov_earlyjapanese.api import listing
+from opengov_earlyjapanese.api.main import app as api_app
+from opengov_earlyjapanese.cli import app
+from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.core import registry
+from opengov_earlyjapanese.core.hiragana import HiraganaTeacher
+from opengov_earlyjapanese.core.pack import (
+    ContentPack,
+    ContentPackError,
+    build_pack,
+    builtin_records,
+    load_sources,
+)
+
+
+@pytest.fixture
+def builtin_pack(tmp_path):
+    """A pack compiled from the built-in content."""
+    path = tmp_path / "content.pack"
+    build_pack(builtin_records(), path, content_version="test")
+    return path
+
+
+@pytest.fixture
+def use_pack(monkeypatch):
+    """Point the registry at a pack for one test."""
+
+    def use(path):
+        monkeypatch.setattr(settings, "content_pack", path)
+        registry.reload()
+
+    yield use
+    monkeypatch.setattr(settings, "content_pack", None)
+    registry.reload()
+
+
+class TestBuild:
+    """Compiling sources into a pack."""
+
+    def test_round_trips_builtin_content(self, builtin_pack):
+        """Test that a pack reproduces the built-in teachers."""
+        builtin = HiraganaTeacher()
+        with ContentPack(builtin_pack) as pack:
+            teacher = HiraganaTeacher.from_pack(pack)
+            assert teacher.rows == builtin.rows
+            assert list(teacher.characters) == list(builtin.characters)
+            assert teacher.characters["あ"] == builtin.characters["あ"]
+            assert teacher.get_lesson("ka_row") == builtin.get_lesson("ka_row")
+            assert pack.content_version == "test"
+            pack.verify()
+
+    def test_checksum_is_deterministic(self, tmp_path, builtin_pack):
+        """Test that rebuilding the same content gives the same checksum."""
+        again = tmp_path / "again.pack"
+        build_pack(builtin_records(), again, content_version="other")
+        with ContentPack(builtin_pack) as a, ContentPack(again) as b:
+            assert a.checksum == b.checksum
+
+    def test_tsv_and_json_sources(self, tmp_path):
+        """Test reading TSV list fields and JSON records."""
+        (tmp_path / "hiragana.tsv").write_text(
+            "character\tromaji\trow\tmnemonic\nか\tka\tka_row\tKnife\nあ\ta\ta_row\t\n",
+            encoding="utf-8",
+        )
+        (tmp_path / "vocabulary.tsv").write_text(
+            "word\treading\tmeanings\tjlpt_level\n水\tみず\twater;cold water\tN5\n",
+            encoding="utf-8",
+        )
+        (tmp_path / "grammar.json").write_text(
+            json.dumps([{"pattern": "が", "meaning": "subject marker"}]), encoding="utf-8"
+        )
+        path = tmp_path / "out.pack"
+        meta = build_pack(load_sources(tmp_path), path)
+        assert meta["counts"] == {"grammar": 1, "hiragana": 2, "vocabulary": 1}
+        with ContentPack(path) as pack:
+            assert pack.keys("hiragana") == ["か", "あ"]
+            assert pack.groups("hiragana") == {"ka_row": ["か"], "a_row": ["あ"]}
+            (word,) = pack.records("vocabulary")
+            assert word["meanings"] == ["water", "cold water"]
+            assert pack.record("hiragana", "か")["unicode"] == "U+304B"
+            assert pack.record("grammar", "が")["examples"] == []
+
+    def test_duplicate_keys_rejected(self, tmp_path):
+        """Test that a kind cannot contain the same key twice."""
+        records = [("kanji", "日", None, {}), ("kanji", "日", None, {})]
+        with pytest.raises(ContentPackError, match="Duplicate"):
+            build_pack(records, tmp_path / "dup.pack")
+
+    def test_missing_sources(self, tmp_path):
+        """Test that an empty source directory is an error."""
+        with pytest.raises(ContentPackError, match="No content sources"):
+            load_sources(tmp_path)
+
+
+class TestLoad:
+    """Opening and reading packs."""
+
+    def test_records_decoded_lazily(self, builtin_pack):
+        """Test that only accessed records are decoded."""
+        with ContentPack(builtin_pack) as pack:
+            table = pack.table("katakana", dict)
+            assert len(table) == 46 and "ア" in table
+            assert table._cache == {}
+            assert table["ア"]["romaji"] == "a"
+            assert list(table._cache) == ["ア"]
+            with pytest.raises(KeyError):
+                table["あ"]
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+    def test_forked_child_reads_through_its_own_connection(self, builtin_pack):
+        """Test that a pack opened before fork() is reopened in the child."""
+        with ContentPack(builtin_pack) as pack:
+            table = pack.table("katakana", dict)
+            parent_db = pack._db
+            read, write = os.pipe()
+            pid = os.fork()
+            if pid == 0:  # child: report, then exit without running pytest's teardown
+                status = 1
+                try:
+                    reopened = pack._db is not parent_db
+                    os.write(write, json.dumps([reopened, table["カ"]["romaji"]]).encode())
+                    status = 0
+                finally:
+                    os._exit(status)
+            os.close(write)
+            with os.fdopen(read) as f:
+                result = json.loads(f.read())
+            assert os.waitpid(pid, 0)[1] == 0
+            assert result == [True, "ka"]
+            assert pack._db is parent_db
+            assert table["カ"]["romaji"] == "ka"
+
+    def test_verify_detects_tampering(self, builtin_pack):
+        """Test that a modified record fails verification."""
+        db = sqlite3.connect(builtin_pack)
+        db.execute("UPDATE records SET data = '{}' WHERE kind = 'kanji'")
+        db.commit()
+        db.close()
+        with ContentPack(builtin_pack) as pack, pytest.raises(
+            ContentPackError, match="Checksum mismatch"
+        ):
+            pack.verify()
+
+    def test_rejects_other_files(self, tmp_path):
+        """Test that non-pack files and unknown formats are refused."""
+        bogus = tmp_path / "bogus.pack"
+        bogus.write_bytes(b"not sqlite at all" * 10)
+        with pytest.raises(ContentPackError):
+            ContentPack(bogus)
+        with pytest.raises(ContentPackError, match="not found"):
+            ContentPack(tmp_path / "missing.pack")
+
+    def test_registry_uses_configured_pack(self, tmp_path, use_pack):
+        """Test that shared teachers are built over the configured pack."""
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "grammar.json").write_text(
+            json.dumps([{"pattern": "を", "meaning": "object marker"}]), encoding="utf-8"
+        )
+        path = tmp_path / "grammar.pack"
+        build_pack(load_sources(tmp_path / "src"), path)
+        use_pack(path)
+        teacher = registry.get_grammar_teacher()
+        assert teacher.patterns() == ["を"]
+        assert teacher.explain("を").meaning == "object marker"
+        assert registry.get_content_pack().path == path
+
+    def test_cli_and_listings_follow_reload(self, tmp_path, use_pack):
+        """Test that CLI lookups and cached listings serve the pack loaded by a reload."""
+        runner = CliRunner()
+        src = tmp_path / "src"
+        assert runner.invoke(app, ["build-content", "--export", str(src)]).exit_code == 0
+        records = json.loads((src / "hiragana.json").read_text(encoding="utf-8"))
+        records[0]["mnemonic"] = "A pack-only mnemonic"
+        (src / "hiragana.json").write_text(json.dumps(records), encoding="utf-8")
+        build_pack(load_sources(src), tmp_path / "edited.pack")
+        client = TestClient(api_app)
+        first = client.get("/hiragana", params={"limit": 1}).json()["items"][0]
+        assert first["mnemonic"] != "A pack-only mnemonic"
+
+        use_pack(tmp_path / "edited.pack")
+        assert runner.invoke(app, ["mnemonic", "あ"]).stdout.strip() == "A pack-only mnemonic"
+        result = runner.invoke(app, ["characters", "a_row"])
+        assert json.loads(result.stdout)[0]["mnemonic"] == "A pack-only mnemonic"
+        first = client.get("/hiragana", params={"limit": 1}).json()["items"][0]
+        assert first["mnemonic"] == "A pack-only mnemonic"
+
+    def test_listings_survive_reload_of_same_pack(self, builtin_pack, use_pack):
+        """Test that listings keep working after a reload closes and reopens the pack."""
+        use_pack(builtin_pack)
+        client = TestClient(api_app)
+        first = client.get("/hiragana", params={"limit": 1}).json()
+        listing.get_collection("kanji")
+        registry.reload()
+        rest = client.get("/hiragana", params={"cursor": first["next_cursor"], "limit": 5})
+        assert rest.status_code == 200
+        assert rest.json()["items"][0]["character"] != first["items"][0]["character"]
+        kanji = client.get("/kanji")
+        assert kanji.status_code == 200
+        assert kanji.json()["items"][0]["character"] == "愛"
+
+
+class TestCommands:
+    """build-content and content-info."""
+
+    def test_build_and_inspect(self, tmp_path):
+        """Test building from exported sources and verifying the result."""
+        runner = CliRunner()
+        src, out = tmp_path / "src", tmp_path / "out.pack"
+        assert runner.invoke(app, ["build-content", "--export", str(src)]).exit_code == 0
+        assert (src / "hiragana.json").exists()
+        result = runner.invoke(app, ["build-content", str(src), "-o", str(out)])
+        assert result.exit_code == 0, result.output
+        assert "46 hiragana" in result.stdout
+        result = runner.invoke(app, ["content-info", str(out), "--verify"])
+        assert result.exit_code == 0
+        assert json.loads(result.stdout)["counts"]["katakana"] == 46
+
+    def test_build_reports_bad_sources(self, tmp_path):
+        """Test that malformed sources exit with an error."""
+        (tmp_path / "kanji.json").write_text('{"not": "a list"}', encoding="utf-8")
+        result = CliRunner().invoke(app, ["build-content", str(tmp_path), "-o", "x.pack"])
+        assert result.exit_code == 1
@@ -0,0 +1,73 @@
+"""Tests for lazy package attributes and CLI startup imports."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import opengov_earlyjapanese
+
+# Modules that must not be loaded just to start the CLI
+HEAVY_MODULES = (
+    "pydantic_settings",
+    "structlog",
+    "opengov_earlyjapanese.config",
+    "opengov_earlyjapanese.core.hiragana",
+    "opengov_earlyjapanese.core.kanji",
+)
+
+
+def _loaded_after(code):
+    probe = f"import sys; {code}; print(' '.join(sorted(sys.modules)))"
+    out = subprocess.run(
+        [sys.executable, "-c", probe], capture_output=True, text=True, check=True
+    ).stdout.split()
+    return [m for m in HEAVY_MODULES if m in out]
+
+
+class TestLazyAttributes:
+    """Test suite for PEP 562 lazy package attributes."""
+
+    def test_public_names_resolve(self):
+        """Test that every name in __all__ is available."""
+        for name in opengov_earlyjapanese.__all__:
+            assert getattr(opengov_earlyjapanese, name) is not None
+
+    def test_same_objects(self):
+        """Test that lazy attributes are the real classes."""
+        from opengov_earlyjapanese.core.hiragana import HiraganaTeacher
+
+        assert opengov_earlyjapanese.HiraganaTeacher is HiraganaTeacher
+
+    def test_unknown_attribute(self):
+        """Test that unknown names still raise AttributeError."""
+        with pytest.raises(AttributeError):
+            opengov_earlyjapanese.does_not_exist  # noqa: B018
+
+    def test_dir_lists_lazy_names(self):
+        """Test that dir() includes names that have not been loaded yet."""
+        assert "KanjiMaster" in dir(opengov_earlyjapanese)
+
+
+class TestStartupImports:
+    """Test suite for what CLI startup imports."""
+
+    def test_package_import_is_light(self):
+        """Test that importing the package loads neither settings nor content."""
+        assert _loaded_after("import opengov_earlyjapanese") == []
+
+    def test_cli_import_is_light(self):
+        """Test that importing the CLI defers settings and content modules."""
+        assert _loaded_after("import opengov_earlyjapanese.cli") == []
+
+    def test_no_directories_created(self, tmp_path):
+        """Test that loading settings does not create directories."""
+        subprocess.run(
+            [sys.executable, "-c", "from opengov_earlyjapanese.config import settings"],
+            cwd=tmp_path,
+            env={**os.environ, "PYTHONPATH": str(Path(opengov_earlyjapanese.__file__).parents[1])},
+            check=True,
+        )
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,87 @@
+"""Tests for keyset pagination helpers."""
+
+import json
+
+import pytest
+
+from opengov_earlyjapanese.api.pagination import (
+    KeysetCollection,
+    decode_cursor,
+    encode_cursor,
+    iter_ndjson,
+)
+
+
+class TestCursor:
+    """Test suite for cursor encoding."""
+
+    def test_round_trip(self):
+        """Test that a cursor decodes to the key it was built from."""
+        assert decode_cursor(encode_cursor("あ")) == "あ"
+
+    def test_invalid_cursor(self):
+        """Test that garbage cursors raise ValueError."""
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    def test_non_string_key_rejected(self):
+        """Test that a well-formed cursor with a non-string key is rejected."""
+        import base64
+
+        raw = base64.urlsafe_b64encode(b'{"k": 1}').decode("ascii")
+        with pytest.raises(ValueError):
+            decode_cursor(raw)
+
+
+class TestKeysetCollection:
+    """Test suite for KeysetCollection."""
+
+    @pytest.fixture
+    def collection(self):
+        """Create a collection of ten keys."""
+        keys = [f"k{i:02d}" for i in range(10)]
+        return KeysetCollection(keys, lambda k: {"key": k})
+
+    def test_walk_all_pages(self, collection):
+        """Test that following cursors visits every item exactly once."""
+        seen = []
+        after = None
+        while True:
+            items, cursor = collection.page(after, 3)
+            seen.extend(i["key"] for i in items)
+            if cursor is None:
+                break
+            after = decode_cursor(cursor)
+        assert seen == [f"k{i:02d}" for i in range(10)]
+
+    def test_last_page_has_no_cursor(self, collection):
+        """Test that an exact final page does not return a cursor."""
+        items, cursor = collection.page("k04", 5)
+        assert len(items) == 5
+        assert cursor is None
+
+    def test_cursor_after_missing_key(self, collection):
+        """Test that a cursor key no longer present still resumes in order."""
+        items, _ = collection.page("k03x", 2)
+        assert [i["key"] for i in items] == ["k04", "k05"]
+
+    def test_iter_from_with_limit(self, collection):
+        """Test iterating a bounded slice."""
+        assert [i["key"] for i in collection.iter_from("k07")] == ["k08", "k09"]
+        assert len(list(collection.iter_from(None, 4))) == 4
+        assert len(collection) == 10
+
+
+class TestNDJSON:
+    """Test suite for NDJSON encoding."""
+
+    def test_chunks_and_lines(self):
+        """Test that items are grouped into newline-terminated chunks."""
+        chunks = list(iter_ndjson(({"n": i} for i in range(5)), chunk_size=2))
+        assert len(chunks) == 3
+        lines = b"".join(chunks).decode("utf-8").splitlines()
+        assert [json.loads(line)["n"] for line in lines] == list(range(5))
+
+    def test_empty(self):
+        """Test that no items yield no chunks."""
+        assert list(iter_ndjson(iter(()), chunk_size=10)) == []
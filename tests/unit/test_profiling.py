@@ -0,0 +1,219 @@
+"""Tests for profiling helpers."""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from opengov_earlyjapanese.utils.profiling import (
+    ContinuousSampler,
+    ProfileStore,
+    StackSampler,
+    StoredProfile,
+    collapse,
+    merge_collapsed_dir,
+    parse_collapsed,
+    render_collapsed,
+)
+
+
+def _spin(stop):
+    while not stop.is_set():
+        sum(range(100))
+
+
+class TestCollapse:
+    """Test suite for stack collapsing."""
+
+    def test_root_first(self):
+        """Test that the current function is the last element of its stack."""
+        stack = collapse(sys._getframe())
+        assert stack.split(";")[-1].startswith("test_root_first (")
+
+    def test_render(self):
+        """Test collapsed-stack rendering, most frequent first."""
+        text = render_collapsed(Counter({"a;b": 2, "a;c": 5}))
+        assert text == "a;c 5\na;b 2\n"
+
+    def test_parse_round_trip(self):
+        """Test that parsing rendered stacks gives back the same counts."""
+        stacks = Counter({"a;b (x.py:1)": 2, "a;c": 5})
+        assert parse_collapsed(render_collapsed(stacks) + "garbage\n") == stacks
+
+    def test_merge_dir(self, tmp_path):
+        """Test that per-worker files are summed."""
+        (tmp_path / "1.collapsed").write_text("a;b 2\na;c 1\n")
+        (tmp_path / "2.collapsed").write_text("a;b 3\n")
+        (tmp_path / "ignored.txt").write_text("a;b 100\n")
+        assert merge_collapsed_dir(tmp_path) == Counter({"a;b": 5, "a;c": 1})
+
+    def test_merge_dir_skips_stale_files(self, tmp_path):
+        """Test that files no longer being flushed are left out when max_age is set."""
+        (tmp_path / "1.collapsed").write_text("a;b 2\n")
+        stale = tmp_path / "2.collapsed"
+        stale.write_text("a;c 7\n")
+        old = time.time() - 60
+        os.utime(stale, (old, old))
+        assert merge_collapsed_dir(tmp_path, max_age=30) == Counter({"a;b": 2})
+        assert merge_collapsed_dir(tmp_path) == Counter({"a;b": 2, "a;c": 7})
+
+
+class TestStackSampler:
+    """Test suite for StackSampler."""
+
+    def test_samples_busy_thread(self):
+        """Test that a busy thread shows up in the samples."""
+        stop = threading.Event()
+        worker = threading.Thread(target=_spin, args=(stop,))
+        worker.start()
+        try:
+            sampler = StackSampler(interval=0.001, thread_ids=[worker.ident]).start()
+            time.sleep(0.05)
+            stacks = sampler.stop()
+        finally:
+            stop.set()
+            worker.join()
+        assert sampler.samples > 0
+        assert any("_spin" in s for s in stacks)
+
+    def test_idle_threads_skipped(self):
+        """Test that a thread parked in Event.wait is not recorded."""
+        stop = threading.Event()
+        waiter = threading.Thread(target=stop.wait)
+        waiter.start()
+        try:
+            sampler = StackSampler(thread_ids=[waiter.ident])
+            sampler.sample_once()
+        finally:
+            stop.set()
+            waiter.join()
+        assert not sampler.stacks
+
+
+class TestProfileStore:
+    """Test suite for ProfileStore."""
+
+    def test_bounded_newest_first(self):
+        """Test that the store keeps only the newest profiles."""
+        store = ProfileStore(max_profiles=2)
+        profiles = [StoredProfile("GET", f"/{i}", 1.0, b"", "") for i in range(3)]
+        for p in profiles:
+            store.add(p)
+        assert [p.path for p in store.list()] == ["/2", "/1"]
+        assert store.get(profiles[0].id) is None
+        assert store.get(profiles[2].id).summary()["path"] == "/2"
+
+
+class TestContinuousSampler:
+    """Test suite for ContinuousSampler."""
+
+    def test_samples_in_background(self):
+        """Test that a running sampler records busy threads."""
+        stop = threading.Event()
+        worker = threading.Thread(target=_spin, args=(stop,))
+        worker.start()
+        sampler = ContinuousSampler(interval=0.001, max_overhead=1.0).start()
+        try:
+            time.sleep(0.05)
+        finally:
+            sampler.stop()
+            stop.set()
+            worker.join()
+        assert not sampler.running
+        assert sampler.samples > 0
+        assert any("_spin" in s for s in sampler.snapshot())
+
+    def test_bounded_stacks(self):
+        """Test that stacks beyond the limit are folded into [other]."""
+        sampler = ContinuousSampler(max_stacks=1)
+        sampler._stacks["seen"] = 1
+        stop = threading.Event()
+        worker = threading.Thread(target=_spin, args=(stop,))
+        worker.start()
+        try:
+            sampler.sample_once()
+        finally:
+            stop.set()
+            worker.join()
+        stacks = sampler.snapshot()
+        assert set(stacks) == {"seen", ContinuousSampler.OTHER}
+
+    def test_backs_off_over_budget(self):
+        """Test that the interval doubles when overhead exceeds the budget."""
+        sampler = ContinuousSampler(interval=0.001, max_overhead=0.0, window=0.005).start()
+        try:
+            time.sleep(0.05)
+        finally:
+            sampler.stop()
+        assert sampler.interval > 0.001
+
+    def test_interval_adapts_per_window(self):
+        """Test that one slow window backs off, clamped, and quiet windows recover."""
+        sampler = ContinuousSampler(interval=0.01, max_overhead=0.01, max_interval=0.04)
+        sampler._window_busy = 0.05
+        sampler.adapt(0.5)
+        assert sampler.interval == 0.01  # window not over yet
+        for now in (1.0, 2.0, 3.0):
+            sampler._window_busy = 0.05
+            sampler.adapt(now)
+        assert sampler.interval == 0.04
+        assert sampler.recent_overhead == pytest.approx(0.05)
+        sampler.adapt(4.0)
+        assert sampler.interval == 0.02
+        sampler._window_busy = 0.005
+        sampler.adapt(5.0)
+        assert sampler.interval == 0.02  # within budget: hold
+        for now in (6.0, 7.0):
+            sampler.adapt(now)
+        assert sampler.interval == 0.01
+
+    def test_stop_removes_worker_file(self, tmp_path):
+        """Test that a stopped sampler's counts leave the merged profile."""
+        sampler = ContinuousSampler(output_dir=tmp_path).start()
+        sampler.flush()
+        assert list(tmp_path.glob("*.collapsed"))
+        sampler.stop()
+        assert not list(tmp_path.glob("*.collapsed"))
+
+    def test_flush_and_merge(self, tmp_path):
+        """Test that flushed counts can be merged from the output directory."""
+        sampler = ContinuousSampler(output_dir=tmp_path)
+        sampler._stacks.update({"a;b": 3})
+        path = sampler.flush()
+        assert path is not None and path.suffix == ".collapsed"
+        assert merge_collapsed_dir(tmp_path) == Counter({"a;b": 3})
+        sampler.reset()
+        assert not sampler.snapshot()
+
+    def test_flush_without_dir(self):
+        """Test that flushing without an output directory is a no-op."""
+        assert ContinuousSampler().flush() is None
+
+
+class TestFlamegraphCommand:
+    """Test suite for the flamegraph CLI command."""
+
+    def test_merges_to_file(self, tmp_path):
+        """Test that the command merges a sampler directory into one file."""
+        from typer.testing import CliRunner
+
+        from opengov_earlyjapanese.cli import app
+
+        (tmp_path / "1.collapsed").write_text("a;b 2\n")
+        (tmp_path / "2.collapsed").write_text("a;b 1\na;c 1\n")
+        out = tmp_path / "merged.txt"
+        result = CliRunner().invoke(app, ["flamegraph", "--dir", str(tmp_path), "-o", str(out)])
+        assert result.exit_code == 0
+        assert out.read_text() == "a;b 3\na;c 1\n"
+
+    def test_missing_dir(self, tmp_path):
+        """Test that a missing directory is an error."""
+        from typer.testing import CliRunner
+
+        from opengov_earlyjapanese.cli import app
+
+        result = CliRunner().invoke(app, ["flamegraph", "--dir", str(tmp_path / "nope")])
+        assert result.exit_code == 1
@@ -0,0 +1,138 @@
+"""Tests for per-request profiling and the admin profile routes."""
+
+import marshal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import SecretStr
+
+from opengov_earlyjapanese.api import admin, profiling
+from opengov_earlyjapanese.api.profiling import ProfilingMiddleware, profile_store
+from opengov_earlyjapanese.config import settings
+
+TOKEN = "s3cret"
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    """Configure an admin token for the duration of a test."""
+    monkeypatch.setattr(settings, "admin_token", SecretStr(TOKEN))
+
+
+def _make_app(sample_rate=0.0):
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        return {"total": sum(i * i for i in range(20000))}
+
+    app.add_middleware(ProfilingMiddleware, sample_rate=sample_rate)
+    app.include_router(admin.router)
+    return app
+
+
+class TestProfilingMiddleware:
+    """Test suite for ProfilingMiddleware."""
+
+    def test_not_profiled_by_default(self, admin_token):
+        """Test that plain requests are not profiled."""
+        response = TestClient(_make_app()).get("/work")
+        assert "x-profile-id" not in response.headers
+
+    def test_header_requires_admin_token(self, admin_token):
+        """Test that the opt-in header alone is not enough."""
+        response = TestClient(_make_app()).get("/work", headers={"X-Profile": "1"})
+        assert "x-profile-id" not in response.headers
+
+    def test_profile_and_download(self, admin_token):
+        """Test profiling a request and downloading both formats."""
+        client = TestClient(_make_app())
+        auth = {"X-Admin-Token": TOKEN}
+        response = client.get("/work", params={"profile": "1"}, headers=auth)
+        assert response.status_code == 200
+        profile_id = response.headers["x-profile-id"]
+
+        listing = client.get("/admin/profiles", headers=auth).json()
+        assert listing[0]["id"] == profile_id
+        assert listing[0]["path"] == "/work"
+
+        pstats = client.get(f"/admin/profiles/{profile_id}", headers=auth)
+        stats = marshal.loads(pstats.content)
+        assert any(func[2] == "work" for func in stats)
+
+        collapsed = client.get(
+            f"/admin/profiles/{profile_id}", params={"format": "collapsed"}, headers=auth
+        )
+        assert collapsed.status_code == 200
+        assert collapsed.headers["content-type"].startswith("text/plain")
+
+    def test_sample_rate(self, admin_token):
+        """Test that a sample rate of 1 profiles every request."""
+        response = TestClient(_make_app(sample_rate=1.0)).get("/work")
+        assert profile_store.get(response.headers["x-profile-id"]) is not None
+
+
+class TestAdminRoutes:
+    """Test suite for admin access control."""
+
+    def test_forbidden_without_token(self, admin_token):
+        """Test that admin routes reject missing or wrong tokens."""
+        client = TestClient(_make_app())
+        assert client.get("/admin/profiles").status_code == 403
+        assert client.get("/admin/profiles", headers={"X-Admin-Token": "x"}).status_code == 403
+
+    def test_disabled_when_unconfigured(self):
+        """Test that admin routes are closed when no token is configured."""
+        client = TestClient(_make_app())
+        assert client.get("/admin/profiles", headers={"X-Admin-Token": ""}).status_code == 403
+
+    def test_unknown_profile(self, admin_token):
+        """Test that an unknown profile id is a 404."""
+        client = TestClient(_make_app())
+        response = client.get("/admin/profiles/nope", headers={"X-Admin-Token": TOKEN})
+        assert response.status_code == 404
+
+
+class TestFlamegraph:
+    """Test suite for the continuous sampler admin route."""
+
+    @pytest.fixture
+    def sampler(self, monkeypatch, tmp_path):
+        """Start the process sampler with a fast interval and stop it afterwards."""
+        monkeypatch.setattr(settings, "sampler_interval", 0.001)
+        monkeypatch.setattr(settings, "sampler_max_overhead", 1.0)
+        monkeypatch.setattr(settings, "sampler_dir", None)
+        sampler = profiling.start_sampler()
+        yield sampler
+        profiling.stop_sampler()
+
+    def test_disabled(self, admin_token, monkeypatch):
+        """Test that the route is a 404 when no sampler is running."""
+        monkeypatch.setattr(settings, "sampler_dir", None)
+        client = TestClient(_make_app())
+        response = client.get("/admin/flamegraph", headers={"X-Admin-Token": TOKEN})
+        assert response.status_code == 404
+
+    def test_local_snapshot(self, admin_token, sampler):
+        """Test that the route returns the sampler's stacks and overhead headers."""
+        sampler._stacks.update({"a;b": 4})
+        client = TestClient(_make_app())
+        response = client.get("/admin/flamegraph", headers={"X-Admin-Token": TOKEN})
+        assert response.status_code == 200
+        assert "a;b 4\n" in response.text
+        assert float(response.headers["x-sampler-overhead"]) >= 0
+
+    def test_merges_worker_files(self, admin_token, sampler, monkeypatch, tmp_path):
+        """Test that with a sampler directory, other workers' files are included."""
+        monkeypatch.setattr(settings, "sampler_dir", tmp_path)
+        sampler.output_dir = tmp_path
+        sampler.reset()
+        sampler._stacks.update({"a;b": 1})
+        (tmp_path / "999999.collapsed").write_text("a;b 2\n")
+        client = TestClient(_make_app())
+        response = client.get("/admin/flamegraph", headers={"X-Admin-Token": TOKEN})
+        # The running sampler adds its own stacks, so look the line up rather than
+        # assuming it sorts first
+        counts = dict(line.rsplit(" ", 1) for line in response.text.splitlines())
+        assert int(counts["a;b"]) >= 3
@@ -0,0 +1,38 @@
+"""Tests for shared content instances."""
+
+from opengov_earlyjapanese.core import registry
+from opengov_earlyjapanese.core.hiragana import HiraganaTeacher
+
+
+class TestRegistry:
+    """Test suite for the content registry."""
+
+    def test_instances_are_shared(self):
+        """Test that getters return the same instance on every call."""
+        assert registry.get_hiragana_teacher() is registry.get_hiragana_teacher()
+        assert registry.get_kanji_master() is registry.get_kanji_master()
+
+    def test_preload(self):
+        """Test that preload builds every instance."""
+        registry.preload()
+        assert isinstance(registry.get_hiragana_teacher(), HiraganaTeacher)
+        assert registry.get_katakana_teacher().characters
+        assert registry.get_grammar_teacher().patterns() == ["です"]
+
+    def test_reload_rebuilds_once(self):
+        """Test that reload drops instances and concurrent callers share one rebuild."""
+        import threading
+
+        before = registry.get_kanji_master()
+        registry.reload()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(registry.get_kanji_master()))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results[0] is not before
+        assert all(r is results[0] for r in results)
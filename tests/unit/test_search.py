@@ -0,0 +1,42 @@
+"""Tests for kana character search."""
+
+import pytest
+
+from opengov_earlyjapanese.core import registry
+from opengov_earlyjapanese.core.search import matches, search_characters
+
+
+class TestSearchCharacters:
+    """Test suite for search_characters."""
+
+    def test_by_romaji(self):
+        """Test that romaji matches return both scripts, hiragana first."""
+        results = search_characters("ka")
+        kinds = [r["type"] for r in results]
+        assert "hiragana" in kinds and "katakana" in kinds
+        assert kinds == sorted(kinds, key=["hiragana", "katakana"].index)
+
+    def test_by_character(self):
+        """Test matching on the glyph itself."""
+        results = search_characters("あ", "hiragana")
+        assert results[0]["character"] == "あ"
+
+    def test_kind_filter(self):
+        """Test that the kind filter restricts results."""
+        assert all(r["type"] == "katakana" for r in search_characters("a", "katakana"))
+
+    def test_unknown_kind(self):
+        """Test that an unknown kind is rejected."""
+        with pytest.raises(ValueError):
+            search_characters("a", "kanji")
+
+    @pytest.mark.parametrize("query", ["ka", "KA", "shi", "apple", "wave", "oo", "zz", "a"])
+    def test_index_matches_full_scan(self, query):
+        """Test that bigram narrowing returns exactly what a full scan would."""
+        expected = [
+            ch.character
+            for teacher in (registry.get_hiragana_teacher(), registry.get_katakana_teacher())
+            for ch in teacher.characters.values()
+            if matches(ch, query)
+        ]
+        assert [r["character"] for r in search_characters(query)] == expected
@@ -0,0 +1,250 @@
+"""Tests for the example-sentence importer, index and front ends."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from typer.testing import CliRunner
+
+from opengov_earlyjapanese.api.main import app as api_app
+from opengov_earlyjapanese.cli import app
+from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.core import registry
+from opengov_earlyjapanese.core.difficulty import LevelTables
+from opengov_earlyjapanese.core.kanji import analyze_text
+from opengov_earlyjapanese.core.sentences import (
+    ImportOptions,
+    SentenceGrader,
+    SentenceIndex,
+    SentenceIndexBuilder,
+    _intersect,
+    import_corpus,
+    level_index,
+    normalize,
+)
+from opengov_earlyjapanese.lookups import kanji_analysis, vocabulary_lookup
+
+# Tatoeba-style pairs: id, Japanese, id, English
+LINES = [
+    "1\t私は学生です。\t2\tI am a student.",
+    "3\t日本語を勉強します。\t4\tI study Japanese.",
+    "5\t水は水です。\t6\tWater is water.",
+    "7\t愛は心です。\t8\tLove is the heart.",
+    "9\t心の水。\t10\tWater of the heart.",
+    "11\t私は学生です。\t12\tA duplicate.",
+    "13\t短い\t14\tShort.",
+    "a line without columns",
+    "15\t日本語の  水です。\t16\tIt is Japanese water.",
+]
+OPTIONS = ImportOptions(japanese=1, english=3)
+
+
+@pytest.fixture
+def tables():
+    """私, 水, 学, 生, 日 and 本 at N5, 語 and 心 at N4, 愛 at N3; 勉 and 強 unlisted."""
+    kanji = {"私": 0, "水": 0, "学": 0, "生": 0, "日": 0, "本": 0, "語": 1, "心": 1, "愛": 2}
+    return LevelTables(kanji, {"学生": 0, "水": 0, "日本語": 1})
+
+
+@pytest.fixture(autouse=True)
+def builtin_tokenizer(monkeypatch):
+    """Use the built-in tokenizer in this process and in workers."""
+    monkeypatch.setattr(settings, "tokenizer_backend", "builtin")
+    registry.reload()
+    yield
+    registry.reload()
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    path = tmp_path / "pairs.tsv"
+    path.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def index_path(tmp_path, corpus, tables):
+    """The corpus imported in this process."""
+    path = tmp_path / "sentences.idx"
+    import_corpus([corpus], path, OPTIONS, workers=1, tables=tables)
+    return path
+
+
+@pytest.fixture
+def index(index_path):
+    return SentenceIndex.open(index_path)
+
+
+def _japanese(sentences):
+    return [s["japanese"] for s in sentences]
+
+
+class TestGrading:
+    """Test suite for parsing and grading TSV lines."""
+
+    def test_grade(self, tables):
+        """The level is the hardest kanji or word; unlisted kanji make it unlisted."""
+        grader = SentenceGrader(tables, registry.get_tokenizer())
+        assert grader.grade("私は学生です。") == (0, ("私", "学", "生"), ("学生",))
+        assert grader.grade("日本語の水")[0] == 1
+        assert grader.grade("勉強")[0] == level_index("unlisted")
+        assert grader.grade("です")[0] == 0
+
+    def test_parse_rejections(self, tables):
+        """Malformed, out-of-length, duplicate and too-hard lines are counted, not kept."""
+        grader = SentenceGrader(tables)
+        rejected, kept = grader.parse("\n".join(LINES), OPTIONS._replace(max_level="N4"))
+        assert rejected == {"malformed": 1, "length": 1, "level": 2, "duplicate": 1}
+        assert [s[0] for s in kept] == ["私は学生です。", "水は水です。", "心の水。", "日本語の 水です。"]
+
+    def test_normalize_and_levels(self):
+        """Whitespace is collapsed and level names are case-insensitive."""
+        assert normalize(" ｶ  ﾞ\tx ") == "ｶ ﾞ x"
+        assert level_index("n4") == 1
+        assert level_index("Unlisted") == 5
+        with pytest.raises(ValueError):
+            level_index("N6")
+
+
+class TestIndex:
+    """Test suite for posting-list queries."""
+
+    def test_sentences_numbered_easiest_first(self, index):
+        """Ids run N5, N4, N3, N2, N1, unlisted; the metadata counts rejections."""
+        assert len(index) == 6
+        assert index.level_counts() == {"N5": 2, "N4": 2, "N3": 1, "N2": 0, "N1": 0, "unlisted": 1}
+        assert index.sentence(0) == {
+            "japanese": "私は学生です。",
+            "english": "I am a student.",
+            "level": "N5",
+        }
+        assert index.meta["rejected"] == {"malformed": 1, "length": 1, "level": 0, "duplicate": 1}
+
+    def test_find_by_kanji_and_level(self, index):
+        """A kanji's sentences, easiest first, cut to the level range."""
+        assert _japanese(index.find(["水"])) == ["水は水です。", "心の水。", "日本語の 水です。"]
+        assert _japanese(index.find(["水"], max_level="N5")) == ["水は水です。"]
+        assert _japanese(index.find(["水"], min_level="N4")) == ["心の水。", "日本語の 水です。"]
+        assert _japanese(index.find(["水"], limit=1)) == ["水は水です。"]
+
+    def test_find_intersection(self, index):
+        """Every term must occur; words and kanji combine."""
+        assert _japanese(index.find(["水", "心"])) == ["心の水。"]
+        assert _japanese(index.find(["日本語", "水"])) == ["日本語の 水です。"]
+        assert _japanese(index.find(["日本語"], max_level="N4")) == ["日本語の 水です。"]
+        assert index.find(["水", "愛"]) == []
+        assert index.find(["猫"]) == []
+
+    def test_find_without_terms(self, index):
+        """No terms lists sentences by level."""
+        assert _japanese(index.find([], min_level="N3", limit=5)) == ["愛は心です。", "日本語を勉強します。"]
+
+    def test_intersect(self):
+        """Sorted lists are intersected within the id range, up to the limit."""
+        lists = [[1, 3, 5, 7, 9, 11], [3, 4, 5, 9, 11, 12], [0, 3, 9, 11]]
+        assert _intersect(lists, 0, 100, 10) == [3, 9, 11]
+        assert _intersect(lists, 4, 100, 10) == [9, 11]
+        assert _intersect(lists, 0, 11, 10) == [3, 9]
+        assert _intersect(lists, 0, 100, 1) == [3]
+        assert _intersect([[5, 6, 9], [1, 9]], 0, 100, 10) == [9]
+
+    def test_intersect_one_list(self):
+        """A single list is cut to the range, including a gap before its first id."""
+        assert _intersect([[0, 3]], 0, 10, 5) == [0, 3]
+        assert _intersect([[4, 7, 8]], 0, 10, 2) == [4, 7]
+        assert _intersect([[4, 7, 8]], 5, 8, 5) == [7]
+        assert _intersect([[4, 7, 8]], 9, 20, 5) == []
+        assert _intersect([[]], 0, 10, 5) == []
+
+    def test_builder_dedupes_across_chunks(self):
+        """The same Japanese text from two chunks is kept once."""
+        builder = SentenceIndexBuilder()
+        assert builder.add(("水です", "a", 0, ("水",), ()))
+        assert not builder.add(("水です", "b", 3, ("水",), ()))
+        index = SentenceIndex(builder.sections())
+        assert len(index) == 1 and builder.duplicates == 1
+        assert index.find(["水"])[0]["english"] == "a"
+
+    def test_process_pool_matches_single_process(self, tmp_path, corpus, tables):
+        """Worker processes over small chunks build the same index."""
+        import_corpus([corpus], tmp_path / "a.idx", OPTIONS, 1, 64, tables=tables)
+        single = SentenceIndex.open(tmp_path / "a.idx")
+        meta = import_corpus([corpus, corpus], tmp_path / "b.idx", OPTIONS, 2, 64, tables=tables)
+        pooled = SentenceIndex.open(tmp_path / "b.idx")
+        assert meta["rejected"]["duplicate"] == 8  # one in each copy, then the whole second copy
+        assert [pooled.sentence(i) for i in range(len(pooled))] == [
+            single.sentence(i) for i in range(len(single))
+        ]
+        assert list(pooled.postings("水")) == list(single.postings("水"))
+
+    def test_max_level_filter(self, tmp_path, corpus, tables):
+        """Sentences above the level are not imported."""
+        options = OPTIONS._replace(max_level="N4")
+        meta = import_corpus([corpus], tmp_path / "n4.idx", options, workers=1, tables=tables)
+        assert meta["sentences"] == 4
+        assert meta["rejected"]["level"] == 2
+
+
+class TestInterfaces:
+    """Test suite for the registry, vocabulary examples, CLI and API."""
+
+    def test_registry_without_index(self, monkeypatch):
+        """No configured index means no examples and a 404 from the API."""
+        monkeypatch.setattr(settings, "sentence_index", None)
+        assert registry.get_sentence_index() is None
+        assert vocabulary_lookup("学生")[0]["example_sentences"] == []
+        with TestClient(api_app) as client:
+            assert client.get("/sentences", params={"q": "水"}).status_code == 404
+
+    def test_vocabulary_examples(self, monkeypatch, index_path):
+        """Vocabulary lookups carry examples no harder than the entry."""
+        monkeypatch.setattr(settings, "sentence_index", index_path)
+        registry.reload()
+        assert isinstance(registry.get_sentence_index(), SentenceIndex)
+        examples = vocabulary_lookup("学生")[0]["example_sentences"]
+        assert examples == [{"japanese": "私は学生です。", "english": "I am a student.", "level": "N5"}]
+
+    def test_kanji_examples(self, monkeypatch, index_path):
+        """Kanji lookups, text analysis and the kanji listing carry examples."""
+        monkeypatch.setattr(settings, "sentence_index", index_path)
+        registry.reload()
+        expected = [{"japanese": "愛は心です。", "english": "Love is the heart.", "level": "N3"}]
+        assert kanji_analysis("愛")["example_sentences"] == expected
+        assert analyze_text("愛してる")[0]["example_sentences"] == expected
+        with TestClient(api_app) as client:
+            item = client.get("/kanji").json()["items"][0]
+        assert item["example_sentences"] == expected
+        assert kanji_analysis("猫")["example_sentences"] == []
+
+    def test_cli(self, tmp_path, corpus):
+        """sentences import builds the index and sentences find queries it."""
+        runner = CliRunner()
+        path = tmp_path / "cli.idx"
+        args = ["sentences", "import", str(corpus), "-o", str(path), "--columns", "1,3", "-w", "1"]
+        result = runner.invoke(app, args)
+        assert result.exit_code == 0, result.output
+        assert "sentences (skipped 1 malformed, 1 length, 0 level, 1 duplicate)" in result.output
+        result = runner.invoke(app, ["sentences", "find", "学", "--index", str(path)])
+        assert _japanese(json.loads(result.output)) == ["私は学生です。"]
+        result = runner.invoke(app, ["sentences", "find", "学", "--index", str(path), "-F", "table"])
+        assert "I am a student." in result.output
+        bad = runner.invoke(app, [*args, "--max-level", "N9"])
+        assert bad.exit_code != 0
+
+    def test_cli_without_index(self, monkeypatch):
+        """find needs an index."""
+        monkeypatch.setattr(settings, "sentence_index", None)
+        result = CliRunner().invoke(app, ["sentences", "find", "水"])
+        assert result.exit_code == 1
+
+    def test_api(self, monkeypatch, index_path):
+        """GET /sentences intersects terms within the levels."""
+        monkeypatch.setattr(settings, "sentence_index", index_path)
+        registry.reload()
+        with TestClient(api_app) as client:
+            response = client.get("/sentences", params={"q": "学", "max_level": "N5"})
+            assert response.status_code == 200
+            assert _japanese(response.json()["items"]) == ["私は学生です。"]
+            response = client.get("/sentences", params=[("q", "水"), ("q", "心"), ("limit", 1)])
+            assert _japanese(response.json()["items"]) == ["心の水。"]
+            assert client.get("/sentences", params={"max_level": "N7"}).status_code == 422
@@ -0,0 +1,140 @@
+"""Tests for the pre-fork API server."""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+from typer.testing import CliRunner
+
+from opengov_earlyjapanese import server as server_module
+from opengov_earlyjapanese.cli import app
+from opengov_earlyjapanese.core import registry
+from opengov_earlyjapanese.server import PreforkServer, default_workers, worker_request_limit
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_healthy(port, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                return True
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    return False
+
+
+class TestHelpers:
+    """Test suite for server helper functions."""
+
+    def test_default_workers_positive(self):
+        """Test that auto-sizing yields at least one worker."""
+        assert default_workers() >= 1
+
+    def test_worker_request_limit(self):
+        """Test max-requests budget with and without jitter."""
+        assert worker_request_limit(0, 10) == 0
+        assert worker_request_limit(100, 0) == 100
+        assert 100 <= worker_request_limit(100, 10) <= 110
+
+    def test_auto_worker_count(self):
+        """Test that zero workers means one per core."""
+        assert PreforkServer(workers=0).workers == default_workers()
+
+    def test_bind_ephemeral_port(self):
+        """Test that binding port 0 records the chosen port."""
+        server = PreforkServer(host="127.0.0.1", port=0, workers=2)
+        sock = server.bind()
+        try:
+            assert server.port == sock.getsockname()[1] != 0
+            assert sock.get_inheritable()
+        finally:
+            sock.close()
+
+
+class TestReload:
+    """Test suite for SIGHUP content reloads."""
+
+    def test_rolling_restart_reloads_content_first(self, monkeypatch):
+        """Test that workers are replaced only after the parent reloads content."""
+        server = PreforkServer(workers=2)
+        server.children = {101: 0.0, 102: 0.0}
+        calls = []
+        monkeypatch.setattr(registry, "reload", lambda: calls.append("reload"))
+        monkeypatch.setattr(server_module, "preload_content", lambda: calls.append("preload"))
+        monkeypatch.setattr(server, "spawn", lambda: calls.append("spawn"))
+        monkeypatch.setattr(server, "_stop_worker", calls.append)
+        server._rolling_restart()
+        assert calls == ["reload", "preload", "spawn", 101, "spawn", 102]
+
+    def test_failed_reload_keeps_workers(self, monkeypatch):
+        """Test that a failing reload leaves the running workers alone."""
+        server = PreforkServer(workers=2)
+        server.children = {101: 0.0}
+
+        def fail():
+            raise OSError("pack is corrupt")
+
+        monkeypatch.setattr(registry, "reload", lambda: None)
+        monkeypatch.setattr(server_module, "preload_content", fail)
+        monkeypatch.setattr(server, "spawn", lambda: pytest.fail("respawned"))
+        server._rolling_restart()
+        assert server.children == {101: 0.0}
+
+
+class TestServeCommand:
+    """Test suite for the serve CLI command."""
+
+    def test_options_override_settings(self):
+        """Test that CLI options are passed to the server."""
+        init_patch = patch(
+            "opengov_earlyjapanese.server.PreforkServer.__init__", return_value=None
+        )
+        with patch("opengov_earlyjapanese.server.PreforkServer.run") as run, init_patch as init:
+            result = CliRunner().invoke(
+                app, ["serve", "--port", "9001", "--workers", "3", "--max-requests", "50"]
+            )
+        assert result.exit_code == 0
+        kwargs = init.call_args.kwargs
+        assert kwargs["port"] == 9001
+        assert kwargs["workers"] == 3
+        assert kwargs["max_requests"] == 50
+        run.assert_called_once()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+class TestPreforkLifecycle:
+    """End-to-end lifecycle of a forked server."""
+
+    def test_serve_reload_and_stop(self):
+        """Test that workers serve, survive a rolling restart and stop on SIGTERM."""
+        port = _free_port()
+        code = (
+            "from opengov_earlyjapanese.server import PreforkServer;"
+            f"PreforkServer(host='127.0.0.1', port={port}, workers=2,"
+            " graceful_timeout=5, log_level='warning').run()"
+        )
+        proc = subprocess.Popen([sys.executable, "-c", code])
+        try:
+            assert _wait_healthy(port)
+            assert httpx.get(f"http://127.0.0.1:{port}/hiragana/a_row").status_code == 200
+            proc.send_signal(signal.SIGHUP)
+            time.sleep(0.5)
+            assert _wait_healthy(port)
+            proc.send_signal(signal.SIGTERM)
+            assert proc.wait(timeout=15) == 0
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
@@ -0,0 +1,114 @@
+"""Tests for single-flight request coalescing."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from opengov_earlyjapanese.utils.singleflight import AsyncSingleFlight, SingleFlight, call_key
+
+
+class TestCallKey:
+    """Test suite for call_key."""
+
+    def test_keyword_order_ignored(self):
+        """Test that keyword order does not change the key."""
+        assert call_key("f", a=1, b=2) == call_key("f", b=2, a=1)
+
+    def test_arguments_distinguish(self):
+        """Test that different arguments give different keys."""
+        assert call_key("f", 1) != call_key("f", 2)
+        assert call_key("f", object) == call_key("f", object)
+
+
+class TestSingleFlight:
+    """Test suite for the thread-based SingleFlight."""
+
+    def test_concurrent_calls_share_one_computation(self):
+        """Test that concurrent callers for one key run the function once."""
+        flight = SingleFlight()
+        calls = []
+        gate = threading.Event()
+
+        def compute():
+            calls.append(1)
+            gate.wait(1.0)
+            return 42
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do("k", compute)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        gate.set()
+        for t in threads:
+            t.join()
+        assert results == [42] * 8
+        assert len(calls) == 1
+        assert flight.in_flight() == 0
+
+    def test_errors_propagate_to_all(self):
+        """Test that waiters receive the leader's exception."""
+        flight = SingleFlight()
+        with pytest.raises(KeyError):
+            flight.do("k", lambda: {}["missing"])
+        # Key is released after a failure
+        assert flight.do("k", lambda: 1) == 1
+
+
+class TestAsyncSingleFlight:
+    """Test suite for AsyncSingleFlight."""
+
+    def test_coalesces(self):
+        """Test that concurrent awaits share one coroutine run."""
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "v"
+
+        async def scenario():
+            return await asyncio.gather(*(flight.do("k", compute) for _ in range(10)))
+
+        assert asyncio.run(scenario()) == ["v"] * 10
+        assert len(calls) == 1
+        assert flight.in_flight() == 0
+
+    def test_cancelled_waiter_does_not_cancel_work(self):
+        """Test that one caller going away leaves the shared work running."""
+        flight = AsyncSingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.02)
+            return 7
+
+        async def scenario():
+            first = asyncio.ensure_future(flight.do("k", compute))
+            second = asyncio.ensure_future(flight.do("k", compute))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(scenario()) == 7
+
+    def test_exception_shared(self):
+        """Test that the leader's exception reaches every waiter."""
+        flight = AsyncSingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+
+        async def scenario():
+            return await asyncio.gather(
+                flight.do("k", compute), flight.do("k", compute), return_exceptions=True
+            )
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(r, ValueError) for r in results)
@@ -140,3 +140,17 @@ class TestSpacedRepetitionSystem:
         assert state.interval > 5
         assert state.repetitions == 5
 
+
+    def test_schedule_many_matches_scalar(self, srs, initial_state):
+        """Test that batch scheduling agrees with one-at-a-time scheduling."""
+        ratings = ["again", "hard", "good", "easy"]
+        batch = srs.schedule_many([initial_state] * 4, ratings)
+        now = batch[0].next_review - timedelta(days=batch[0].interval)
+        for state, rating in zip(batch, ratings):
+            expected = srs.schedule(initial_state, rating, now)
+            assert state == expected
+
+    def test_schedule_many_length_mismatch(self, srs, initial_state):
+        """Test that batch scheduling rejects mismatched inputs."""
+        with pytest.raises(ValueError):
+            srs.schedule_many([initial_state], ["good", "easy"])
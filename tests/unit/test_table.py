@@ -0,0 +1,70 @@
+"""Tests for the display-width-aware table renderer."""
+
+import pytest
+
+from opengov_earlyjapanese.utils.table import TableRenderer, display_width, pad, truncate
+
+
+class TestDisplayWidth:
+    """Test suite for display width helpers."""
+
+    @pytest.mark.parametrize(
+        "text,width",
+        [("abc", 3), ("あいう", 6), ("ｱｲｳ", 3), ("愛 love", 7), ("é", 1), ("", 0)],
+    )
+    def test_display_width(self, text, width):
+        """Test wide, half-width and combining characters."""
+        assert display_width(text) == width
+
+    def test_truncate_wide(self):
+        """Test truncation never splits a wide character across the limit."""
+        assert truncate("あいうえお", 5) == "あい…"
+        assert display_width(truncate("あいうえお", 6)) <= 6
+        assert truncate("あい", 4) == "あい"
+
+    def test_truncate_narrow_limit(self):
+        """Test truncation to widths smaller than the ellipsis."""
+        assert truncate("abc", 0) == ""
+
+    def test_pad(self):
+        """Test padding to a display width."""
+        assert pad("あ", 4) == "あ  "
+        assert pad("toolong", 3) == "toolong"
+
+
+class TestTableRenderer:
+    """Test suite for TableRenderer."""
+
+    def test_columns_align(self):
+        """Test that separators line up for mixed-width content."""
+        lines = list(TableRenderer(["char", "meaning"]).render([["愛", "love"], ["a", "x"]]))
+        positions = {display_width(line.split("|")[0]) for line in lines if "|" in line}
+        assert len(positions) == 1
+        assert lines[1].startswith("-----+-")
+
+    def test_sampled_widths_truncate_later_rows(self):
+        """Test that rows after the sample are cut to the sampled widths."""
+        rows = [["abc"], ["def"], ["こんにちは"]]
+        lines = list(TableRenderer(["h"], sample=2).render(rows))
+        assert lines[-1] == "こ…"
+        assert all(display_width(line) == 3 for line in lines[2:])
+
+    def test_fixed_widths_stream(self):
+        """Test that fixed widths render rows as they are produced."""
+        produced = []
+
+        def rows():
+            for i in range(3):
+                produced.append(i)
+                yield [i, "あ" * i]
+
+        lines = TableRenderer(["n", "kana"], widths=[2, 4]).render(rows())
+        assert next(lines) == "n  | kana"
+        next(lines)
+        assert next(lines) == "0  |     "
+        assert produced == [0]
+
+    def test_max_width(self):
+        """Test that sampled widths are capped."""
+        lines = list(TableRenderer(["text"], max_width=5).render([["abcdefghij"]]))
+        assert lines[-1] == "abcd…"
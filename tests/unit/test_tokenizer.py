@@ -0,0 +1,265 @@
+"""Tests for the lattice tokenizer, its backends and front ends."""
+
+import json
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from typer.testing import CliRunner
+
+from opengov_earlyjapanese.api.main import app as api_app
+from opengov_earlyjapanese.cli import app
+from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.core import registry
+from opengov_earlyjapanese.core.models import Vocabulary
+from opengov_earlyjapanese.core.tokenizer import (
+    DictionaryTokenizer,
+    Token,
+    build_sections,
+    char_class,
+    create_tokenizer,
+    function_entries,
+    pos_class,
+    vocabulary_entries,
+)
+
+WORDS = [
+    ("学生", "がくせい", "noun", 380),
+    ("水", "みず", "noun", 420),
+    ("今日", "きょう", "noun", 150),
+    ("今日", "こんにち", "noun", 4200),
+    ("日本語", "にほんご", "noun", 900),
+    ("日本", "にほん", "noun", 300),
+    ("食べる", "たべる", "verb", 610),
+    ("書く", "かく", "godan verb", 700),
+    ("飲む", "のむ", "verb", 650),
+    ("大きい", "おおきい", "i-adjective", 350),
+    ("上手", "じょうず", "na-adjective", 2100),
+    ("勉強", "べんきょう", "noun", 1200),
+]
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    """A tokenizer over a small vocabulary plus the built-in function words."""
+    entries = [
+        Vocabulary(
+            id=f"v{i}",
+            word=w,
+            reading=r,
+            meanings=["x"],
+            part_of_speech=p,
+            jlpt_level="N5",
+            frequency_rank=rank,
+        )
+        for i, (w, r, p, rank) in enumerate(WORDS)
+    ]
+    return DictionaryTokenizer.from_entries([*function_entries(), *vocabulary_entries(entries)])
+
+
+def _split(tokenizer, text):
+    return [t.surface for t in tokenizer.tokenize(text)]
+
+
+class TestSegmentation:
+    """Test suite for dictionary segmentation."""
+
+    @pytest.mark.parametrize(
+        "text,words",
+        [
+            ("私は学生です。", ["私", "は", "学生", "です", "。"]),
+            ("日本語を勉強します", ["日本語", "を", "勉強", "し", "ます"]),
+            ("今日は水を飲みました", ["今日", "は", "水", "を", "飲み", "ました"]),
+            ("食べたい", ["食べ", "たい"]),
+            ("大きくない", ["大き", "くない"]),
+            ("大きい", ["大きい"]),
+            ("手紙を書いて", ["手紙", "を", "書い", "て"]),
+            ("上手ですね", ["上手", "です", "ね"]),
+        ],
+    )
+    def test_sentences(self, tokenizer, text, words):
+        """Common sentences split into words and endings."""
+        assert _split(tokenizer, text) == words
+
+    def test_readings_and_base_forms(self, tokenizer):
+        """Tokens carry hiragana readings, classes and dictionary forms."""
+        tokens = tokenizer.tokenize("今日は書かない")
+        assert [(t.reading, t.pos, t.base) for t in tokens] == [
+            ("きょう", "noun", "今日"),
+            ("わ", "particle", "は"),
+            ("かか", "verb-stem", "書く"),
+            ("ない", "inflection", "ない"),
+        ]
+
+    def test_kana_spelling(self, tokenizer):
+        """A word written in kana is still recognised, with its usual form as base."""
+        tokens = tokenizer.tokenize("たべます")
+        assert [(t.surface, t.base) for t in tokens] == [("たべ", "食べる"), ("ます", "ます")]
+
+    def test_unknown_words(self, tokenizer):
+        """Runs of katakana, latin and digits are single unknown tokens."""
+        tokens = tokenizer.tokenize("テストは100点とOK")
+        assert [(t.surface, t.pos, t.known) for t in tokens] == [
+            ("テスト", "noun", False),
+            ("は", "particle", True),
+            ("100", "number", False),
+            ("点", "noun", False),
+            ("と", "particle", True),
+            ("OK", "noun", False),
+        ]
+        assert tokens[0].reading == "てすと"
+
+    def test_offsets_cover_text(self, tokenizer):
+        """Offsets index the input across sentences and whitespace."""
+        text = "私は学生です。 水を飲みます！\n大きい"
+        tokens = tokenizer.tokenize(text)
+        assert all(text[t.start : t.end] == t.surface for t in tokens)
+        assert "".join(t.surface for t in tokens) == "".join(text.split())
+
+    def test_empty(self, tokenizer):
+        """Empty and blank text have no tokens."""
+        assert tokenizer.tokenize("") == []
+        assert tokenizer.tokenize(" \n ") == []
+
+
+class TestCachingAndBatches:
+    """Test suite for the sentence cache and batch APIs."""
+
+    def test_sentences_are_memoised(self):
+        """A repeated sentence is segmented once, wherever it appears."""
+        tokenizer = DictionaryTokenizer.from_entries(function_entries())
+        first = tokenizer.tokenize("これです。これです。")
+        assert tokenizer.cache.misses == 1 and tokenizer.cache.hits == 1
+        assert first[3].start == 5
+        tokenizer.tokenize("それは、これです。")
+        assert tokenizer.cache.misses == 2
+
+    def test_batch(self, tokenizer):
+        """tokenize_many and iter_tokenize match single calls."""
+        texts = ["私は学生です", "水を飲む", ""]
+        expected = [tokenizer.tokenize(t) for t in texts]
+        assert tokenizer.tokenize_many(texts) == expected
+        assert list(tokenizer.iter_tokenize(iter(texts))) == expected
+        assert tokenizer.words("水を飲む") == ["水", "を", "飲む"]
+
+
+class TestHelpers:
+    """Test suite for classification helpers."""
+
+    @pytest.mark.parametrize(
+        "ch,cls",
+        [
+            ("日", "kanji"),
+            ("々", "kanji"),
+            ("あ", "hiragana"),
+            ("ア", "katakana"),
+            ("ｱ", "katakana"),
+            ("A", "latin"),
+            ("５", "digit"),
+            ("。", "symbol"),
+            (" ", "space"),
+        ],
+    )
+    def test_char_class(self, ch, cls):
+        """Characters are classed as unknown-word rules expect."""
+        assert char_class(ch) == cls
+
+    @pytest.mark.parametrize(
+        "name,cls",
+        [
+            ("noun", "noun"),
+            ("Godan verb", "verb"),
+            ("adverb", "adverb"),
+            ("adjective (na)", "na-adjective"),
+            ("i-adjective", "i-adjective"),
+            ("expression", "noun"),
+        ],
+    )
+    def test_pos_class(self, name, cls):
+        """Content parts of speech map onto tokenizer classes."""
+        assert pos_class(name) == cls
+
+
+class TestBackends:
+    """Test suite for backend selection."""
+
+    def test_auto_falls_back_to_builtin(self, monkeypatch):
+        """Without SudachiPy or MeCab, auto selects the built-in tokenizer."""
+        monkeypatch.setitem(sys.modules, "sudachipy", None)
+        monkeypatch.setitem(sys.modules, "fugashi", None)
+        monkeypatch.setattr(settings, "use_sudachi", True)
+        monkeypatch.setattr(settings, "mecab_dict_path", "/nonexistent")
+        tokenizer = create_tokenizer("auto")
+        assert tokenizer.name == "builtin"
+        assert [t.surface for t in tokenizer.tokenize("これは")] == ["これ", "は"]
+
+    @pytest.mark.parametrize("backend", ["sudachi", "mecab"])
+    def test_explicit_backend_must_be_installed(self, monkeypatch, backend):
+        """Asking for a missing backend by name raises ImportError."""
+        monkeypatch.setitem(sys.modules, "sudachipy", None)
+        monkeypatch.setitem(sys.modules, "fugashi", None)
+        with pytest.raises(ImportError):
+            create_tokenizer(backend)
+
+    def test_unknown_backend(self):
+        """An unknown backend name is rejected."""
+        with pytest.raises(ValueError):
+            create_tokenizer("juman")
+
+    def test_lexicon_only_loaded_for_builtin(self, monkeypatch):
+        """The lexicon loader is called only when the built-in tokenizer is chosen."""
+        monkeypatch.setitem(sys.modules, "fugashi", None)
+        calls = []
+
+        def lexicon():
+            calls.append(1)
+            return build_sections(function_entries())
+
+        with pytest.raises(ImportError):
+            create_tokenizer("mecab", lexicon)
+        assert calls == []
+        create_tokenizer("builtin", lexicon)
+        assert calls == [1]
+
+
+class TestInterfaces:
+    """Test suite for the registry, CLI and API."""
+
+    @pytest.fixture(autouse=True)
+    def builtin(self, monkeypatch):
+        """Use the built-in tokenizer over the served content."""
+        monkeypatch.setattr(settings, "tokenizer_backend", "builtin")
+        registry.reload()
+        yield
+        registry.reload()
+
+    def test_registry_lexicon_covers_content(self):
+        """The shared tokenizer knows the served vocabulary."""
+        tokens = registry.get_tokenizer().tokenize("学生は日本語を食べます")
+        assert [t.surface for t in tokens] == ["学生", "は", "日本語", "を", "食べ", "ます"]
+        assert registry.get_tokenizer() is registry.get_tokenizer()
+
+    def test_cli(self):
+        """tokenize prints tokens as JSON, a table or words, and streams batches."""
+        runner = CliRunner()
+        result = runner.invoke(app, ["tokenize", "学生です"])
+        assert result.exit_code == 0
+        assert [t["surface"] for t in json.loads(result.output)] == ["学生", "です"]
+        result = runner.invoke(app, ["tokenize", "学生です", "--format", "words"])
+        assert result.output.strip() == "学生 です"
+        result = runner.invoke(app, ["tokenize", "学生です", "--format", "table"])
+        assert "がくせい" in result.output
+        result = runner.invoke(app, ["tokenize", "--stdin"], input="学生です\n水\n")
+        lines = [json.loads(line) for line in result.output.splitlines()]
+        assert [len(line["result"]) for line in lines] == [2, 1]
+
+    def test_api(self):
+        """POST /tokenize and /tokenize/batch return tokens with offsets."""
+        with TestClient(api_app) as client:
+            response = client.post("/tokenize", json={"text": "学生です"})
+            assert response.status_code == 200
+            tokens = response.json()["tokens"]
+            assert tokens[0] == dict(Token("学生", "がくせい", "noun", "学生", 0, 2)._asdict())
+            response = client.post("/tokenize/batch", json={"texts": ["水", "学生です"]})
+            assert [len(r) for r in response.json()["results"]] == [1, 2]
+            assert client.post("/tokenize", json={"text": "x" * 100_001}).status_code == 422
@@ -0,0 +1,170 @@
+"""Tests for tracing spans and exporters."""
+
+import asyncio
+import json
+
+import pytest
+
+from opengov_earlyjapanese.core.hiragana import HiraganaTeacher
+from opengov_earlyjapanese.core.srs import SpacedRepetitionSystem, SRSState
+from opengov_earlyjapanese.utils.tracing import (
+    NOOP_SPAN,
+    FileExporter,
+    InMemoryExporter,
+    current_span,
+    read_spans,
+    summarize,
+    traced,
+    tracer,
+)
+
+
+@pytest.fixture
+def exporter():
+    """Enable tracing into memory for one test."""
+    exporter = InMemoryExporter()
+    tracer.configure(exporter)
+    yield exporter
+    tracer.disable()
+
+
+def _span(name, span_id, parent=None, start=0, end=1_000_000, code="UNSET"):
+    return {
+        "name": name,
+        "trace_id": "t",
+        "span_id": span_id,
+        "parent_span_id": parent,
+        "start_time_unix_nano": start,
+        "end_time_unix_nano": end,
+        "status": {"code": code},
+    }
+
+
+class TestDisabled:
+    """Behaviour with no exporter configured."""
+
+    def test_start_span_is_noop(self):
+        """Test that disabled tracing hands out the shared no-op span."""
+        assert not tracer.enabled
+        with tracer.start_span("anything") as span:
+            span.set_attribute("k", "v")
+            assert span is NOOP_SPAN
+        assert current_span() is NOOP_SPAN
+
+    def test_traced_calls_through(self):
+        """Test that decorated functions still run and return normally."""
+
+        @traced("double")
+        def double(x):
+            return x * 2
+
+        assert double(21) == 42
+
+
+class TestSpans:
+    """Span nesting, attributes and status."""
+
+    def test_nested_spans_share_trace(self, exporter):
+        """Test that a child span records its parent and trace id."""
+        with tracer.start_span("outer") as outer:
+            with tracer.start_span("inner", {"k": 1}) as inner:
+                assert current_span() is inner
+            assert current_span() is outer
+        inner_span, outer_span = exporter.get_finished_spans()
+        assert inner_span.parent_span_id == outer_span.span_id
+        assert inner_span.trace_id == outer_span.trace_id
+        assert outer_span.parent_span_id is None
+        assert inner_span.attributes == {"k": 1}
+        assert len(outer_span.trace_id) == 32 and len(outer_span.span_id) == 16
+
+    def test_exception_sets_error_status(self, exporter):
+        """Test that an escaping exception is recorded as an event."""
+        with pytest.raises(KeyError), tracer.start_span("failing"):
+            raise KeyError("missing")
+        (span,) = exporter.get_finished_spans()
+        assert span.status_code == "ERROR"
+        assert span.events[0]["name"] == "exception"
+        assert span.events[0]["attributes"]["exception.type"] == "KeyError"
+
+    def test_context_follows_tasks(self, exporter):
+        """Test that spans started in concurrent tasks get the right parent."""
+
+        async def child(name):
+            with tracer.start_span(name):
+                await asyncio.sleep(0)
+
+        async def main():
+            with tracer.start_span("root"):
+                await asyncio.gather(child("a"), child("b"))
+
+        asyncio.run(main())
+        spans = {s.name: s for s in exporter.get_finished_spans()}
+        assert spans["a"].parent_span_id == spans["root"].span_id
+        assert spans["b"].parent_span_id == spans["root"].span_id
+
+    def test_traced_records_arguments(self, exporter):
+        """Test that instrumented core calls export named arguments."""
+        HiraganaTeacher().get_lesson("a_row")
+        (span,) = exporter.get_finished_spans()
+        assert span.name == "hiragana.get_lesson"
+        assert span.attributes["row"] == "a_row"
+        assert span.attributes["code.function"] == "HiraganaTeacher.get_lesson"
+
+    def test_schedule_many_nests_schedules(self, exporter):
+        """Test that batch scheduling nests one span per card."""
+        from datetime import datetime
+
+        state = SRSState(interval=1, ease_factor=2.5, repetitions=0, next_review=datetime.now())
+        SpacedRepetitionSystem().schedule_many([state, state], ["good", "again"])
+        spans = exporter.get_finished_spans()
+        parent = spans[-1]
+        assert parent.name == "srs.schedule_many"
+        children = [s for s in spans if s.parent_span_id == parent.span_id]
+        assert [s.attributes["rating"] for s in children] == ["good", "again"]
+
+
+class TestExporters:
+    """File export and offline inspection."""
+
+    def test_file_round_trip(self, tmp_path):
+        """Test that spans written to a file can be read back."""
+        path = tmp_path / "spans.jsonl"
+        tracer.configure(FileExporter(path))
+        try:
+            with tracer.start_span("written", {"n": 1}):
+                pass
+        finally:
+            tracer.disable()
+        with path.open("a", encoding="utf-8") as f:
+            f.write('{"truncated"')
+        (span,) = read_spans(path)
+        assert span["name"] == "written"
+        assert span["attributes"] == {"n": 1}
+        assert json.dumps(span)
+
+    def test_in_memory_is_bounded(self, exporter):
+        """Test that the in-memory exporter keeps only the newest spans."""
+        small = InMemoryExporter(maxlen=2)
+        tracer.configure(small)
+        for name in "abc":
+            with tracer.start_span(name):
+                pass
+        assert [s.name for s in small.get_finished_spans()] == ["b", "c"]
+
+
+class TestSummarize:
+    """Per-name rollups."""
+
+    def test_self_time_excludes_children(self):
+        """Test that self time subtracts direct children only."""
+        spans = [
+            _span("request", "1", end=10_000_000),
+            _span("lookup", "2", parent="1", end=6_000_000),
+            _span("query", "3", parent="2", end=4_000_000, code="ERROR"),
+        ]
+        rows = {r["name"]: r for r in summarize(spans)}
+        assert rows["request"]["self_ms"] == 4.0
+        assert rows["lookup"]["self_ms"] == 2.0
+        assert rows["query"]["self_ms"] == 4.0
+        assert rows["query"]["errors"] == 1
+        assert summarize(spans)[-1]["name"] == "lookup"
@@ -0,0 +1,65 @@
+"""Tests for request spans and the admin trace route."""
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import SecretStr
+
+from opengov_earlyjapanese.api.main import app
+from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.utils.tracing import InMemoryExporter, tracer
+
+TOKEN = "s3cret"
+AUTH = {"X-Admin-Token": TOKEN}
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    """Enable in-memory tracing and an admin token for one test."""
+    monkeypatch.setattr(settings, "admin_token", SecretStr(TOKEN))
+    exporter = InMemoryExporter()
+    tracer.configure(exporter)
+    yield exporter
+    tracer.disable()
+
+
+class TestTracingMiddleware:
+    """Test suite for request spans."""
+
+    def test_request_span_wraps_handler(self, exporter):
+        """Test that core spans nest under the route-named server span."""
+        response = TestClient(app).get("/hiragana/a_row")
+        assert response.status_code == 200
+        spans = {s.name: s for s in exporter.get_finished_spans()}
+        server = spans["GET /hiragana/{row}"]
+        assert server.kind == "SERVER"
+        assert server.attributes["http.response.status_code"] == 200
+        assert server.attributes["http.route"] == "/hiragana/{row}"
+        assert spans["hiragana.get_lesson"].parent_span_id == server.span_id
+        assert spans["serialize"].parent_span_id == server.span_id
+
+    def test_no_spans_when_disabled(self):
+        """Test that requests are untraced without an exporter."""
+        assert TestClient(app).get("/health").status_code == 200
+        assert tracer.exporter is None
+
+
+class TestTracesRoute:
+    """Test suite for /admin/traces."""
+
+    def test_lists_and_summarises(self, exporter):
+        """Test listing spans by trace and the summary view."""
+        client = TestClient(app)
+        client.get("/hiragana/a_row")
+        spans = client.get("/admin/traces", headers=AUTH).json()
+        trace_id = next(s["trace_id"] for s in spans if s["name"] == "GET /hiragana/{row}")
+        one = client.get("/admin/traces", params={"trace_id": trace_id}, headers=AUTH).json()
+        names = {s["name"] for s in one}
+        assert names == {"GET /hiragana/{row}", "hiragana.get_lesson", "serialize"}
+        summary = client.get("/admin/traces", params={"summary": True}, headers=AUTH).json()
+        assert {"name", "count", "self_ms"} <= set(summary[0])
+
+    def test_not_found_without_memory_exporter(self, monkeypatch):
+        """Test that the route reports when spans are not kept in memory."""
+        monkeypatch.setattr(settings, "admin_token", SecretStr(TOKEN))
+        response = TestClient(app).get("/admin/traces", headers=AUTH)
+        assert response.status_code == 404
@@ -0,0 +1,195 @@
+"""Tests for the indexed vocabulary bank and its CLI and API lookups."""
+
+import json
+import unicodedata
+
+import pytest
+from fastapi.testclient import TestClient
+from typer.testing import CliRunner
+
+from opengov_earlyjapanese.api.main import app as api_app
+from opengov_earlyjapanese.cli import app
+from opengov_earlyjapanese.config import settings
+from opengov_earlyjapanese.core import registry, vocabulary
+from opengov_earlyjapanese.core.pack import ContentPack, build_pack, builtin_records
+from opengov_earlyjapanese.core.vocabulary import (
+    INDEX_VERSION,
+    VocabularyBank,
+    build_sections,
+    entry_id,
+)
+from opengov_earlyjapanese.utils.index_cache import IndexCache
+
+
+@pytest.fixture
+def bank():
+    """A bank over the built-in sample vocabulary."""
+    return VocabularyBank.from_records(vocabulary.builtin_records())
+
+
+class TestLookups:
+    """Point lookups by id, word and reading."""
+
+    def test_by_word_and_reading(self, bank):
+        """Test that an entry is found by its written form and by its reading."""
+        (by_word,) = bank.by_word("食べる")
+        (by_reading,) = bank.by_reading("たべる")
+        assert by_word == by_reading
+        assert by_word.meanings == ["to eat"]
+
+    def test_homographs(self, bank):
+        """Test that one written form with two readings returns both entries."""
+        readings = {e.reading for e in bank.by_word("今日")}
+        assert readings == {"きょう", "こんにち"}
+
+    def test_lookup_prefers_words(self, bank):
+        """Test that lookup matches words and readings without duplicates."""
+        assert [e.word for e in bank.lookup("みず")] == ["水"]
+        assert len(bank.lookup("今日")) == 2
+        assert bank.lookup("ない") == []
+
+    def test_lookup_normalises_input(self, bank):
+        """Test that decomposed kana and surrounding space still match."""
+        assert bank.by_reading(unicodedata.normalize("NFD", " がくせい "))[0].word == "学生"
+
+    def test_get_by_id(self, bank):
+        """Test id lookup and the generated id format."""
+        assert bank.get("vocab_水_みず").word == "水"
+        assert bank.get("missing") is None
+        assert bank["vocab_水_みず"].word == "水"
+        with pytest.raises(KeyError):
+            bank["missing"]
+        assert bank.ids() == sorted(bank.ids())
+        assert entry_id({"word": "水", "reading": "みず"}) == "vocab_水_みず"
+
+    def test_duplicate_ids_rejected(self):
+        """Test that the same word and reading cannot be added twice."""
+        record = vocabulary.BUILTIN[0]
+        with pytest.raises(ValueError, match="Duplicate"):
+            build_sections([record, dict(record)])
+
+    def test_invalid_record_rejected(self):
+        """Test that records are validated against the Vocabulary model."""
+        with pytest.raises(ValueError):
+            build_sections([{"word": "水", "reading": "みず", "jlpt_level": "N9"}])
+
+
+class TestFilters:
+    """Level, part-of-speech and frequency queries."""
+
+    def test_level_and_part_of_speech(self, bank):
+        """Test that filters intersect and are case-insensitive."""
+        assert bank.levels() == ["N3", "N5"]
+        assert {e.reading for e in bank.find(jlpt_level="n3")} == {"こんにち"}
+        adjectives = bank.find(jlpt_level="N5", part_of_speech="I-Adjective")
+        assert [e.word for e in adjectives] == ["大きい"]
+        assert bank.find(jlpt_level="N1") == []
+        assert bank.find(part_of_speech="particle") == []
+
+    def test_rank_range_in_frequency_order(self, bank):
+        """Test that rank bounds are inclusive and results come most frequent first."""
+        ranks = [e.frequency_rank for e in bank.find(max_rank=600)]
+        assert ranks == [150, 350, 380, 420]
+        found = bank.find(min_rank=420, max_rank=900, part_of_speech="noun")
+        assert [e.frequency_rank for e in found] == [420, 900]
+
+    def test_limit(self, bank):
+        """Test that find stops at the limit."""
+        assert len(bank.find(limit=3)) == 3
+        assert len(list(bank.iter_find())) == len(bank)
+
+    def test_stats(self, bank):
+        """Test the size summary."""
+        stats = bank.stats()
+        assert stats["entries"] == len(vocabulary.BUILTIN)
+        assert stats["levels"] == {"N3": 1, "N5": 7}
+
+
+class TestStorage:
+    """Banks loaded from the index cache and content packs."""
+
+    def test_cached_sections_round_trip(self, tmp_path, bank):
+        """Test that a bank mapped from a cache file answers like the built one."""
+        cache = IndexCache(tmp_path)
+        records = vocabulary.builtin_records()
+        cache.load_or_build("vocabulary", "h", lambda: build_sections(records), INDEX_VERSION)
+        loaded = VocabularyBank(
+            cache.load_or_build("vocabulary", "h", lambda: pytest.fail("rebuilt"), INDEX_VERSION)
+        )
+        assert cache.hits == 1
+        assert loaded.ids() == bank.ids()
+        assert loaded.lookup("今日") == bank.lookup("今日")
+        assert loaded.find(max_rank=600) == bank.find(max_rank=600)
+        assert loaded.find(jlpt_level="N5", part_of_speech="noun") == bank.find(
+            jlpt_level="N5", part_of_speech="noun"
+        )
+
+    def test_registry_uses_content_pack(self, tmp_path, monkeypatch):
+        """Test that the shared bank is built from the configured pack."""
+        path = tmp_path / "content.pack"
+        records = [r for r in builtin_records() if r[0] != "vocabulary"]
+        records.append(
+            (
+                "vocabulary",
+                "v1",
+                "N4",
+                {
+                    "id": "v1",
+                    "word": "猫",
+                    "reading": "ねこ",
+                    "meanings": ["cat"],
+                    "part_of_speech": "noun",
+                    "jlpt_level": "N4",
+                },
+            )
+        )
+        build_pack(records, path)
+        with ContentPack(path) as pack:
+            assert pack.keys("vocabulary") == ["v1"]
+        monkeypatch.setattr(settings, "content_pack", path)
+        registry.reload()
+        try:
+            bank = registry.get_vocabulary_bank()
+            assert bank.ids() == ["v1"]
+            assert bank.by_reading("ねこ")[0].meanings == ["cat"]
+        finally:
+            monkeypatch.setattr(settings, "content_pack", None)
+            registry.reload()
+
+
+class TestInterfaces:
+    """CLI and HTTP lookups."""
+
+    def test_cli_lookup(self):
+        """Test the vocab lookup command in JSON and table form."""
+        runner = CliRunner()
+        result = runner.invoke(app, ["vocab", "lookup", "きょう"])
+        assert result.exit_code == 0
+        assert json.loads(result.stdout)[0]["meanings"] == ["today"]
+        table = runner.invoke(app, ["vocab", "lookup", "今日", "-f", "table"])
+        assert "こんにち" in table.stdout
+        missing = runner.invoke(app, ["vocab", "lookup", "ない"])
+        assert missing.exit_code == 1
+
+    def test_cli_list(self):
+        """Test the vocab list command's filters."""
+        result = CliRunner().invoke(app, ["vocab", "list", "--jlpt", "N5", "--max-rank", "400"])
+        assert result.exit_code == 0
+        assert [e["word"] for e in json.loads(result.stdout)] == ["今日", "大きい", "学生"]
+
+    def test_api_lookup_and_search(self):
+        """Test the vocabulary endpoints."""
+        client = TestClient(api_app)
+        response = client.get("/vocabulary/lookup/今日")
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+        assert client.get("/vocabulary/lookup/ない").status_code == 404
+        response = client.get("/vocabulary/search", params={"jlpt": "N5", "pos": "verb"})
+        assert [e["word"] for e in response.json()["items"]] == ["食べる"]
+        assert client.get("/vocabulary/search", params={"jlpt": "N9"}).status_code == 422
+
+    def test_api_listing(self):
+        """Test that vocabulary is also a paginated collection."""
+        page = TestClient(api_app).get("/vocabulary", params={"limit": 3}).json()
+        assert len(page["items"]) == 3
+        assert page["next_cursor"]